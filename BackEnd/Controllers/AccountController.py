@@ -2,16 +2,20 @@
 """
 Contains the class Account Controller
 """
+import logging
 from BackEnd.models import storage
 from BackEnd.models.Account import Account
 from BackEnd.models.Transaction import Transaction
 from sqlalchemy.orm.exc import NoResultFound
 from BackEnd.Controllers.AccountAuthController import AccountAuthController
 from BackEnd.Controllers.NotificationController import NotificationController
+from BackEnd.Controllers.TransactionController import TransactionController
 from typing import List
 from sqlalchemy import func
 import re
 
+logger = logging.getLogger(__name__)
+
 
 class AccountController:
     """
@@ -23,6 +27,7 @@ class AccountController:
         self.db = storage
         self.auth = AccountAuthController()
         self.notification_controller = NotificationController()
+        self.transaction_controller = TransactionController()
         self.__session = None
 
     def _get_last_account_number(self):
@@ -72,32 +77,41 @@ class AccountController:
             return True
         except Exception as e:
             self.db.Rollback()
-            print(f"Error deleting accounts for user {user_id}: {e}")
+            logger.exception("Error deleting accounts for user %s", user_id)
             return False
 
+    def new_account(self, user_id: str, account_type: str = 'savings', **fields) -> Account:
+        """
+        Add an account with the next account number to the session,
+        leaving the commit to the caller
+        Args:
+            user_id: The ID of the customer owning the account
+            account_type: Account type, e.g. 'savings'
+            fields: Other column values, e.g. status or balance
+        Returns:
+            The pending account
+        """
+        account = Account(
+            user_id=user_id,
+            account_number=self._generate_account_number(),
+            type=account_type,
+            **fields
+        )
+        self.db.new(account)
+        return account
+
     def create_account(self, user_id: str, account_type: str = 'savings') -> Account:
         """Create a new account for a customer"""
         try:
-            # Generate new account number
-            account_number = self._generate_account_number()
-            
-            # Create new account with inactive status by default
-            account = Account(
-                user_id=user_id,
-                account_number=account_number,
-                type=account_type,
-                status='inactive'  # New accounts start as inactive
-            )
-            
-            # Save to database
-            self.db.new(account)
+            # New accounts start as inactive
+            account = self.new_account(user_id, account_type, status='inactive')
             self.db.save()
             
             return account
             
         except Exception as e:
             self.db.Rollback()
-            print(f"Error creating account: {e}")
+            logger.exception("Error creating account")
             raise e
 
     def get_account_by_number(self, account_number: str) -> Account:
@@ -185,10 +199,8 @@ class AccountController:
         if not self.auth.validate_active_account(account_id):
             raise ValueError("Cannot deposit to a non-active account")
 
-        account = self.db.get(Account, account_id)
-        account.balance += amount
-        transaction = Transaction(account_id=account_id, amount=amount, transaction_type="deposit")
-        self.db.new(transaction)
+        account = self.transaction_controller.lock_account(account_id)
+        self.transaction_controller.post(account, amount, "deposit")
         self.db.save()
 
     def withdraw(self, account_id: int, amount: float) -> None:
@@ -196,13 +208,11 @@ class AccountController:
         if not self.auth.validate_active_account(account_id):
             raise ValueError("Cannot withdraw from a non-active account")
 
-        account = self.db.get(Account, account_id)
+        account = self.transaction_controller.lock_account(account_id)
         if account.balance < amount:
             raise ValueError("Insufficient funds")
 
-        account.balance -= amount
-        transaction = Transaction(account_id=account_id, amount=-amount, type="withdrawal")
-        self.db.new(transaction)
+        transaction = self.transaction_controller.post(account, -amount, "withdrawal")
         self.db.save()
         return transaction.id
 
@@ -212,16 +222,17 @@ class AccountController:
                 to_account_id)):
             raise ValueError("Both accounts must be active for transfer")
 
-        from_account = self.db.get(Account, from_account_id)
-        to_account = self.db.get(Account, to_account_id)
+        # Lock both rows in a fixed order so opposite transfers cannot deadlock
+        locked = {account_id: self.transaction_controller.lock_account(account_id)
+                  for account_id in sorted({from_account_id, to_account_id})}
+        from_account = locked[from_account_id]
+        to_account = locked[to_account_id]
 
         if from_account.balance < amount:
             raise ValueError("Insufficient funds")
 
-        from_account.balance -= amount
-        to_account.balance += amount
-        transaction = Transaction(account_id=from_account_id, amount=-amount, type="transfer")
-        self.db.new(transaction)
+        self.transaction_controller.post(from_account, -amount, "transfer")
+        self.transaction_controller.post(to_account, amount, "transfer")
         self.db.save()
 
     def get_transactions_by_account(self, account_id: int) -> List[Transaction]:
@@ -248,7 +259,7 @@ class AccountController:
             return False
         except Exception as e:
             self.db.Rollback()
-            print(f"Error updating account status: {e}")
+            logger.exception("Error updating account status")
             return False
 
     def update_account_balance(self, account_number: str, amount: float) -> bool:
@@ -262,7 +273,7 @@ class AccountController:
             return False
         except Exception as e:
             self.db.Rollback()
-            print(f"Error updating account balance: {e}")
+            logger.exception("Error updating account balance")
             return False
 
     def activate_account(self, user_id: str) -> bool:
@@ -271,16 +282,16 @@ class AccountController:
             account = self.get_accounts_by_id(user_id)
             if account:
                 account.status = 'active'
-                self.db.save()
                 
                 # Create activation notification
-                self.notification_controller.notify_account_activation(user_id)
+                self.notification_controller.notify_account_activation(user_id, commit=False)
+                self.db.save()
                 
                 return True
             return False
         except Exception as e:
             self.db.Rollback()
-            print(f"Error activating account for user {user_id}: {e}")
+            logger.exception("Error activating account for user %s", user_id)
             return False
 
     def deactivate_account_by_user(self, user_id: str) -> bool:
@@ -294,5 +305,5 @@ class AccountController:
             return False
         except Exception as e:
             self.db.Rollback()
-            print(f"Error deactivating account for user {user_id}: {e}")
+            logger.exception("Error deactivating account for user %s", user_id)
             return False
@@ -9,7 +9,7 @@ from sqlalchemy.orm.exc import NoResultFound
 from BackEnd.models import storage
 from BackEnd.models.user import User
 from BackEnd.Controllers.UserControllers import UserController
-from BackEnd.Controllers.EmailVerificationController import send_verification_email
+from BackEnd.tasks.runner import defer
 from datetime import datetime, timedelta
 
 
@@ -23,8 +23,16 @@ def _generate_uuid() -> str:
     return str(uuid4())
 
 
+# Expired sessions are swept at most this often, not on every lookup
+SESSION_CLEANUP_INTERVAL = timedelta(minutes=5)
+# How long a notification stream ticket can wait to be redeemed
+STREAM_TICKET_TTL = timedelta(seconds=30)
+
+
 class AuthController:
     """AuthController class to interact with the authentication database."""
+    _last_session_cleanup = None
+
     def __init__(self):
         """Initializes a new AuthController instance"""
         self._db = storage
@@ -38,32 +46,31 @@ class AuthController:
         try:
             new_user = self._userC.find_user_by(email=email)
         except NoResultFound:
-            # Create new user with all fields
-            new_user = self._userC.add_user(
-                username=username,
-                email=email,
-                password=password,
-                admin=admin,
-                fullname=fullname or username,
-                phone_number=phone_number
-            )
-            
-            # Handle file uploads if present
-            if fayda_document:
-                new_user.update_fayda_document(fayda_document)
-            
-            if id_card_front:
-                new_user.update_id_card_front(id_card_front)
-            
-            if id_card_back:
-                new_user.update_id_card_back(id_card_back)
-            
-            # Save all file uploads
-            if fayda_document or id_card_front or id_card_back:
-                self._db.save()
-            
-            # Send verification email
-            send_verification_email(new_user.id)
+            # The user, their account, uploads and the tasks sending the
+            # welcome notification and verification email are written in
+            # one commit
+            with self._db.transaction():
+                # Create new user with all fields
+                new_user = self._userC.add_user(
+                    username=username,
+                    email=email,
+                    password=password,
+                    admin=admin,
+                    fullname=fullname or username,
+                    phone_number=phone_number
+                )
+
+                # Handle file uploads if present
+                if fayda_document:
+                    new_user.update_fayda_document(fayda_document)
+
+                if id_card_front:
+                    new_user.update_id_card_front(id_card_front)
+
+                if id_card_back:
+                    new_user.update_id_card_back(id_card_back)
+
+                defer('send_verification_email', user_id=new_user.id)
 
             return new_user
         raise ValueError(f"User {email} already exists")
@@ -103,7 +110,11 @@ class AuthController:
         user = None
         if session_id is None:
             return None
-        self._db.cleanup_expired_sessions()
+        now = datetime.utcnow()
+        if (AuthController._last_session_cleanup is None or
+                now - AuthController._last_session_cleanup >= SESSION_CLEANUP_INTERVAL):
+            AuthController._last_session_cleanup = now
+            self._db.cleanup_expired_sessions()
         try:
             user = self._userC.find_user_by(session_id=session_id)
             # Check if session has expired
@@ -118,7 +129,40 @@ class AuthController:
         """Destroys a session associated with a given user."""
         if user_id is None:
             return None
-        self._userC.update_user(user_id, session_id=None, session_expiration=None)
+        self._userC.update_user(user_id, session_id=None, session_expiration=None,
+                                stream_ticket=None, stream_ticket_expiration=None)
+
+    def create_stream_ticket(self, user_id: str) -> str:
+        """
+        Issue a short-lived, single-use ticket that opens the user's
+        notification stream, so the session id never goes in a URL
+        """
+        ticket = _generate_uuid()
+        self._userC.update_user(user_id, stream_ticket=ticket,
+                                stream_ticket_expiration=datetime.utcnow() + STREAM_TICKET_TTL)
+        return ticket
+
+    def redeem_stream_ticket(self, ticket: str) -> Union[User, None]:
+        """
+        Exchange a stream ticket for its user; the ticket is cleared in the
+        same conditional UPDATE, so only one request can redeem it
+        """
+        if not ticket:
+            return None
+        session = self._db.session()
+        user = session.query(User).filter(User.stream_ticket == ticket).first()
+        if user is None:
+            return None
+        redeemed = session.query(User).filter(
+            User.id == user.id,
+            User.stream_ticket == ticket,
+            User.stream_ticket_expiration >= datetime.utcnow()
+        ).update({User.stream_ticket: None, User.stream_ticket_expiration: None},
+                 synchronize_session=False)
+        session.commit()
+        if not redeemed or user.session_id is None:
+            return None
+        return user
 
     def get_reset_password_token(self, email: str) -> str:
         """Generates a password reset token for a user."""
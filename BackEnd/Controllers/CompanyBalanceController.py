@@ -2,16 +2,20 @@
 """
 Contains the CompanyBalanceController class for managing company financial metrics
 """
+import logging
 from BackEnd.models import storage
 from BackEnd.models.Transaction import Transaction
 from BackEnd.models.Loan import Loan
 from BackEnd.models.Account import Account
 from BackEnd.models.Stripe import StripePayment
 from BackEnd.models.Repayment import Repayment
+from BackEnd.Controllers.DelinquencyController import DelinquencyController
 from sqlalchemy import func, and_
 from datetime import datetime, timedelta
 from typing import Dict, List, Any
 
+logger = logging.getLogger(__name__)
+
 
 class CompanyBalanceController:
     """
@@ -21,6 +25,7 @@ class CompanyBalanceController:
     def __init__(self):
         """Initialize the CompanyBalanceController with database storage"""
         self.db = storage
+        self.delinquency_controller = DelinquencyController()
 
     def get_company_overview(self) -> Dict[str, Any]:
         """
@@ -42,6 +47,7 @@ class CompanyBalanceController:
             company_balance = self._calculate_company_balance()
             profit_loss = self._calculate_profit_loss()
             loan_default_rate = self._calculate_loan_default_rate()
+            delinquency = self.delinquency_controller.get_bucket_summary()
             
             # Get trend data (last 12 months)
             monthly_trends = self._get_monthly_trends()
@@ -63,6 +69,7 @@ class CompanyBalanceController:
                     "active_loan_amount": active_loans["amount"],
                     "total_interest_earned": total_interest_earned,
                     "loan_default_rate": loan_default_rate,
+                    "delinquency": delinquency,
                     "total_repayments": total_loan_repayments
                 },
                 "transactions": {
@@ -75,7 +82,7 @@ class CompanyBalanceController:
                 "generated_at": datetime.now().isoformat()
             }
         except Exception as e:
-            print(f"Error getting company overview: {str(e)}")
+            logger.exception("Error getting company overview")
             return {"error": str(e)}
 
     def _get_total_customers(self) -> int:
@@ -154,7 +161,7 @@ class CompanyBalanceController:
             
             return total_interest
         except Exception as e:
-            print(f"Error calculating interest earned: {str(e)}")
+            logger.exception("Error calculating interest earned")
             return 0.0
 
     def _get_loan_repayments_amount(self, loan_id: str) -> float:
@@ -197,7 +204,7 @@ class CompanyBalanceController:
             company_balance = total_deposits - total_withdrawals - total_disbursements + total_repayments
             return company_balance
         except Exception as e:
-            print(f"Error calculating company balance: {str(e)}")
+            logger.exception("Error calculating company balance")
             return 0.0
 
     def _calculate_profit_loss(self) -> float:
@@ -218,25 +225,39 @@ class CompanyBalanceController:
     def _calculate_loan_default_rate(self) -> float:
         """Calculate loan default rate (percentage)"""
         try:
-            loans = list(self.db.all(Loan).values())
-            total_loans = len([loan for loan in loans if loan.loan_status in ['active', 'paid']])
+            total_loans = self.db.session().query(func.count(Loan.id)).filter(
+                Loan.loan_status.in_(['active', 'paid'])
+            ).scalar() or 0
             
             if total_loans == 0:
                 return 0.0
             
-            # For now, we'll consider loans that are overdue as defaults
-            # You can enhance this logic based on your business rules
-            defaulted_loans = 0
-            current_date = datetime.now()
-            
-            for loan in loans:
-                if loan.loan_status == 'active' and loan.end_date and loan.end_date < current_date:
-                    defaulted_loans += 1
+            # Overdue loans are counted as defaults, read from the daily
+            # delinquency snapshot
+            defaulted_loans = self.delinquency_controller.count_delinquent()
             
             return (defaulted_loans / total_loans) * 100
         except:
             return 0.0
 
+    def get_delinquency_summary(self) -> Dict[str, Any]:
+        """
+        Get overdue loans grouped by days-past-due bucket
+        Returns:
+            Dictionary containing the buckets and their totals
+        """
+        try:
+            buckets = self.delinquency_controller.get_bucket_summary()
+            return {
+                "buckets": buckets,
+                "total_count": sum(b["count"] for b in buckets.values()),
+                "total_amount": sum(b["amount"] for b in buckets.values()),
+                "generated_at": datetime.now().isoformat()
+            }
+        except Exception as e:
+            logger.exception("Error getting delinquency summary")
+            return {"error": str(e)}
+
     def _get_monthly_trends(self) -> List[Dict[str, Any]]:
         """Get monthly trends for the last 12 months"""
         try:
@@ -278,7 +299,7 @@ class CompanyBalanceController:
             
             return list(reversed(trends))  # Most recent first
         except Exception as e:
-            print(f"Error getting monthly trends: {str(e)}")
+            logger.exception("Error getting monthly trends")
             return []
 
     def _get_recent_activities(self) -> List[Dict[str, Any]]:
@@ -316,7 +337,7 @@ class CompanyBalanceController:
             activities.sort(key=lambda x: x["date"], reverse=True)
             return activities[:10]
         except Exception as e:
-            print(f"Error getting recent activities: {str(e)}")
+            logger.exception("Error getting recent activities")
             return []
 
     def get_detailed_loan_analytics(self) -> Dict[str, Any]:
@@ -361,5 +382,5 @@ class CompanyBalanceController:
                 "generated_at": datetime.now().isoformat()
             }
         except Exception as e:
-            print(f"Error getting loan analytics: {str(e)}")
+            logger.exception("Error getting loan analytics")
             return {"error": str(e)}
\ No newline at end of file
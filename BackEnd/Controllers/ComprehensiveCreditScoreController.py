@@ -4,15 +4,17 @@ Comprehensive Credit Score Controller
 This controller handles the new comprehensive credit scoring system
 """
 
+import logging
 from flask import jsonify, request
 from BackEnd.models import storage
-from BackEnd.models.ComprehensiveCreditScoreModel import ComprehensiveCreditScoreModel
 from BackEnd.Controllers.AuthController import AuthController
 from BackEnd.models.user import User
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 import json
 
+logger = logging.getLogger(__name__)
+
 
 class ComprehensiveCreditScoreController:
     """
@@ -21,9 +23,17 @@ class ComprehensiveCreditScoreController:
     
     def __init__(self):
         """Initialize the comprehensive credit score controller"""
-        self.model = ComprehensiveCreditScoreModel()
+        self._model = None
         self.auth_controller = AuthController()
 
+    @property
+    def model(self):
+        """The scoring model, loaded on first use as it imports numpy"""
+        if self._model is None:
+            from BackEnd.models.ComprehensiveCreditScoreModel import ComprehensiveCreditScoreModel
+            self._model = ComprehensiveCreditScoreModel()
+        return self._model
+
     def get_comprehensive_credit_score(self, user_id: str) -> tuple:
         """
         Get comprehensive credit score for a specific user
@@ -58,7 +68,7 @@ class ComprehensiveCreditScoreController:
             return jsonify(score_data), 200
             
         except Exception as e:
-            print(f"Error getting comprehensive credit score: {e}")
+            logger.exception("Error getting comprehensive credit score")
             return jsonify({'error': f'Failed to calculate comprehensive credit score: {str(e)}'}), 500
 
     def get_user_comprehensive_score_authenticated(self) -> tuple:
@@ -84,7 +94,7 @@ class ComprehensiveCreditScoreController:
             return self.get_comprehensive_credit_score(user.id)
             
         except Exception as e:
-            print(f"Error in authenticated comprehensive score: {e}")
+            logger.exception("Error in authenticated comprehensive score")
             return jsonify({'error': f'Authentication failed: {str(e)}'}), 500
 
     def get_score_history(self, user_id: str, months: int = 12) -> tuple:
@@ -124,7 +134,7 @@ class ComprehensiveCreditScoreController:
             return jsonify(response_data), 200
             
         except Exception as e:
-            print(f"Error getting score history: {e}")
+            logger.exception("Error getting score history")
             return jsonify({'error': f'Failed to get score history: {str(e)}'}), 500
 
     def get_score_comparison(self, user_id: str) -> tuple:
@@ -166,7 +176,7 @@ class ComprehensiveCreditScoreController:
             return jsonify(response_data), 200
             
         except Exception as e:
-            print(f"Error getting score comparison: {e}")
+            logger.exception("Error getting score comparison")
             return jsonify({'error': f'Failed to get score comparison: {str(e)}'}), 500
 
     def get_loan_eligibility(self, user_id: str, requested_amount: float = None) -> tuple:
@@ -201,7 +211,7 @@ class ComprehensiveCreditScoreController:
             return jsonify(response_data), 200
             
         except Exception as e:
-            print(f"Error getting loan eligibility: {e}")
+            logger.exception("Error getting loan eligibility")
             return jsonify({'error': f'Failed to calculate loan eligibility: {str(e)}'}), 500
 
     def get_score_factors_detailed(self, user_id: str) -> tuple:
@@ -236,7 +246,7 @@ class ComprehensiveCreditScoreController:
             return jsonify(response_data), 200
             
         except Exception as e:
-            print(f"Error getting detailed score factors: {e}")
+            logger.exception("Error getting detailed score factors")
             return jsonify({'error': f'Failed to get detailed factors: {str(e)}'}), 500
 
     def get_admin_analytics(self) -> tuple:
@@ -267,7 +277,7 @@ class ComprehensiveCreditScoreController:
             return jsonify(analytics), 200
             
         except Exception as e:
-            print(f"Error getting admin analytics: {e}")
+            logger.exception("Error getting admin analytics")
             return jsonify({'error': f'Failed to get analytics: {str(e)}'}), 500
 
     def _generate_score_history(self, current_score: int, months: int, user_created_at: datetime) -> List[Dict]:
@@ -465,7 +475,7 @@ class ComprehensiveCreditScoreController:
             return analysis
             
         except Exception as e:
-            print(f"Error in detailed factor analysis: {e}")
+            logger.exception("Error in detailed factor analysis")
             return {'error': str(e)}
 
     def _analyze_behavioral_patterns(self, transactions: List, loans: List) -> Dict:
@@ -1,16 +1,25 @@
 #!/usr/bin/python3
 """Credit Score Controller"""
 
+import logging
 from flask import jsonify, request
-from BackEnd.models.ComprehensiveCreditScoreModel import ComprehensiveCreditScoreModel
 from BackEnd.models import storage
 from BackEnd.models.user import User
-import traceback
+
+logger = logging.getLogger(__name__)
 
 class CreditScoreController:
     def __init__(self):
         """Initialize the Credit Score Controller"""
-        self.credit_model = ComprehensiveCreditScoreModel()
+        self._credit_model = None
+
+    @property
+    def credit_model(self):
+        """The scoring model, loaded on first use as it imports numpy"""
+        if self._credit_model is None:
+            from BackEnd.models.ComprehensiveCreditScoreModel import ComprehensiveCreditScoreModel
+            self._credit_model = ComprehensiveCreditScoreModel()
+        return self._credit_model
 
     def _get_authenticated_user(self):
         """Get authenticated user from Authorization header"""
@@ -32,7 +41,7 @@ class CreditScoreController:
                 
             return user, None, None
         except Exception as e:
-            print(f"Authentication error: {str(e)}")
+            logger.exception("Authentication error")
             return None, jsonify({"error": "Authentication required"}), 401
 
     def get_user_credit_score(self):
@@ -51,8 +60,7 @@ class CreditScoreController:
             return jsonify(score_data), 200
             
         except Exception as e:
-            print(f"Error getting user credit score: {str(e)}")
-            print(traceback.format_exc())
+            logger.exception("Error getting user credit score")
             return jsonify({'error': 'Failed to calculate credit score'}), 500
 
     def get_credit_score_history(self):
@@ -78,7 +86,7 @@ class CreditScoreController:
             }), 200
             
         except Exception as e:
-            print(f"Error getting credit score history: {str(e)}")
+            logger.exception("Error getting credit score history")
             return jsonify({'error': 'Failed to get credit score history'}), 500
 
     def get_all_users_credit_scores(self):
@@ -110,7 +118,7 @@ class CreditScoreController:
                         'is_admin': user_obj.admin
                     })
                 except Exception as user_error:
-                    print(f"Error calculating score for user {user_obj.id}: {user_error}")
+                    logger.exception("Error calculating score for user %s", user_obj.id)
                     users_scores.append({
                         'user_id': user_obj.id,
                         'username': user_obj.username,
@@ -131,7 +139,7 @@ class CreditScoreController:
             }), 200
             
         except Exception as e:
-            print(f"Error getting all users credit scores: {str(e)}")
+            logger.exception("Error getting all users credit scores")
             return jsonify({'error': 'Failed to get users credit scores'}), 500
 
     def get_user_credit_score_by_id(self, user_id):
@@ -166,7 +174,7 @@ class CreditScoreController:
             return jsonify(score_data), 200
             
         except Exception as e:
-            print(f"Error getting user credit score by ID: {str(e)}")
+            logger.exception("Error getting user credit score by ID")
             return jsonify({'error': 'Failed to calculate credit score'}), 500
 
     def get_credit_score_analytics(self):
@@ -236,7 +244,7 @@ class CreditScoreController:
             return jsonify(analytics), 200
             
         except Exception as e:
-            print(f"Error getting credit score analytics: {str(e)}")
+            logger.exception("Error getting credit score analytics")
             return jsonify({'error': 'Failed to get credit score analytics'}), 500
 
     def retrain_model(self):
@@ -250,7 +258,8 @@ class CreditScoreController:
                 return jsonify({'error': 'Admin privileges required'}), 403
                 
             # Reinitialize the comprehensive model
-            self.credit_model = ComprehensiveCreditScoreModel()
+            from BackEnd.models.ComprehensiveCreditScoreModel import ComprehensiveCreditScoreModel
+            self._credit_model = ComprehensiveCreditScoreModel()
             
             return jsonify({
                 'message': 'Credit score model reinitialized successfully',
@@ -258,7 +267,7 @@ class CreditScoreController:
             }), 200
             
         except Exception as e:
-            print(f"Error reinitializing model: {str(e)}")
+            logger.exception("Error reinitializing model")
             return jsonify({'error': 'Failed to reinitialize model'}), 500
 
     def _get_score_rating(self, score):
@@ -0,0 +1,157 @@
+#!/usr/bin/python3
+"""
+Contains the DelinquencyController class
+"""
+import logging
+import uuid
+from datetime import datetime, date, time
+from typing import Dict, List, Optional
+from sqlalchemy import func
+from BackEnd.models import storage
+from BackEnd.models.Loan import Loan
+from BackEnd.models.LoanDelinquency import LoanDelinquency
+from BackEnd.models.DelinquencySweep import DelinquencySweep
+
+logger = logging.getLogger(__name__)
+
+# (lowest days past due, highest days past due, bucket label)
+BUCKETS = [
+    (1, 30, '1-30'),
+    (31, 60, '31-60'),
+    (61, 90, '61-90'),
+    (91, None, '90+'),
+]
+
+
+def bucket_for(days_past_due: int) -> str:
+    """Return the delinquency bucket label for a number of days past due"""
+    for low, high, label in BUCKETS:
+        if days_past_due >= low and (high is None or days_past_due <= high):
+            return label
+    return None
+
+
+class DelinquencyController:
+    """
+    Computes and reads the daily loan delinquency snapshot. Only the daily
+    job writes it (see daily_jobs.py); readers use the latest finished sweep
+    """
+
+    def __init__(self):
+        """Initialize the DelinquencyController with database storage"""
+        self.db = storage
+
+    def run_sweep(self, as_of: date = None) -> int:
+        """
+        Rebuild the delinquency snapshot for a day
+        Args:
+            as_of: Snapshot date, defaults to today
+        Returns:
+            Number of delinquent loans recorded
+        """
+        as_of = as_of or date.today()
+        cutoff = datetime.combine(as_of, time.min)
+        session = self.db.session()
+
+        try:
+            # Served by the (loan_status, end_date) index
+            overdue = session.query(
+                Loan.id, Loan.account_id, Loan.end_date, Loan.amount
+            ).filter(
+                Loan.loan_status == 'active',
+                Loan.end_date < cutoff
+            ).all()
+
+            session.query(LoanDelinquency).filter(
+                LoanDelinquency.snapshot_date == as_of
+            ).delete(synchronize_session=False)
+
+            now = datetime.now()
+            rows = []
+            for loan_id, account_id, end_date, amount in overdue:
+                days_past_due = (as_of - end_date.date()).days
+                rows.append({
+                    'id': str(uuid.uuid4()),
+                    'created_at': now,
+                    'updated_at': now,
+                    'loan_id': loan_id,
+                    'account_id': account_id,
+                    'snapshot_date': as_of,
+                    'days_past_due': days_past_due,
+                    'bucket': bucket_for(days_past_due),
+                    'outstanding_amount': amount
+                })
+            if rows:
+                session.execute(LoanDelinquency.__table__.insert(), rows)
+
+            # Committed with the rows; the unique snapshot dates make a
+            # second sweep of the same day running concurrently fail
+            # instead of duplicating them
+            session.query(DelinquencySweep).filter(
+                DelinquencySweep.snapshot_date == as_of
+            ).delete(synchronize_session=False)
+            session.execute(DelinquencySweep.__table__.insert(), [{
+                'id': str(uuid.uuid4()),
+                'created_at': now,
+                'updated_at': now,
+                'snapshot_date': as_of,
+                'loan_count': len(rows)
+            }])
+            self.db.save()
+        except Exception as e:
+            self.db.Rollback()
+            logger.exception("Error running delinquency sweep")
+            raise e
+
+        return len(rows)
+
+    def current_snapshot_date(self) -> Optional[date]:
+        """
+        Date of the latest finished sweep, None before the first one
+        """
+        return self.db.session().query(func.max(DelinquencySweep.snapshot_date)).scalar()
+
+    def get_loan_delinquencies(self, loan_ids: List[str] = None) -> List[LoanDelinquency]:
+        """
+        Get the current snapshot rows, optionally limited to some loans
+        Args:
+            loan_ids: Only return rows for these loans
+        Returns:
+            List of LoanDelinquency objects
+        """
+        snapshot_date = self.current_snapshot_date()
+        if snapshot_date is None or (loan_ids is not None and not loan_ids):
+            return []
+        query = self.db.session().query(LoanDelinquency).filter(
+            LoanDelinquency.snapshot_date == snapshot_date
+        )
+        if loan_ids is not None:
+            query = query.filter(LoanDelinquency.loan_id.in_(loan_ids))
+        return query.all()
+
+    def count_delinquent(self) -> int:
+        """Number of loans in the current snapshot"""
+        snapshot_date = self.current_snapshot_date()
+        return self.db.session().query(func.count(LoanDelinquency.id)).filter(
+            LoanDelinquency.snapshot_date == snapshot_date
+        ).scalar() or 0
+
+    def get_bucket_summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Loan count and outstanding amount per days-past-due bucket
+        Returns:
+            Dictionary keyed by bucket label
+        """
+        snapshot_date = self.current_snapshot_date()
+        rows = self.db.session().query(
+            LoanDelinquency.bucket,
+            func.count(LoanDelinquency.id),
+            func.coalesce(func.sum(LoanDelinquency.outstanding_amount), 0.0)
+        ).filter(
+            LoanDelinquency.snapshot_date == snapshot_date
+        ).group_by(LoanDelinquency.bucket).all()
+
+        summary = {label: {"count": 0, "amount": 0.0} for _, _, label in BUCKETS}
+        for bucket, count, amount in rows:
+            summary[bucket] = {"count": count, "amount": float(amount)}
+        return summary
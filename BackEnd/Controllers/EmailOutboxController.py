@@ -0,0 +1,289 @@
+#!/usr/bin/python3
+"""
+Contains the EmailOutboxController class and the background worker that
+delivers queued email over a reused SMTP connection
+"""
+import logging
+import os
+import smtplib
+import threading
+import time
+from datetime import datetime, timedelta
+from email.mime.text import MIMEText
+from typing import List, Optional, Tuple
+from sqlalchemy import update
+from BackEnd.models import storage
+from BackEnd.models.EmailOutbox import EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+# Emails sent per batch, i.e. per SMTP connection check
+BATCH_SIZE = int(os.getenv('EMAIL_BATCH_SIZE', '20'))
+# Seconds the worker sleeps when it is not woken by a new email
+POLL_INTERVAL = float(os.getenv('EMAIL_POLL_INTERVAL', '5'))
+# Attempts before an email is marked as failed
+MAX_ATTEMPTS = int(os.getenv('EMAIL_MAX_ATTEMPTS', '6'))
+# Retry delays grow from RETRY_BASE_DELAY and are capped at RETRY_MAX_DELAY
+RETRY_BASE_DELAY = 30
+RETRY_MAX_DELAY = 3600
+# Idle seconds after which the SMTP connection is closed
+SMTP_IDLE_TIMEOUT = 60
+# Seconds after which an email left in 'sending' is assumed lost with its
+# worker; well past a batch of BATCH_SIZE emails timing out twice each
+SENDING_TIMEOUT = 3600
+
+
+def _retry_delay(attempts: int) -> timedelta:
+    """Exponential backoff for the given number of failed attempts"""
+    return timedelta(seconds=min(RETRY_BASE_DELAY * 2 ** (attempts - 1), RETRY_MAX_DELAY))
+
+
+class SMTPConnection:
+    """
+    A lazily opened SMTP connection that is kept open between batches.
+    Configured from SMTP_HOST, SMTP_PORT, SMTP_USE_SSL, SMTP_STARTTLS,
+    EMAIL_USER and EMAIL_PASSWORD.
+    """
+
+    def __init__(self):
+        """Read the SMTP settings from the environment"""
+        self.host = os.getenv('SMTP_HOST', 'smtp.gmail.com')
+        self.port = int(os.getenv('SMTP_PORT', '465'))
+        self.use_ssl = os.getenv('SMTP_USE_SSL', 'true' if self.port == 465 else 'false').lower() == 'true'
+        self.starttls = os.getenv('SMTP_STARTTLS', 'true' if self.port == 587 else 'false').lower() == 'true'
+        self.username = os.getenv('EMAIL_USER')
+        self.password = os.getenv('EMAIL_PASSWORD')
+        self._server = None
+        self._last_used = 0.0
+
+    def _connect(self):
+        """Open and authenticate a new connection"""
+        if self.use_ssl:
+            server = smtplib.SMTP_SSL(self.host, self.port, timeout=30)
+        else:
+            server = smtplib.SMTP(self.host, self.port, timeout=30)
+            if self.starttls:
+                server.starttls()
+        if self.username and self.password:
+            server.login(self.username, self.password)
+        return server
+
+    def get(self):
+        """Return a live connection, reconnecting if it was dropped or idle"""
+        if self._server is not None:
+            if time.monotonic() - self._last_used > SMTP_IDLE_TIMEOUT:
+                self.close()
+            else:
+                try:
+                    self._server.noop()
+                except smtplib.SMTPException:
+                    self._server = None
+        if self._server is None:
+            self._server = self._connect()
+        self._last_used = time.monotonic()
+        return self._server
+
+    def send(self, sender: str, recipient: str, message: str):
+        """Send one message, reconnecting once if the server hung up"""
+        try:
+            self.get().sendmail(sender, recipient, message)
+        except smtplib.SMTPServerDisconnected:
+            self._server = None
+            self.get().sendmail(sender, recipient, message)
+        self._last_used = time.monotonic()
+
+    def close(self):
+        """Close the connection if it is open"""
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._server = None
+
+
+class EmailOutboxController:
+    """
+    Queues outgoing email in the outbox table and delivers it in batches
+    """
+
+    def __init__(self, connection: SMTPConnection = None):
+        """Initialize the EmailOutboxController with database storage"""
+        self.db = storage
+        self.connection = connection or SMTPConnection()
+
+    def enqueue_email(self, recipient: str, subject: str, body: str, commit: bool = True) -> EmailOutbox:
+        """
+        Queue an email for delivery by the background worker
+        Args:
+            recipient: Address to send to
+            subject: Subject line
+            body: Plain-text body
+            commit: Commit immediately; pass False to queue the email with
+                the caller's next commit
+        Returns:
+            The outbox entry
+        """
+        email = EmailOutbox(
+            sender=os.getenv('EMAIL_USER', 'no-reply@localhost'),
+            recipient=recipient,
+            subject=subject,
+            body=body,
+            status='pending',
+            attempts=0,
+            next_attempt_at=datetime.utcnow()
+        )
+        self.db.new(email)
+        if commit:
+            self.db.save()
+            email_worker.wake()
+        return email
+
+    def _claim_batch(self) -> List[Tuple[str, str, str, str, int]]:
+        """
+        Mark the next due emails as sending and commit, so that no row lock
+        or transaction is held while they go over SMTP
+        Returns:
+            (id, sender, recipient, message, attempts) of each claimed email
+        """
+        session = self.db.session()
+        table = EmailOutbox.__table__
+        now = datetime.utcnow()
+        # Emails whose worker died between claiming and recording them
+        session.execute(update(table).where(
+            table.c.status == 'sending',
+            table.c.updated_at < now - timedelta(seconds=SENDING_TIMEOUT)
+        ).values(status='pending'))
+        batch = session.query(EmailOutbox).filter(
+            EmailOutbox.status == 'pending',
+            EmailOutbox.next_attempt_at <= now
+        ).order_by(EmailOutbox.next_attempt_at).limit(BATCH_SIZE).with_for_update(
+            skip_locked=True
+        ).all()
+        claimed = []
+        for email in batch:
+            email.status = 'sending'
+            email.attempts += 1
+            email.updated_at = now
+            message = MIMEText(email.body)
+            message['Subject'] = email.subject
+            message['From'] = email.sender
+            message['To'] = email.recipient
+            claimed.append((email.id, email.sender, email.recipient, message.as_string(),
+                            email.attempts))
+        self.db.save()
+        return claimed
+
+    def process_batch(self) -> int:
+        """
+        Deliver one batch of due emails over the shared SMTP connection
+        Returns:
+            Number of emails attempted
+        """
+        try:
+            batch = self._claim_batch()
+        except Exception:
+            self.db.Rollback()
+            logger.exception("Error claiming emails from the outbox")
+            return 0
+
+        outcomes = [(email_id, attempts, self._deliver(sender, recipient, message))
+                    for email_id, sender, recipient, message, attempts in batch]
+
+        try:
+            for email_id, attempts, (status, error) in outcomes:
+                self._record(email_id, attempts, status, error)
+            self.db.save()
+        except Exception:
+            # The emails stay in 'sending' and are retried after SENDING_TIMEOUT
+            self.db.Rollback()
+            logger.exception("Error recording email deliveries")
+        return len(batch)
+
+    def _deliver(self, sender: str, recipient: str, message: str) -> Tuple[str, Optional[str]]:
+        """
+        Send one email; touches no database state
+        Returns:
+            The status the email ends in ('sent', 'failed', or 'pending' to
+            retry) and the error message if any
+        """
+        try:
+            self.connection.send(sender, recipient, message)
+            return 'sent', None
+        except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused) as e:
+            # Retrying will not help when the server rejects the addresses
+            return 'failed', str(e)[:500]
+        except (smtplib.SMTPException, OSError) as e:
+            self.connection.close()
+            logger.exception("Error sending email to %s", recipient)
+            return 'pending', str(e)[:500]
+
+    def _record(self, email_id: str, attempts: int, status: str, error: Optional[str]):
+        """Store the outcome of a delivery on the email's outbox row"""
+        email = self.db.session().get(EmailOutbox, email_id)
+        if email is None or email.status != 'sending':
+            return
+        email.last_error = error
+        if status == 'sent':
+            email.status = 'sent'
+            email.sent_at = datetime.utcnow()
+        elif status == 'pending' and attempts < MAX_ATTEMPTS:
+            email.status = 'pending'
+            email.next_attempt_at = datetime.utcnow() + _retry_delay(attempts)
+        else:
+            email.status = 'failed'
+
+
+class EmailWorker:
+    """
+    Background thread that drains the email outbox
+    """
+
+    def __init__(self):
+        """Initialize the worker without starting it"""
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start the worker thread once per process"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, name='email-outbox', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = None):
+        """Ask the worker thread to finish and wait for it"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def wake(self):
+        """Let the worker pick up newly queued email without waiting"""
+        self._wake.set()
+
+    def run(self):
+        """Deliver batches until stopped; sleeps when the outbox is empty"""
+        controller = EmailOutboxController()
+        try:
+            while not self._stop.is_set():
+                self._wake.clear()
+                try:
+                    sent = controller.process_batch()
+                finally:
+                    # The worker thread has its own scoped session
+                    storage.close()
+                if sent < BATCH_SIZE:
+                    self._wake.wait(POLL_INTERVAL)
+        finally:
+            controller.connection.close()
+
+
+email_worker = EmailWorker()
+
+
+if __name__ == "__main__":
+    # Run the worker as its own process instead of inside the API
+    email_worker.run()
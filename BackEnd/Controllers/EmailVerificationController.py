@@ -2,17 +2,19 @@
 """
 Email Verification Controller
 """
+import logging
 import os
-import smtplib
 import uuid
-from email.mime.text import MIMEText
 from BackEnd.models import storage
 from BackEnd.models.user import User
+from BackEnd.Controllers.EmailOutboxController import EmailOutboxController, email_worker
+
+logger = logging.getLogger(__name__)
 
 
 def send_verification_email(user_id):
     """
-    Sends a verification email to the user.
+    Queues a verification email for the user.
     """
     user = storage.get(User, user_id)
     if not user:
@@ -20,26 +22,24 @@ def send_verification_email(user_id):
 
     token = str(uuid.uuid4())
     setattr(user, 'verification_token', token)
-    storage.save()
 
-    sender_email = os.getenv('EMAIL_USER')
-    sender_password = os.getenv('EMAIL_PASSWORD')
-    receiver_email = user.email
     url = os.getenv('VITE_API_URL')
     verification_link = f"{url}/api/v1/users/verify-email?token={token}"
 
-    message = MIMEText(f"Click the link to verify your email: {verification_link}")
-    message['Subject'] = "Email Verification"
-    message['From'] = sender_email
-    message['To'] = receiver_email
-
     try:
-        with smtplib.SMTP_SSL('smtp.gmail.com', 465) as server:
-            server.login(sender_email, sender_password)
-            server.sendmail(sender_email, receiver_email, message.as_string())
+        # Token and outbox entry are saved together; the worker sends it
+        EmailOutboxController().enqueue_email(
+            user.email,
+            "Email Verification",
+            f"Click the link to verify your email: {verification_link}",
+            commit=False
+        )
+        storage.save()
+        email_worker.wake()
         return True
     except Exception as e:
-        print(f"Error sending email: {e}")
+        storage.Rollback()
+        logger.exception("Error queueing email")
         return False
 
 def verify_email(token):
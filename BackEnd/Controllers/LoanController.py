@@ -2,17 +2,38 @@
 """
 Contains the class Loan Controller
 """
+import logging
+import math
 from BackEnd.models import storage
 from BackEnd.models.Loan import Loan
+from BackEnd.models.LoanInstallment import LoanInstallment
 from BackEnd.models.Account import Account
 from BackEnd.models.Transaction import Transaction
+from BackEnd.models.Repayment import Repayment
 from BackEnd.models.user import User
+from sqlalchemy import and_, func
+from sqlalchemy.orm import aliased, joinedload
 from sqlalchemy.orm.exc import NoResultFound
+from BackEnd.Controllers.AccountController import AccountController
 from BackEnd.Controllers.LoanAuthController import LoanAuthController
 from BackEnd.Controllers.NotificationController import NotificationController
+from BackEnd.Controllers.TransactionController import TransactionController
+from BackEnd.monitoring.metrics import operation
+from BackEnd.tasks.runner import defer
 from datetime import datetime, timedelta
 from typing import List, Tuple
 
+logger = logging.getLogger(__name__)
+
+
+def loan_listing_options():
+    """
+    Loader options for loan listings: each loan's account and the
+    account's owner come back in the same SELECT, so Loan.to_dict can
+    include them without a query per loan
+    """
+    return (joinedload(Loan.account).joinedload(Account.User),)
+
 
 class LoanController:
     """
@@ -24,6 +45,7 @@ class LoanController:
         self.db = storage
         self.auth = LoanAuthController()
         self.notification_controller = NotificationController()
+        self.transaction_controller = TransactionController()
 
     def apply_loan(self, user_id: str, amount: float, interest_rate: float,
                    repayment_period: int, purpose: str, admin_id: str) -> Loan:
@@ -35,39 +57,17 @@ class LoanController:
         if not admin_id or admin_id == 'undefined':
             raise ValueError("Invalid admin_id provided")
             
-        print(f"Processing loan for user_id: {user_id} with admin_id: {admin_id}")
+        logger.info("Processing loan application", extra={'user_id': user_id, 'admin_id': admin_id})
         
-        # Find the user and admin
-        customer = self.db.get(User, user_id)
-        admin = self.db.get(User, admin_id)
+        # Find the user, their account and the admin in a single query
+        customer, account, admin = self._get_loan_parties(user_id, admin_id)
         
         if not customer:
             raise ValueError("Customer not found")
             
-        if not admin or not admin.admin:
+        if not admin:
             raise ValueError("Invalid admin selected")
         
-        # Find or create an account for this user
-        all_accounts = self.db.all(Account).values()
-        account = None
-        
-        # Try to find an account for this user
-        for acc in all_accounts:
-            if acc.user_id == customer.id:
-                account = acc
-                break
-        
-        # If no account exists, create one
-        if not account:
-            account = Account(
-                user_id=customer.id,
-                account_type="savings",
-                balance=1000.0,
-                status="active"
-            )
-            self.db.new(account)
-            self.db.save()
-
         # Calculate total amount including interest
         total_interest = amount * (interest_rate / 100) * (repayment_period / 12)
         total_loan_amount = amount + total_interest
@@ -76,34 +76,69 @@ class LoanController:
         start_date = datetime.now()
         end_date = start_date + timedelta(days=repayment_period * 30)  # Assuming 30 days per month
 
-        new_loan = Loan(
-            admin_id=admin_id,
-            account_id=account.id,
-            amount=total_loan_amount,  # Store total amount including interest
-            interest_rate=interest_rate,
-            repayment_period=repayment_period,
-            end_date=end_date,
-            loan_status="pending"
-        )
-        self.db.new(new_loan)
-        self.db.save()
-        
-        # Create loan application notification for user
-        self.notification_controller.notify_loan_application(
-            user_id=user_id,
-            amount=amount,
-            loan_id=new_loan.id
-        )
-        
-        # Create notification for admin about new loan application
-        admin_message = f"New loan application received from user {customer.fullname or customer.username} for {amount} ETB (Loan ID: {new_loan.id}). Please review and approve/reject."
-        self.notification_controller.create_notification(
-            user_id=admin_id,
-            message=admin_message
-        )
+        # Account, loan, notification and admin task are written in one
+        # commit, and a failure in any step writes none of them
+        try:
+            with self.db.transaction():
+                # If no account exists, create one as part of the same commit
+                if not account:
+                    account = AccountController().new_account(
+                        customer.id, "savings", balance=1000.0, status="active"
+                    )
+
+                new_loan = Loan(
+                    admin_id=admin_id,
+                    account_id=account.id,
+                    amount=total_loan_amount,  # Store total amount including interest
+                    interest_rate=interest_rate,
+                    repayment_period=repayment_period,
+                    end_date=end_date,
+                    loan_status="pending"
+                )
+                self.db.new(new_loan)
+
+                # Create loan application notification for user
+                self.notification_controller.notify_loan_application(
+                    user_id=user_id,
+                    amount=amount,
+                    loan_id=new_loan.id,
+                    commit=False
+                )
+
+                # Notify the admin about the new loan application after commit
+                defer('notify_admin_loan_application', admin_id=admin_id,
+                      customer_name=customer.fullname or customer.username,
+                      amount=amount, loan_id=new_loan.id)
+        except Exception:
+            self.db.Rollback()
+            raise
         
         return new_loan
 
+    def _get_loan_parties(self, user_id: str, admin_id: str) -> Tuple[User, Account, User]:
+        """
+        Fetch the customer, the customer's account and the admin in one query
+        Args:
+            user_id: The ID of the customer applying for the loan
+            admin_id: The ID of the admin the loan is assigned to
+        Returns:
+            Tuple of (customer, account, admin); missing entries are None and
+            admin is None unless the user exists and is an admin
+        """
+        Admin = aliased(User)
+        row = self.db.session().query(User, Account, Admin).outerjoin(
+            Account, Account.user_id == User.id
+        ).outerjoin(
+            Admin, and_(Admin.id == admin_id, Admin.admin == True)
+        ).filter(
+            User.id == user_id
+        ).order_by(Account.created_at).first()
+
+        if row is None:
+            return None, None, None
+        return row[0], row[1], row[2]
+
+    @operation('loan_approve', amount=lambda loan: loan.amount)
     def approve_loan(self, loan_id: str, admin_id: str) -> Loan:
         """Approve a loan (Admin only)"""
         try:
@@ -119,37 +154,38 @@ class LoanController:
             if not admin or not admin.admin:
                 raise ValueError("Invalid admin")
 
-            account = self.db.get(Account, loan.account_id)
+            account = self.transaction_controller.lock_account(loan.account_id)
             if not account:
                 raise NoResultFound("Account not found")
 
             # Update loan status and details
+            start_date = datetime.now()
             loan.loan_status = "active"
-            loan.end_date = datetime.now() + timedelta(days=30 * loan.repayment_period)
+            loan.end_date = start_date + timedelta(days=30 * loan.repayment_period)
+
+            # Store the amortization schedule once, at approval time
+            self._create_installments(loan, start_date)
 
             # For loan disbursement, we give the principal amount (without interest) to the user
             # But the loan.amount already includes interest, so we need to calculate the principal
             principal_amount = loan.amount / (1 + (loan.interest_rate / 100) * (loan.repayment_period / 12))
 
-            # Create transaction for loan disbursement
-            transaction = Transaction(
-                account_id=account.id,
-                amount=principal_amount,  # Disburse only the principal amount
-                transaction_type="loan_disbursement",
-                description=f"Loan disbursement for loan {loan_id}"
+            # Disburse only the principal amount
+            self.transaction_controller.post(
+                account,
+                principal_amount,
+                "loan_disbursement",
+                f"Loan disbursement for loan {loan_id}"
             )
-            self.db.new(transaction)
-
-            # Update account balance with principal amount only
-            account.balance += principal_amount
-            self.db.save()
 
             # Create loan approval notification
             self.notification_controller.notify_loan_approval(
                 user_id=account.user_id,
                 amount=loan.amount,
-                loan_id=loan_id
+                loan_id=loan_id,
+                commit=False
             )
+            self.db.save()
 
             return loan
         except Exception as e:
@@ -157,63 +193,92 @@ class LoanController:
             self.db.Rollback()
             raise ValueError(f"Error approving loan: {str(e)}")
 
-    def make_repayment(self, loan_id: str, amount: float) -> Tuple[Transaction, Loan]:
+    def _lock_loan(self, loan_id: str) -> Loan:
+        """Load a loan and lock its row until the caller commits"""
+        return self.db.session().query(Loan).filter(
+            Loan.id == loan_id
+        ).with_for_update().populate_existing().one_or_none()
+
+    @operation('repayment', amount=lambda result: result[0].amount)
+    def make_repayment(self, loan_id: str, amount: float, description: str = None,
+                       user_id: str = None) -> Tuple[Transaction, Loan]:
         """
-        Make a loan repayment
+        Make a loan repayment. The installments, loan and account balances,
+        the repayment and transaction rows and the notification are all
+        written in one commit.
         Args:
             loan_id: The ID of the loan to repay
             amount: The amount to repay
+            description: Optional description for the transaction
+            user_id: When given, the user whose account must hold the loan
         Returns:
-            Tuple of (transaction, loan)
+            Tuple of (transaction, loan); the repayment is transaction.repayment
+        Raises:
+            PermissionError: If the loan's account does not belong to user_id
         """
-        loan = self.db.get(Loan, loan_id)
-        if not loan:
-            raise NoResultFound("Loan not found")
+        if not math.isfinite(amount) or amount <= 0:
+            raise ValueError("Repayment amount must be positive")
 
-        if loan.loan_status != "active":
-            raise ValueError("Can only make repayments on active loans")
+        try:
+            # Loan first, then its account, so concurrent repayments queue up
+            loan = self._lock_loan(loan_id)
+            if not loan:
+                raise NoResultFound("Loan not found")
 
-        account = self.db.get(Account, loan.account_id)
-        if not account:
-            raise NoResultFound("Account not found")
-
-        if account.balance < amount:
-            raise ValueError("Insufficient funds for repayment")
-
-        # Check if payment amount doesn't exceed remaining loan amount
-        if amount > loan.amount:
-            amount = loan.amount  # Cap the payment to remaining loan amount
-
-        # Create repayment transaction
-        transaction = Transaction(
-            account_id=account.id,
-            amount=-amount,  # Negative amount for repayment
-            transaction_type="loan_repayment",
-            description=f"Loan repayment for loan {loan_id}"
-        )
-        self.db.new(transaction)
-
-        # Update account balance
-        account.balance -= amount
-
-        # IMPORTANT: Reduce the loan amount by the payment amount
-        loan.amount -= amount
-        
-        # Update loan status if fully repaid
-        if loan.amount <= 0:
-            loan.loan_status = "paid"
-            loan.end_date = datetime.now()
-            loan.amount = 0  # Ensure it doesn't go negative
+            if loan.loan_status != "active":
+                raise ValueError("Can only make repayments on active loans")
+
+            account = self.transaction_controller.lock_account(loan.account_id)
+            if not account:
+                raise NoResultFound("Account not found")
+
+            if user_id is not None and account.user_id != user_id:
+                raise PermissionError("Unauthorized to repay this loan")
+
+            # Check if payment amount doesn't exceed remaining loan amount
+            if amount > loan.amount:
+                amount = loan.amount  # Cap the payment to remaining loan amount
+
+            if account.balance < amount:
+                raise ValueError("Insufficient funds for repayment")
+
+            repayment = Repayment(loan_id=loan_id, amount=amount, status='completed')
+            self.db.new(repayment)
+
+            # Create repayment transaction, debiting the account
+            transaction = self.transaction_controller.post(
+                account,
+                -amount,
+                "loan_repayment",
+                description or f"Loan repayment for loan {loan_id}",
+                repayment_id=repayment.id
+            )
+
+            # IMPORTANT: Reduce the loan amount by the payment amount
+            loan.amount -= amount
+
+            # Settle the oldest outstanding installments first
+            self._allocate_to_installments(loan, amount)
+
+            # Update loan status if fully repaid
+            if loan.amount <= 0:
+                loan.loan_status = "paid"
+                loan.end_date = datetime.now()
+                loan.amount = 0  # Ensure it doesn't go negative
+
+            # Create loan repayment notification
+            self.notification_controller.notify_loan_repayment(
+                user_id=account.user_id,
+                amount=amount,
+                loan_id=loan_id,
+                commit=False
+            )
+
+            self.db.save()
+        except Exception:
+            self.db.Rollback()
+            raise
 
-        self.db.save()
-        
-        # Create loan repayment notification
-        self.notification_controller.notify_loan_repayment(
-            user_id=account.user_id,
-            amount=amount,
-            loan_id=loan_id
-        )
-        
         return transaction, loan
 
     def get_repayment_schedule(self, loan_id: str) -> List[dict]:
@@ -224,29 +289,173 @@ class LoanController:
         Returns:
             List of dictionaries containing repayment schedule
         """
-        loan = self.db.get(Loan, loan_id)
+        loan = self.db.session().get(Loan, loan_id)
         if not loan:
             raise NoResultFound("Loan not found")
 
-        monthly_payment = self._calculate_monthly_payment(loan)
+        return self._format_schedule(self._get_installments(loan))
+
+    def get_overdue_installments(self, as_of: datetime = None) -> List[LoanInstallment]:
+        """
+        Get all unpaid installments whose due date has passed
+        Args:
+            as_of: Reference date, defaults to now
+        Returns:
+            List of LoanInstallment objects ordered by due date
+        """
+        as_of = as_of or datetime.now()
+        return self.db.session().query(LoanInstallment).filter(
+            LoanInstallment.status.in_(["pending", "partial"]),
+            LoanInstallment.due_date < as_of
+        ).order_by(LoanInstallment.due_date).all()
+
+    def backfill_installments(self) -> int:
+        """
+        Store the schedules of approved loans that have none, as
+        get_repayment_schedule projects them, committing loan by loan
+        Returns:
+            Number of loans given a schedule
+        """
+        session = self.db.session()
+        scheduled = session.query(LoanInstallment.loan_id).distinct()
+        loans = session.query(Loan).filter(
+            Loan.loan_status.in_(["active", "paid"]),
+            ~Loan.id.in_(scheduled)
+        ).all()
+        for loan in loans:
+            for installment in self._backfill_installments(loan):
+                self.db.new(installment)
+            self.db.save()
+        return len(loans)
+
+    def _build_installments(self, loan: Loan, start_date: datetime,
+                            total: float = None) -> List[LoanInstallment]:
+        """
+        Split a loan into equal monthly installments
+        Args:
+            loan: The loan to split
+            start_date: Date the first 30-day period starts from
+            total: Principal plus interest to split, defaults to loan.amount
+                (which includes interest until repayments reduce it)
+        Returns:
+            List of (unsaved) LoanInstallment objects
+        """
+        periods = loan.repayment_period
+        total = loan.amount if total is None else total
+        principal_total = total / (1 + (loan.interest_rate / 100) * (periods / 12))
+        interest_total = total - principal_total
+        principal_each = round(principal_total / periods, 2)
+        interest_each = round(interest_total / periods, 2)
+
+        installments = []
+        for number in range(1, periods + 1):
+            principal = principal_each
+            interest = interest_each
+            if number == periods:
+                # Last installment absorbs the rounding difference
+                principal = round(principal_total - principal_each * (periods - 1), 2)
+                interest = round(interest_total - interest_each * (periods - 1), 2)
+            installments.append(LoanInstallment(
+                loan_id=loan.id,
+                installment_number=number,
+                due_date=start_date + timedelta(days=30 * number),
+                principal=principal,
+                interest=interest,
+                amount_paid=0.0,
+                status="paid" if principal + interest <= 0 else "pending"
+            ))
+        return installments
+
+    def _create_installments(self, loan: Loan, start_date: datetime) -> List[LoanInstallment]:
+        """Build the installments for a loan and add them to the session"""
+        installments = self._build_installments(loan, start_date)
+        for installment in installments:
+            self.db.new(installment)
+        return installments
+
+    def _get_installments(self, loan: Loan) -> List[LoanInstallment]:
+        """
+        Read a loan's stored installments in order. Never writes: pending
+        loans get a projected (unsaved) schedule, and loans approved before
+        installments were stored get the one the migration would store.
+        """
+        installments = self.db.session().query(LoanInstallment).filter(
+            LoanInstallment.loan_id == loan.id
+        ).order_by(LoanInstallment.installment_number).all()
+        if installments:
+            return installments
+
+        if loan.loan_status not in ["active", "paid"]:
+            return self._build_installments(loan, loan.created_at)
+        return self._backfill_installments(loan)
+
+    def _backfill_installments(self, loan: Loan) -> List[LoanInstallment]:
+        """
+        Rebuild the schedule of a loan approved before installments were
+        stored: split the original principal plus interest (what is left of
+        loan.amount plus everything repaid) and apply the completed
+        repayments to it, oldest installment first
+        Returns:
+            List of (unsaved) LoanInstallment objects
+        """
+        repaid = self.db.session().query(func.coalesce(func.sum(Repayment.amount), 0.0)).filter(
+            Repayment.loan_id == loan.id,
+            Repayment.status == 'completed'
+        ).scalar()
+        if loan.end_date and loan.loan_status == "active":
+            start_date = loan.end_date - timedelta(days=30 * loan.repayment_period)
+        else:
+            # Paid loans have end_date moved to the payoff date
+            start_date = loan.created_at
+        installments = self._build_installments(loan, start_date, total=loan.amount + repaid)
+        self._apply_payment(installments, repaid)
+        return installments
+
+    def _allocate_to_installments(self, loan: Loan, amount: float) -> None:
+        """
+        Apply a repayment to the loan's outstanding installments, oldest first
+        Args:
+            loan: The loan being repaid
+            amount: The amount paid
+        """
+        outstanding = self.db.session().query(LoanInstallment).filter(
+            LoanInstallment.loan_id == loan.id,
+            LoanInstallment.status.in_(["pending", "partial"])
+        ).order_by(LoanInstallment.installment_number).all()
+        self._apply_payment(outstanding, amount)
+
+    def _apply_payment(self, installments: List[LoanInstallment], amount: float) -> None:
+        """Settle installments in order with amount, leaving the rest untouched"""
+        remaining = amount
+        for installment in installments:
+            if installment.status == "paid":
+                continue
+            if remaining <= 0:
+                break
+            due = installment.amount_due - (installment.amount_paid or 0.0)
+            applied = min(due, remaining)
+            installment.amount_paid = (installment.amount_paid or 0.0) + applied
+            remaining -= applied
+            if installment.amount_paid >= installment.amount_due - 0.005:
+                installment.status = "paid"
+            else:
+                installment.status = "partial"
+
+    def _format_schedule(self, installments: List[LoanInstallment]) -> List[dict]:
+        """Convert installments into the schedule format returned by the API"""
+        remaining_balance = sum(i.amount_due - (i.amount_paid or 0.0) for i in installments)
         schedule = []
-        # Use created_at as start date since start_date doesn't exist in DB
-        current_date = loan.created_at
-
-        for month in range(loan.repayment_period):
-            schedule.append({
-                "due_date": current_date + timedelta(days=30 * (month + 1)),
-                "amount": monthly_payment,
-                "status": "pending"
+        for installment in installments:
+            remaining_balance -= installment.amount_due - (installment.amount_paid or 0.0)
+            entry = installment.to_dict()
+            entry.update({
+                "payment_number": installment.installment_number,
+                "amount": installment.amount_due,
+                "remaining_balance": max(0, round(remaining_balance, 2))
             })
-
+            schedule.append(entry)
         return schedule
 
-    def _calculate_monthly_payment(self, loan: Loan) -> float:
-        """Calculate monthly payment amount"""
-        # The loan.amount already includes interest, so just divide by repayment period
-        return loan.amount / loan.repayment_period
-
     def get_loan_repayments(self, loan_id: str) -> List[Transaction]:
         """Get all repayments for a loan"""
         loan = self.db.get(Loan, loan_id)
@@ -307,7 +516,6 @@ class LoanController:
             raise ValueError("Invalid admin")
 
         loan.loan_status = "rejected"
-        self.db.save()
         
         # Get the account to find the user_id
         account = self.db.get(Account, loan.account_id)
@@ -317,8 +525,11 @@ class LoanController:
                 user_id=account.user_id,
                 amount=loan.amount,
                 reason=reason,
-                loan_id=loan_id
+                loan_id=loan_id,
+                commit=False
             )
+
+        self.db.save()
         
         return loan
 
@@ -328,14 +539,28 @@ class LoanController:
         if not admin or not admin.admin:
             raise ValueError("Invalid admin ID")
             
-        return self.db.session().query(Loan).filter(Loan.admin_id == admin_id).all()
+        return self.db.session().query(Loan).options(*loan_listing_options()).filter(
+            Loan.admin_id == admin_id
+        ).all()
 
     def get_unassigned_loans(self) -> List[Loan]:
         """Get all pending loans that haven't been assigned to an admin"""
-        return self.db.session().query(Loan).filter(
+        return self.db.session().query(Loan).options(*loan_listing_options()).filter(
             Loan.loan_status == "pending"
         ).all()
 
+    def get_user_loans(self, user_id: str) -> List[Loan]:
+        """Get all loans on a customer's accounts"""
+        return self.db.session().query(Loan).join(Loan.account).options(
+            *loan_listing_options()
+        ).filter(Account.user_id == user_id).all()
+
+    def get_loan(self, loan_id: str) -> Loan:
+        """Get one loan with its account and owner loaded"""
+        return self.db.session().query(Loan).options(*loan_listing_options()).filter(
+            Loan.id == loan_id
+        ).one_or_none()
+
     def get_loan_repayment_schedule(self, loan_id: str) -> List[dict]:
         """
         Get the repayment schedule for a loan
@@ -344,39 +569,11 @@ class LoanController:
         Returns:
             List of dictionaries containing repayment schedule
         """
-        loan = self.db.get(Loan, loan_id)
+        loan = self.db.session().get(Loan, loan_id)
         if not loan:
             raise NoResultFound("Loan not found")
 
         if loan.loan_status not in ["active", "paid"]:
             raise ValueError("Can only get repayment schedule for active or paid loans")
 
-        # Calculate schedule using available fields
-        monthly_payment = self._calculate_monthly_payment(loan)
-        total_interest = loan.amount * (loan.interest_rate / 100) * (loan.repayment_period / 12)
-        total_amount = loan.amount + total_interest
-        
-        # Get all previous repayments
-        previous_repayments = self.get_loan_repayments(loan_id)
-        total_paid = sum(abs(repayment.amount) for repayment in previous_repayments)
-        remaining_balance = total_amount - total_paid
-        
-        schedule = []
-        current_date = loan.created_at  # Use created_at as start date
-
-        for month in range(loan.repayment_period):
-            payment_amount = monthly_payment
-            if month == loan.repayment_period - 1:
-                # Last payment might be slightly different due to rounding
-                payment_amount = remaining_balance
-
-            schedule.append({
-                "due_date": current_date + timedelta(days=30 * (month + 1)),
-                "amount": payment_amount,
-                "status": "pending",
-                "payment_number": month + 1,
-                "remaining_balance": max(0, remaining_balance - payment_amount)
-            })
-            remaining_balance -= payment_amount
-
-        return schedule
+        return self._format_schedule(self._get_installments(loan))
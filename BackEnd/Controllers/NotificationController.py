@@ -2,12 +2,84 @@
 """
 Contains the NotificationController class
 """
+import logging
 from BackEnd.models import storage
 from BackEnd.models.Notification import Notification
 from BackEnd.models.user import User
+from BackEnd.Controllers.NotificationHub import notification_hub
+from sqlalchemy import event, update, bindparam, case, or_
+from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
+# session.info key holding notification rows waiting for the next commit
+PENDING_NOTIFICATIONS = 'pending_notifications'
+# session.info key holding (user_id, event) pairs to publish after commit
+PENDING_EVENTS = 'pending_notification_events'
+
+
+@event.listens_for(Session, 'before_commit')
+def _flush_pending_notifications(session):
+    """Write buffered notifications with one executemany insert"""
+    rows = session.info.pop(PENDING_NOTIFICATIONS, None)
+    if rows:
+        # Flush ORM changes first so rows the notifications refer to exist
+        session.flush()
+        session.execute(Notification.__table__.insert(), rows)
+
+        # Bump each recipient's unread counter in the same transaction
+        counts = {}
+        for row in rows:
+            counts[row['user_id']] = counts.get(row['user_id'], 0) + 1
+        users = User.__table__
+        session.execute(
+            update(users).where(users.c.id == bindparam('uid')).values(
+                unread_notification_count=users.c.unread_notification_count + bindparam('n')
+            ),
+            [{'uid': user_id, 'n': n} for user_id, n in counts.items()]
+        )
+        _expire_unread_counts(session, counts)
+
+        _queue_events(session, [(row['user_id'], {
+            'type': 'notification',
+            'notification': {
+                'id': row['id'],
+                'message': row['message'],
+                'is_read': row['is_read'],
+                'created_at': row['created_at'].isoformat(),
+                'updated_at': row['updated_at'].isoformat()
+            },
+            'unread_delta': 1
+        }) for row in rows])
+
+
+def _queue_events(session, events):
+    """Hold stream events until the transaction that caused them commits"""
+    session.info.setdefault(PENDING_EVENTS, []).extend(events)
+
+
+@event.listens_for(Session, 'after_commit')
+def _publish_pending_events(session):
+    """Push committed notification changes to open streams"""
+    for user_id, payload in session.info.pop(PENDING_EVENTS, ()):
+        notification_hub.publish(user_id, payload)
+
+
+def _expire_unread_counts(session, user_ids):
+    """Make loaded users re-read their counter after it changed in SQL"""
+    for obj in list(session.identity_map.values()):
+        if isinstance(obj, User) and obj.id in user_ids:
+            session.expire(obj, ['unread_notification_count'])
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_pending_notifications(session, previous_transaction):
+    """Drop buffered notifications when the unit of work is rolled back"""
+    session.info.pop(PENDING_NOTIFICATIONS, None)
+    session.info.pop(PENDING_EVENTS, None)
+
 
 class NotificationController:
     """
@@ -18,16 +90,47 @@ class NotificationController:
         """Initialize the NotificationController with database storage"""
         self.db = storage
 
-    def create_notification(self, user_id: str, message: str) -> Notification:
+    def _queue(self, notifications: List[Notification], commit: bool):
+        """
+        Buffer notifications on the current session; they are inserted
+        together when the session next commits
+        """
+        for notification in notifications:
+            # Store, and hand back, the naive UTC timestamps the column keeps
+            notification.created_at = notification.created_at.replace(tzinfo=None)
+            notification.updated_at = notification.updated_at.replace(tzinfo=None)
+        rows = [{
+            'id': notification.id,
+            'created_at': notification.created_at,
+            'updated_at': notification.updated_at,
+            'user_id': notification.user_id,
+            'message': notification.message,
+            'is_read': notification.is_read
+        } for notification in notifications]
+        session = self.db.session().registry()
+        if not session.in_transaction():
+            # Begin now so a rollback before the next query still discards the buffer
+            session.begin()
+        session.info.setdefault(PENDING_NOTIFICATIONS, []).extend(rows)
+        if commit:
+            self.db.save()
+
+    def create_notification(self, user_id: str, message: str, commit: bool = True) -> Notification:
         """
         Create a new notification for a user
         
         Args:
             user_id: The ID of the user to notify
             message: The notification message
+            commit: Commit immediately; pass False to write the notification
+                with the caller's next commit
             
         Returns:
-            The created notification object
+            The notification, with the id and timestamps of the row written
+            for it. The row is inserted by the buffered INSERT at commit, so
+            the object is not attached to the session: later changes to it
+            are not saved, and with commit=False the row only exists once
+            the caller commits.
         """
         try:
             notification = Notification(
@@ -36,16 +139,58 @@ class NotificationController:
                 is_read=False
             )
             
-            self.db.new(notification)
-            self.db.save()
+            self._queue([notification], commit)
             
             return notification
             
         except Exception as e:
             self.db.Rollback()
-            print(f"Error creating notification: {e}")
+            logger.exception("Error creating notification")
             raise e
 
+    def create_notifications_bulk(self, user_ids: List[str], message: str, commit: bool = True) -> int:
+        """
+        Create the same notification for many users, e.g. a broadcast
+        
+        Args:
+            user_ids: The IDs of the users to notify
+            message: The notification message
+            commit: Commit immediately; pass False to write the notifications
+                with the caller's next commit
+            
+        Returns:
+            Number of notifications created
+        """
+        try:
+            notifications = [
+                Notification(user_id=user_id, message=message, is_read=False)
+                for user_id in user_ids
+            ]
+            
+            self._queue(notifications, commit)
+            
+            return len(notifications)
+            
+        except Exception as e:
+            self.db.Rollback()
+            logger.exception("Error creating notifications")
+            raise e
+
+    def broadcast_to_customers(self, message: str) -> int:
+        """
+        Notify every non-admin user
+        
+        Args:
+            message: The notification message
+            
+        Returns:
+            Number of notifications created
+        """
+        user_ids = [row[0] for row in self.db.session().query(User.id).filter(
+            User.admin == False
+        ).all()]
+        return self.create_notifications_bulk(user_ids, message)
+
     def get_user_notifications(self, user_id: str, limit: int = 50) -> List[Notification]:
         """
         Get all notifications for a user
@@ -65,9 +210,32 @@ class NotificationController:
             return notifications
             
         except Exception as e:
-            print(f"Error fetching notifications: {e}")
+            logger.exception("Error fetching notifications")
             return []
 
+    def _adjust_unread_count(self, user_id: str, delta: int):
+        """
+        Change a user's unread counter in SQL, never below zero
+        """
+        session = self.db.session()
+        count = User.unread_notification_count
+        session.query(User).filter(User.id == user_id).update(
+            {count: case((count + delta < 0, 0), else_=count + delta)},
+            synchronize_session=False
+        )
+        _expire_unread_counts(session.registry(), {user_id})
+        _queue_events(session.registry(), [(user_id, {'type': 'unread', 'unread_delta': delta})])
+
+    def _mark_read(self, *criteria) -> int:
+        """
+        Flag the matching unread notifications read in one conditional
+        UPDATE; the rowcount is how many this call turned read, so
+        concurrent callers never both count the same notification
+        """
+        return self.db.session().query(Notification).filter(
+            Notification.is_read == False, *criteria
+        ).update({Notification.is_read: True}, synchronize_session=False)
+
     def mark_as_read(self, notification_id: str) -> bool:
         """
         Mark a notification as read
@@ -81,14 +249,15 @@ class NotificationController:
         try:
             notification = self.db.get(Notification, notification_id)
             if notification:
-                notification.is_read = True
+                if self._mark_read(Notification.id == notification_id):
+                    self._adjust_unread_count(notification.user_id, -1)
                 self.db.save()
                 return True
             return False
             
         except Exception as e:
             self.db.Rollback()
-            print(f"Error marking notification as read: {e}")
+            logger.exception("Error marking notification as read")
             return False
 
     def mark_all_as_read(self, user_id: str) -> bool:
@@ -102,17 +271,16 @@ class NotificationController:
             True if successful, False otherwise
         """
         try:
-            self.db.session().query(Notification).filter(
-                Notification.user_id == user_id,
-                Notification.is_read == False
-            ).update({'is_read': True})
+            read = self._mark_read(Notification.user_id == user_id)
+            if read:
+                self._adjust_unread_count(user_id, -read)
             
             self.db.save()
             return True
             
         except Exception as e:
             self.db.Rollback()
-            print(f"Error marking all notifications as read: {e}")
+            logger.exception("Error marking all notifications as read")
             return False
 
     def get_unread_count(self, user_id: str) -> int:
@@ -126,17 +294,38 @@ class NotificationController:
             Number of unread notifications
         """
         try:
-            count = self.db.session().query(Notification).filter(
-                Notification.user_id == user_id,
-                Notification.is_read == False
-            ).count()
+            count = self.db.session().query(User.unread_notification_count).filter(
+                User.id == user_id
+            ).scalar()
             
-            return count
+            return count or 0
             
         except Exception as e:
-            print(f"Error getting unread count: {e}")
+            logger.exception("Error getting unread count")
             return 0
 
+    def get_unread_count_for_session(self, session_id: str) -> Optional[int]:
+        """
+        Get the unread count of the user holding a session, for polling
+        clients: one single-column query on the indexed session_id, without
+        loading the user
+
+        Args:
+            session_id: The session ID sent as the bearer token
+
+        Returns:
+            Number of unread notifications, or None if the session is
+            unknown or has expired
+        """
+        row = self.db.session().query(User.unread_notification_count).filter(
+            User.session_id == session_id,
+            or_(User.session_expiration.is_(None),
+                User.session_expiration >= datetime.utcnow())
+        ).first()
+        if row is None:
+            return None
+        return row[0] or 0
+
     def delete_notification(self, notification_id: str) -> bool:
         """
         Delete a notification
@@ -150,6 +339,10 @@ class NotificationController:
         try:
             notification = self.db.get(Notification, notification_id)
             if notification:
+                # Marking it read first locks the row, so of two concurrent
+                # deletes only one sees it unread
+                if self._mark_read(Notification.id == notification_id):
+                    self._adjust_unread_count(notification.user_id, -1)
                 self.db.delete(notification)
                 self.db.save()
                 return True
@@ -157,44 +350,44 @@ class NotificationController:
             
         except Exception as e:
             self.db.Rollback()
-            print(f"Error deleting notification: {e}")
+            logger.exception("Error deleting notification")
             return False
 
     # Specific notification creation methods for different actions
 
-    def notify_deposit(self, user_id: str, amount: float, account_number: str = None):
+    def notify_deposit(self, user_id: str, amount: float, account_number: str = None, commit: bool = True):
         """Create notification for successful deposit"""
         message = f"Deposit of {amount} ETB has been successfully processed"
         if account_number:
             message += f" to account {account_number}"
         message += "."
-        return self.create_notification(user_id, message)
+        return self.create_notification(user_id, message, commit=commit)
 
-    def notify_withdrawal(self, user_id: str, amount: float, account_number: str = None):
+    def notify_withdrawal(self, user_id: str, amount: float, account_number: str = None, commit: bool = True):
         """Create notification for successful withdrawal"""
         message = f"Withdrawal of {amount} ETB has been successfully processed"
         if account_number:
             message += f" from account {account_number}"
         message += "."
-        return self.create_notification(user_id, message)
+        return self.create_notification(user_id, message, commit=commit)
 
-    def notify_loan_application(self, user_id: str, amount: float, loan_id: str = None):
+    def notify_loan_application(self, user_id: str, amount: float, loan_id: str = None, commit: bool = True):
         """Create notification for loan application submission"""
         message = f"Your loan application for {amount} ETB has been submitted and is under review"
         if loan_id:
             message += f" (Loan ID: {loan_id})"
         message += "."
-        return self.create_notification(user_id, message)
+        return self.create_notification(user_id, message, commit=commit)
 
-    def notify_loan_approval(self, user_id: str, amount: float, loan_id: str = None):
+    def notify_loan_approval(self, user_id: str, amount: float, loan_id: str = None, commit: bool = True):
         """Create notification for loan approval"""
         message = f"Congratulations! Your loan application for {amount} ETB has been approved"
         if loan_id:
             message += f" (Loan ID: {loan_id})"
         message += ". The funds will be credited to your account shortly."
-        return self.create_notification(user_id, message)
+        return self.create_notification(user_id, message, commit=commit)
 
-    def notify_loan_rejection(self, user_id: str, amount: float, reason: str = None, loan_id: str = None):
+    def notify_loan_rejection(self, user_id: str, amount: float, reason: str = None, loan_id: str = None, commit: bool = True):
         """Create notification for loan rejection"""
         message = f"Your loan application for {amount} ETB has been declined"
         if loan_id:
@@ -202,45 +395,45 @@ class NotificationController:
         if reason:
             message += f". Reason: {reason}"
         message += ". Please contact support for more information."
-        return self.create_notification(user_id, message)
+        return self.create_notification(user_id, message, commit=commit)
 
-    def notify_loan_repayment(self, user_id: str, amount: float, loan_id: str = None):
+    def notify_loan_repayment(self, user_id: str, amount: float, loan_id: str = None, commit: bool = True):
         """Create notification for loan repayment"""
         message = f"Loan repayment of {amount} ETB has been successfully processed"
         if loan_id:
             message += f" for Loan ID: {loan_id}"
         message += "."
-        return self.create_notification(user_id, message)
+        return self.create_notification(user_id, message, commit=commit)
 
-    def notify_account_activation(self, user_id: str):
+    def notify_account_activation(self, user_id: str, commit: bool = True):
         """Create notification for account activation"""
         message = "Your account has been activated! You can now access all banking services."
-        return self.create_notification(user_id, message)
+        return self.create_notification(user_id, message, commit=commit)
 
-    def notify_account_deactivation(self, user_id: str):
+    def notify_account_deactivation(self, user_id: str, commit: bool = True):
         """Create notification for account deactivation"""
         message = "Your account has been deactivated. Please contact support for assistance."
-        return self.create_notification(user_id, message)
+        return self.create_notification(user_id, message, commit=commit)
 
-    def notify_payment_success(self, user_id: str, amount: float, payment_type: str):
+    def notify_payment_success(self, user_id: str, amount: float, payment_type: str, commit: bool = True):
         """Create notification for successful payment"""
         message = f"Your {payment_type} payment of {amount} ETB has been successfully processed."
-        return self.create_notification(user_id, message)
+        return self.create_notification(user_id, message, commit=commit)
 
-    def notify_payment_failure(self, user_id: str, amount: float, payment_type: str, reason: str = None):
+    def notify_payment_failure(self, user_id: str, amount: float, payment_type: str, reason: str = None, commit: bool = True):
         """Create notification for failed payment"""
         message = f"Your {payment_type} payment of {amount} ETB has failed"
         if reason:
             message += f". Reason: {reason}"
         message += ". Please try again or contact support."
-        return self.create_notification(user_id, message)
+        return self.create_notification(user_id, message, commit=commit)
 
-    def notify_low_balance(self, user_id: str, current_balance: float):
+    def notify_low_balance(self, user_id: str, current_balance: float, commit: bool = True):
         """Create notification for low account balance"""
         message = f"Your account balance is low (Current balance: {current_balance} ETB). Consider making a deposit."
-        return self.create_notification(user_id, message)
+        return self.create_notification(user_id, message, commit=commit)
 
-    def notify_welcome(self, user_id: str, username: str):
+    def notify_welcome(self, user_id: str, username: str, commit: bool = True):
         """Create welcome notification for new users"""
         message = f"Welcome to MicroFinance, {username}! Your account is being reviewed and will be activated soon."
-        return self.create_notification(user_id, message)
\ No newline at end of file
+        return self.create_notification(user_id, message, commit=commit)
\ No newline at end of file
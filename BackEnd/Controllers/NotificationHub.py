@@ -0,0 +1,125 @@
+#!/usr/bin/python3
+"""
+Contains the NotificationHub class, an in-process publish/subscribe hub
+that feeds the notification event stream
+"""
+import queue
+import threading
+from typing import Dict, List, Optional
+
+# Events buffered per connection before it is told to resync
+MAX_QUEUE_SIZE = 100
+# Open streams allowed per user; the oldest is closed beyond this
+MAX_SUBSCRIPTIONS_PER_USER = 5
+
+
+class Subscription:
+    """
+    A single open stream for a user, with a bounded event buffer
+    """
+
+    def __init__(self, user_id: str, maxsize: int = MAX_QUEUE_SIZE):
+        """Initialize the subscription with an empty bounded queue"""
+        self.user_id = user_id
+        self.events = queue.Queue(maxsize=maxsize)
+        self.closed = False
+        # Serializes writers so that a drain is never refilled before the
+        # event that follows it; the stream only ever takes events out
+        self._lock = threading.Lock()
+
+    def put(self, event: Dict):
+        """
+        Queue an event without blocking the publisher; when the buffer is
+        full the backlog is replaced with a single resync event. Events
+        after close() are dropped.
+        """
+        with self._lock:
+            if self.closed:
+                return
+            try:
+                self.events.put_nowait(event)
+            except queue.Full:
+                self._drain()
+                self.events.put_nowait({"type": "resync"})
+
+    def get(self, timeout: float) -> Optional[Dict]:
+        """Wait for the next event; returns None on timeout"""
+        try:
+            return self.events.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        """Ask the stream serving this subscription to finish"""
+        with self._lock:
+            self.closed = True
+            self._drain()
+            self.events.put_nowait({"type": "close"})
+
+    def _drain(self):
+        """Discard everything still buffered"""
+        while True:
+            try:
+                self.events.get_nowait()
+            except queue.Empty:
+                return
+
+
+class NotificationHub:
+    """
+    Fans notification events out to the streams open in this process.
+    Events only reach clients connected to the same process as the writer,
+    so clients should still refetch on connect and on a resync event.
+    """
+
+    def __init__(self):
+        """Initialize the hub with no subscribers"""
+        self._lock = threading.Lock()
+        self._subscribers: Dict[str, List[Subscription]] = {}
+
+    def subscribe(self, user_id: str) -> Subscription:
+        """
+        Open a subscription for a user
+        Args:
+            user_id: The ID of the user whose events to receive
+        Returns:
+            The new Subscription
+        """
+        subscription = Subscription(user_id)
+        with self._lock:
+            subscriptions = self._subscribers.setdefault(user_id, [])
+            subscriptions.append(subscription)
+            evicted = subscriptions[:-MAX_SUBSCRIPTIONS_PER_USER]
+            del subscriptions[:-MAX_SUBSCRIPTIONS_PER_USER]
+        for old in evicted:
+            old.close()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """Remove a subscription once its stream has ended"""
+        with self._lock:
+            subscriptions = self._subscribers.get(subscription.user_id, [])
+            if subscription in subscriptions:
+                subscriptions.remove(subscription)
+            if not subscriptions:
+                self._subscribers.pop(subscription.user_id, None)
+
+    def publish(self, user_id: str, event: Dict):
+        """
+        Deliver an event to every open stream of a user
+        Args:
+            user_id: The ID of the user the event is for
+            event: JSON-serialisable event payload
+        """
+        with self._lock:
+            subscriptions = list(self._subscribers.get(user_id, ()))
+        for subscription in subscriptions:
+            subscription.put(event)
+
+    def subscriber_count(self) -> int:
+        """Number of open streams in this process"""
+        with self._lock:
+            return sum(len(s) for s in self._subscribers.values())
+
+
+notification_hub = NotificationHub()
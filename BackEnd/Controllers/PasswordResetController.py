@@ -2,51 +2,33 @@
 """
 Password Reset Controller
 """
+import logging
 import os
-import smtplib
-from email.mime.text import MIMEText
-from BackEnd.models import storage
-from BackEnd.models.user import User
 from BackEnd.Controllers.AuthController import AuthController
-from BackEnd.Controllers.UserControllers import UserController
+from BackEnd.Controllers.EmailOutboxController import EmailOutboxController
+
+logger = logging.getLogger(__name__)
 
 def send_password_reset_email(email):
     """
-    Sends a password reset email to the user.
+    Queues a password reset email for the user.
     """
-    userc = UserController()
     auth = AuthController()
     try:
         token = auth.get_reset_password_token(email)
     except ValueError:
         return False
 
-    sender_email = os.getenv('EMAIL_USER')
-    sender_password = os.getenv('EMAIL_PASSWORD')
-    receiver_email = email
     frontend_url = os.getenv('FRONTEND_URL', 'http://localhost:5173')
     reset_link = f"{frontend_url}/reset-password/{token}"
 
-    message = MIMEText(f"Click the link to reset your password: {reset_link}")
-    message['Subject'] = "Password Reset Request"
-    message['From'] = sender_email
-    message['To'] = receiver_email
-    db = storage
     try:
-        with smtplib.SMTP('smtp.gmail.com', 587) as server:
-            server.starttls()
-            server.login(sender_email, sender_password)
-            server.sendmail(sender_email, receiver_email, message.as_string())
-            user = userc.find_user_by(email=email)
-            if user:
-                user.reset_password_token = token
-                storage.new(user)
-                storage.save()
+        EmailOutboxController().enqueue_email(
+            email,
+            "Password Reset Request",
+            f"Click the link to reset your password: {reset_link}"
+        )
         return True
     except Exception as e:
-        print(f"Error sending email: {e}")
+        logger.exception("Error queueing email")
         return False
-
-
-
-
@@ -21,7 +21,8 @@ class RepaymentAuthController:
     def verify_loan_for_repayment(self, user_id: int, loan_id: int) -> Loan:
         """Check if the loan is valid and belongs to the user"""
         loan = self.db.get(Loan, loan_id)
-        if not loan or loan.user_id != user_id:
+        account = self.db.get(Account, loan.account_id) if loan else None
+        if not account or account.user_id != user_id:
             raise NoResultFound("Loan not found or not authorized")
         return loan
 
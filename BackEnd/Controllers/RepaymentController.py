@@ -4,8 +4,13 @@ Contains the class Repayment Controller
 """
 from BackEnd.models import storage
 from BackEnd.models.Repayment import Repayment
+from BackEnd.models.Loan import Loan
+from BackEnd.models.Transaction import Transaction
 from sqlalchemy.orm.exc import NoResultFound
 from BackEnd.Controllers.RepaymentAuthController import RepaymentAuthController
+from BackEnd.Controllers.LoanController import LoanController
+from BackEnd.Controllers.TransactionController import paginate, DEFAULT_PAGE_SIZE
+from typing import List, Optional, Tuple
 
 
 class RepaymentController:
@@ -19,22 +24,52 @@ class RepaymentController:
         self.auth = RepaymentAuthController()
 
     def make_repayment(self, user_id: int, loan_id: int, amount: float) -> Repayment:
-        """Make a loan repayment"""
-        loan = self.auth.verify_loan_for_repayment(user_id, loan_id)
-        account = self.auth.check_funds(user_id, amount)
+        """Make a loan repayment through LoanController.make_repayment"""
+        self.auth.verify_loan_for_repayment(user_id, loan_id)
+        transaction, _ = LoanController().make_repayment(loan_id, amount)
+        return transaction.repayment
 
-        account.balance -= amount
-        loan.remaining_balance -= amount
+    def get_repayments_page(self, loan_id: str = None, status: str = None, cursor: str = None,
+                            limit: int = DEFAULT_PAGE_SIZE) -> Tuple[List[Repayment], Optional[str]]:
+        """
+        Get one page of repayments, newest first
+        Args:
+            loan_id: Only repayments of this loan
+            status: Only repayments with this status
+            cursor: Cursor returned with the previous page
+            limit: Page size
+        Returns:
+            Tuple of (repayments, cursor for the next page or None)
+        """
+        query = self.db.session().query(Repayment)
+        if loan_id:
+            query = query.filter(Repayment.loan_id == loan_id)
+        if status:
+            query = query.filter(Repayment.status == status)
+        return paginate(query, Repayment, cursor, limit)
 
-        new_repayment = Repayment(user_id=user_id, loan_id=loan_id, amount=amount)
-        self.db.new(new_repayment)
-        self.db.save()
-
-        if loan.remaining_balance <= 0:
-            loan.status = "Paid"
-            self.db.save()
-
-        return new_repayment
+    def get_repayment_transactions_page(self, account_id: str, loan_id: str = None, cursor: str = None,
+                                        limit: int = DEFAULT_PAGE_SIZE
+                                        ) -> Tuple[List[Tuple[Transaction, Repayment, Loan]], Optional[str]]:
+        """
+        Get one page of an account's repayment transactions, newest first,
+        each with its repayment and loan loaded by the same query
+        Args:
+            account_id: The account the transactions belong to
+            loan_id: Only transactions repaying this loan
+            cursor: Cursor returned with the previous page
+            limit: Page size
+        Returns:
+            Tuple of ((transaction, repayment, loan) rows, cursor for the next page or None)
+        """
+        query = self.db.session().query(Transaction, Repayment, Loan).join(
+            Repayment, Transaction.repayment_id == Repayment.id
+        ).join(
+            Loan, Repayment.loan_id == Loan.id
+        ).filter(Transaction.account_id == account_id)
+        if loan_id:
+            query = query.filter(Repayment.loan_id == loan_id)
+        return paginate(query, Transaction, cursor, limit)
 
     def get_repayment_schedule(self, user_id: int):
         """Get the repayment schedule for the user"""
@@ -1,4 +1,3 @@
-import stripe
 from flask import request, jsonify
 from BackEnd.models import storage
 from BackEnd.models.Stripe import StripePayment
@@ -10,8 +9,6 @@ from BackEnd.Controllers.NotificationController import NotificationController
 from BackEnd.Controllers.LoanController import LoanController
 from BackEnd.models.Loan import Loan
 
-stripe.api_key = getenv('STRIPE_SECRET_KEY')
-
 class StripeController:
     """
     Handles Stripe payment processing for deposits, withdrawals, and loan repayments.
@@ -26,6 +23,9 @@ class StripeController:
         """
         Creates a new charge using Stripe.
         """
+        # Imported here: the SDK is slow to load and only payments need it
+        import stripe
+        stripe.api_key = getenv('STRIPE_SECRET_KEY')
         try:
             intent = stripe.PaymentIntent.create(
                 amount=amount,  # amount in cents for USD
@@ -83,18 +83,19 @@ class StripeController:
             storage.new(new_payment)
             storage.save()
 
+            # Create success notification, written with the deposit
+            self.notification_controller.notify_deposit(
+                user_id=data['user_id'],
+                amount=data['amount'],
+                account_number=account.account_number,
+                commit=False
+            )
             # Process the transaction (account already verified above)
             self.transaction_controller.deposit(
                 account_id=account.id,
                 amount=data['amount'],
                 description=description
             )
-            # Create success notification
-            self.notification_controller.notify_deposit(
-                user_id=data['user_id'],
-                amount=data['amount'],
-                account_number=account.account_number
-            )
             
             return jsonify({'status': 'success', 'payment_intent_id': intent.id})
         else:
@@ -155,19 +156,20 @@ class StripeController:
             storage.new(new_payment)
             storage.save()
 
+            # Create success notification, written with the withdrawal
+            self.notification_controller.notify_withdrawal(
+                user_id=data['user_id'],
+                amount=data['amount'],
+                account_number=account.account_number,
+                commit=False
+            )
+
             self.transaction_controller.withdraw(
                 account_id=account.id,
                 amount=data['amount'],
                 description=description
             )
             
-            # Create success notification
-            self.notification_controller.notify_withdrawal(
-                user_id=data['user_id'],
-                amount=data['amount'],
-                account_number=account.account_number
-            )
-            
             return jsonify({'status': 'success', 'payment_intent_id': intent.id})
         else:
             # Create failure notification
@@ -227,21 +229,12 @@ class StripeController:
 
             try:
                 # Use LoanController to properly handle the repayment and update loan balance
+                # (writes the repayment record in the same commit)
                 transaction, updated_loan = self.loan_controller.make_repayment(
                     loan_id=data['loan_id'],
                     amount=data['amount']
                 )
 
-                # Create repayment record
-                from BackEnd.models.Repayment import Repayment
-                repayment = Repayment(
-                    loan_id=data['loan_id'],
-                    amount=data['amount'],
-                    status='completed'
-                )
-                storage.new(repayment)
-                storage.save()
-
                 return jsonify({
                     'status': 'success', 
                     'payment_intent_id': intent.id,
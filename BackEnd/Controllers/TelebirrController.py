@@ -7,8 +7,8 @@ from BackEnd.models.Telebirr import Telebirr
 from BackEnd.models.Account import Account
 from BackEnd.models.Transaction import Transaction
 from BackEnd.Controllers.TelebirrAuthController import TelebirrAuthController
+from BackEnd.Controllers.TransactionController import TransactionController
 from sqlalchemy.orm.exc import NoResultFound
-import requests
 import json
 from datetime import datetime
 from typing import Tuple
@@ -23,6 +23,7 @@ class TelebirrController:
         """Initialize TelebirrController"""
         self.db = storage
         self.auth = TelebirrAuthController()
+        self.transaction_controller = TransactionController()
         self.base_url = "https://api.telebirr.com/v1"  # Replace with actual Telebirr API URL
 
     def initiate_payment(self, account_id: str, amount: float, payment_type: str) -> Tuple[Telebirr, dict]:
@@ -35,6 +36,9 @@ class TelebirrController:
         Returns:
             Tuple of (Telebirr payment record, payment initiation response)
         """
+        # Imported here to keep it out of the API's start up
+        import requests
+
         # Validate payment request
         self.auth.verify_payment_request(account_id, amount, payment_type)
 
@@ -115,24 +119,17 @@ class TelebirrController:
 
         # If payment successful, create transaction
         if callback_data["status"] == "completed":
-            account = self.db.get(Account, payment.account_id)
+            account = self.transaction_controller.lock_account(payment.account_id)
             if not account:
                 raise NoResultFound("Account not found")
 
-            # Create transaction
-            transaction = Transaction(
-                account_id=payment.account_id,
-                amount=payment.amount if payment.payment_type == "deposit" else -payment.amount,
-                transaction_type=f"telebirr_{payment.payment_type}",
-                description=f"Telebirr {payment.payment_type} - {payment.transaction_id}"
+            # Create transaction and update the account balance
+            transaction = self.transaction_controller.post(
+                account,
+                payment.amount if payment.payment_type == "deposit" else -payment.amount,
+                f"telebirr_{payment.payment_type}",
+                f"Telebirr {payment.payment_type} - {payment.transaction_id}"
             )
-            self.db.new(transaction)
-
-            # Update account balance
-            if payment.payment_type == "deposit":
-                account.balance += payment.amount
-            else:  # withdrawal
-                account.balance -= payment.amount
 
             self.db.save()
             return payment, transaction
@@ -148,6 +145,8 @@ class TelebirrController:
         Returns:
             dict: Payment status information
         """
+        import requests
+
         payment = self.db.get(Telebirr, payment_id)
         if not payment:
             raise NoResultFound("Payment not found")
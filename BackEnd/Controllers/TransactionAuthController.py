@@ -2,12 +2,15 @@
 """
 Contains the class Transaction Authentication Controller
 """
+import logging
 from BackEnd.models import storage
 from BackEnd.models.Account import Account
 from sqlalchemy.orm.exc import NoResultFound
 
 from BackEnd.models.Transaction import Transaction
 
+logger = logging.getLogger(__name__)
+
 
 class TransactionAuthController:
     """
@@ -26,7 +29,7 @@ class TransactionAuthController:
                 raise NoResultFound("Account not found")
             return account.status == "active"
         except Exception as e:
-            print(f"Error validating account: {str(e)}")
+            logger.exception("Error validating account")
             raise
         if not account:
             raise NoResultFound("Account not found")
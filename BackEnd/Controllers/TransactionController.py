@@ -2,14 +2,72 @@
 """
 Contains the class Transaction Controller
 """
+import logging
 from BackEnd.models import storage
 from BackEnd.models.Transaction import Transaction
 from BackEnd.models.Account import Account
 from sqlalchemy.orm.exc import NoResultFound
 from BackEnd.Controllers.TransactionAuthController import TransactionAuthController
 from BackEnd.Controllers.NotificationController import NotificationController
-from datetime import datetime
-from typing import List, Tuple
+from BackEnd.monitoring.metrics import operation
+from BackEnd.tasks.runner import defer
+from sqlalchemy import and_, or_, func
+from datetime import datetime, timedelta
+from typing import Iterator, List, Optional, Tuple
+import base64
+
+logger = logging.getLogger(__name__)
+
+# Page size for transaction listings when the client does not ask for one
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+# Rows fetched per round trip when streaming a statement
+STATEMENT_BATCH_SIZE = 1000
+
+
+def encode_cursor(obj) -> str:
+    """Opaque cursor pointing just past a row in (created_at, id) order"""
+    # Timestamps are stored as naive UTC, so drop any tzinfo before encoding
+    raw = f"{obj.created_at.replace(tzinfo=None).isoformat()}|{obj.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Reverse encode_cursor; raises ValueError for malformed cursors"""
+    try:
+        created_at, transaction_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|', 1)
+        return datetime.fromisoformat(created_at), transaction_id
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def paginate(query, model, cursor: str = None, limit: int = DEFAULT_PAGE_SIZE) -> Tuple[list, Optional[str]]:
+    """
+    Keyset pagination on (created_at, id), newest first
+    Args:
+        query: Filtered query whose first entity is model
+        model: Mapped class that provides created_at and id
+        cursor: Cursor returned with the previous page
+        limit: Page size, capped at MAX_PAGE_SIZE
+    Returns:
+        Tuple of (rows, cursor for the next page or None)
+    """
+    limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        query = query.filter(or_(
+            model.created_at < created_at,
+            and_(model.created_at == created_at, model.id < row_id)
+        ))
+
+    # Fetch one extra row to know whether another page exists
+    rows = query.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = encode_cursor(last if isinstance(last, model) else last[0])
+    return rows[:limit], next_cursor
 
 
 class TransactionController:
@@ -23,8 +81,51 @@ class TransactionController:
         self.auth = TransactionAuthController()
         self.notification_controller = NotificationController()
 
-    def create_transaction(self, account_id: str, amount: float, transaction_type: str, description: str = None) -> Transaction:
-        """Create a new transaction for an account"""
+    def lock_account(self, account_id: str) -> Optional[Account]:
+        """
+        Load an account and lock its row until the caller commits, so
+        concurrent postings to it are applied one after the other
+        """
+        # populate_existing refreshes an account already in the session;
+        # pending changes are autoflushed before the SELECT
+        return self.db.session().query(Account).filter(
+            Account.id == account_id
+        ).with_for_update().populate_existing().one_or_none()
+
+    def post(self, account: Account, amount: float, transaction_type: str, description: str = None,
+             repayment_id: str = None) -> Transaction:
+        """
+        Apply a signed amount to an account's balance and record the
+        transaction with the resulting balance. The account should come from
+        lock_account; nothing is committed.
+        Args:
+            account: The account to post to
+            amount: Signed amount, negative for money leaving the account
+            transaction_type: Type recorded on the transaction
+            description: Optional description
+            repayment_id: Repayment the transaction belongs to, if any
+        Returns:
+            The pending transaction
+        """
+        account.balance = (account.balance or 0.0) + amount
+        transaction = Transaction(
+            account_id=account.id,
+            repayment_id=repayment_id,
+            amount=amount,
+            transaction_type=transaction_type,
+            description=description,
+            balance_after=account.balance
+        )
+        self.db.new(transaction)
+        return transaction
+
+    def create_transaction(self, account_id: str, amount: float, transaction_type: str, description: str = None,
+                           commit: bool = True) -> Transaction:
+        """
+        Record a transaction for an account without changing its balance.
+        The record does not post, so its balance_after is left NULL; use
+        post() for anything that moves money.
+        """
         if not self.auth.validate_active_account(account_id):
             raise ValueError("Cannot create a transaction for a non-active account")
 
@@ -35,53 +136,55 @@ class TransactionController:
             description=description
         )
         self.db.new(new_transaction)
-        self.db.save()
+        if commit:
+            self.db.save()
         return new_transaction
 
-    def deposit(self, account_id: str, amount: float, description: str = None) -> Transaction:
+    @operation('deposit', amount=lambda transaction: transaction.amount)
+    def deposit(self, account_id: str, amount: float, description: str = None, commit: bool = True) -> Transaction:
         """
         Deposit money into an account.
         Args:
             account_id: The ID of the account to deposit into.
             amount: The amount to deposit.
             description: Optional description of the deposit.
+            commit: Commit immediately; pass False to leave the deposit in
+                the caller's unit of work.
         Returns:
             The created transaction.
         """
         if amount <= 0:
             raise ValueError("Deposit amount must be positive")
 
-        account = self.db.get(Account, account_id)
+        account = self.lock_account(account_id)
         if not account:
             raise NoResultFound("Account not found")
 
         if not self.auth.validate_active_account(account_id):
             raise ValueError("Account must be active for deposit")
 
-        account.balance += amount
-        transaction = self.create_transaction(
-            account_id,
-            amount,
-            "deposit",
-            description
-        )
-        self.db.save()
+        transaction = self.post(account, amount, "deposit", description)
+        if commit:
+            self.db.save()
         return transaction
 
-    def withdraw(self, account_id: str, amount: float, description: str = None) -> Transaction:
+    @operation('withdraw', amount=lambda transaction: transaction.amount)
+    def withdraw(self, account_id: str, amount: float, description: str = None, commit: bool = True) -> Transaction:
         """
         Withdraw money from an account.
         Args:
             account_id: The ID of the account to withdraw from.
             amount: The amount to withdraw.
             description: Optional description of the withdrawal.
+            commit: Commit immediately; pass False to leave the withdrawal in
+                the caller's unit of work.
         Returns:
             The created transaction.
         """
         if amount <= 0:
             raise ValueError("Withdrawal amount must be positive")
 
-        account = self.db.get(Account, account_id)
+        account = self.lock_account(account_id)
         if not account:
             raise NoResultFound("Account not found")
 
@@ -91,22 +194,16 @@ class TransactionController:
         if account.balance < amount:
             raise ValueError("Insufficient funds")
 
-        account.balance -= amount
-        transaction = self.create_transaction(
-            account_id,
-            -amount,
-            "withdrawal",
-            description
-        )
-        self.db.save()
+        transaction = self.post(account, -amount, "withdrawal", description)
         
-        # Check for low balance and create notification if needed
+        # Check for low balance and notify once the withdrawal is committed
         LOW_BALANCE_THRESHOLD = 100.0  # ETB
         if account.balance < LOW_BALANCE_THRESHOLD:
-            self.notification_controller.notify_low_balance(
-                user_id=account.user_id,
-                current_balance=account.balance
-            )
+            defer('notify_low_balance', user_id=account.user_id,
+                  current_balance=float(account.balance))
+
+        if commit:
+            self.db.save()
         
         return transaction
 
@@ -149,17 +246,50 @@ class TransactionController:
             transactions = self.db.session().query(Transaction).filter(Transaction.account_id == account_id).all()
             return transactions
         except Exception as e:
-            print(f"Error getting transactions for account {account_id}: {str(e)}")
+            logger.exception("Error getting transactions for account %s", account_id)
             return []
 
-    def get_transactions_by_date(self, start_date: str, end_date: str) -> List[Transaction]:
+    def get_transactions_page(self, account_id: str = None, transaction_type: str = None,
+                              min_amount: float = None, max_amount: float = None,
+                              start: datetime = None, end: datetime = None,
+                              cursor: str = None, limit: int = DEFAULT_PAGE_SIZE
+                              ) -> Tuple[List[Transaction], Optional[str]]:
         """
-        Get transactions within a date range
+        Get one page of transactions, newest first, using keyset pagination
+        on (created_at, id)
         Args:
-            start_date: Start date in format 'YYYY-MM-DD'
-            end_date: End date in format 'YYYY-MM-DD'
+            account_id: Only transactions of this account
+            transaction_type: Only transactions of this type
+            min_amount: Lowest signed amount (withdrawals are negative)
+            max_amount: Highest signed amount
+            start: Only transactions created at or after this time
+            end: Only transactions created before this time
+            cursor: Cursor returned with the previous page
+            limit: Page size, capped at MAX_PAGE_SIZE
         Returns:
-            List of Transaction objects
+            Tuple of (transactions, cursor for the next page or None)
+        """
+        query = self.db.session().query(Transaction)
+        if account_id is not None:
+            query = query.filter(Transaction.account_id == account_id)
+        if transaction_type:
+            query = query.filter(Transaction.transaction_type == transaction_type)
+        if min_amount is not None:
+            query = query.filter(Transaction.amount >= min_amount)
+        if max_amount is not None:
+            query = query.filter(Transaction.amount <= max_amount)
+        if start is not None:
+            query = query.filter(Transaction.created_at >= start)
+        if end is not None:
+            query = query.filter(Transaction.created_at < end)
+        return paginate(query, Transaction, cursor, limit)
+
+    @staticmethod
+    def parse_date_range(start_date: str, end_date: str) -> Tuple[datetime, datetime]:
+        """
+        Parse an inclusive YYYY-MM-DD date range into datetime bounds
+        Returns:
+            Tuple of (start, exclusive end)
         """
         try:
             start = datetime.strptime(start_date, '%Y-%m-%d')
@@ -170,8 +300,95 @@ class TransactionController:
         if start > end:
             raise ValueError("Start date must be before end date")
 
-        return self.db.get_transactions_by_date_range(start, end)
+        return start, end + timedelta(days=1)
 
+    def get_transactions_by_date(self, start_date: str, end_date: str, **page) -> Tuple[List[Transaction], Optional[str]]:
+        """
+        Get transactions within a date range
+        Args:
+            start_date: Start date in format 'YYYY-MM-DD'
+            end_date: End date in format 'YYYY-MM-DD', inclusive
+            page: Filters and paging arguments for get_transactions_page
+        Returns:
+            Tuple of (transactions, cursor for the next page or None)
+        """
+        start, end = self.parse_date_range(start_date, end_date)
+        return self.get_transactions_page(start=start, end=end, **page)
+
+    def get_balance_before(self, account_id: str, start: datetime = None) -> float:
+        """
+        Balance of an account just before a point in time
+        Args:
+            account_id: The account to report on
+            start: Cut-off time; None means the start of history
+        Returns:
+            The balance carried into a statement starting at start
+        """
+        if start is None:
+            return 0.0
+        balance = self._last_posted_balance(account_id, start)
+        if balance is not None:
+            return balance
+
+        # Transactions posted before balance_after was recorded
+        total = self.db.session().query(func.coalesce(func.sum(Transaction.amount), 0.0)).filter(
+            Transaction.account_id == account_id,
+            Transaction.created_at < start
+        ).scalar()
+        return float(total or 0.0)
+
+    def _last_posted_balance(self, account_id: str, start: datetime) -> Optional[float]:
+        """balance_after of the account's last posted transaction before start, if any"""
+        # One probe of the (account_id, created_at, id) index
+        last = self.db.session().query(Transaction.balance_after).filter(
+            Transaction.account_id == account_id,
+            Transaction.created_at < start,
+            Transaction.balance_after.isnot(None)
+        ).order_by(Transaction.created_at.desc(), Transaction.id.desc()).first()
+        return None if last is None else float(last.balance_after)
+
+    def iter_statement(self, account_id: str, start: datetime = None, end: datetime = None,
+                       opening_balance: float = 0.0,
+                       batch_size: int = STATEMENT_BATCH_SIZE) -> Iterator[Tuple]:
+        """
+        Stream an account's transactions, oldest first, with a running balance.
+        Each row's balance is its recorded balance_after. A row without one
+        is a legacy posting, adding its amount to the balance, until the
+        account's first recorded balance; after that it is a record that
+        did not post (see create_transaction) and carries the balance over.
+        Args:
+            account_id: The account to report on
+            start: Only transactions created at or after this time
+            end: Only transactions created before this time
+            opening_balance: Balance before the first transaction yielded
+            batch_size: Rows fetched from the server-side cursor at a time
+        Yields:
+            Tuples of (created_at, id, transaction_type, description, amount,
+            balance after the transaction)
+        """
+        query = self.db.session().query(
+            Transaction.created_at, Transaction.id, Transaction.transaction_type,
+            Transaction.description, Transaction.amount, Transaction.balance_after
+        ).filter(Transaction.account_id == account_id)
+        if start is not None:
+            query = query.filter(Transaction.created_at >= start)
+        if end is not None:
+            query = query.filter(Transaction.created_at < end)
+
+        # yield_per streams from a server-side cursor instead of buffering
+        # the whole result, so memory stays flat for any history length
+        balance = opening_balance
+        posted = start is not None and self._last_posted_balance(account_id, start) is not None
+        for created_at, transaction_id, transaction_type, description, amount, balance_after in query.order_by(
+                Transaction.created_at, Transaction.id).yield_per(batch_size):
+            if balance_after is not None:
+                balance = balance_after
+                posted = True
+            elif not posted:
+                balance += amount
+            yield created_at, transaction_id, transaction_type, description, amount, balance
+
+    @operation('transfer', amount=lambda transactions: transactions[1].amount)
     def transfer(self, from_account_id: str, to_account_id: str, amount: float, description: str = None) -> Tuple[Transaction, Transaction]:
         """
         Transfer money between accounts
@@ -187,28 +404,34 @@ class TransactionController:
                 self.auth.validate_active_account(to_account_id)):
             raise ValueError("Both accounts must be active for transfer")
 
-        from_account = self.db.get(Account, from_account_id)
-        to_account = self.db.get(Account, to_account_id)
-
-        if not from_account or not to_account:
-            raise NoResultFound("One or both accounts not found")
-
-        if from_account.balance < amount:
-            raise ValueError("Insufficient funds")
-
-        # Withdraw from source account
-        debit_transaction = self.withdraw(
-            from_account_id,
-            amount,
-            f"Transfer to {to_account.id}" + (f": {description}" if description else "")
-        )
+        # Both legs and their notifications are written in one commit, and a
+        # failure releases the locks and rolls everything back
+        with self.db.transaction():
+            # Lock both rows in a fixed order so opposite transfers cannot deadlock
+            locked = {account_id: self.lock_account(account_id)
+                      for account_id in sorted({from_account_id, to_account_id})}
+            from_account = locked[from_account_id]
+            to_account = locked[to_account_id]
+
+            if not from_account or not to_account:
+                raise NoResultFound("One or both accounts not found")
+
+            if from_account.balance < amount:
+                raise ValueError("Insufficient funds")
+
+            # Withdraw from source account
+            debit_transaction = self.withdraw(
+                from_account_id,
+                amount,
+                f"Transfer to {to_account.id}" + (f": {description}" if description else "")
+            )
 
-        # Deposit into destination account
-        credit_transaction = self.deposit(
-            to_account_id,
-            amount,
-            f"Transfer from {from_account.id}" + (f": {description}" if description else "")
-        )
+            # Deposit into destination account
+            credit_transaction = self.deposit(
+                to_account_id,
+                amount,
+                f"Transfer from {from_account.id}" + (f": {description}" if description else "")
+            )
 
         return debit_transaction, credit_transaction
 
@@ -226,12 +449,12 @@ class TransactionController:
         if not transaction:
             raise NoResultFound("Transaction not found")
 
-        if transaction.type == "deposit":
-            new_transaction = self.create_transaction(transaction.account_id, -transaction.amount, "reversal")
-        elif transaction.type == "withdrawal":
-            new_transaction = self.create_transaction(transaction.account_id, transaction.amount, "reversal")
-        else:
-            raise ValueError("Unsupported transaction type for reversal")
+        with self.db.transaction():
+            if transaction.type == "deposit":
+                new_transaction = self.create_transaction(transaction.account_id, -transaction.amount, "reversal")
+            elif transaction.type == "withdrawal":
+                new_transaction = self.create_transaction(transaction.account_id, transaction.amount, "reversal")
+            else:
+                raise ValueError("Unsupported transaction type for reversal")
 
-        self.db.save()
         return new_transaction
@@ -2,14 +2,18 @@
 """
 Contains the class User Controller
 """
+import logging
 from BackEnd.models.user import User
 from BackEnd.Controllers.AccountController import AccountController
 from BackEnd.Controllers.NotificationController import NotificationController
+from BackEnd.tasks.runner import defer
 from sqlalchemy import tuple_
 from sqlalchemy.exc import InvalidRequestError
 from sqlalchemy.orm.exc import NoResultFound
 from BackEnd.models import storage
 
+logger = logging.getLogger(__name__)
+
 class UserController:
     """
         - UserController class
@@ -43,13 +47,13 @@ class UserController:
 
             # If user is not an admin, create an account and welcome notification
             if not admin:
+                # Welcome notification sent after the new account is committed
+                defer('notify_welcome', user_id=user.id, username=fullname or username)
                 self.account_controller.create_account(user.id, account_type='savings')
-                # Create welcome notification
-                self.notification_controller.notify_welcome(user.id, fullname or username)
 
         except Exception as e:
             self.db.Rollback()
-            print(f"Error: {e}")
+            logger.exception("Error adding user")
             raise e
 
         return user
@@ -57,19 +61,17 @@ class UserController:
     def find_user_by(self, **filters) -> User:
         """Find a user in the database based on filters."""
         session = self.db.session()
-        print("Searching user with filters:", filters)
+        logger.debug("Searching user", extra={'filters': sorted(filters)})
 
         query = session.query(User)
         for field, value in filters.items():
             if hasattr(User, field):
-                print(f"Filter: {field} = {value}")
                 query = query.filter(getattr(User, field) == value)
             else:
                 raise InvalidRequestError(f"Invalid filter: {field}")
 
         user = query.first()
         if user is None:
-            print("User not found.")
             raise NoResultFound("User not found.")
         return user
 
@@ -144,16 +146,16 @@ class UserController:
             session.delete(user)
             
             # Commit all changes
-            session.commit()
+            self.db.save()
             return True
             
         except NoResultFound as e:
-            print(f"Error deleting user: {e}")
+            logger.exception("Error deleting user")
             self.db.Rollback()
             return False
         except Exception as e:
             self.db.Rollback()
-            print(f"An unexpected error occurred during user deletion: {e}")
+            logger.exception("An unexpected error occurred during user deletion")
             import traceback
             traceback.print_exc()
             return False
@@ -5,14 +5,32 @@ from BackEnd.models import storage
 from BackEnd.api.v1.views import app_views
 from BackEnd.api.v1.views.stripe import stripe_views
 from BackEnd.api.v1.views.company_balance import company_balance_bp
+from BackEnd.api.v1.response_encoding import init_app as init_response_encoding
+from BackEnd.api.v1.commit_metrics import init_app as init_commit_metrics
+from BackEnd.monitoring.profiler import init_app as init_profiler
+from BackEnd.monitoring.metrics import init_app as init_metrics
+from BackEnd.monitoring.log import init_app as init_logging
+from BackEnd.api.v1.swagger import init_app as init_swagger
+from BackEnd.Controllers.EmailOutboxController import email_worker
+from BackEnd.tasks.runner import task_runner
 from os import environ
 from flask import Flask, make_response, jsonify
 from flask_cors import CORS
-from flasgger import Swagger
 
 app = Flask(__name__)
-app.config['JSONIFY_PRETTYPRINT_REGULAR'] = True
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+# JSON log lines through a background writer, tagged with X-Request-ID
+init_logging(app)
+# Prometheus metrics at /metrics; registered first so that its after_request
+# hook runs last and sees the final status
+init_metrics(app)
+# Compact JSON, ETag/304 on GETs and gzip/brotli for large bodies
+init_response_encoding(app)
+# X-DB-Commits on every response, totals per endpoint in commit_stats
+init_commit_metrics(app)
+# Query counts and DB time per request: Server-Timing in debug mode, slow
+# query log, percentiles per route at /admin/perf
+init_profiler(app)
 
 app.register_blueprint(app_views, url_prefix='/api/v1')
 app.register_blueprint(stripe_views, url_prefix='/api/v1')
@@ -24,14 +42,32 @@ CORS(app, resources={
     r"/api/*": {
         "origins": "*",  # Allow all origins in development
         "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-        "allow_headers": ["Content-Type", "Authorization", "Accept"],
-        "expose_headers": ["Content-Type", "Authorization"],
+        "allow_headers": ["Content-Type", "Authorization", "Accept", "X-Request-ID"],
+        "expose_headers": ["Content-Type", "Authorization", "X-Next-Cursor", "Link", "ETag", "X-DB-Commits", "Server-Timing", "X-Request-ID"],
         "supports_credentials": True,
         "max_age": 3600
     }
 })
 
 
+def start_workers():
+    """
+    Start the background threads of the API process. Called when the app
+    is run as a script; a WSGI server should call it once per worker
+    process. Importing the app starts nothing.
+    """
+    # Deliver queued email from a background thread; set MFS_EMAIL_WORKER=0
+    # when the worker runs as its own process instead
+    if environ.get('MFS_EMAIL_WORKER', '1') != '0':
+        email_worker.start()
+
+    # Run deferred side effects (notifications, verification email) on a
+    # thread pool; set MFS_TASK_WORKERS=0 when python -m BackEnd.tasks.runner
+    # runs them
+    if task_runner.workers:
+        task_runner.start()
+
+
 @app.teardown_appcontext
 def close_db(error):
     """ Close Storage """
@@ -48,12 +84,8 @@ def not_found(error):
     """
     return make_response(jsonify({'error': "Not found"}), 404)
 
-app.config['SWAGGER'] = {
-    'title': 'UniLove App Restful API',
-    'uiversion': 3
-}
-
-Swagger(app)
+# Swagger UI at /apidocs, built by the first request for it
+init_swagger(app)
 
 
 if __name__ == "__main__":
@@ -64,4 +96,5 @@ if __name__ == "__main__":
         host = '0.0.0.0'
     if not port:
         port = '5000'
+    start_workers()
     app.run(host=host, port=port, threaded=True)
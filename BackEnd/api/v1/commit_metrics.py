@@ -0,0 +1,68 @@
+#!/usr/bin/python3
+"""
+Commits per request: each response carries the number of database commits
+made while handling it in X-DB-Commits, and commit_stats keeps running
+totals per endpoint
+"""
+import threading
+
+from flask import request
+
+from BackEnd.models import storage
+
+
+class CommitStats:
+    """
+    Requests, commits and the most commits in one request, per endpoint
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # endpoint -> [requests, commits, max commits]
+        self._endpoints = {}
+
+    def record(self, endpoint: str, commits: int):
+        """Count one request to endpoint that made commits commits"""
+        with self._lock:
+            stats = self._endpoints.setdefault(endpoint, [0, 0, 0])
+            stats[0] += 1
+            stats[1] += commits
+            stats[2] = max(stats[2], commits)
+
+    def snapshot(self) -> dict:
+        """
+        Returns:
+            endpoint -> {"requests", "commits", "mean", "max"}
+        """
+        with self._lock:
+            return {endpoint: {'requests': requests, 'commits': commits,
+                               'mean': commits / requests, 'max': most}
+                    for endpoint, (requests, commits, most) in self._endpoints.items()}
+
+    def reset(self):
+        """Forget everything recorded"""
+        with self._lock:
+            self._endpoints.clear()
+
+
+commit_stats = CommitStats()
+
+
+def start_counting():
+    """Count the request's commits from zero"""
+    storage.reset_commit_count()
+
+
+def record_commits(response):
+    """Report the request's commits in X-DB-Commits and commit_stats"""
+    commits = storage.commit_count()
+    response.headers['X-DB-Commits'] = str(commits)
+    commit_stats.record(request.endpoint or 'unmatched', commits)
+    return response
+
+
+def init_app(app):
+    """Count commits per request when the storage engine counts them"""
+    if hasattr(storage, 'commit_count'):
+        app.before_request(start_counting)
+        app.after_request(record_commits)
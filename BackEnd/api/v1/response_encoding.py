@@ -0,0 +1,112 @@
+#!/usr/bin/python3
+"""
+Response encoding for the API: compact JSON, conditional GETs and
+gzip/brotli compression of large bodies
+"""
+import gzip
+import hashlib
+import os
+from datetime import date
+from functools import wraps
+
+from flask import current_app, make_response, request
+
+from BackEnd.models import storage
+
+try:
+    import brotli
+except ImportError:  # optional, enables Content-Encoding: br
+    brotli = None
+
+# Bodies smaller than this many bytes are sent uncompressed
+COMPRESS_MIN_SIZE = int(os.getenv('MFS_COMPRESS_MIN_SIZE', '1024'))
+# Fast settings: responses are compressed on every request
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+# Mimetypes worth compressing
+COMPRESSIBLE_TYPES = ('application/json', 'text/')
+
+ENCODERS = {'gzip': lambda data: gzip.compress(data, compresslevel=GZIP_LEVEL)}
+if brotli is not None:
+    ENCODERS['br'] = lambda data: brotli.compress(data, quality=BROTLI_QUALITY)
+# Preferred first when the client accepts both equally
+ENCODINGS = [encoding for encoding in ('br', 'gzip') if encoding in ENCODERS]
+
+
+def _cacheable(response) -> bool:
+    """Whole, successful GET responses; streams and files are left alone"""
+    return (request.method in ('GET', 'HEAD') and response.status_code == 200
+            and not response.direct_passthrough and not response.is_streamed)
+
+
+def _compress(response):
+    """Encode the body with the best encoding the client accepts"""
+    if 'Content-Encoding' in response.headers:
+        return
+    if not (response.mimetype or '').startswith(COMPRESSIBLE_TYPES):
+        return
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_SIZE:
+        return
+    response.vary.add('Accept-Encoding')
+    encoding = request.accept_encodings.best_match(ENCODINGS)
+    if encoding is None:
+        return
+    response.set_data(ENCODERS[encoding](data))
+    response.headers['Content-Encoding'] = encoding
+
+
+def encode_response(response):
+    """
+    after_request hook: tag whole GET responses with a weak ETag, answer a
+    matching If-None-Match with 304, and compress what is left to send
+    """
+    if not _cacheable(response):
+        return response
+    if not response.get_etag()[0]:
+        # Hash of the uncompressed body, so every encoding shares it
+        response.add_etag(weak=True)
+    response.make_conditional(request)
+    if response.status_code == 200:
+        _compress(response)
+    return response
+
+
+def conditional(fingerprint):
+    """
+    Decorator for read endpoints whose data can be fingerprinted more
+    cheaply than it can be built: a request whose If-None-Match matches the
+    fingerprint gets a 304 before the view runs
+    Args:
+        fingerprint: Callable returning a repr()-able value that changes
+            whenever the view's output would
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            key = f"{request.full_path}|{fingerprint()!r}".encode('utf-8')
+            etag = hashlib.sha1(key).hexdigest()
+            if request.if_none_match.contains_weak(etag):
+                response = current_app.response_class(status=304)
+                response.set_etag(etag, weak=True)
+                return response
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                response.set_etag(etag, weak=True)
+            return response
+        return wrapper
+    return decorator
+
+
+def table_versions(*models):
+    """
+    Fingerprint of some tables: the write counter of each (see
+    DBStorage.table_versions), plus today's date for views relative to today
+    """
+    return date.today(), storage.table_versions(*models)
+
+
+def init_app(app):
+    """Send compact JSON and encode every response through encode_response"""
+    app.json.compact = True
+    app.after_request(encode_response)
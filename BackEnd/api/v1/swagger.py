@@ -0,0 +1,93 @@
+#!/usr/bin/python3
+"""
+Swagger documentation, built on first use.
+
+The views declare their YAML spec with swag_from(), which only records the
+file on the view function as flasgger's decorator does, without importing
+flasgger. LazyDocs sends /apidocs, /apispec_1.json and the Swagger UI
+assets to a separate Flask app holding the same routes; that app, flasgger
+and the spec are only built the first time one of them is asked for, so
+workers start without paying for documentation nobody reads.
+"""
+import os
+import threading
+
+from flask import Flask
+
+# Paths served by the documentation app
+DOCS_PREFIXES = ('/apidocs', '/apispec', '/flasgger_static')
+
+SWAGGER_CONFIG = {
+    'title': 'UniLove App Restful API',
+    'uiversion': 3
+}
+
+
+def swag_from(specs: str, methods=None):
+    """
+    Document a view with a YAML file, read when the docs are first built
+    Args:
+        specs: Path of the YAML file, relative to the view's module
+        methods: HTTP methods the file documents, all of them by default
+    """
+    def decorator(function):
+        path = specs
+        if not os.path.isabs(path):
+            function.root_path = os.path.dirname(os.path.abspath(function.__code__.co_filename))
+            path = os.path.join(function.root_path, path)
+        function.swag_type = path.split('.')[-1]
+        if methods:
+            if not hasattr(function, 'swag_paths'):
+                function.swag_paths = {}
+            for verb in methods:
+                function.swag_paths[verb.lower()] = path
+        else:
+            function.swag_path = path
+        return function
+    return decorator
+
+
+class LazyDocs:
+    """
+    WSGI middleware serving the documentation paths from an app built
+    on the first request for one of them
+    """
+
+    def __init__(self, app: Flask):
+        self.app = app
+        self.wsgi_app = app.wsgi_app
+        self._docs = None
+        self._lock = threading.Lock()
+
+    def docs_app(self) -> Flask:
+        """The documentation app, built once"""
+        if self._docs is None:
+            with self._lock:
+                if self._docs is None:
+                    self._docs = self._build()
+        return self._docs
+
+    def _build(self) -> Flask:
+        """A Flask app with the API's routes and flasgger on top"""
+        from flasgger import Swagger
+
+        docs = Flask(self.app.import_name)
+        docs.config['SWAGGER'] = self.app.config['SWAGGER']
+        for rule in self.app.url_map.iter_rules():
+            if rule.endpoint in docs.view_functions:
+                continue
+            docs.url_map.add(rule.empty())
+            docs.view_functions[rule.endpoint] = self.app.view_functions[rule.endpoint]
+        Swagger(docs)
+        return docs
+
+    def __call__(self, environ, start_response):
+        if environ.get('PATH_INFO', '').startswith(DOCS_PREFIXES):
+            return self.docs_app()(environ, start_response)
+        return self.wsgi_app(environ, start_response)
+
+
+def init_app(app: Flask):
+    """Serve the Swagger UI at /apidocs, built when first visited"""
+    app.config.setdefault('SWAGGER', SWAGGER_CONFIG)
+    app.wsgi_app = LazyDocs(app)
@@ -15,4 +15,5 @@ from BackEnd.api.v1.views.credit_score import *
 from BackEnd.api.v1.views.comprehensive_credit_score import *
 from BackEnd.api.v1.views.notifications import *
 from BackEnd.api.v1.views.settings import * 
+from BackEnd.api.v1.views.perf import *
 
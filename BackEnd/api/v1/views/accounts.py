@@ -1,16 +1,24 @@
 #!/usr/bin/python3
 """ objects that handle all default RestFul API actions for Accounts """
+import logging
+import csv
+import io
+import json
+from datetime import datetime, timedelta
 from typing import Any
-from flask import abort, jsonify, make_response, request
-from flasgger.utils import swag_from
+from flask import abort, jsonify, make_response, request, Response, stream_with_context
+from BackEnd.api.v1.swagger import swag_from
 
 from BackEnd.Controllers.TransactionController import TransactionController
+from BackEnd.api.v1.views.pagination import transaction_page_args, paginated_response
 from BackEnd.models.Account import Account
 from BackEnd.models import storage
 from BackEnd.api.v1.views import app_views
 from BackEnd.Controllers.AccountController import AccountController
 from BackEnd.Controllers.AuthController import AuthController
 
+logger = logging.getLogger(__name__)
+
 @app_views.route('/accounts', methods=['GET'], strict_slashes=False)
 @swag_from('documentation/account/all_accounts.yml')
 def get_accounts():
@@ -136,30 +144,30 @@ def deposit(account_id):
     """
     Deposits money into an account
     """
-    print(f"[DEBUG] deposit called with account_id={account_id}")
+    logger.debug("deposit called with account_id=%s", account_id)
     if not request.get_json():
         abort(400, description="Not a JSON")
 
     data = request.get_json()
     amount = data.get('amount')
-    print(f"[DEBUG] deposit amount from request: {amount} (type: {type(amount)})")
+    logger.debug("deposit amount from request: %s (type: %s)", amount, type(amount))
     if not amount or amount <= 0:
         abort(400, description="Invalid amount")
 
     account = storage.get(Account, account_id)
-    print(f"[DEBUG] storage.get(Account, {account_id}) returned: {account}")
+    logger.debug("storage.get(Account, %s) returned: %s", account_id, account)
     if not account:
         abort(404)
 
     controller = AccountController()
     try:
-        print(f"[DEBUG] Calling controller.deposit(account.id={account.id}, amount={amount})")
+        logger.debug("Calling controller.deposit(account.id=%s, amount=%s)", account.id, amount)
         controller.deposit(account.id, amount)
         updated_account = storage.get(Account, account.id)
-        print(f"[DEBUG] Updated account after deposit: {updated_account}")
+        logger.debug("Updated account after deposit: %s", updated_account)
         return make_response(jsonify(updated_account.to_dict()), 200)
     except Exception as e:
-        print(f"[ERROR] Exception in deposit: {e}")
+        logger.exception("Exception in deposit")
         return make_response(jsonify({"error": str(e)}), 400)
 
 @app_views.route('/accounts/<account_id>/withdraw', methods=['POST'], strict_slashes=False)
@@ -191,16 +199,108 @@ def withdraw(account_id):
 @swag_from('documentation/account/get_account_transactions.yml')
 def get_account_transactions(account_id):
     """
-    Retrieves all transactions for a specific account
+    Retrieves one page of transactions for a specific account, newest first
     """
     account = storage.get(Account, account_id)
     if not account:
         abort(404)
 
     transaction = TransactionController()
-    controller = AccountController()
-    transactions = transaction.get_transactions_by_account(account_id)
-    return jsonify([transaction.to_dict() for transaction in transactions])
+    try:
+        transactions, next_cursor = transaction.get_transactions_page(
+            account_id=account_id, **transaction_page_args()
+        )
+    except ValueError as e:
+        return make_response(jsonify({"error": str(e)}), 400)
+    return paginated_response(transactions, next_cursor)
+
+# Statement rows written per chunk sent to the client
+STATEMENT_CHUNK_ROWS = 500
+STATEMENT_COLUMNS = ['date', 'transaction_id', 'type', 'description', 'amount', 'balance']
+
+
+@app_views.route('/accounts/<account_id>/statement', methods=['GET'], strict_slashes=False)
+@swag_from('documentation/account/get_account_statement.yml')
+def get_account_statement(account_id):
+    """
+    Streams an account statement with a running balance as CSV or NDJSON
+    """
+    auth_header = request.headers.get('Authorization')
+    if not auth_header or not auth_header.startswith('Bearer '):
+        return jsonify({"message": "No authorization token provided"}), 401
+    
+    token = auth_header.split(' ')[1]
+    auth_controller = AuthController()
+    user = auth_controller.get_user_from_session_id(token)
+    
+    if not user:
+        return jsonify({"message": "Unauthorized"}), 401
+    
+    account = storage.session().get(Account, account_id)
+    if not account:
+        abort(404)
+    if account.user_id != user.id and not user.admin:
+        return jsonify({"message": "Unauthorized to access this account"}), 403
+    
+    output_format = request.args.get('format', 'csv').lower()
+    if output_format not in ('csv', 'ndjson'):
+        return make_response(jsonify({"error": "format must be csv or ndjson"}), 400)
+    
+    date_from = request.args.get('from')
+    date_to = request.args.get('to')
+    try:
+        start = datetime.strptime(date_from, '%Y-%m-%d') if date_from else None
+        # 'to' is inclusive, so stop at the start of the following day
+        end = datetime.strptime(date_to, '%Y-%m-%d') + timedelta(days=1) if date_to else None
+    except ValueError:
+        return make_response(jsonify({"error": "Invalid date format. Use YYYY-MM-DD"}), 400)
+    if start and end and start >= end:
+        return make_response(jsonify({"error": "Start date must be before end date"}), 400)
+    
+    controller = TransactionController()
+    opening_balance = controller.get_balance_before(account_id, start)
+    rows = controller.iter_statement(account_id, start, end, opening_balance)
+    
+    def generate_csv():
+        """Yield the statement as CSV, a chunk of rows at a time"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(STATEMENT_COLUMNS)
+        writer.writerow(['', '', 'opening_balance', '', '', f"{opening_balance:.2f}"])
+        for count, (created_at, transaction_id, transaction_type, description, amount, balance) in enumerate(rows, 1):
+            writer.writerow([created_at.isoformat(), transaction_id, transaction_type,
+                             description or '', f"{amount:.2f}", f"{balance:.2f}"])
+            if count % STATEMENT_CHUNK_ROWS == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+    
+    def generate_ndjson():
+        """Yield the statement as one JSON object per line"""
+        chunk = [json.dumps({'type': 'opening_balance', 'balance': round(opening_balance, 2)})]
+        for created_at, transaction_id, transaction_type, description, amount, balance in rows:
+            chunk.append(json.dumps({
+                'date': created_at.isoformat(),
+                'transaction_id': transaction_id,
+                'type': transaction_type,
+                'description': description,
+                'amount': round(amount, 2),
+                'balance': round(balance, 2)
+            }))
+            if len(chunk) >= STATEMENT_CHUNK_ROWS:
+                yield '\n'.join(chunk) + '\n'
+                chunk = []
+        if chunk:
+            yield '\n'.join(chunk) + '\n'
+    
+    filename = f"statement_{account.account_number}_{date_from or 'start'}_{date_to or 'today'}.{output_format}"
+    generator = generate_csv() if output_format == 'csv' else generate_ndjson()
+    # stream_with_context keeps the request's database session open until
+    # the last row has been sent
+    return Response(stream_with_context(generator),
+                    mimetype='text/csv' if output_format == 'csv' else 'application/x-ndjson',
+                    headers={'Content-Disposition': f'attachment; filename="{filename}"'})
 
 @app_views.route('/accounts/activate/<user_id>', methods=['POST'], strict_slashes=False)
 @swag_from('documentation/account/activate_account.yml')
@@ -5,13 +5,28 @@ Company Balance API endpoints
 from flask import Blueprint, jsonify, request
 from BackEnd.Controllers.CompanyBalanceController import CompanyBalanceController
 from BackEnd.Controllers.AuthController import AuthController
+from BackEnd.api.v1.response_encoding import conditional, table_versions
+from BackEnd.models.Account import Account
+from BackEnd.models.Loan import Loan
+from BackEnd.models.DelinquencySweep import DelinquencySweep
+from BackEnd.models.Repayment import Repayment
+from BackEnd.models.Stripe import StripePayment
+from BackEnd.models.Transaction import Transaction
+from BackEnd.models.user import User
 
 company_balance_bp = Blueprint('company_balance', __name__)
 company_balance_controller = CompanyBalanceController()
 auth_controller = AuthController()
 
 
+def company_data_version():
+    """Fingerprint of every table the company dashboards read"""
+    return table_versions(Account, Transaction, Loan, Repayment, DelinquencySweep,
+                          StripePayment, User)
+
+
 @company_balance_bp.route('/overview', methods=['GET'])
+@conditional(company_data_version)
 def get_company_overview():
     """
     Get comprehensive company financial overview
@@ -64,6 +79,7 @@ def get_company_overview():
 
 
 @company_balance_bp.route('/loan-analytics', methods=['GET'])
+@conditional(company_data_version)
 def get_loan_analytics():
     """
     Get detailed loan analytics
@@ -101,7 +117,43 @@ def get_loan_analytics():
         return jsonify({"error": str(e)}), 500
 
 
+@company_balance_bp.route('/delinquency', methods=['GET'])
+@conditional(company_data_version)
+def get_delinquency_summary():
+    """
+    Get overdue loans grouped by days past due
+    ---
+    tags:
+      - Company Balance
+    responses:
+      200:
+        description: Delinquency buckets from the daily snapshot
+        schema:
+          type: object
+          properties:
+            buckets:
+              type: object
+            total_count:
+              type: integer
+            total_amount:
+              type: number
+      500:
+        description: Internal server error
+    """
+    try:
+        summary = company_balance_controller.get_delinquency_summary()
+        
+        if "error" in summary:
+            return jsonify({"error": summary["error"]}), 500
+        
+        return jsonify(summary), 200
+    
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
 @company_balance_bp.route('/summary', methods=['GET'])
+@conditional(company_data_version)
 def get_company_summary():
     """
     Get quick company summary for dashboard cards
@@ -151,6 +203,7 @@ def get_company_summary():
 
 
 @company_balance_bp.route('/trends/<period>', methods=['GET'])
+@conditional(company_data_version)
 def get_trends(period):
     """
     Get financial trends for specific period
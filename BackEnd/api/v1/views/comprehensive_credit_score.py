@@ -10,6 +10,7 @@ This is a new comprehensive credit scoring system that analyzes:
 - Financial behavior patterns
 """
 
+import logging
 from BackEnd.api.v1.views import app_views
 from BackEnd.Controllers.ComprehensiveCreditScoreController import ComprehensiveCreditScoreController
 from BackEnd.Controllers.AuthController import AuthController
@@ -17,6 +18,8 @@ from flask import request, jsonify
 from BackEnd.models import storage
 from BackEnd.models.user import User
 
+logger = logging.getLogger(__name__)
+
 # Initialize the comprehensive credit score controller
 comprehensive_controller = ComprehensiveCreditScoreController()
 
@@ -27,7 +30,7 @@ def get_comprehensive_credit_score():
         response_data, status_code = comprehensive_controller.get_user_comprehensive_score_authenticated()
         return response_data, status_code
     except Exception as e:
-        print(f"Error in comprehensive credit score endpoint: {e}")
+        logger.exception("Error in comprehensive credit score endpoint")
         return jsonify({'error': f'Failed to get comprehensive credit score: {str(e)}'}), 500
 
 @app_views.route('/comprehensive-credit-score/history', methods=['GET'], strict_slashes=False)
@@ -54,7 +57,7 @@ def get_comprehensive_score_history():
         return response_data, status_code
         
     except Exception as e:
-        print(f"Error in score history endpoint: {e}")
+        logger.exception("Error in score history endpoint")
         return jsonify({'error': f'Failed to get score history: {str(e)}'}), 500
 
 @app_views.route('/comprehensive-credit-score/comparison', methods=['GET'], strict_slashes=False)
@@ -77,7 +80,7 @@ def get_comprehensive_score_comparison():
         return response_data, status_code
         
     except Exception as e:
-        print(f"Error in score comparison endpoint: {e}")
+        logger.exception("Error in score comparison endpoint")
         return jsonify({'error': f'Failed to get score comparison: {str(e)}'}), 500
 
 @app_views.route('/comprehensive-credit-score/loan-eligibility', methods=['GET'], strict_slashes=False)
@@ -103,7 +106,7 @@ def get_loan_eligibility():
         return response_data, status_code
         
     except Exception as e:
-        print(f"Error in loan eligibility endpoint: {e}")
+        logger.exception("Error in loan eligibility endpoint")
         return jsonify({'error': f'Failed to get loan eligibility: {str(e)}'}), 500
 
 @app_views.route('/comprehensive-credit-score/factors', methods=['GET'], strict_slashes=False)
@@ -126,7 +129,7 @@ def get_comprehensive_score_factors():
         return response_data, status_code
         
     except Exception as e:
-        print(f"Error in score factors endpoint: {e}")
+        logger.exception("Error in score factors endpoint")
         return jsonify({'error': f'Failed to get score factors: {str(e)}'}), 500
 
 @app_views.route('/comprehensive-credit-score/test-auth', methods=['GET'], strict_slashes=False)
@@ -164,7 +167,7 @@ def get_comprehensive_admin_analytics():
         return response_data, status_code
         
     except Exception as e:
-        print(f"Error in admin analytics endpoint: {e}")
+        logger.exception("Error in admin analytics endpoint")
         return jsonify({'error': f'Failed to get admin analytics: {str(e)}'}), 500
 
 @app_views.route('/admin/comprehensive-credit-score/user/<user_id>', methods=['GET'], strict_slashes=False)
@@ -176,7 +179,7 @@ def get_user_comprehensive_score_admin(user_id):
         return response_data, status_code
         
     except Exception as e:
-        print(f"Error in admin user score endpoint: {e}")
+        logger.exception("Error in admin user score endpoint")
         return jsonify({'error': f'Failed to get user comprehensive score: {str(e)}'}), 500
 
 @app_views.route('/admin/comprehensive-credit-score/user/<user_id>/factors', methods=['GET'], strict_slashes=False)
@@ -188,7 +191,7 @@ def get_user_comprehensive_factors_admin(user_id):
         return response_data, status_code
         
     except Exception as e:
-        print(f"Error in admin user factors endpoint: {e}")
+        logger.exception("Error in admin user factors endpoint")
         return jsonify({'error': f'Failed to get user factors: {str(e)}'}), 500
 
 @app_views.route('/admin/comprehensive-credit-score/user/<user_id>/loan-eligibility', methods=['GET'], strict_slashes=False)
@@ -201,7 +204,7 @@ def get_user_loan_eligibility_admin(user_id):
         return response_data, status_code
         
     except Exception as e:
-        print(f"Error in admin loan eligibility endpoint: {e}")
+        logger.exception("Error in admin loan eligibility endpoint")
         return jsonify({'error': f'Failed to get loan eligibility: {str(e)}'}), 500
 
 @app_views.route('/comprehensive-credit-score/debug/<user_id>', methods=['GET'], strict_slashes=False)
@@ -1,6 +1,7 @@
 #!/usr/bin/python3
 """Credit Score API endpoints"""
 
+import logging
 from BackEnd.api.v1.views import app_views
 from BackEnd.Controllers.CreditScoreController import CreditScoreController
 from flask import request, jsonify
@@ -8,6 +9,8 @@ from BackEnd.Controllers.AuthController import AuthController
 from BackEnd.models import storage
 from BackEnd.models.user import User
 
+logger = logging.getLogger(__name__)
+
 # Initialize the controller
 credit_controller = CreditScoreController()
 
@@ -138,7 +141,7 @@ def get_user_credit_score():
         return jsonify(score_data), 200
         
     except Exception as e:
-        print(f"Error getting user credit score: {str(e)}")
+        logger.exception("Error getting user credit score")
         return jsonify({'error': f'Failed to calculate credit score {e}'}), 500
 
 @app_views.route('/credit-score/history', methods=['GET'], strict_slashes=False)
@@ -173,7 +176,7 @@ def get_credit_score_history():
         }), 200
         
     except Exception as e:
-        print(f"Error getting credit score history: {str(e)}")
+        logger.exception("Error getting credit score history")
         return jsonify({'error': 'Failed to get credit score history'}), 500
 
 @app_views.route('/admin/credit-scores', methods=['GET'], strict_slashes=False)
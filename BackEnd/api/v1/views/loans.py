@@ -1,8 +1,9 @@
 #!/usr/bin/python3
 """ objects that handle all default RestFul API actions for Loans """
+import logging
 from typing import Any
 from flask import abort, jsonify, make_response, request
-from flasgger.utils import swag_from
+from BackEnd.api.v1.swagger import swag_from
 from BackEnd.models.Loan import Loan
 from BackEnd.models import storage
 from BackEnd.api.v1.views import app_views
@@ -11,6 +12,8 @@ from BackEnd.Controllers.AuthController import AuthController
 from BackEnd.models.Account import Account
 from sqlalchemy.orm.exc import NoResultFound
 
+logger = logging.getLogger(__name__)
+
 @app_views.route('/loans', methods=['GET'], strict_slashes=False)
 @swag_from('documentation/loan/all_loans.yml')
 def get_loans():
@@ -40,18 +43,11 @@ def get_loans():
     
     # If user is not admin, they can only see their own loans
     try:
-        # Use SQLAlchemy query to get loans with account relationship loaded
-        user_loans = storage.session().query(Loan).join(Loan.account).filter(Account.user_id == user.id).all()
-        # Convert loans to dict and include account relationship
-        loan_dicts = []
-        for loan in user_loans:
-            loan_dict = loan.to_dict()
-            if loan.account:
-                loan_dict['account'] = loan.account.to_dict()
-            loan_dicts.append(loan_dict)
-        return jsonify(loan_dicts)
+        # Loans come back with their account already loaded
+        user_loans = controller.get_user_loans(user.id)
+        return jsonify([loan.to_dict() for loan in user_loans])
     except Exception as e:
-        print(f"Error fetching user loans: {e}")
+        logger.exception("Error fetching user loans")
         return make_response(jsonify({"error": "Failed to fetch loans"}), 500)
 
 @app_views.route('/loans/<loan_id>', methods=['GET'], strict_slashes=False)
@@ -71,7 +67,7 @@ def get_loan(loan_id):
     if not user:
         return jsonify({"message": "Unauthorized"}), 401
 
-    loan = storage.get(Loan, loan_id)
+    loan = LoanController().get_loan(loan_id)
     if not loan:
         abort(404)
 
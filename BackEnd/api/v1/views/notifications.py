@@ -1,13 +1,23 @@
 #!/usr/bin/python3
 """ objects that handle all default RestFul API actions for Notifications """
-from flask import abort, jsonify, make_response, request
-from flasgger.utils import swag_from
+import json
+from flask import abort, jsonify, make_response, request, Response
+from BackEnd.api.v1.swagger import swag_from
 
 from BackEnd.models.Notification import Notification
 from BackEnd.models import storage
 from BackEnd.api.v1.views import app_views
 from BackEnd.Controllers.NotificationController import NotificationController
-from BackEnd.Controllers.AuthController import AuthController
+from BackEnd.Controllers.AuthController import AuthController, STREAM_TICKET_TTL
+from BackEnd.Controllers.NotificationHub import notification_hub
+
+# Seconds between keep-alive comments on an idle stream
+STREAM_HEARTBEAT_INTERVAL = 15
+
+
+def _sse(event_type, data):
+    """Format one Server-Sent Events message"""
+    return f"event: {event_type}\ndata: {json.dumps(data)}\n\n"
 
 
 @app_views.route('/notifications', methods=['GET'], strict_slashes=False)
@@ -60,6 +70,27 @@ def get_unread_count():
     if not auth_header or not auth_header.startswith('Bearer '):
         return jsonify({"message": "No authorization token provided"}), 401
     
+    token = auth_header.split(' ')[1]
+    # Polled often: authenticate and read the counter in one query
+    unread_count = NotificationController().get_unread_count_for_session(token)
+    
+    if unread_count is None:
+        return jsonify({"message": "Unauthorized"}), 401
+    
+    return jsonify({"unread_count": unread_count})
+
+
+@app_views.route('/notifications/stream-ticket', methods=['POST'], strict_slashes=False)
+@swag_from('documentation/notification/create_stream_ticket.yml')
+def create_stream_ticket():
+    """
+    Issue a single-use ticket for opening the notification stream
+    """
+    # Check for authentication
+    auth_header = request.headers.get('Authorization')
+    if not auth_header or not auth_header.startswith('Bearer '):
+        return jsonify({"message": "No authorization token provided"}), 401
+    
     token = auth_header.split(' ')[1]
     auth_controller = AuthController()
     user = auth_controller.get_user_from_session_id(token)
@@ -67,10 +98,56 @@ def get_unread_count():
     if not user:
         return jsonify({"message": "Unauthorized"}), 401
     
-    notification_controller = NotificationController()
-    unread_count = notification_controller.get_unread_count(user.id)
+    ticket = auth_controller.create_stream_ticket(user.id)
+    return jsonify({"ticket": ticket,
+                    "expires_in": int(STREAM_TICKET_TTL.total_seconds())}), 201
+
+
+@app_views.route('/notifications/stream', methods=['GET'], strict_slashes=False)
+@swag_from('documentation/notification/stream_notifications.yml')
+def stream_notifications():
+    """
+    Stream new notifications and unread-count changes as Server-Sent Events
+    """
+    # EventSource cannot set headers, so browsers pass a ticket from
+    # /notifications/stream-ticket instead of the session id
+    auth_controller = AuthController()
+    auth_header = request.headers.get('Authorization')
+    if auth_header and auth_header.startswith('Bearer '):
+        user = auth_controller.get_user_from_session_id(auth_header.split(' ')[1])
+    elif request.args.get('ticket'):
+        user = auth_controller.redeem_stream_ticket(request.args.get('ticket'))
+    else:
+        return jsonify({"message": "No authorization token provided"}), 401
     
-    return jsonify({"unread_count": unread_count})
+    if not user:
+        return jsonify({"message": "Unauthorized"}), 401
+    
+    unread_count = user.unread_notification_count or 0
+    subscription = notification_hub.subscribe(user.id)
+    
+    def generate():
+        """Yield queued events, with heartbeats while idle"""
+        try:
+            yield "retry: 5000\n\n"
+            yield _sse('unread', {'type': 'unread', 'unread_count': unread_count})
+            while not subscription.closed:
+                event = subscription.get(timeout=STREAM_HEARTBEAT_INTERVAL)
+                if event is None:
+                    yield ": keepalive\n\n"
+                    continue
+                if event['type'] == 'close':
+                    break
+                yield _sse(event['type'], event)
+        finally:
+            notification_hub.unsubscribe(subscription)
+    
+    # The generator never touches the database; the request's session is
+    # released by teardown before streaming starts
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
 
 
 @app_views.route('/notifications/<notification_id>/mark-read', methods=['POST'], strict_slashes=False)
@@ -251,4 +328,36 @@ def create_notification():
             'created_at': notification.created_at.isoformat() if notification.created_at else None
         }), 201
     except Exception as e:
-        return jsonify({"error": str(e)}), 400
\ No newline at end of file
+        return jsonify({"error": str(e)}), 400
+
+@app_views.route('/notifications/broadcast', methods=['POST'], strict_slashes=False)
+@swag_from('documentation/notification/broadcast_notification.yml')
+def broadcast_notification():
+    """
+    Send a notification to every customer (Admin only)
+    """
+    # Check for admin authentication
+    auth_header = request.headers.get('Authorization')
+    if not auth_header or not auth_header.startswith('Bearer '):
+        return jsonify({"message": "No authorization token provided"}), 401
+    
+    token = auth_header.split(' ')[1]
+    auth_controller = AuthController()
+    user = auth_controller.get_user_from_session_id(token)
+    
+    if not user or not user.admin:
+        return jsonify({"message": "Unauthorized. Admin access required"}), 403
+    
+    if not request.get_json():
+        return jsonify({"error": "Not a JSON"}), 400
+    
+    message = request.get_json().get('message')
+    if not message:
+        return jsonify({"error": "Missing message"}), 400
+    
+    notification_controller = NotificationController()
+    try:
+        count = notification_controller.broadcast_to_customers(message)
+        return jsonify({"message": "Broadcast sent", "count": count}), 201
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
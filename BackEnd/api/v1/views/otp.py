@@ -2,7 +2,7 @@
 """ objects that handle all default RestFul API actions for OTP """
 from typing import Any
 from flask import abort, jsonify, make_response, request
-from flasgger.utils import swag_from
+from BackEnd.api.v1.swagger import swag_from
 from BackEnd.models.otp import OTP
 from BackEnd.models import storage
 from BackEnd.api.v1.views import app_views
@@ -0,0 +1,50 @@
+#!/usr/bin/python3
+""" Helpers for cursor-paginated transaction listings """
+from flask import current_app, request, url_for
+
+from BackEnd.Controllers.TransactionController import DEFAULT_PAGE_SIZE
+from BackEnd.models.serializer import dumps, serializer_for, uses_default_to_dict
+
+
+def page_args():
+    """Read the paging query parameters: cursor and limit"""
+    return {
+        'cursor': request.args.get('cursor'),
+        'limit': request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+    }
+
+
+def transaction_page_args():
+    """
+    Read the paging and filter query parameters:
+    cursor, limit, type, min_amount and max_amount
+    """
+    return {
+        **page_args(),
+        'transaction_type': request.args.get('type'),
+        'min_amount': request.args.get('min_amount', type=float),
+        'max_amount': request.args.get('max_amount', type=float)
+    }
+
+
+def paginated_response(items, next_cursor, serialize=None):
+    """
+    JSON list of items, serialized with to_dict() unless serialize is given
+    (models without their own to_dict go through the precompiled
+    serializer); when more pages exist the cursor for the next one is sent
+    in the X-Next-Cursor header and as a Link rel="next" URL
+    """
+    if serialize is not None:
+        body = dumps([serialize(item) for item in items])
+    elif items and uses_default_to_dict(type(items[0])):
+        body = serializer_for(type(items[0])).dumps(items)
+    else:
+        body = dumps([item.to_dict() for item in items])
+    response = current_app.response_class(body, mimetype='application/json')
+    if next_cursor:
+        args = request.args.to_dict()
+        args['cursor'] = next_cursor
+        next_url = url_for(request.endpoint, **(request.view_args or {}), **args)
+        response.headers['X-Next-Cursor'] = next_cursor
+        response.headers['Link'] = f'<{next_url}>; rel="next"'
+    return response
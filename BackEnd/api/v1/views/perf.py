@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+"""Request performance statistics for admins"""
+
+from flask import jsonify, request
+from BackEnd.api.v1.views import app_views
+from BackEnd.api.v1.views.settings import admin_required
+from BackEnd.api.v1.commit_metrics import commit_stats
+from BackEnd.monitoring.profiler import route_stats
+
+
+@app_views.route('/admin/perf', methods=['GET'], strict_slashes=False)
+@admin_required
+def get_perf():
+    """
+    Duration, DB time and query count percentiles (p50/p95/p99) per route
+    over its recent requests with its slowest queries, and commits per
+    request by endpoint. ?reset=1 starts the statistics over after reading
+    them.
+    """
+    report = {'routes': route_stats.snapshot(), 'commits': commit_stats.snapshot()}
+    if request.args.get('reset') == '1':
+        route_stats.reset()
+        commit_stats.reset()
+    return jsonify(report), 200
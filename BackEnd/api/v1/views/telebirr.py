@@ -2,7 +2,7 @@
 """ objects that handle all default RestFul API actions for Telebirr """
 from typing import Any
 from flask import abort, jsonify, make_response, request
-from flasgger.utils import swag_from
+from BackEnd.api.v1.swagger import swag_from
 from BackEnd.models import storage
 from BackEnd.api.v1.views import app_views
 from BackEnd.Controllers.TelebirrController import TelebirrController
@@ -2,26 +2,28 @@
 """ objects that handle all default RestFul API actions for Transactions """
 from typing import Any
 from flask import abort, jsonify, make_response, request
-from flasgger.utils import swag_from
+from BackEnd.api.v1.swagger import swag_from
 
 from BackEnd.Controllers.AccountController import AccountController
 from BackEnd.models.Transaction import Transaction
 from BackEnd.models import storage
 from BackEnd.api.v1.views import app_views
 from BackEnd.Controllers.TransactionController import TransactionController
+from BackEnd.api.v1.views.pagination import transaction_page_args, paginated_response
 from sqlalchemy.orm.exc import NoResultFound
 
 @app_views.route('/transactions', methods=['GET'], strict_slashes=False)
 @swag_from('documentation/transaction/all_transactions.yml')
 def get_transactions():
     """
-    Retrieves the list of all transaction objects
+    Retrieves one page of transaction objects, newest first
     """
-    all_transactions = storage.all(Transaction).values()
-    list_transactions = []
-    for transaction in all_transactions:
-        list_transactions.append(transaction.to_dict())
-    return jsonify(list_transactions)
+    controller = TransactionController()
+    try:
+        transactions, next_cursor = controller.get_transactions_page(**transaction_page_args())
+    except ValueError as e:
+        return make_response(jsonify({"error": str(e)}), 400)
+    return paginated_response(transactions, next_cursor)
 
 @app_views.route('/transactions/<transaction_id>', methods=['GET'], strict_slashes=False)
 @swag_from('documentation/transaction/get_transaction.yml')
@@ -134,11 +136,16 @@ def transfer():
 @swag_from('documentation/transaction/get_account_transactions.yml')
 def get_account_transactions_for_account(account_id):
     """
-    Retrieves all transactions for a specific account
+    Retrieves one page of transactions for a specific account, newest first
     """
     controller = TransactionController()
-    transactions = controller.get_transactions_by_account(account_id)
-    return jsonify([transaction.to_dict() for transaction in transactions])
+    try:
+        transactions, next_cursor = controller.get_transactions_page(
+            account_id=account_id, **transaction_page_args()
+        )
+    except ValueError as e:
+        return make_response(jsonify({"error": str(e)}), 400)
+    return paginated_response(transactions, next_cursor)
 
 @app_views.route('/transactions/date-range', methods=['GET'], strict_slashes=False)
 @swag_from('documentation/transaction/get_transactions_by_date.yml')
@@ -154,7 +161,9 @@ def get_transactions_by_date():
 
     controller = TransactionController()
     try:
-        transactions = controller.get_transactions_by_date(start_date, end_date)
-        return jsonify([transaction.to_dict() for transaction in transactions])
+        transactions, next_cursor = controller.get_transactions_by_date(
+            start_date, end_date, account_id=request.args.get('account_id'), **transaction_page_args()
+        )
+        return paginated_response(transactions, next_cursor)
     except ValueError as e:
         return make_response(jsonify({"error": str(e)}), 400) 
\ No newline at end of file
@@ -1,5 +1,6 @@
 #!/usr/bin/python3
 """ objects that handle all default RestFul API actions for Users """
+import logging
 from typing import Any
 
 from werkzeug import Response
@@ -8,7 +9,7 @@ from BackEnd.models.user import User
 from BackEnd.models import storage
 from BackEnd.api.v1.views import app_views
 from flask import abort, jsonify, make_response, request, redirect, send_file, render_template
-from flasgger.utils import swag_from
+from BackEnd.api.v1.swagger import swag_from
 from BackEnd.Controllers.AuthController import AuthController
 from BackEnd.Controllers.EmailVerificationController import verify_email
 from BackEnd.Controllers.PasswordResetController import send_password_reset_email
@@ -17,6 +18,8 @@ import os
 from werkzeug.utils import secure_filename
 import re
 
+logger = logging.getLogger(__name__)
+
 @app_views.route('/users', methods=['GET'], strict_slashes=False)
 @swag_from('documentation/user/all_users.yml')
 def get_users():
@@ -294,9 +297,7 @@ def login() -> tuple[Any, int] | Any:
         # Find the user by email
         user = auth._userC.find_user_by(email=email)
         
-        # Print debug information
-        print(f"DEBUG - Found user: ID={user.id}, Username={user.username}, Email={user.email}")
-        print(f"DEBUG - Session ID created: {session_id}")
+        logger.debug("Session created", extra={'user_id': user.id})
         
         # Always use the actual username from the database
         # This is what the user entered during registration
@@ -307,15 +308,15 @@ def login() -> tuple[Any, int] | Any:
         # If username is None or empty, use a fallback
         if not username:
             username = email.split('@')[0]
-            print(f"DEBUG - Username was empty, using email prefix as fallback: {username}")
+            logger.debug("Username was empty, using email prefix as fallback: %s", username)
         else:
-            print(f"DEBUG - Using actual username from database: {username}")
+            logger.debug("Using actual username from database: %s", username)
     except Exception as e:
-        print(f"DEBUG - Error retrieving user: {e}")
+        logger.warning("Could not load user after login: %s", e)
         username = email.split('@')[0]
         admin = False
         user_id = None
-        print(f"DEBUG - Using email name as fallback: {username}")
+        logger.debug("Using email name as fallback: %s", username)
     
     resp = jsonify({
         "email": email, 
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Benchmark the core money flows through the API and write a JSON report
+
+Usage:
+    python -m BackEnd.benchmarks.bench_api [--iterations 50] [--scenarios login,deposit]
+        [--customers 200] [--transactions 100000] [--dataset dataset.json]
+        [--report report.json] [--baseline previous.json] [--threshold 0.25]
+
+Seeds the database with BackEnd.benchmarks.seed, or uses the dataset that
+--dataset was written to by it, then calls each scenario --iterations
+times through the Flask test client: login, deposit, transfer, loan_apply,
+loan_approve (of the applied loans), repayment, notifications (polling),
+company_overview and credit_score. Reports p50/p95/p99 per scenario and
+writes them with the commit to --report. With --baseline, exits with
+status 1 when a scenario's p50 grew by more than --threshold. Side
+effects stay in the task outbox (MFS_TASK_WORKERS=0), so only the request
+path is timed. Runs against MFS_DB_URL (defaults to a throwaway sqlite
+file).
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+os.environ.setdefault('MFS_DB_URL', 'sqlite:///{}'.format(
+    os.path.join(tempfile.mkdtemp(prefix='mfs_bench_'), 'api.db')))
+os.environ.setdefault('MFS_EMAIL_WORKER', '0')
+os.environ.setdefault('MFS_TASK_WORKERS', '0')
+os.environ.setdefault('MFS_LOG_LEVEL', 'WARNING')
+
+from BackEnd.api.v1.app import app  # noqa: E402
+from BackEnd.benchmarks import seed  # noqa: E402
+from BackEnd.Controllers.LoanController import LoanController  # noqa: E402
+from BackEnd.models import storage  # noqa: E402
+from BackEnd.monitoring.profiler import percentile  # noqa: E402
+
+SCENARIOS = ('login', 'deposit', 'transfer', 'loan_apply', 'loan_approve', 'repayment',
+             'notifications', 'company_overview', 'credit_score')
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+
+
+class Flows:
+    """
+    The benchmarked API calls against a seeded dataset. Each scenario
+    method makes one request and returns the response; prepare_<scenario>
+    returns the arguments of the next call and is not timed.
+    """
+
+    def __init__(self, client, dataset: dict):
+        self.client = client
+        self.dataset = dataset
+        self.customers = dataset['customers']
+        self._next = itertools.count()
+        # customer index -> session id of its last login
+        self._tokens = {}
+        self._pending_loans = deque()
+        # Indices of the customers holding a seeded loan
+        self._borrowers = [index for index, customer in enumerate(self.customers)
+                           if customer.get('loan_id')]
+        self.admin_token = self._login(dataset['admin']['email']).get_json()['session_id']
+
+    def _customer(self) -> int:
+        """Index of the next customer, round-robin"""
+        return next(self._next) % len(self.customers)
+
+    def _login(self, email: str):
+        return self.client.post('/api/v1/users/login',
+                                json={'email': email, 'password': self.dataset['password']})
+
+    def _auth(self, index: int) -> dict:
+        """Authorization header of a customer"""
+        return {'Authorization': f"Bearer {self._tokens[index]}"}
+
+    def _sign_in(self, index: int) -> tuple:
+        """Log the customer in unless it already is, so the login is not timed"""
+        if index not in self._tokens:
+            self._tokens[index] = self._login(self.customers[index]['email']).get_json()['session_id']
+        return (index,)
+
+    def _signed_in(self) -> tuple:
+        """The next customer, logged in beforehand"""
+        return self._sign_in(self._customer())
+
+    def login(self):
+        index = self._customer()
+        response = self._login(self.customers[index]['email'])
+        if response.status_code == 200:
+            self._tokens[index] = response.get_json()['session_id']
+        return response
+
+    def deposit(self):
+        account_id = self.customers[self._customer()]['account_id']
+        return self.client.post(f'/api/v1/accounts/{account_id}/deposit', json={'amount': 100})
+
+    def transfer(self):
+        index = self._customer()
+        return self.client.post('/api/v1/transactions/transfer', json={
+            'from_account_id': self.customers[index]['account_id'],
+            'to_account_id': self.customers[(index + 1) % len(self.customers)]['account_id'],
+            'amount': 10, 'description': 'Benchmark transfer'})
+
+    prepare_loan_apply = prepare_notifications = prepare_credit_score = _signed_in
+
+    def loan_apply(self, index: int):
+        response = self.client.post('/api/v1/loans', headers=self._auth(index), json={
+            'user_id': self.customers[index]['id'], 'amount': 1000, 'interest_rate': 10,
+            'repayment_period': 12, 'purpose': 'Benchmark', 'admin_id': self.dataset['admin']['id']})
+        if response.status_code == 201:
+            self._pending_loans.append(response.get_json()['id'])
+        return response
+
+    def prepare_loan_approve(self) -> tuple:
+        """A pending loan, applied for here when loan_apply left none"""
+        if not self._pending_loans:
+            customer = self.customers[self._customer()]
+            loan = LoanController().apply_loan(customer['id'], 1000, 10, 12, 'Benchmark',
+                                               self.dataset['admin']['id'])
+            storage.close()
+            self._pending_loans.append(loan.id)
+        return (self._pending_loans.popleft(),)
+
+    def loan_approve(self, loan_id: str):
+        return self.client.post(f'/api/v1/loans/{loan_id}/approve',
+                                headers={'Authorization': f"Bearer {self.admin_token}"})
+
+    def prepare_repayment(self) -> tuple:
+        """The next borrower, logged in beforehand"""
+        return self._sign_in(self._borrowers[next(self._next) % len(self._borrowers)])
+
+    def repayment(self, index: int):
+        return self.client.post('/api/v1/repayments/make-payment', headers=self._auth(index), json={
+            'loan_id': self.customers[index]['loan_id'], 'amount': 10,
+            'payment_method': 'account'})
+
+    def notifications(self, index: int):
+        return self.client.get('/api/v1/notifications', headers=self._auth(index))
+
+    def company_overview(self):
+        return self.client.get('/api/v1/company/overview')
+
+    def credit_score(self, index: int):
+        return self.client.get('/api/v1/comprehensive-credit-score', headers=self._auth(index))
+
+
+def run_scenario(flows: Flows, scenario: str, iterations: int, warmup: int = 5) -> dict:
+    """
+    Call a scenario warmup + iterations times
+    Returns:
+        requests, errors and the latency summary in milliseconds
+    """
+    call = getattr(flows, scenario)
+    prepare = getattr(flows, f'prepare_{scenario}', tuple)
+    timings = []
+    errors = 0
+    for n in range(warmup + iterations):
+        args = prepare()
+        start = time.perf_counter()
+        response = call(*args)
+        elapsed = time.perf_counter() - start
+        if n < warmup:
+            continue
+        timings.append(elapsed * 1000)
+        if response.status_code >= 400:
+            errors += 1
+    ordered = sorted(timings)
+    return {'requests': iterations, 'errors': errors,
+            'mean_ms': round(sum(ordered) / len(ordered), 3),
+            'p50_ms': round(percentile(ordered, 50), 3),
+            'p95_ms': round(percentile(ordered, 95), 3),
+            'p99_ms': round(percentile(ordered, 99), 3),
+            'max_ms': round(ordered[-1], 3),
+            'rps': round(len(ordered) / (sum(ordered) / 1000), 1)}
+
+
+def git_commit():
+    """Commit of the checked out tree, None outside git"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, check=True,
+                              capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def regressions(report: dict, baseline: dict, threshold: float) -> list:
+    """(scenario, baseline p50, p50) of scenarios whose p50 grew by more than threshold"""
+    slower = []
+    for scenario, result in report['scenarios'].items():
+        before = baseline.get('scenarios', {}).get(scenario)
+        if before and result['p50_ms'] > before['p50_ms'] * (1 + threshold):
+            slower.append((scenario, before['p50_ms'], result['p50_ms']))
+    return slower
+
+
+def main():
+    """Seed, run the scenarios and report them"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS))
+    parser.add_argument('--customers', type=int, default=200)
+    parser.add_argument('--transactions', type=int, default=100000)
+    parser.add_argument('--dataset')
+    parser.add_argument('--report')
+    parser.add_argument('--baseline')
+    parser.add_argument('--threshold', type=float, default=0.25)
+    args = parser.parse_args()
+
+    if args.dataset:
+        with open(args.dataset) as f:
+            dataset = json.load(f)
+    else:
+        start = time.perf_counter()
+        dataset = seed.seed(customers=args.customers, transactions=args.transactions,
+                            loans=max(1, args.customers // 5),
+                            repayments=args.customers * 5, notifications=20)
+        print(f"seeded {dataset['counts']} in {time.perf_counter() - start:.2f}s")
+
+    flows = Flows(app.test_client(), dataset)
+    report = {'commit': git_commit(), 'created_at': datetime.now(timezone.utc).isoformat(),
+              'python': platform.python_version(), 'database': storage.engine().dialect.name,
+              'seed': dataset['counts'], 'iterations': args.iterations, 'scenarios': {}}
+    print(f"{'scenario':<18} {'p50':>9} {'p95':>9} {'p99':>9} {'req/s':>8} errors")
+    for scenario in args.scenarios.split(','):
+        result = report['scenarios'][scenario] = run_scenario(flows, scenario, args.iterations)
+        print(f"{scenario:<18} {result['p50_ms']:>7.2f}ms {result['p95_ms']:>7.2f}ms "
+              f"{result['p99_ms']:>7.2f}ms {result['rps']:>8.1f} {result['errors']}")
+
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"wrote {args.report}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            slower = regressions(report, json.load(f), args.threshold)
+        for scenario, before, after in slower:
+            print(f"regression: {scenario} p50 {before:.2f}ms -> {after:.2f}ms")
+        if slower:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark LoanController.apply_loan against a large accounts table
+
+Usage:
+    python -m BackEnd.benchmarks.bench_apply_loan [--accounts 100000] [--loans 200]
+
+Runs against MFS_DB_URL (defaults to a throwaway sqlite file) so it can be
+pointed at a MySQL instance seeded the same way.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+os.environ.setdefault('MFS_DB_URL', 'sqlite:///{}'.format(
+    os.path.join(tempfile.mkdtemp(prefix='mfs_bench_'), 'apply_loan.db')))
+
+from BackEnd.models import storage  # noqa: E402
+from BackEnd.models.user import User  # noqa: E402
+from BackEnd.models.Account import Account  # noqa: E402
+from BackEnd.Controllers.LoanController import LoanController  # noqa: E402
+
+
+def seed(n_accounts):
+    """Insert n_accounts customers, one account each, plus one admin"""
+    session = storage.session()
+    now = datetime.now()
+    users = []
+    accounts = []
+    for i in range(n_accounts):
+        user_id = str(uuid.uuid4())
+        users.append({'id': user_id, 'created_at': now, 'updated_at': now,
+                      'fullname': f'Customer {i}', 'username': f'customer{i}',
+                      'email': f'customer{i}@bench.local', 'password': 'x',
+                      'admin': False})
+        accounts.append({'id': str(uuid.uuid4()), 'created_at': now, 'updated_at': now,
+                         'user_id': user_id, 'account_number': f'MF{i:07d}',
+                         'balance': 0.0, 'type': 'savings', 'status': 'active',
+                         'currency': 'ETB', 'overdraft_limit': 0.0})
+    admin_id = str(uuid.uuid4())
+    users.append({'id': admin_id, 'created_at': now, 'updated_at': now,
+                  'fullname': 'Admin', 'username': 'bench-admin',
+                  'email': 'admin@bench.local', 'password': 'x', 'admin': True})
+    session.execute(User.__table__.insert(), users)
+    session.execute(Account.__table__.insert(), accounts)
+    session.commit()
+    return [u['id'] for u in users[:-1]], admin_id
+
+
+def main():
+    """Seed the database and time loan applications"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--accounts', type=int, default=100000)
+    parser.add_argument('--loans', type=int, default=200)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    customer_ids, admin_id = seed(args.accounts)
+    print(f"seeded {args.accounts} accounts in {time.perf_counter() - start:.2f}s")
+
+    controller = LoanController()
+    step = max(1, len(customer_ids) // args.loans)
+    timings = []
+    for user_id in customer_ids[::step][:args.loans]:
+        start = time.perf_counter()
+        controller.apply_loan(user_id, 1000.0, 10.0, 12, "benchmark", admin_id)
+        timings.append(time.perf_counter() - start)
+        storage.close()
+
+    timings.sort()
+    print(f"apply_loan x{len(timings)}: "
+          f"mean {sum(timings) / len(timings) * 1000:.2f}ms "
+          f"p50 {timings[len(timings) // 2] * 1000:.2f}ms "
+          f"p95 {timings[int(len(timings) * 0.95)] * 1000:.2f}ms")
+
+    # Reference: what the old per-application full table load cost
+    start = time.perf_counter()
+    storage.all(Account)
+    print(f"legacy storage.all(Account) scan: {(time.perf_counter() - start) * 1000:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
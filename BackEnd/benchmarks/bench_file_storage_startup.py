@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark FileStorage startup from a memory-mapped snapshot
+
+Usage:
+    python -m BackEnd.benchmarks.bench_file_storage_startup [--objects 1000000] [--legacy]
+
+Writes a snapshot of --objects objects (1% users, 4% accounts, the rest
+transactions), then times reload(), a lookup by id, count() and a find()
+by email, which decodes the users only. --legacy also writes the same
+objects as the old JSON file.json and times reloading that, which decodes
+everything up front. Runs with MFS_TYPE_STORAGE=file, like a kiosk.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+os.environ.setdefault('MFS_TYPE_STORAGE', 'file')
+WORK_DIR = tempfile.mkdtemp(prefix='mfs_bench_')
+# The default storage reloads ./file.json on import
+os.chdir(WORK_DIR)
+
+from BackEnd.models.engine.file_storage import FileStorage  # noqa: E402
+from BackEnd.models.engine.snapshot import write_snapshot  # noqa: E402
+from BackEnd.models.user import User  # noqa: E402
+from BackEnd.models.Transaction import Transaction  # noqa: E402
+
+
+def make_objects(n_objects):
+    """Dictionaries of n_objects objects, keyed like FileStorage keys them"""
+    now = datetime.now().strftime("%Y-%m-%dT%H:%M:%S.%f")
+    objects = {}
+    n_users = max(1, n_objects // 100)
+    n_accounts = max(1, n_objects // 25)
+    user_ids = [str(uuid.uuid4()) for _ in range(n_users)]
+    account_ids = [str(uuid.uuid4()) for _ in range(n_accounts)]
+    for i, user_id in enumerate(user_ids):
+        objects["User." + user_id] = {
+            "__class__": "User", "id": user_id, "created_at": now, "updated_at": now,
+            "fullname": f"Customer {i}", "username": f"customer{i}",
+            "email": f"customer{i}@bench.local", "password": "x", "admin": False}
+    for i, account_id in enumerate(account_ids):
+        objects["Account." + account_id] = {
+            "__class__": "Account", "id": account_id, "created_at": now, "updated_at": now,
+            "user_id": user_ids[i % n_users], "account_number": f"MF{i:07d}",
+            "balance": 100.0, "type": "savings", "status": "active", "currency": "ETB"}
+    for i in range(n_objects - n_users - n_accounts):
+        transaction_id = str(uuid.uuid4())
+        objects["Transaction." + transaction_id] = {
+            "__class__": "Transaction", "id": transaction_id, "created_at": now,
+            "updated_at": now, "account_id": account_ids[i % n_accounts], "amount": 25.0,
+            "transaction_type": "deposit", "description": "Benchmark transaction",
+            "balance_after": 25.0}
+    return objects
+
+
+def timed(label, func):
+    """Run func, print how long it took and return its result"""
+    start = time.perf_counter()
+    result = func()
+    print(f"{label:<36} {(time.perf_counter() - start) * 1000:>10.1f}ms")
+    return result
+
+
+def main():
+    """Write the files and time startup and first lookups"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--objects', type=int, default=1000000)
+    parser.add_argument('--legacy', action='store_true')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    objects = make_objects(args.objects)
+    path = os.path.join(WORK_DIR, 'file.json')
+    write_snapshot(path, ((key, json.dumps(value, separators=(",", ":")).encode("utf-8"))
+                          for key, value in sorted(objects.items())))
+    print(f"wrote {len(objects)} objects ({os.path.getsize(path) / 1e6:.1f}MB) "
+          f"in {time.perf_counter() - start:.2f}s")
+
+    transaction_key = random.choice([key for key in objects if key.startswith("Transaction.")])
+    user_email = next(value["email"] for value in objects.values() if value["__class__"] == "User")
+
+    storage = FileStorage(path)
+    timed("snapshot reload()", storage.reload)
+    timed("get(Transaction, id)",
+          lambda: storage.get(Transaction, transaction_key.split(".", 1)[1]))
+    timed("count()", storage.count)
+    timed("find(User, email=...) first call", lambda: storage.find(User, email=user_email))
+    timed("find(User, email=...) indexed", lambda: storage.find(User, email=user_email))
+
+    if args.legacy:
+        legacy_path = os.path.join(WORK_DIR, 'legacy_file.json')
+        with open(legacy_path, 'w') as f:
+            json.dump(objects, f)
+        legacy = FileStorage(legacy_path)
+        timed("legacy JSON reload()", legacy.reload)
+
+
+if __name__ == "__main__":
+    main()
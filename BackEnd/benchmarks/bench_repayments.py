@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Benchmark concurrent loan repayments through LoanController.make_repayment
+
+Usage:
+    python -m BackEnd.benchmarks.bench_repayments [--loans 200] [--threads 8] [--repayments 2000]
+
+Each worker thread repays loans round-robin, so --loans lower than
+--threads makes workers contend for the same loan and account rows. After
+the run the account balances, loan amounts and repayment rows are checked
+against each other. Runs against MFS_DB_URL (defaults to a throwaway
+sqlite file, where writers serialize on the database lock).
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+os.environ.setdefault('MFS_DB_URL', 'sqlite:///{}?timeout=30'.format(
+    os.path.join(tempfile.mkdtemp(prefix='mfs_bench_'), 'repayments.db')))
+
+from sqlalchemy import event, func  # noqa: E402
+from BackEnd.models import storage  # noqa: E402
+from BackEnd.models.user import User  # noqa: E402
+from BackEnd.models.Account import Account  # noqa: E402
+from BackEnd.models.Loan import Loan  # noqa: E402
+from BackEnd.models.Repayment import Repayment  # noqa: E402
+from BackEnd.Controllers.LoanController import LoanController  # noqa: E402
+
+ACCOUNT_BALANCE = 1000000.0
+LOAN_AMOUNT = 1000000.0
+REPAYMENT_AMOUNT = 10.0
+
+
+def serialize_sqlite_writers():
+    """
+    SQLite ignores SELECT ... FOR UPDATE, so take the database write lock
+    when each transaction begins; this stands in for MySQL's row locks
+    """
+    engine = storage._DBStorage__engine
+    if engine.dialect.name != 'sqlite':
+        return
+
+    @event.listens_for(engine, "connect")
+    def _connect(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _begin(connection):
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def seed(n_loans):
+    """Insert n_loans customers, each with a funded account and an active loan"""
+    session = storage.session()
+    now = datetime.now()
+    admin_id = str(uuid.uuid4())
+    users = [{'id': admin_id, 'created_at': now, 'updated_at': now,
+              'fullname': 'Admin', 'username': 'bench-admin',
+              'email': 'admin@bench.local', 'password': 'x', 'admin': True}]
+    accounts = []
+    loans = []
+    for i in range(n_loans):
+        user_id = str(uuid.uuid4())
+        account_id = str(uuid.uuid4())
+        users.append({'id': user_id, 'created_at': now, 'updated_at': now,
+                      'fullname': f'Customer {i}', 'username': f'customer{i}',
+                      'email': f'customer{i}@bench.local', 'password': 'x',
+                      'admin': False})
+        accounts.append({'id': account_id, 'created_at': now, 'updated_at': now,
+                         'user_id': user_id, 'account_number': f'MF{i:07d}',
+                         'balance': ACCOUNT_BALANCE, 'type': 'savings', 'status': 'active',
+                         'currency': 'ETB', 'overdraft_limit': 0.0})
+        loans.append({'id': str(uuid.uuid4()), 'created_at': now, 'updated_at': now,
+                      'admin_id': admin_id, 'account_id': account_id,
+                      'amount': LOAN_AMOUNT, 'interest_rate': 10.0,
+                      'loan_status': 'active', 'repayment_period': 12,
+                      'end_date': now + timedelta(days=365), 'purpose': 'benchmark'})
+    session.execute(User.__table__.insert(), users)
+    session.execute(Account.__table__.insert(), accounts)
+    session.execute(Loan.__table__.insert(), loans)
+    session.commit()
+    storage.close()
+    return [loan['id'] for loan in loans]
+
+
+def worker(loan_ids, offset, count, timings, errors):
+    """Make count repayments, starting at loan_ids[offset]"""
+    controller = LoanController()
+    for i in range(count):
+        loan_id = loan_ids[(offset + i) % len(loan_ids)]
+        start = time.perf_counter()
+        try:
+            controller.make_repayment(loan_id, REPAYMENT_AMOUNT)
+            timings.append(time.perf_counter() - start)
+        except Exception as e:
+            errors.append(str(e))
+        finally:
+            # Each thread has its own scoped session
+            storage.close()
+
+
+def main():
+    """Seed the database and time concurrent repayments"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--loans', type=int, default=200)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--repayments', type=int, default=2000)
+    args = parser.parse_args()
+
+    serialize_sqlite_writers()
+    start = time.perf_counter()
+    loan_ids = seed(args.loans)
+    print(f"seeded {args.loans} loans in {time.perf_counter() - start:.2f}s")
+
+    per_thread = args.repayments // args.threads
+    timings = []
+    errors = []
+    threads = [threading.Thread(target=worker, args=(loan_ids, i, per_thread, timings, errors))
+               for i in range(args.threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    timings.sort()
+    print(f"make_repayment x{len(timings)} on {args.threads} threads: "
+          f"{len(timings) / elapsed:.1f} repayments/s, "
+          f"p50 {timings[len(timings) // 2] * 1000:.2f}ms "
+          f"p95 {timings[int(len(timings) * 0.95)] * 1000:.2f}ms, "
+          f"{len(errors)} error(s)")
+    if errors:
+        print(f"first error: {errors[0]}")
+
+    # Every committed repayment must show up once in each balance
+    session = storage.session()
+    repaid = session.query(func.coalesce(func.sum(Repayment.amount), 0.0)).scalar()
+    balances = session.query(func.sum(Account.balance)).scalar()
+    outstanding = session.query(func.sum(Loan.amount)).scalar()
+    consistent = (abs(repaid - len(timings) * REPAYMENT_AMOUNT) < 1e-6 and
+                  abs(args.loans * ACCOUNT_BALANCE - balances - repaid) < 1e-6 and
+                  abs(args.loans * LOAN_AMOUNT - outstanding - repaid) < 1e-6)
+    print(f"ledger {'consistent' if consistent else 'INCONSISTENT'}: "
+          f"repaid {repaid:.2f}, accounts {balances:.2f}, loans outstanding {outstanding:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark serializing transactions with to_dict and the precompiled serializer
+
+Usage:
+    python -m BackEnd.benchmarks.bench_serializer [--rows 100000] [--repeat 3]
+
+Seeds --rows transactions, loads them once, then reports rows/second for
+building dicts with Transaction.to_dict, for the same dicts, tuples and
+JSON bytes from BackEnd.models.serializer, and for to_dict + json.dumps as
+the reference encoding. The JSON encoder is orjson when installed, else
+the standard json module. Runs against MFS_DB_URL (defaults to a throwaway
+sqlite file).
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+os.environ.setdefault('MFS_DB_URL', 'sqlite:///{}'.format(
+    os.path.join(tempfile.mkdtemp(prefix='mfs_bench_'), 'serializer.db')))
+
+from BackEnd.models import storage  # noqa: E402
+from BackEnd.models.Transaction import Transaction  # noqa: E402
+from BackEnd.models import serializer  # noqa: E402
+
+SEED_CHUNK = 50000
+
+
+def seed(n_rows):
+    """Insert n_rows transactions spread over ten accounts"""
+    session = storage.session()
+    account_ids = [str(uuid.uuid4()) for _ in range(10)]
+    start = datetime.now() - timedelta(minutes=n_rows)
+    for offset in range(0, n_rows, SEED_CHUNK):
+        rows = []
+        for i in range(offset, min(offset + SEED_CHUNK, n_rows)):
+            created_at = start + timedelta(minutes=i)
+            rows.append({'id': str(uuid.uuid4()), 'created_at': created_at,
+                         'updated_at': created_at, 'account_id': account_ids[i % 10],
+                         'amount': 25.0, 'transaction_type': 'deposit',
+                         'description': 'Benchmark transaction', 'balance_after': 25.0 * i})
+        session.execute(Transaction.__table__.insert(), rows)
+        session.commit()
+
+
+def best_of(repeat, func):
+    """Fastest of repeat runs of func, in seconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    """Seed the database, load the rows and time each serialization"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    seed(args.rows)
+    transactions = storage.session().query(Transaction).all()
+    print(f"seeded and loaded {len(transactions)} transactions in {time.perf_counter() - start:.2f}s")
+
+    fast = serializer.serializer_for(Transaction)
+    cases = [
+        ('to_dict', lambda: [t.to_dict() for t in transactions]),
+        ('serializer.to_dicts', lambda: fast.to_dicts(transactions)),
+        ('serializer.to_tuples', lambda: fast.to_tuples(transactions)),
+        ('to_dict + json.dumps', lambda: json.dumps([t.to_dict() for t in transactions]).encode()),
+        ('serializer.dumps', lambda: fast.dumps(transactions)),
+    ]
+    encoder = 'orjson' if serializer.orjson is not None else 'json'
+    for name, func in cases:
+        elapsed = best_of(args.repeat, func)
+        label = f"{name} ({encoder})" if name == 'serializer.dumps' else name
+        print(f"{label:<32} {len(transactions) / elapsed:>12,.0f} rows/s  ({elapsed * 1000:.0f}ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark the API's cold start with python -X importtime
+
+Usage:
+    python -m BackEnd.benchmarks.bench_startup [--runs 5] [--top 15] [--max-ms 0]
+
+Imports BackEnd.api.v1.app in --runs fresh interpreters and prints the
+median wall time and import time, the --top slowest imports of the median
+run and which of the modules kept out of start up (numpy, pandas, sklearn,
+stripe, requests, flasgger) were imported anyway. With --max-ms, exits
+with status 1 when the median import time is over it, so CI can track it.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+# Loaded on first use rather than when the app is imported
+LAZY_MODULES = ('numpy', 'pandas', 'sklearn', 'stripe', 'requests', 'flasgger')
+
+
+def import_app() -> tuple:
+    """
+    Import the app in a new interpreter
+    Returns:
+        (wall seconds, [(cumulative us, self us, module)] of every import)
+    """
+    env = dict(os.environ)
+    env.setdefault('MFS_DB_URL', 'sqlite:///{}'.format(
+        os.path.join(tempfile.mkdtemp(prefix='mfs_bench_'), 'startup.db')))
+    env.setdefault('MFS_EMAIL_WORKER', '0')
+    env['PYTHONPATH'] = ROOT
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import BackEnd.api.v1.app'],
+                            cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    wall = time.perf_counter() - start
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, module = line[len('import time:'):].split('|')
+        # nested imports are indented under the one that made them
+        imports.append((int(cumulative_us), int(self_us), module[1:].rstrip()))
+    return wall, imports
+
+
+def main():
+    """Import the app --runs times and report the median run"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--max-ms', type=float, default=0)
+    args = parser.parse_args()
+
+    runs = sorted((import_app() for _ in range(args.runs)),
+                  key=lambda run: sum(us for us, _, module in run[1] if not module.startswith(' ')))
+    wall, imports = runs[len(runs) // 2]
+    total_ms = sum(us for us, _, module in imports if not module.startswith(' ')) / 1000
+    print(f"median of {args.runs} runs: {total_ms:.1f}ms importing, "
+          f"{statistics.median(run[0] for run in runs) * 1000:.1f}ms wall")
+
+    print(f"\n{'cumulative':>12} {'self':>10}  module")
+    for cumulative_us, self_us, module in sorted(imports, reverse=True)[:args.top]:
+        print(f"{cumulative_us / 1000:>10.1f}ms {self_us / 1000:>8.1f}ms  {module}")
+
+    loaded = sorted({module.strip() for _, _, module in imports} & set(LAZY_MODULES))
+    print(f"\nlazy modules imported at start up: {', '.join(loaded) or 'none'}")
+
+    if args.max_ms and total_ms > args.max_ms:
+        print(f"import time {total_ms:.1f}ms is over {args.max_ms:.1f}ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark streaming account statement export over a long history
+
+Usage:
+    python -m BackEnd.benchmarks.bench_statement_export [--rows 1000000] [--format csv] [--legacy]
+
+Seeds one account with --rows transactions, then downloads
+GET /accounts/<id>/statement through the Flask test client, reporting
+throughput and the peak Python memory allocated while streaming. --legacy
+also times building the same history as one jsonify'd list, for comparison.
+Runs against MFS_DB_URL (defaults to a throwaway sqlite file).
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+os.environ.setdefault('MFS_DB_URL', 'sqlite:///{}'.format(
+    os.path.join(tempfile.mkdtemp(prefix='mfs_bench_'), 'statement.db')))
+os.environ.setdefault('MFS_EMAIL_WORKER', '0')
+
+from BackEnd.models import storage  # noqa: E402
+from BackEnd.models.user import User  # noqa: E402
+from BackEnd.models.Account import Account  # noqa: E402
+from BackEnd.models.Transaction import Transaction  # noqa: E402
+
+SEED_CHUNK = 50000
+
+
+def seed(n_rows):
+    """Insert one customer with a session token and n_rows transactions"""
+    session = storage.session()
+    now = datetime.now()
+    user_id = str(uuid.uuid4())
+    account_id = str(uuid.uuid4())
+    token = str(uuid.uuid4())
+    session.execute(User.__table__.insert(), [{
+        'id': user_id, 'created_at': now, 'updated_at': now,
+        'fullname': 'Customer', 'username': 'customer', 'email': 'customer@bench.local',
+        'password': 'x', 'admin': False, 'session_id': token,
+        'session_expiration': now + timedelta(days=1)}])
+    session.execute(Account.__table__.insert(), [{
+        'id': account_id, 'created_at': now, 'updated_at': now, 'user_id': user_id,
+        'account_number': 'MF0000001', 'balance': 0.0, 'type': 'savings',
+        'status': 'active', 'currency': 'ETB', 'overdraft_limit': 0.0}])
+
+    start = now - timedelta(minutes=n_rows)
+    for offset in range(0, n_rows, SEED_CHUNK):
+        rows = []
+        for i in range(offset, min(offset + SEED_CHUNK, n_rows)):
+            created_at = start + timedelta(minutes=i)
+            deposit = i % 3 != 0
+            rows.append({'id': str(uuid.uuid4()), 'created_at': created_at,
+                         'updated_at': created_at, 'account_id': account_id,
+                         'amount': 25.0 if deposit else -10.0,
+                         'transaction_type': 'deposit' if deposit else 'withdrawal',
+                         'description': 'Benchmark transaction'})
+        session.execute(Transaction.__table__.insert(), rows)
+        session.commit()
+    storage.close()
+    return account_id, token
+
+
+def main():
+    """Seed the database and time a full statement download"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--format', choices=['csv', 'ndjson'], default='csv')
+    parser.add_argument('--legacy', action='store_true')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    account_id, token = seed(args.rows)
+    print(f"seeded {args.rows} transactions in {time.perf_counter() - start:.2f}s")
+
+    from BackEnd.api.v1.app import app
+    client = app.test_client()
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    response = client.get(f'/api/v1/accounts/{account_id}/statement?format={args.format}',
+                          headers={'Authorization': f'Bearer {token}'}, buffered=False)
+    first_byte = None
+    size = 0
+    lines = 0
+    for chunk in response.response:
+        if first_byte is None:
+            first_byte = time.perf_counter() - start
+        size += len(chunk)
+        lines += chunk.count(b'\n') if isinstance(chunk, bytes) else chunk.count('\n')
+    response.close()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"statement ({args.format}): {lines} lines, {size / 1e6:.1f}MB in {elapsed:.2f}s "
+          f"({args.rows / elapsed:,.0f} rows/s), first byte {first_byte * 1000:.1f}ms, "
+          f"peak traced memory {peak / 1e6:.1f}MB")
+
+    if args.legacy:
+        # Reference: the whole history as one in-memory list
+        from flask import jsonify
+        tracemalloc.start()
+        start = time.perf_counter()
+        with app.app_context():
+            transactions = storage.session().query(Transaction).filter(
+                Transaction.account_id == account_id).all()
+            body = jsonify([t.to_dict() for t in transactions]).get_data()
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"legacy jsonify list: {len(body) / 1e6:.1f}MB in {elapsed:.2f}s, "
+              f"peak traced memory {peak / 1e6:.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Locust load test of the core money flows against a running API
+
+Usage:
+    python -m BackEnd.benchmarks.seed --output dataset.json
+    MFS_BENCH_DATASET=dataset.json locust -f BackEnd/benchmarks/locustfile.py \
+        --host http://localhost:5000 --users 100 --spawn-rate 10 --run-time 5m \
+        --headless --json > locust.json
+
+Start the API on the seeded database first. Customers log in, then mostly
+poll their notifications and move money, now and then applying for a
+loan, repaying one or checking their credit score; admins approve the
+loans and read the company overview. Weights follow what the app's
+clients do most.
+"""
+import json
+import os
+import random
+from collections import deque
+
+from locust import HttpUser, between, task
+
+with open(os.getenv('MFS_BENCH_DATASET', 'dataset.json')) as f:
+    DATASET = json.load(f)
+PASSWORD = DATASET['password']
+# Loans applied for by customers and waiting for an admin
+PENDING_LOANS = deque()
+
+
+class Customer(HttpUser):
+    """A customer using the app"""
+    weight = 20
+    wait_time = between(1, 3)
+
+    def on_start(self):
+        self.customer = random.choice(DATASET['customers'])
+        response = self.client.post('/api/v1/users/login', name='login',
+                                    json={'email': self.customer['email'], 'password': PASSWORD})
+        self.headers = {'Authorization': f"Bearer {response.json()['session_id']}"}
+
+    @task(10)
+    def notifications(self):
+        self.client.get('/api/v1/notifications', headers=self.headers, name='notifications')
+
+    @task(4)
+    def deposit(self):
+        self.client.post(f"/api/v1/accounts/{self.customer['account_id']}/deposit",
+                         json={'amount': 100}, name='deposit')
+
+    @task(3)
+    def transfer(self):
+        other = random.choice(DATASET['customers'])
+        self.client.post('/api/v1/transactions/transfer', name='transfer', json={
+            'from_account_id': self.customer['account_id'], 'to_account_id': other['account_id'],
+            'amount': 10, 'description': 'Load test transfer'})
+
+    @task(2)
+    def repayment(self):
+        # Only borrowers can repay, and only their own loan
+        if self.customer.get('loan_id'):
+            self.client.post('/api/v1/repayments/make-payment', headers=self.headers,
+                             name='repayment', json={
+                                 'loan_id': self.customer['loan_id'], 'amount': 10,
+                                 'payment_method': 'account'})
+
+    @task(1)
+    def loan_apply(self):
+        response = self.client.post('/api/v1/loans', headers=self.headers, name='loan_apply', json={
+            'user_id': self.customer['id'], 'amount': 1000, 'interest_rate': 10,
+            'repayment_period': 12, 'purpose': 'Load test', 'admin_id': DATASET['admin']['id']})
+        if response.status_code == 201:
+            PENDING_LOANS.append(response.json()['id'])
+
+    @task(1)
+    def credit_score(self):
+        self.client.get('/api/v1/comprehensive-credit-score', headers=self.headers,
+                        name='credit_score')
+
+
+class Admin(HttpUser):
+    """An admin reviewing loans and the company's books"""
+    weight = 1
+    wait_time = between(2, 5)
+
+    def on_start(self):
+        response = self.client.post('/api/v1/users/login', name='login', json={
+            'email': DATASET['admin']['email'], 'password': PASSWORD})
+        self.headers = {'Authorization': f"Bearer {response.json()['session_id']}"}
+
+    @task(3)
+    def loan_approve(self):
+        try:
+            loan_id = PENDING_LOANS.popleft()
+        except IndexError:
+            return
+        self.client.post(f'/api/v1/loans/{loan_id}/approve', headers=self.headers,
+                         name='loan_approve')
+
+    @task(1)
+    def company_overview(self):
+        self.client.get('/api/v1/company/overview', name='company_overview')
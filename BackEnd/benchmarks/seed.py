@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Seed a database with customers, accounts, transactions, loans and repayments
+
+Usage:
+    python -m BackEnd.benchmarks.seed [--customers 1000] [--transactions 1000000]
+        [--loans 200] [--repayments 2000] [--notifications 20] [--output dataset.json]
+
+Every customer gets a funded account and --notifications unread
+notifications; --loans of them get an active loan, repaid --repayments
+times in total; the --transactions rows are spread over all the accounts
+and the last year. Customers log in as customer<i>@bench.local and the
+admin as admin@bench.local, all with the MFS_BENCH_PASSWORD password.
+--output writes the ids the load scripts need. Seeds MFS_DB_URL, by
+default ./mfs_bench.db.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+os.environ.setdefault('MFS_DB_URL', 'sqlite:///{}'.format(os.path.abspath('mfs_bench.db')))
+
+import bcrypt  # noqa: E402
+
+from BackEnd.models import storage  # noqa: E402
+from BackEnd.models.user import User  # noqa: E402
+from BackEnd.models.Account import Account  # noqa: E402
+from BackEnd.models.Loan import Loan  # noqa: E402
+from BackEnd.models.Notification import Notification  # noqa: E402
+from BackEnd.models.Repayment import Repayment  # noqa: E402
+from BackEnd.models.Transaction import Transaction  # noqa: E402
+
+PASSWORD = os.getenv('MFS_BENCH_PASSWORD', 'bench-password')
+ACCOUNT_BALANCE = 1000000.0
+LOAN_AMOUNT = 50000.0
+SEED_CHUNK = 50000
+# Transaction types and signs of the seeded history
+TRANSACTION_TYPES = (('deposit', 1), ('withdrawal', -1), ('transfer', -1), ('loan_repayment', -1))
+
+
+def _insert(table, rows):
+    """Insert rows into table in chunks, one commit per chunk"""
+    session = storage.session()
+    for offset in range(0, len(rows), SEED_CHUNK):
+        session.execute(table.insert(), rows[offset:offset + SEED_CHUNK])
+        session.commit()
+
+
+def seed_transactions(account_ids, n_transactions, rng):
+    """Insert n_transactions over the last year, built a chunk at a time"""
+    session = storage.session()
+    now = datetime.now()
+    step = timedelta(days=365) / max(1, n_transactions)
+    for offset in range(0, n_transactions, SEED_CHUNK):
+        rows = []
+        for i in range(offset, min(offset + SEED_CHUNK, n_transactions)):
+            created_at = now - timedelta(days=365) + step * i
+            transaction_type, sign = rng.choice(TRANSACTION_TYPES)
+            amount = round(rng.uniform(10, 5000), 2)
+            rows.append({'id': str(uuid.uuid4()), 'created_at': created_at,
+                         'updated_at': created_at, 'account_id': account_ids[i % len(account_ids)],
+                         'amount': sign * amount, 'transaction_type': transaction_type,
+                         'description': 'Seeded transaction', 'balance_after': ACCOUNT_BALANCE})
+        session.execute(Transaction.__table__.insert(), rows)
+        session.commit()
+
+
+def seed(customers=1000, transactions=1000000, loans=200, repayments=2000,
+         notifications=20, seed_value=0) -> dict:
+    """
+    Fill the database
+    Returns:
+        The dataset: admin and customers with their ids, emails and
+        account ids, active loan ids, the password and the counts seeded
+    """
+    rng = random.Random(seed_value)
+    now = datetime.now()
+    # One bcrypt hash for everyone; hashing is what makes logins slow
+    password = bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt()).decode()
+    admin = {'id': str(uuid.uuid4()), 'email': 'admin@bench.local'}
+    users = [{'id': admin['id'], 'created_at': now, 'updated_at': now, 'fullname': 'Admin',
+              'username': 'bench-admin', 'email': admin['email'], 'password': password,
+              'admin': True, 'is_verified': True}]
+    accounts = []
+    people = []
+    for i in range(customers):
+        user_id = str(uuid.uuid4())
+        account_id = str(uuid.uuid4())
+        people.append({'id': user_id, 'email': f'customer{i}@bench.local',
+                       'account_id': account_id})
+        users.append({'id': user_id, 'created_at': now, 'updated_at': now,
+                      'fullname': f'Customer {i}', 'username': f'customer{i}',
+                      'email': f'customer{i}@bench.local', 'password': password,
+                      'admin': False, 'is_verified': True,
+                      'unread_notification_count': notifications})
+        accounts.append({'id': account_id, 'created_at': now, 'updated_at': now,
+                         'user_id': user_id, 'account_number': f'MF{i:07d}',
+                         'balance': ACCOUNT_BALANCE, 'type': 'savings', 'status': 'active',
+                         'currency': 'ETB', 'overdraft_limit': 0.0})
+    _insert(User.__table__, users)
+    _insert(Account.__table__, accounts)
+
+    _insert(Notification.__table__, [
+        {'id': str(uuid.uuid4()), 'created_at': now - timedelta(hours=n), 'updated_at': now,
+         'user_id': person['id'], 'message': f'Seeded notification {n}', 'is_read': False}
+        for person in people for n in range(notifications)])
+
+    borrowers = rng.sample(people, min(loans, len(people)))
+    loan_rows = [{'id': str(uuid.uuid4()), 'created_at': now, 'updated_at': now,
+                  'admin_id': admin['id'], 'account_id': person['account_id'],
+                  'amount': LOAN_AMOUNT, 'interest_rate': 10.0, 'loan_status': 'active',
+                  'repayment_period': 12, 'end_date': now + timedelta(days=365),
+                  'purpose': 'Seeded loan'}
+                 for person in borrowers]
+    for person, loan in zip(borrowers, loan_rows):
+        # Only the borrower may repay the loan
+        person['loan_id'] = loan['id']
+    _insert(Loan.__table__, loan_rows)
+    if loan_rows:
+        _insert(Repayment.__table__, [
+            {'id': str(uuid.uuid4()), 'created_at': now - timedelta(days=i % 365),
+             'updated_at': now, 'loan_id': loan_rows[i % len(loan_rows)]['id'],
+             'amount': 100.0, 'status': 'completed'}
+            for i in range(repayments)])
+
+    seed_transactions([account['id'] for account in accounts], transactions, rng)
+    storage.close()
+    return {'admin': admin, 'customers': people, 'loans': [loan['id'] for loan in loan_rows],
+            'password': PASSWORD,
+            'counts': {'customers': customers, 'transactions': transactions, 'loans': loans,
+                       'repayments': repayments if loan_rows else 0,
+                       'notifications': notifications * customers}}
+
+
+def main():
+    """Seed the database and optionally write the dataset"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--customers', type=int, default=1000)
+    parser.add_argument('--transactions', type=int, default=1000000)
+    parser.add_argument('--loans', type=int, default=200)
+    parser.add_argument('--repayments', type=int, default=2000)
+    parser.add_argument('--notifications', type=int, default=20)
+    parser.add_argument('--output')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    dataset = seed(args.customers, args.transactions, args.loans, args.repayments,
+                   args.notifications)
+    print(f"seeded {dataset['counts']} into {os.environ['MFS_DB_URL']} "
+          f"in {time.perf_counter() - start:.2f}s")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(dataset, f)
+        print(f"wrote the dataset to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""
+pytest-benchmark runs of the bench_api scenarios
+
+Usage:
+    pytest BackEnd/benchmarks/test_money_flows.py --benchmark-json=benchmark.json
+
+Seeds a small dataset once per run; compare runs with
+--benchmark-compare or pytest-benchmark compare. Skipped when
+pytest-benchmark is not installed.
+"""
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+from BackEnd.benchmarks import bench_api  # noqa: E402
+from BackEnd.benchmarks import seed  # noqa: E402
+
+
+@pytest.fixture(scope='module')
+def flows():
+    """The scenarios, against a freshly seeded database"""
+    dataset = seed.seed(customers=50, transactions=20000, loans=10, repayments=200,
+                        notifications=20)
+    return bench_api.Flows(bench_api.app.test_client(), dataset)
+
+
+@pytest.mark.parametrize('scenario', bench_api.SCENARIOS)
+def test_scenario(benchmark, flows, scenario):
+    """Time one request of the scenario per round"""
+    prepare = getattr(flows, f'prepare_{scenario}', tuple)
+    response = benchmark.pedantic(getattr(flows, scenario),
+                                  setup=lambda: (prepare(), {}), rounds=20, warmup_rounds=2)
+    assert response.status_code < 400
@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+Daily maintenance jobs, meant to be run from cron shortly after midnight:
+
+    0 1 * * * cd /path/to/MicroFinance-Solution && python -m BackEnd.daily_jobs
+"""
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from BackEnd.Controllers.DelinquencyController import DelinquencyController
+from BackEnd.Controllers.BalanceSnapshotController import BalanceSnapshotController
+
+
+def main():
+    """Run every daily job"""
+    count = DelinquencyController().run_sweep()
+    print(f"✓ Delinquency snapshot written for {count} loan(s)")
+    count = BalanceSnapshotController().run_snapshot()
+    print(f"✓ Closing balances recorded for {count} account(s)")
+
+
+if __name__ == "__main__":
+    main()
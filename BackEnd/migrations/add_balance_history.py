@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Migration to add transactions.balance_after and the daily balance snapshots"""
+import sys
+import os
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from BackEnd.models import storage
+from BackEnd.models.AccountBalanceDaily import AccountBalanceDaily
+from BackEnd.Controllers.BalanceSnapshotController import BalanceSnapshotController, BALANCE_HISTORY_DAYS
+from sqlalchemy import text
+
+
+def run_migration():
+    """Add the column and table, then backfill balances and past snapshots"""
+    try:
+        engine = storage._DBStorage__engine
+        with engine.begin() as connection:
+            result = connection.execute(text("""
+                SELECT COUNT(*)
+                FROM INFORMATION_SCHEMA.COLUMNS
+                WHERE TABLE_SCHEMA = DATABASE()
+                AND TABLE_NAME = 'transactions'
+                AND COLUMN_NAME = 'balance_after'
+            """))
+            if result.scalar() == 0:
+                connection.execute(text("ALTER TABLE transactions ADD COLUMN balance_after FLOAT NULL"))
+                print("✓ Added balance_after column")
+            else:
+                print("✓ balance_after column already exists")
+
+            # Current balance minus everything posted after each transaction
+            connection.execute(text("""
+                UPDATE transactions t
+                JOIN (
+                    SELECT tx.id,
+                           a.balance - COALESCE(SUM(tx.amount) OVER (
+                               PARTITION BY tx.account_id
+                               ORDER BY tx.created_at DESC, tx.id DESC
+                               ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING
+                           ), 0) AS balance_after
+                    FROM transactions tx
+                    JOIN accounts a ON a.id = tx.account_id
+                ) b ON b.id = t.id
+                SET t.balance_after = b.balance_after
+                WHERE t.balance_after IS NULL
+            """))
+            print("✓ Backfilled transaction balances")
+
+        AccountBalanceDaily.__table__.create(bind=engine, checkfirst=True)
+        print("✓ Created account_balance_daily table")
+
+        controller = BalanceSnapshotController()
+        today = date.today()
+        for days_ago in range(BALANCE_HISTORY_DAYS, 0, -1):
+            controller.run_snapshot(today - timedelta(days=days_ago))
+        print(f"✓ Recorded closing balances for the last {BALANCE_HISTORY_DAYS} days")
+        return True
+    except Exception as e:
+        print(f"✗ Error: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    success = run_migration()
+    sys.exit(0 if success else 1)
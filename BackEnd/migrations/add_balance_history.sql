@@ -0,0 +1,35 @@
+-- Running balance on transactions and end-of-day balance snapshots
+USE MicroFinance_db;
+
+ALTER TABLE transactions
+    ADD COLUMN balance_after FLOAT NULL;
+
+CREATE TABLE IF NOT EXISTS account_balance_daily (
+    id VARCHAR(60) NOT NULL PRIMARY KEY,
+    created_at DATETIME NOT NULL,
+    updated_at DATETIME NOT NULL,
+    account_id VARCHAR(60) NOT NULL,
+    snapshot_date DATE NOT NULL,
+    balance FLOAT NOT NULL DEFAULT 0,
+    FOREIGN KEY (account_id) REFERENCES accounts(id),
+    UNIQUE INDEX idx_account_balance_daily_account_date (account_id, snapshot_date),
+    INDEX idx_account_balance_daily_date (snapshot_date)
+);
+
+-- Backfill: each transaction's balance is the current account balance
+-- minus everything posted after it
+UPDATE transactions t
+JOIN (
+    SELECT tx.id,
+           a.balance - COALESCE(SUM(tx.amount) OVER (
+               PARTITION BY tx.account_id
+               ORDER BY tx.created_at DESC, tx.id DESC
+               ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING
+           ), 0) AS balance_after
+    FROM transactions tx
+    JOIN accounts a ON a.id = tx.account_id
+) b ON b.id = t.id
+SET t.balance_after = b.balance_after
+WHERE t.balance_after IS NULL;
+
+-- Past daily snapshots are written by add_balance_history.py
@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""Migration to add the data_versions table behind the dashboard ETags"""
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from BackEnd.models import storage
+from BackEnd.models.DataVersion import DataVersion
+
+
+def run_migration():
+    """Create the data_versions table; counters are added by the first write"""
+    try:
+        DataVersion.__table__.create(bind=storage._DBStorage__engine, checkfirst=True)
+        print("✓ Created data_versions table")
+        return True
+    except Exception as e:
+        print(f"✗ Error: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    success = run_migration()
+    sys.exit(0 if success else 1)
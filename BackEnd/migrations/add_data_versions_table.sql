@@ -0,0 +1,8 @@
+-- Per-table write counters, bumped after each commit; fingerprint the
+-- company dashboards without scanning their tables
+USE MicroFinance_db;
+
+CREATE TABLE IF NOT EXISTS data_versions (
+    table_name VARCHAR(64) NOT NULL PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Migration to record delinquency sweeps and make snapshot rows unique per loan and day"""
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from BackEnd.models import storage
+from BackEnd.models.DelinquencySweep import DelinquencySweep
+from BackEnd.Controllers.DelinquencyController import DelinquencyController
+from sqlalchemy import text
+
+
+def run_migration():
+    """Create delinquency_sweeps, dedupe and uniquely index loan_delinquency, then sweep"""
+    try:
+        engine = storage._DBStorage__engine
+        DelinquencySweep.__table__.create(bind=engine, checkfirst=True)
+        print("✓ Created delinquency_sweeps table")
+
+        with engine.begin() as connection:
+            unique = connection.execute(text("""
+                SELECT MIN(NON_UNIQUE)
+                FROM INFORMATION_SCHEMA.STATISTICS
+                WHERE TABLE_SCHEMA = DATABASE()
+                AND TABLE_NAME = 'loan_delinquency'
+                AND INDEX_NAME = 'idx_loan_delinquency_loan_date'
+            """)).scalar()
+            if unique == 0:
+                print("✓ idx_loan_delinquency_loan_date is already unique")
+            else:
+                # Concurrent lazy sweeps could have written a loan twice
+                connection.execute(text("""
+                    DELETE d1 FROM loan_delinquency d1
+                    JOIN loan_delinquency d2
+                    ON d1.loan_id = d2.loan_id
+                    AND d1.snapshot_date = d2.snapshot_date
+                    AND d1.id > d2.id
+                """))
+                if unique is not None:
+                    connection.execute(text(
+                        "DROP INDEX idx_loan_delinquency_loan_date ON loan_delinquency"
+                    ))
+                connection.execute(text(
+                    "CREATE UNIQUE INDEX idx_loan_delinquency_loan_date "
+                    "ON loan_delinquency (loan_id, snapshot_date)"
+                ))
+                print("✓ Made idx_loan_delinquency_loan_date unique")
+
+        count = DelinquencyController().run_sweep()
+        print(f"✓ Delinquency snapshot written for {count} loan(s)")
+        return True
+    except Exception as e:
+        print(f"✗ Error: {e}")
+        storage.Rollback()
+        return False
+
+
+if __name__ == "__main__":
+    success = run_migration()
+    sys.exit(0 if success else 1)
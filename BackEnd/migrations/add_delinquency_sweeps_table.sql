@@ -0,0 +1,20 @@
+-- Record finished delinquency sweeps; readers use the latest one
+USE MicroFinance_db;
+
+CREATE TABLE IF NOT EXISTS delinquency_sweeps (
+    id VARCHAR(60) NOT NULL PRIMARY KEY,
+    snapshot_date DATE NOT NULL UNIQUE,
+    loan_count INT NOT NULL DEFAULT 0,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- At most one snapshot row per loan and day
+DELETE d1 FROM loan_delinquency d1
+JOIN loan_delinquency d2
+ON d1.loan_id = d2.loan_id
+AND d1.snapshot_date = d2.snapshot_date
+AND d1.id > d2.id;
+
+DROP INDEX idx_loan_delinquency_loan_date ON loan_delinquency;
+CREATE UNIQUE INDEX idx_loan_delinquency_loan_date ON loan_delinquency (loan_id, snapshot_date);
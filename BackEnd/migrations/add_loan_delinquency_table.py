@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""Migration to add the loan_delinquency table and take the first snapshot"""
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from BackEnd.models import storage
+from BackEnd.models.Loan import Loan
+from BackEnd.models.LoanDelinquency import LoanDelinquency
+from BackEnd.models.DelinquencySweep import DelinquencySweep
+from BackEnd.Controllers.DelinquencyController import DelinquencyController
+
+
+def run_migration():
+    """Create loan_delinquency, index loans for overdue lookups and run the sweep"""
+    try:
+        engine = storage._DBStorage__engine
+        LoanDelinquency.__table__.create(bind=engine, checkfirst=True)
+        DelinquencySweep.__table__.create(bind=engine, checkfirst=True)
+        print("✓ Created loan_delinquency and delinquency_sweeps tables")
+
+        for index in Loan.__table__.indexes:
+            if index.name == 'idx_loans_status_end_date':
+                index.create(bind=engine, checkfirst=True)
+        print("✓ Created idx_loans_status_end_date index")
+
+        count = DelinquencyController().run_sweep()
+        print(f"✓ Delinquency snapshot written for {count} loan(s)")
+        return True
+    except Exception as e:
+        print(f"✗ Error: {e}")
+        storage.Rollback()
+        return False
+
+
+if __name__ == "__main__":
+    success = run_migration()
+    sys.exit(0 if success else 1)
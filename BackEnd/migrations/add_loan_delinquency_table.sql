@@ -0,0 +1,30 @@
+-- Add loan_delinquency table (daily overdue-loan snapshot)
+USE MicroFinance_db;
+
+CREATE TABLE IF NOT EXISTS loan_delinquency (
+    id VARCHAR(60) NOT NULL PRIMARY KEY,
+    loan_id VARCHAR(60) NOT NULL,
+    account_id VARCHAR(60) NOT NULL,
+    snapshot_date DATE NOT NULL,
+    days_past_due INT NOT NULL,
+    bucket VARCHAR(10) NOT NULL,
+    outstanding_amount FLOAT NOT NULL DEFAULT 0,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (loan_id) REFERENCES loans(id) ON DELETE CASCADE,
+    FOREIGN KEY (account_id) REFERENCES accounts(id) ON DELETE CASCADE,
+    INDEX idx_loan_delinquency_date_bucket (snapshot_date, bucket),
+    UNIQUE INDEX idx_loan_delinquency_loan_date (loan_id, snapshot_date)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- One row per finished sweep; readers use the latest
+CREATE TABLE IF NOT EXISTS delinquency_sweeps (
+    id VARCHAR(60) NOT NULL PRIMARY KEY,
+    snapshot_date DATE NOT NULL UNIQUE,
+    loan_count INT NOT NULL DEFAULT 0,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Overdue detection scans active loans by end date
+CREATE INDEX idx_loans_status_end_date ON loans (loan_status, end_date);
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""Migration to add the loan_installments table and backfill approved loans"""
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from BackEnd.models import storage
+from BackEnd.models.LoanInstallment import LoanInstallment
+from BackEnd.Controllers.LoanController import LoanController
+
+
+def run_migration():
+    """Create loan_installments and generate schedules for existing loans"""
+    try:
+        LoanInstallment.__table__.create(bind=storage._DBStorage__engine, checkfirst=True)
+        print("✓ Created loan_installments table")
+
+        # Split from the original principal, with the repayments so far
+        # already applied
+        count = LoanController().backfill_installments()
+        print(f"✓ Backfilled installments for {count} loan(s)")
+        return True
+    except Exception as e:
+        print(f"✗ Error: {e}")
+        storage.Rollback()
+        return False
+
+
+if __name__ == "__main__":
+    success = run_migration()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,18 @@
+-- Add loan_installments table (stored amortization schedule)
+USE MicroFinance_db;
+
+CREATE TABLE IF NOT EXISTS loan_installments (
+    id VARCHAR(60) NOT NULL PRIMARY KEY,
+    loan_id VARCHAR(60) NOT NULL,
+    installment_number INT NOT NULL,
+    due_date DATETIME NOT NULL,
+    principal FLOAT NOT NULL,
+    interest FLOAT NOT NULL,
+    amount_paid FLOAT NOT NULL DEFAULT 0,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (loan_id) REFERENCES loans(id) ON DELETE CASCADE,
+    INDEX idx_loan_installments_loan_number (loan_id, installment_number),
+    INDEX idx_loan_installments_status_due (status, due_date)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""Migration to add the repayment listing indexes"""
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from BackEnd.models import storage
+from BackEnd.models.Repayment import Repayment
+from BackEnd.models.Transaction import Transaction
+
+
+def run_migration():
+    """Create the repayment indexes and the transactions (account_id, repayment_id) index"""
+    try:
+        engine = storage._DBStorage__engine
+        indexes = [index for index in Transaction.__table__.indexes
+                   if index.name == 'idx_transactions_account_repayment']
+        indexes += list(Repayment.__table__.indexes)
+        for index in indexes:
+            index.create(bind=engine, checkfirst=True)
+            print(f"✓ Created {index.name} index")
+        return True
+    except Exception as e:
+        print(f"✗ Error: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    success = run_migration()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,6 @@
+-- Indexes for the paginated repayment and repayment transaction listings
+USE MicroFinance_db;
+
+CREATE INDEX idx_transactions_account_repayment ON transactions (account_id, repayment_id);
+CREATE INDEX idx_repayments_loan_created ON repayments (loan_id, created_at, id);
+CREATE INDEX idx_repayments_created ON repayments (created_at, id);
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Migration to add the users.stream_ticket columns for the notification stream"""
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from BackEnd.models import storage
+from sqlalchemy import text
+
+COLUMNS = {
+    'stream_ticket': "ALTER TABLE users ADD COLUMN stream_ticket VARCHAR(60)",
+    'stream_ticket_expiration': "ALTER TABLE users ADD COLUMN stream_ticket_expiration DATETIME",
+}
+
+
+def run_migration():
+    """Add each missing column, then the ticket lookup index"""
+    try:
+        with storage._DBStorage__engine.begin() as connection:
+            for column, ddl in COLUMNS.items():
+                exists = connection.execute(text("""
+                    SELECT COUNT(*)
+                    FROM INFORMATION_SCHEMA.COLUMNS
+                    WHERE TABLE_SCHEMA = DATABASE()
+                    AND TABLE_NAME = 'users'
+                    AND COLUMN_NAME = :column
+                """), {'column': column}).scalar()
+                if exists:
+                    print(f"✓ {column} column already exists")
+                else:
+                    connection.execute(text(ddl))
+                    print(f"✓ Added {column} column")
+
+            exists = connection.execute(text("""
+                SELECT COUNT(*)
+                FROM INFORMATION_SCHEMA.STATISTICS
+                WHERE TABLE_SCHEMA = DATABASE()
+                AND TABLE_NAME = 'users'
+                AND INDEX_NAME = 'ix_users_stream_ticket'
+            """)).scalar()
+            if exists:
+                print("✓ ix_users_stream_ticket already exists")
+            else:
+                connection.execute(text(
+                    "CREATE INDEX ix_users_stream_ticket ON users (stream_ticket)"
+                ))
+                print("✓ Created ix_users_stream_ticket")
+        return True
+    except Exception as e:
+        print(f"✗ Error: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    success = run_migration()
+    sys.exit(0 if success else 1)
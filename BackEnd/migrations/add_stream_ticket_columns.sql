@@ -0,0 +1,8 @@
+-- Single-use tickets for opening the notification stream
+USE MicroFinance_db;
+
+ALTER TABLE users
+    ADD COLUMN stream_ticket VARCHAR(60),
+    ADD COLUMN stream_ticket_expiration DATETIME;
+
+CREATE INDEX ix_users_stream_ticket ON users (stream_ticket);
@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""Migration to add the task_outbox table"""
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from BackEnd.models import storage
+from BackEnd.models.TaskOutbox import TaskOutbox
+
+
+def run_migration():
+    """Create the task_outbox table"""
+    try:
+        TaskOutbox.__table__.create(bind=storage._DBStorage__engine, checkfirst=True)
+        print("✓ Created task_outbox table")
+        return True
+    except Exception as e:
+        print(f"✗ Error: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    success = run_migration()
+    sys.exit(0 if success else 1)
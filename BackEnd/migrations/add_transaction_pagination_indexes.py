@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""Migration to add the transaction pagination indexes"""
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from BackEnd.models import storage
+from BackEnd.models.Transaction import Transaction
+
+
+def run_migration():
+    """Create the (created_at, id) indexes on transactions"""
+    try:
+        engine = storage._DBStorage__engine
+        for index in Transaction.__table__.indexes:
+            index.create(bind=engine, checkfirst=True)
+            print(f"✓ Created {index.name} index")
+        return True
+    except Exception as e:
+        print(f"✗ Error: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    success = run_migration()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,5 @@
+-- Indexes for keyset-paginated transaction listings on (created_at, id)
+USE MicroFinance_db;
+
+CREATE INDEX idx_transactions_account_created ON transactions (account_id, created_at, id);
+CREATE INDEX idx_transactions_created ON transactions (created_at, id);
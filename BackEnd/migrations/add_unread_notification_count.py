@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Migration to add users.unread_notification_count and backfill it"""
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from BackEnd.models import storage
+from sqlalchemy import text
+
+# index name -> (table, columns)
+INDEXES = {
+    'idx_users_session_id': ('users', 'session_id'),
+    'idx_notifications_user_read': ('notifications', 'user_id, is_read'),
+}
+
+
+def run_migration():
+    """Add the counter column, the lookup indexes and backfill the counts"""
+    try:
+        with storage._DBStorage__engine.begin() as connection:
+            result = connection.execute(text("""
+                SELECT COUNT(*)
+                FROM INFORMATION_SCHEMA.COLUMNS
+                WHERE TABLE_SCHEMA = DATABASE()
+                AND TABLE_NAME = 'users'
+                AND COLUMN_NAME = 'unread_notification_count'
+            """))
+            if result.scalar() == 0:
+                connection.execute(text(
+                    "ALTER TABLE users ADD COLUMN unread_notification_count INT NOT NULL DEFAULT 0"
+                ))
+                print("✓ Added unread_notification_count column")
+            else:
+                print("✓ unread_notification_count column already exists")
+
+            # Each index is checked on its own so a rerun after a partial
+            # failure still creates the missing ones
+            for name, (table, columns) in INDEXES.items():
+                exists = connection.execute(text("""
+                    SELECT COUNT(*)
+                    FROM INFORMATION_SCHEMA.STATISTICS
+                    WHERE TABLE_SCHEMA = DATABASE()
+                    AND TABLE_NAME = :table
+                    AND INDEX_NAME = :name
+                """), {'table': table, 'name': name}).scalar()
+                if exists:
+                    print(f"✓ {name} already exists")
+                else:
+                    connection.execute(text(f"CREATE INDEX {name} ON {table} ({columns})"))
+                    print(f"✓ Created {name}")
+
+            connection.execute(text("""
+                UPDATE users u
+                SET u.unread_notification_count = (
+                    SELECT COUNT(*) FROM notifications n
+                    WHERE n.user_id = u.id AND n.is_read = 0
+                )
+            """))
+            print("✓ Backfilled unread notification counts")
+        return True
+    except Exception as e:
+        print(f"✗ Error: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    success = run_migration()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,15 @@
+-- Add cached unread notification counter to users
+USE MicroFinance_db;
+
+ALTER TABLE users
+    ADD COLUMN unread_notification_count INT NOT NULL DEFAULT 0;
+
+CREATE INDEX idx_users_session_id ON users (session_id);
+CREATE INDEX idx_notifications_user_read ON notifications (user_id, is_read);
+
+-- Backfill from existing notifications
+UPDATE users u
+SET u.unread_notification_count = (
+    SELECT COUNT(*) FROM notifications n
+    WHERE n.user_id = u.id AND n.is_read = 0
+);
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""Migration creating every table of the models that does not exist yet
+
+The API no longer creates its tables when it starts; run this once per
+deployment, before the workers.
+"""
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from BackEnd.models import storage
+
+
+def run_migration():
+    """Create the missing tables"""
+    try:
+        storage.create_all()
+        print("✓ Created missing tables")
+        return True
+    except Exception as e:
+        print(f"✗ Error: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    success = run_migration()
+    sys.exit(0 if success else 1)
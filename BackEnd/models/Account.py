@@ -11,7 +11,7 @@ class Account(BaseModel, Base):
     """Account Model"""
     __tablename__ = 'accounts'
 
-    user_id = Column(String(60), ForeignKey('users.id'), nullable=False)
+    user_id = Column(String(60), ForeignKey('users.id'), nullable=False, index=True)
     account_number = Column(String(20), unique=True, nullable=False)
     balance = Column(Float, default=0.00)
     type = Column(String(50), nullable=False)
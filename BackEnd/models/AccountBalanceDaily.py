@@ -0,0 +1,27 @@
+#!/usr/bin/python3
+"""AccountBalanceDaily Class"""
+
+from sqlalchemy import Float, String, ForeignKey, Date, Column, Index
+from BackEnd.models.base_model import BaseModel, Base
+
+
+class AccountBalanceDaily(BaseModel, Base):
+    """Closing balance of an account at the end of a day"""
+    __tablename__ = 'account_balance_daily'
+    __table_args__ = (
+        Index('idx_account_balance_daily_account_date', 'account_id', 'snapshot_date', unique=True),
+        Index('idx_account_balance_daily_date', 'snapshot_date'),
+    )
+
+    account_id = Column(String(60), ForeignKey('accounts.id'), nullable=False)
+    snapshot_date = Column(Date, nullable=False)
+    balance = Column(Float, nullable=False, default=0.0)
+
+    def to_dict(self):
+        """Returns a dictionary representation of the snapshot row"""
+        return {
+            'id': self.id,
+            'account_id': self.account_id,
+            'snapshot_date': self.snapshot_date.isoformat() if self.snapshot_date else None,
+            'balance': float(self.balance or 0.0)
+        }
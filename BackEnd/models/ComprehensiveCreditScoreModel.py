@@ -10,12 +10,15 @@ This is a new advanced credit scoring system that considers multiple factors:
 - Financial behavior patterns
 """
 
+import logging
 from datetime import datetime, timedelta
 import numpy as np
-import pandas as pd
 from sqlalchemy import func, and_, or_
 from typing import Dict, List, Tuple, Optional
+from BackEnd.monitoring.metrics import CREDIT_SCORE_DURATION
 import warnings
+
+logger = logging.getLogger(__name__)
 warnings.filterwarnings('ignore')
 
 
@@ -45,6 +48,7 @@ class ComprehensiveCreditScoreModel:
             'very_poor': (300, 549)
         }
 
+    @CREDIT_SCORE_DURATION.time('comprehensive')
     def calculate_comprehensive_credit_score(self, user_id: str, session) -> Dict:
         """
         Calculate comprehensive credit score considering all factors
@@ -129,7 +133,7 @@ class ComprehensiveCreditScoreModel:
             }
             
         except Exception as e:
-            print(f"Error calculating comprehensive credit score: {e}")
+            logger.exception("Error calculating comprehensive credit score")
             return self._default_score_response()
 
     def _extract_comprehensive_user_data(self, user_id: str, session) -> Optional[Dict]:
@@ -167,6 +171,14 @@ class ComprehensiveCreditScoreModel:
                 Repayment.loan_id.in_(loan_ids)
             ).all() if loan_ids else []
             
+            # Get overdue loans from the daily delinquency snapshot
+            from BackEnd.Controllers.DelinquencyController import DelinquencyController
+            delinquencies = DelinquencyController().get_loan_delinquencies(loan_ids)
+            
+            # Daily closing balances from the end-of-day snapshots
+            from BackEnd.Controllers.BalanceSnapshotController import BalanceSnapshotController
+            balance_history = BalanceSnapshotController().get_balance_history(accounts)
+            
             # Compile comprehensive data
             user_data = {
                 'user': user,
@@ -174,6 +186,8 @@ class ComprehensiveCreditScoreModel:
                 'transactions': transactions,
                 'loans': loans,
                 'repayments': repayments,
+                'delinquencies': delinquencies,
+                'balance_history': balance_history,
                 'account_ids': account_ids,
                 'loan_ids': loan_ids
             }
@@ -181,7 +195,7 @@ class ComprehensiveCreditScoreModel:
             return user_data
             
         except Exception as e:
-            print(f"Error extracting user data: {e}")
+            logger.exception("Error extracting user data")
             return None
 
     def _calculate_payment_history_score(self, user_data: Dict) -> float:
@@ -207,9 +221,7 @@ class ComprehensiveCreditScoreModel:
         payment_consistency = self._calculate_payment_consistency(loan_repayment_transactions)
         
         # Count overdue loans
-        current_date = datetime.now()
-        overdue_loans = len([loan for loan in loans 
-                           if loan.loan_status == 'active' and loan.end_date and loan.end_date < current_date])
+        overdue_loans = len(user_data.get('delinquencies', []))
         
         # Calculate base score
         base_score = 300
@@ -224,6 +236,7 @@ class ComprehensiveCreditScoreModel:
         base_score -= overdue_loans * 50
         
         # Bonus for recent payment activity (0-50 points)
+        current_date = datetime.now()
         recent_payments = len([t for t in loan_repayment_transactions 
                              if (current_date - t.created_at).days <= 30])
         base_score += min(50, recent_payments * 10)
@@ -400,7 +413,7 @@ class ComprehensiveCreditScoreModel:
         
         # Calculate balance stability
         total_balance = sum(acc.balance for acc in accounts)
-        balance_history = self._calculate_balance_history(transactions, total_balance)
+        balance_history = user_data['balance_history']
         balance_volatility = np.std(balance_history) if len(balance_history) > 1 else 0
         
         # Calculate overdraft usage
@@ -511,27 +524,6 @@ class ComprehensiveCreditScoreModel:
         # Combined consistency score
         return (amount_consistency + timing_consistency) / 2
 
-    def _calculate_balance_history(self, transactions: List, current_balance: float) -> List[float]:
-        """Calculate historical balance progression"""
-        if not transactions:
-            return [current_balance]
-        
-        # Sort transactions by date (newest first)
-        sorted_transactions = sorted(transactions, key=lambda x: x.created_at, reverse=True)
-        
-        balances = [current_balance]
-        running_balance = current_balance
-        
-        # Reconstruct balance history (last 60 transactions)
-        for transaction in sorted_transactions[:60]:
-            if transaction.transaction_type in ['withdrawal', 'debit', 'loan_repayment']:
-                running_balance += abs(transaction.amount)
-            else:
-                running_balance -= transaction.amount
-            balances.append(running_balance)
-        
-        return balances
-
     def _get_score_rating(self, score: float) -> str:
         """Get score rating based on score value"""
         for rating, (min_score, max_score) in self.score_ranges.items():
@@ -763,8 +755,7 @@ class ComprehensiveCreditScoreModel:
         accounts = user_data['accounts']
         
         # Check for overdue loans
-        current_date = datetime.now()
-        overdue_loans = [l for l in loans if l.loan_status == 'active' and l.end_date and l.end_date < current_date]
+        overdue_loans = user_data.get('delinquencies', [])
         if overdue_loans:
             risk_factors.append(f"{len(overdue_loans)} overdue loan(s)")
         
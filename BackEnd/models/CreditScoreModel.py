@@ -1,3 +1,4 @@
+import logging
 from datetime import datetime
 import numpy as np
 import pandas as pd
@@ -6,8 +7,11 @@ from sklearn.preprocessing import StandardScaler
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy import func, and_, or_
 import joblib
+from BackEnd.monitoring.metrics import CREDIT_SCORE_DURATION
 
 import warnings
+
+logger = logging.getLogger(__name__)
 warnings.filterwarnings('ignore')
 
 class AICredoScoreModel:
@@ -74,8 +78,9 @@ class AICredoScoreModel:
                 total_deposits = sum(t.amount for t in transactions if t.amount > 0)
                 total_withdrawals = sum(abs(t.amount) for t in transactions if t.amount < 0)
                 
-                # Calculate balance volatility
-                daily_balances = self._calculate_daily_balances(transactions, total_balance)
+                # Calculate balance volatility from the end-of-day snapshots
+                from BackEnd.Controllers.BalanceSnapshotController import BalanceSnapshotController
+                daily_balances = BalanceSnapshotController().get_balance_history(accounts)
                 balance_volatility = np.std(daily_balances) if len(daily_balances) > 1 else 0
                 
                 # Days since last transaction  
@@ -166,7 +171,7 @@ class AICredoScoreModel:
             return features
             
         except Exception as e:
-            print(f"Error extracting user features: {e}")
+            logger.exception("Error extracting user features")
             return self._default_features()
 
     def _default_features(self):
@@ -194,26 +199,6 @@ class AICredoScoreModel:
             'overdraft_usage': 0
         }
 
-    def _calculate_daily_balances(self, transactions, current_balance):
-        """Calculate daily balance history"""
-        if not transactions:
-            return [current_balance]
-        
-        # Sort transactions by date
-        sorted_transactions = sorted(transactions, key=lambda x: x.created_at, reverse=True)
-        
-        balances = [current_balance]
-        running_balance = current_balance
-        
-        for transaction in sorted_transactions[:30]:  # Last 30 transactions
-            if transaction.transaction_type in ['withdrawal', 'debit']:
-                running_balance += abs(transaction.amount)
-            else:
-                running_balance -= transaction.amount
-            balances.append(running_balance)
-        
-        return balances
-
     def _calculate_payment_consistency(self, transactions):
         """Calculate payment consistency score"""
         if len(transactions) < 3:
@@ -239,6 +224,7 @@ class AICredoScoreModel:
         consistency = max(0, 1 - (std_interval / max(mean_interval, 1)))
         return min(consistency, 1.0)
 
+    @CREDIT_SCORE_DURATION.time('ai')
     def predict_credit_score(self, user_id, session):
         """Predict credit score for a user"""
 
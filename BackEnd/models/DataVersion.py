@@ -0,0 +1,17 @@
+#!/usr/bin/python3
+"""DataVersion Class"""
+
+from sqlalchemy import BigInteger, Column, String
+from BackEnd.models.base_model import Base
+
+
+class DataVersion(Base):
+    """
+    Write counter of a table, bumped after every commit that changed it;
+    lets read endpoints fingerprint their tables with primary key lookups
+    instead of scanning them (see DBStorage.table_versions)
+    """
+    __tablename__ = 'data_versions'
+
+    table_name = Column(String(64), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
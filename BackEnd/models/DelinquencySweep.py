@@ -0,0 +1,24 @@
+#!/usr/bin/python3
+"""DelinquencySweep Class"""
+
+from sqlalchemy import Column, Date, Integer
+from BackEnd.models.base_model import BaseModel, Base
+
+
+class DelinquencySweep(BaseModel, Base):
+    """
+    Record of a finished delinquency sweep; readers use the latest one, so a
+    day without delinquent loans still replaces the previous snapshot
+    """
+    __tablename__ = 'delinquency_sweeps'
+
+    snapshot_date = Column(Date, nullable=False, unique=True)
+    loan_count = Column(Integer, nullable=False, default=0)
+
+    def to_dict(self):
+        """Returns a dictionary representation of the sweep"""
+        return {
+            'id': self.id,
+            'snapshot_date': self.snapshot_date.isoformat() if self.snapshot_date else None,
+            'loan_count': self.loan_count
+        }
@@ -0,0 +1,38 @@
+#!/usr/bin/python3
+"""EmailOutbox Class"""
+
+from sqlalchemy import String, Text, DateTime, Column, Integer, Index
+from BackEnd.models.base_model import BaseModel, Base
+from datetime import datetime
+
+
+class EmailOutbox(BaseModel, Base):
+    """Outgoing email waiting for, or already through, SMTP delivery"""
+    __tablename__ = 'email_outbox'
+    __table_args__ = (
+        Index('idx_email_outbox_status_next', 'status', 'next_attempt_at'),
+    )
+
+    sender = Column(String(120))
+    recipient = Column(String(120), nullable=False)
+    subject = Column(String(255), nullable=False)
+    body = Column(Text, nullable=False)
+    status = Column(String(20), nullable=False, default='pending')  # 'pending', 'sending', 'sent', 'failed'
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    last_error = Column(String(500))
+    sent_at = Column(DateTime)
+
+    def to_dict(self):
+        """Returns a dictionary representation of the outbox entry"""
+        return {
+            'id': self.id,
+            'recipient': self.recipient,
+            'subject': self.subject,
+            'status': self.status,
+            'attempts': self.attempts,
+            'next_attempt_at': self.next_attempt_at.isoformat() if self.next_attempt_at else None,
+            'last_error': self.last_error,
+            'sent_at': self.sent_at.isoformat() if self.sent_at else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
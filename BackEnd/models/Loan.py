@@ -2,7 +2,7 @@
 """Loan Class"""
 
 
-from sqlalchemy import Float, String, ForeignKey, DateTime, Column, Integer
+from sqlalchemy import Float, String, ForeignKey, DateTime, Column, Integer, Index
 from sqlalchemy.orm import relationship
 from BackEnd.models.base_model import BaseModel, Base
 from datetime import datetime
@@ -11,6 +11,10 @@ from datetime import datetime
 class Loan(BaseModel, Base):
     """Loan Model"""
     __tablename__ = 'loans'
+    __table_args__ = (
+        # Overdue detection: active loans past their end date
+        Index('idx_loans_status_end_date', 'loan_status', 'end_date'),
+    )
 
     admin_id = Column(String(60), ForeignKey('users.id'), nullable=False)
     account_id = Column(String(60), ForeignKey('accounts.id'), nullable=False)
@@ -23,6 +27,9 @@ class Loan(BaseModel, Base):
     credit_score = Column(Integer, default=0)  # AI-calculated credit score
 
     repayments = relationship("Repayment", backref="loan", cascade="all, delete, delete-orphan")
+    installments = relationship("LoanInstallment", backref="loan",
+                                cascade="all, delete, delete-orphan",
+                                order_by="LoanInstallment.installment_number")
 
     def to_dict(self):
         """Returns a dictionary representation of the Loan model"""
@@ -43,8 +50,19 @@ class Loan(BaseModel, Base):
             'credit_score': self.credit_score
         }
 
-        # Add account information if it's loaded
-        if hasattr(self, 'account') and self.account is not None:
-            loan_dict['account'] = self.account.to_dict()
+        # Add account and owner information only if they were preloaded
+        # (see LoanController.loan_listing_options); touching them here would
+        # cost a query per loan
+        account = self.loaded('account')
+        if account is not None:
+            loan_dict['account'] = account.to_dict()
+            owner = account.loaded('User')
+            if owner is not None:
+                loan_dict['account']['user'] = {
+                    'id': owner.id,
+                    'fullname': owner.fullname,
+                    'email': owner.email,
+                    'phone_number': owner.phone_number
+                }
 
         return loan_dict
@@ -0,0 +1,33 @@
+#!/usr/bin/python3
+"""LoanDelinquency Class"""
+
+from sqlalchemy import Float, String, ForeignKey, Date, Column, Integer, Index
+from BackEnd.models.base_model import BaseModel, Base
+
+
+class LoanDelinquency(BaseModel, Base):
+    """Daily snapshot row for a loan that is past its end date"""
+    __tablename__ = 'loan_delinquency'
+    __table_args__ = (
+        Index('idx_loan_delinquency_date_bucket', 'snapshot_date', 'bucket'),
+        Index('idx_loan_delinquency_loan_date', 'loan_id', 'snapshot_date', unique=True),
+    )
+
+    loan_id = Column(String(60), ForeignKey('loans.id'), nullable=False)
+    account_id = Column(String(60), ForeignKey('accounts.id'), nullable=False)
+    snapshot_date = Column(Date, nullable=False)
+    days_past_due = Column(Integer, nullable=False)
+    bucket = Column(String(10), nullable=False)  # '1-30', '31-60', '61-90', '90+'
+    outstanding_amount = Column(Float, nullable=False, default=0.0)
+
+    def to_dict(self):
+        """Returns a dictionary representation of the snapshot row"""
+        return {
+            'id': self.id,
+            'loan_id': self.loan_id,
+            'account_id': self.account_id,
+            'snapshot_date': self.snapshot_date.isoformat() if self.snapshot_date else None,
+            'days_past_due': self.days_past_due,
+            'bucket': self.bucket,
+            'outstanding_amount': float(self.outstanding_amount or 0.0)
+        }
@@ -0,0 +1,40 @@
+#!/usr/bin/python3
+"""LoanInstallment Class"""
+
+from sqlalchemy import Float, String, ForeignKey, DateTime, Column, Integer, Index
+from BackEnd.models.base_model import BaseModel, Base
+
+
+class LoanInstallment(BaseModel, Base):
+    """One installment of a loan's amortization schedule"""
+    __tablename__ = 'loan_installments'
+    __table_args__ = (
+        Index('idx_loan_installments_loan_number', 'loan_id', 'installment_number'),
+        Index('idx_loan_installments_status_due', 'status', 'due_date'),
+    )
+
+    loan_id = Column(String(60), ForeignKey('loans.id'), nullable=False)
+    installment_number = Column(Integer, nullable=False)
+    due_date = Column(DateTime, nullable=False)
+    principal = Column(Float, nullable=False)
+    interest = Column(Float, nullable=False)
+    amount_paid = Column(Float, default=0.0, nullable=False)
+    status = Column(String(20), default='pending', nullable=False)  # 'pending', 'partial', 'paid'
+
+    @property
+    def amount_due(self):
+        """Total amount (principal + interest) due for this installment"""
+        return self.principal + self.interest
+
+    def to_dict(self):
+        """Returns a dictionary representation of the installment"""
+        return {
+            'id': self.id,
+            'loan_id': self.loan_id,
+            'installment_number': self.installment_number,
+            'due_date': self.due_date.isoformat() if self.due_date else None,
+            'principal': float(self.principal),
+            'interest': float(self.interest),
+            'amount_paid': float(self.amount_paid or 0.0),
+            'status': self.status
+        }
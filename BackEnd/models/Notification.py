@@ -3,7 +3,7 @@
 Notification model
 """
 from .base_model import BaseModel, Base
-from sqlalchemy import Column, String, ForeignKey, Boolean
+from sqlalchemy import Column, String, ForeignKey, Boolean, Index
 
 
 class Notification(BaseModel, Base):
@@ -11,6 +11,9 @@ class Notification(BaseModel, Base):
     Representation of a notification
     """
     __tablename__ = 'notifications'
+    __table_args__ = (
+        Index('idx_notifications_user_read', 'user_id', 'is_read'),
+    )
     user_id = Column(String(60), ForeignKey('users.id'), nullable=False)
     message = Column(String(255), nullable=False)
     is_read = Column(Boolean, default=False, nullable=False)
@@ -1,7 +1,7 @@
 #!/usr/bin/python3
 """Repayment Class"""
 
-from sqlalchemy import Float, String, ForeignKey, Column
+from sqlalchemy import Float, String, ForeignKey, Column, Index
 from sqlalchemy.orm import relationship
 
 from BackEnd.models.base_model import BaseModel, Base
@@ -10,6 +10,11 @@ from BackEnd.models.base_model import BaseModel, Base
 class Repayment(BaseModel, Base):
     """Repayment Model"""
     __tablename__ = 'repayments'
+    __table_args__ = (
+        # Keyset pagination on (created_at, id), per loan and overall
+        Index('idx_repayments_loan_created', 'loan_id', 'created_at', 'id'),
+        Index('idx_repayments_created', 'created_at', 'id'),
+    )
 
     loan_id = Column(String(60), ForeignKey('loans.id'), nullable=False)
     amount = Column(Float, nullable=False)
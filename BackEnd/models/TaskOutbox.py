@@ -0,0 +1,35 @@
+#!/usr/bin/python3
+"""TaskOutbox Class"""
+
+from sqlalchemy import String, Text, DateTime, Column, Integer, Index
+from BackEnd.models.base_model import BaseModel, Base
+from datetime import datetime
+
+
+class TaskOutbox(BaseModel, Base):
+    """Deferred side effect waiting for, or already through, the task runner"""
+    __tablename__ = 'task_outbox'
+    __table_args__ = (
+        Index('idx_task_outbox_status_next', 'status', 'next_attempt_at'),
+    )
+
+    name = Column(String(60), nullable=False)
+    payload = Column(Text, nullable=False)  # JSON keyword arguments of the task
+    status = Column(String(20), nullable=False, default='pending')  # 'pending', 'running', 'done', 'failed'
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    last_error = Column(String(500))
+    finished_at = Column(DateTime)
+
+    def to_dict(self):
+        """Returns a dictionary representation of the task"""
+        return {
+            'id': self.id,
+            'name': self.name,
+            'status': self.status,
+            'attempts': self.attempts,
+            'next_attempt_at': self.next_attempt_at.isoformat() if self.next_attempt_at else None,
+            'last_error': self.last_error,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
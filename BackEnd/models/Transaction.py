@@ -2,7 +2,7 @@
 """Transaction Class"""
 
 from BackEnd.models.base_model import BaseModel, Base
-from sqlalchemy import Column, String, Float, DateTime, ForeignKey
+from sqlalchemy import Column, String, Float, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 
@@ -10,6 +10,13 @@ from datetime import datetime, timezone
 class Transaction(BaseModel, Base):
     """Transaction Model"""
     __tablename__ = 'transactions'
+    __table_args__ = (
+        # Keyset pagination on (created_at, id), per account and overall
+        Index('idx_transactions_account_created', 'account_id', 'created_at', 'id'),
+        Index('idx_transactions_created', 'created_at', 'id'),
+        # Repayment transactions of an account
+        Index('idx_transactions_account_repayment', 'account_id', 'repayment_id'),
+    )
 
 
     repayment_id = Column(String(60), ForeignKey('repayments.id'))
@@ -17,3 +24,8 @@ class Transaction(BaseModel, Base):
     amount = Column(Float, nullable=False)
     transaction_type = Column(String(50), nullable=False)
     description = Column(String(255))
+    # Account balance right after this transaction was posted. Set on every
+    # row written by TransactionController.post(); NULL on records that do
+    # not move the balance (create_transaction) and on rows from before the
+    # column existed that add_balance_history did not back-fill
+    balance_after = Column(Float)
@@ -1,6 +1,7 @@
 from datetime import datetime, timezone
 from os import getenv
 import sqlalchemy
+import BackEnd.models
 from sqlalchemy import Column, String, DateTime
 from sqlalchemy.ext.declarative import declarative_base
 import uuid
@@ -21,7 +22,7 @@ class BaseModel:
     if storage_t == "db":
         id = Column(String(60), primary_key=True)
         created_at = Column(DateTime, default=datetime.now(timezone.utc), nullable=False)
-        updated_at = Column(DateTime, default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc), nullable=False)
+        updated_at = Column(DateTime, default=datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc), nullable=False)
 
     def __init__(self, *args, **kwargs):
         """Initialization of the base model"""
@@ -48,6 +49,13 @@ class BaseModel:
         """String representation of the BaseModel class"""
         return "[{:s}] ({:s}) {}".format(self.__class__.__name__, self.id, self.__dict__)
 
+    def loaded(self, name):
+        """
+        Value of a relationship if it is already loaded (eagerly or by an
+        earlier access), else None; never issues a query
+        """
+        return self.__dict__.get(name)
+
     def save(self):
         """updates the attribute 'updated_at' with the current datetime"""
         self.updated_at = datetime.now(timezone.utc)
@@ -80,6 +88,11 @@ class BaseModel:
         new_dict["__class__"] = self.__class__.__name__
         if "_sa_instance_state" in new_dict:
             del new_dict["_sa_instance_state"]
+        # Relationships that happen to be loaded hold model objects; models
+        # that expose them add them explicitly
+        for key, value in list(new_dict.items()):
+            if isinstance(value, (BaseModel, list)):
+                del new_dict[key]
         if save_fs is None:
             if "password" in new_dict:
                 del new_dict["password"]
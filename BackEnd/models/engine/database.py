@@ -2,30 +2,106 @@
 """
 Contains the class DBStorage
 """
+import logging
+from contextlib import contextmanager
 from datetime import datetime
 
 import BackEnd.models
 from BackEnd.models.base_model import Base
 from os import getenv
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, insert, select, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy.pool import StaticPool
 from BackEnd.models.base_model import BaseModel
 from BackEnd.models.user import User
 from BackEnd.models.Account import Account
+from BackEnd.models.AccountBalanceDaily import AccountBalanceDaily
+from BackEnd.models.DataVersion import DataVersion
 from BackEnd.models.Loan import Loan
+from BackEnd.models.LoanInstallment import LoanInstallment
+from BackEnd.models.LoanDelinquency import LoanDelinquency
+from BackEnd.models.DelinquencySweep import DelinquencySweep
+from BackEnd.models.EmailOutbox import EmailOutbox
+from BackEnd.models.TaskOutbox import TaskOutbox
 from BackEnd.models.Notification import Notification
 from BackEnd.models.otp import OTP
 from BackEnd.models.Telebirr import Telebirr
 from BackEnd.models.Repayment import Repayment
+from BackEnd.models.Stripe import StripePayment
 from BackEnd.models.Transaction import Transaction
 
+logger = logging.getLogger(__name__)
+
 classes = {"BaseModel": BaseModel, "User": User,
                                                 "Account" : Account, "Loan" : Loan,
                                                 "Repayment" : Repayment, "Transaction" : Transaction,
-           "Notification" : Notification, "OTP" : OTP, "Telebirr" : Telebirr}
+           "Notification" : Notification, "OTP" : OTP, "Telebirr" : Telebirr,
+           "LoanInstallment" : LoanInstallment, "LoanDelinquency" : LoanDelinquency,
+           "EmailOutbox" : EmailOutbox, "AccountBalanceDaily" : AccountBalanceDaily,
+           "TaskOutbox" : TaskOutbox, "DelinquencySweep" : DelinquencySweep,
+           "StripePayment" : StripePayment}
+
+
+
+def _count_commit(session):
+    """Counts the commits of each session, see DBStorage.commit_count"""
+    session.info['commits'] = session.info.get('commits', 0) + 1
+
+
+def _track_flush(session, flush_context):
+    """Remember the tables an ORM flush wrote to"""
+    written = session.info.setdefault('written_tables', set())
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        table = getattr(obj, '__tablename__', None)
+        if table:
+            written.add(table)
+
 
+def _track_execute(orm_execute_state):
+    """Remember the table of a bulk INSERT, UPDATE or DELETE"""
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, 'table', None)
+        if table is not None:
+            orm_execute_state.session.info.setdefault('written_tables', set()).add(table.name)
 
 
+def _bump_versions(session):
+    """
+    Bump the data_versions counter of every table the commit changed, in a
+    short transaction of its own so the counters are never held locked
+    while a business transaction runs
+    """
+    written = session.info.pop('written_tables', None)
+    written = written and written - {DataVersion.__tablename__}
+    if not written:
+        return
+    versions = DataVersion.__table__
+    try:
+        with session.get_bind().begin() as connection:
+            connection.execute(update(versions).where(
+                versions.c.table_name.in_(written)
+            ).values(version=versions.c.version + 1))
+            missing = written - set(connection.execute(select(versions.c.table_name).where(
+                versions.c.table_name.in_(written))).scalars())
+            for table in missing:
+                try:
+                    with connection.begin_nested():
+                        connection.execute(insert(versions).values(table_name=table, version=1))
+                except IntegrityError:
+                    # Another writer created it first
+                    connection.execute(update(versions).where(
+                        versions.c.table_name == table
+                    ).values(version=versions.c.version + 1))
+    except SQLAlchemyError:
+        logger.exception("Could not bump data versions of %s", sorted(written))
+
+
+def _forget_writes(session, previous_transaction):
+    """Rolled back writes change nothing"""
+    if previous_transaction.parent is None:
+        session.info.pop('written_tables', None)
+
 
 class DBStorage:
     """interaacts with the MySQL database"""
@@ -38,15 +114,32 @@ class DBStorage:
         MFS_HOST = getenv('MFS_HOST')
         MFS_DB = getenv('MFS_DB')
         MFS_ENV = getenv('MFS_ENV')
-        self.__engine = create_engine('mysql+pymysql://{}:{}@{}/{}'.
-                                      format(MFS_USER,
-                                             MFS_PWD,
-                                             MFS_HOST,
-                                             MFS_DB))
+        # MFS_DB_URL overrides the MySQL settings (e.g. sqlite for benchmarks)
+        MFS_DB_URL = getenv('MFS_DB_URL')
+        if MFS_DB_URL in ('sqlite://', 'sqlite:///:memory:'):
+            # One connection shared by every thread, or each thread would
+            # see its own empty in-memory database
+            self.__engine = create_engine(MFS_DB_URL, poolclass=StaticPool,
+                                          connect_args={'check_same_thread': False})
+        elif MFS_DB_URL:
+            self.__engine = create_engine(MFS_DB_URL)
+        else:
+            self.__engine = create_engine('mysql+pymysql://{}:{}@{}/{}'.
+                                          format(MFS_USER,
+                                                 MFS_PWD,
+                                                 MFS_HOST,
+                                                 MFS_DB))
 
         if MFS_ENV == "test":
             Base.metadata.drop_all(self.__engine)
 
+        # Tables are created by migrations/create_tables.py before the API
+        # starts; sqlite databases (tests, benchmarks) still get them on
+        # reload(), as does any database with MFS_CREATE_ALL=1
+        sqlite = (MFS_DB_URL or '').startswith('sqlite')
+        default = '1' if MFS_ENV == "test" or sqlite else '0'
+        self.__create_all = getenv('MFS_CREATE_ALL', default) == '1'
+
     def all(self, cls=None):
         """query on the current database session"""
         new_dict = {}
@@ -61,14 +154,70 @@ class DBStorage:
         """Returning or Exposing self.__session"""
         return self.__session
 
+    def engine(self):
+        """Returning or Exposing self.__engine"""
+        return self.__engine
+
     def new(self, obj):
         """add the object to the current database session"""
         self.__session.add(obj)
 
     def save(self):
-        """commit all changes of the current database session"""
+        """
+        commit all changes of the current database session; inside
+        transaction() the commit is left to the outermost scope
+        """
+        if self.__session.info.get('uow_depth'):
+            return
         self.__session.commit()
 
+    @contextmanager
+    def transaction(self):
+        """
+        Unit of work: save() calls made inside the block, including those of
+        nested controller calls and nested transaction() blocks, are deferred
+        and the outermost block commits once, flushing every change together.
+        An exception rolls the whole unit back, as does a Rollback() made
+        inside it even if the error was then handled.
+        """
+        info = self.__session.info
+        depth = info.get('uow_depth', 0)
+        if not depth:
+            info['uow_rollback'] = False
+        info['uow_depth'] = depth + 1
+        try:
+            yield self
+        except BaseException:
+            info['uow_depth'] = depth
+            if not depth:
+                self.__session.rollback()
+            raise
+        info['uow_depth'] = depth
+        if not depth:
+            if info.pop('uow_rollback'):
+                self.__session.rollback()
+            else:
+                self.__session.commit()
+
+    def commit_count(self):
+        """Commits made by the current session since reset_commit_count()"""
+        return self.__session.info.get('commits', 0)
+
+    def reset_commit_count(self):
+        """Start counting commits of the current session from zero"""
+        self.__session.info['commits'] = 0
+
+    def table_versions(self, *models):
+        """
+        Write counters of the models' tables, read by primary key in one
+        query; they change after every commit that wrote to a table
+        """
+        names = [model.__tablename__ for model in models]
+        rows = self.__session.query(DataVersion.table_name, DataVersion.version).filter(
+            DataVersion.table_name.in_(names)
+        ).all()
+        return tuple(sorted(rows))
+
     def delete(self, obj=None):
         """delete from the current database session obj if not None"""
         if obj is not None:
@@ -76,17 +225,30 @@ class DBStorage:
 
     def reload(self):
         """reloads data from the database"""
-        Base.metadata.create_all(self.__engine)
+        if self.__create_all:
+            self.create_all()
         sess_factory = sessionmaker(bind=self.__engine, expire_on_commit=False)
+        event.listen(sess_factory, 'after_commit', _count_commit)
+        event.listen(sess_factory, 'after_flush', _track_flush)
+        event.listen(sess_factory, 'do_orm_execute', _track_execute)
+        event.listen(sess_factory, 'after_commit', _bump_versions)
+        event.listen(sess_factory, 'after_soft_rollback', _forget_writes)
         Session = scoped_session(sess_factory)
         self.__session = Session
 
+    def create_all(self):
+        """Create the tables that do not exist yet"""
+        Base.metadata.create_all(self.__engine)
+
     def close(self):
         """call remove() method on the private session attribute"""
         self.__session.remove()
 
     def Rollback(self):
         """Call Rallback"""
+        if self.__session.info.get('uow_depth'):
+            # The enclosing transaction() must not commit what is left
+            self.__session.info['uow_rollback'] = True
         self.__session.rollback()
 
     def get(self, cls, id):
@@ -97,12 +259,9 @@ class DBStorage:
         if cls not in classes.values():
             return None
 
-        all_cls = BackEnd.models.storage.all(cls)
-        for value in all_cls.values():
-            if (value.id == id):
-                return value
-
-        return None
+        # Primary key lookup; returns the identity-map copy without a query
+        # when the object is already loaded
+        return self.__session.get(cls, id)
 
     def count(self, cls=None):
         """
@@ -136,7 +295,7 @@ class DBStorage:
             
             self.__session.commit()
         except Exception as e:
-            print(f"Error cleaning up expired sessions: {e}")
+            logger.exception("Error cleaning up expired sessions")
             self.__session.rollback()
 
 
@@ -3,67 +3,303 @@
 Contains the FileStorage class
 """
 
+import heapq
 import json
-import BackEnd.models
+import os
+from contextlib import contextmanager
+from datetime import date, datetime
+from sqlalchemy import Column, Date, DateTime
+from BackEnd.models.base_model import BaseModel
+from BackEnd.models.engine.snapshot import Snapshot, is_snapshot, write_snapshot
 from BackEnd.models.user import User
+from BackEnd.models.Account import Account
+from BackEnd.models.AccountBalanceDaily import AccountBalanceDaily
+from BackEnd.models.Loan import Loan
+from BackEnd.models.LoanInstallment import LoanInstallment
+from BackEnd.models.LoanDelinquency import LoanDelinquency
+from BackEnd.models.DelinquencySweep import DelinquencySweep
+from BackEnd.models.EmailOutbox import EmailOutbox
+from BackEnd.models.TaskOutbox import TaskOutbox
+from BackEnd.models.Notification import Notification
+from BackEnd.models.otp import OTP
+from BackEnd.models.Telebirr import Telebirr
+from BackEnd.models.Repayment import Repayment
+from BackEnd.models.Stripe import StripePayment
+from BackEnd.models.Transaction import Transaction
 
-classes = {"User": User}
+classes = {"BaseModel": BaseModel, "User": User,
+           "Account": Account, "Loan": Loan,
+           "Repayment": Repayment, "Transaction": Transaction,
+           "Notification": Notification, "OTP": OTP, "Telebirr": Telebirr,
+           "LoanInstallment": LoanInstallment, "LoanDelinquency": LoanDelinquency,
+           "EmailOutbox": EmailOutbox, "AccountBalanceDaily": AccountBalanceDaily,
+           "TaskOutbox": TaskOutbox, "DelinquencySweep": DelinquencySweep,
+           "StripePayment": StripePayment}
+
+# Fields find() looks up through a hash index instead of a scan
+INDEXED_FIELDS = {"User": ("email", "session_id", "username"),
+                  "Account": ("user_id", "account_number"),
+                  "Loan": ("account_id",),
+                  "Transaction": ("account_id",)}
+# The log is folded into the snapshot once it holds at least this many
+# entries and more entries than there are objects
+COMPACT_MIN_ENTRIES = int(os.getenv("MFS_FILE_COMPACT_MIN_ENTRIES", "10000"))
+
+_date_fields = {}
+
+
+def _to_json(obj):
+    """Every attribute of obj, as BaseModel.to_dict returns them for saving"""
+    # Models' own to_dict methods shape API responses instead
+    return BaseModel.to_dict(obj, save_fs=1)
+
+
+def _record(obj):
+    """obj as a compact JSON snapshot record"""
+    return json.dumps(_to_json(obj), default=_encode, separators=(",", ":")).encode("utf-8")
+
+
+def _encode(value):
+    """json.dumps default: dates as ISO strings"""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+def model_columns(cls):
+    """Attribute name -> Column of a model, mapped or not"""
+    table = getattr(cls, "__table__", None)
+    if table is not None:
+        return {column.key: column for column in table.columns}
+    columns = {}
+    for klass in reversed(cls.__mro__):
+        for name, value in vars(klass).items():
+            if isinstance(value, Column):
+                columns[name] = value
+    return columns
+
+
+def date_columns(cls):
+    """Date and DateTime columns of cls other than created_at/updated_at"""
+    fields = _date_fields.get(cls)
+    if fields is None:
+        fields = {}
+        for name, column in model_columns(cls).items():
+            if isinstance(column.type, (Date, DateTime)):
+                fields[name] = datetime if isinstance(column.type, DateTime) else date
+        for name in ("created_at", "updated_at"):
+            fields.pop(name, None)
+        _date_fields[cls] = fields
+    return fields
 
 
 class FileStorage:
-    """serializes instances to a JSON file & deserializes back to instances"""
+    """
+    serializes instances to a JSON file & deserializes back to instances.
 
-    # string - path to the JSON file
-    __file_path = "file.json"
-    # dictionary - empty but will store all objects by <class name>.id
-    __objects = {}
+    file.json is a binary snapshot of every object (see snapshot.py) that
+    is memory-mapped at startup; objects are decoded from it only when
+    first asked for. Saves append only the objects passed to new() or
+    delete() since the last save to file.json.log, one JSON line each, and
+    the log is periodically compacted into a new snapshot. Objects changed
+    in place must be passed to new() again (BaseModel.save() does this) to
+    be written. A legacy JSON file.json is read whole and replaced by a
+    snapshot at the first compaction.
+    """
+
+    def __init__(self, file_path="file.json", indexes=None):
+        """
+        Args:
+            file_path: Snapshot file; the log is kept next to it
+            indexes: Indexed fields per class name, defaults to INDEXED_FIELDS
+        """
+        # string - path to the JSON file
+        self.__file_path = file_path
+        self.__log_path = file_path + ".log"
+        self.__snapshot = None
+        # dictionary - empty but will store all objects by <class name>.id
+        self.__objects = {}
+        # class name -> {<class name>.id: obj}
+        self.__by_class = {name: {} for name in classes}
+        # classes whose snapshot objects have all been decoded
+        self.__loaded = set()
+        self.__indexed_fields = indexes if indexes is not None else INDEXED_FIELDS
+        # class name -> field -> value -> set of keys
+        self.__indexes = {}
+        # key -> values the object was indexed under
+        self.__indexed_values = {}
+        # keys added or deleted since the snapshot was written
+        self.__changed = set()
+        self.__tombstones = set()
+        # keys written or deleted since the last save
+        self.__dirty = set()
+        self.__deleted = set()
+        self.__log_entries = 0
+        self.__disk_state = None
+        # Nesting of transaction() blocks
+        self.__depth = 0
 
     def all(self, cls=None):
         """returns the dictionary __objects"""
         if cls is not None:
-            new_dict = {}
-            for key, value in self.__objects.items():
-                if cls == value.__class__ or cls == value.__class__.__name__:
-                    new_dict[key] = value
-            return new_dict
+            name = cls if isinstance(cls, str) else cls.__name__
+            self.__load_class(name)
+            return dict(self.__by_class.get(name, {}))
+        for name in classes:
+            self.__load_class(name)
         return self.__objects
 
     def new(self, obj):
-        """sets in __objects the obj with key <obj class name>.id"""
+        """
+        sets in __objects the obj with key <obj class name>.id and marks it
+        to be written by the next save()
+        """
         if obj is not None:
             key = obj.__class__.__name__ + "." + obj.id
-            self.__objects[key] = obj
+            self.__add(key, obj)
+            self.__changed.add(key)
+            self.__tombstones.discard(key)
+            self.__dirty.add(key)
+            self.__deleted.discard(key)
 
     def save(self):
-        """serializes __objects to the JSON file (path: __file_path)"""
-        json_objects = {}
-        for key in self.__objects:
-            if key == "password":
-                json_objects[key].decode()
-            json_objects[key] = self.__objects[key].to_dict(save_fs=1)
-        with open(self.__file_path, 'w') as f:
-            json.dump(json_objects, f)
+        """
+        appends the objects changed since the last save to the log; inside
+        transaction() they are left for the outermost block to append
+        """
+        if self.__depth or (not self.__dirty and not self.__deleted):
+            return
+        lines = []
+        for key in self.__dirty:
+            obj = self.__objects.get(key)
+            if obj is not None:
+                lines.append(json.dumps({"key": key, "obj": _to_json(obj)}, default=_encode))
+        for key in self.__deleted:
+            lines.append(json.dumps({"key": key, "obj": None}))
+        with open(self.__log_path, 'a') as f:
+            f.write("\n".join(lines) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.__dirty.clear()
+        self.__deleted.clear()
+        self.__log_entries += len(lines)
+        if self.__log_entries >= max(COMPACT_MIN_ENTRIES, self.count()):
+            self.compact()
+        else:
+            self.__disk_state = self.__stat()
+
+    @contextmanager
+    def transaction(self):
+        """
+        Unit of work, as DBStorage.transaction(): the outermost block appends
+        everything changed inside it to the log in one write; if it raised,
+        every unsaved change is rolled back instead
+        """
+        depth = self.__depth
+        self.__depth = depth + 1
+        try:
+            yield self
+        except BaseException:
+            self.__depth = depth
+            if not depth:
+                self.Rollback()
+            raise
+        self.__depth = depth
+        if not depth:
+            self.save()
+
+    def Rollback(self):
+        """discards every change not yet saved by reloading from disk"""
+        self.reload()
+
+    def compact(self):
+        """writes a new snapshot with every object and empties the log"""
+        changed = sorted(
+            (key, _record(self.__objects[key])) for key in self.__changed if key in self.__objects
+        )
+        if self.__snapshot is not None:
+            # Untouched objects are copied over without being decoded
+            kept = ((key, record) for key, record in self.__snapshot
+                    if key not in self.__changed and key not in self.__tombstones)
+            entries = heapq.merge(kept, changed)
+        else:
+            entries = changed
+        tmp_path = self.__file_path + ".tmp"
+        write_snapshot(tmp_path, entries)
+        if self.__snapshot is not None:
+            self.__snapshot.close()
+        os.replace(tmp_path, self.__file_path)
+        self.__snapshot = Snapshot(self.__file_path)
+        # Pending changes are part of the snapshot now
+        self.__changed.clear()
+        self.__tombstones.clear()
+        self.__dirty.clear()
+        self.__deleted.clear()
+        with open(self.__log_path, 'w'):
+            pass
+        self.__log_entries = 0
+        self.__disk_state = self.__stat()
 
     def reload(self):
-        """deserializes the JSON file to __objects"""
+        """maps the snapshot, then replays the log over it"""
+        if self.__snapshot is not None:
+            self.__snapshot.close()
+            self.__snapshot = None
+        self.__objects = {}
+        self.__by_class = {name: {} for name in classes}
+        self.__loaded = set()
+        self.__indexes = {}
+        self.__indexed_values = {}
+        self.__changed.clear()
+        self.__tombstones.clear()
+        self.__dirty.clear()
+        self.__deleted.clear()
+        self.__log_entries = 0
+        if is_snapshot(self.__file_path):
+            self.__snapshot = Snapshot(self.__file_path)
+        else:
+            try:
+                with open(self.__file_path, 'r') as f:
+                    jo = json.load(f)
+            except (OSError, ValueError):
+                jo = {}
+            for key, value in jo.items():
+                self.__load(key, value)
+                self.__changed.add(key)
+            self.__loaded.update(classes)
         try:
-            with open(self.__file_path, 'r') as f:
-                jo = json.load(f)
-            for key in jo:
-                self.__objects[key] = classes[jo[key]["__class__"]](**jo[key])
-        except:
+            with open(self.__log_path, 'r') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # A write cut short by a crash; nothing follows it
+                        break
+                    self.__log_entries += 1
+                    key = entry["key"]
+                    if entry["obj"] is None:
+                        self.__discard(key)
+                    else:
+                        self.__load(key, entry["obj"])
+                        self.__changed.add(key)
+                        self.__tombstones.discard(key)
+        except OSError:
             pass
+        self.__disk_state = self.__stat()
 
     def delete(self, obj=None):
         """delete obj from __objects if it’s inside"""
         if obj is not None:
             key = obj.__class__.__name__ + '.' + obj.id
             if key in self.__objects:
-                del self.__objects[key]
+                self.__discard(key)
+                self.__dirty.discard(key)
+                self.__deleted.add(key)
 
     def close(self):
-        """call reload() method for deserializing the JSON file to objects"""
-        self.reload()
+        """call reload() method if another process changed the files"""
+        if self.__stat() != self.__disk_state:
+            self.reload()
 
     def get(self, cls, id):
         """
@@ -73,13 +309,11 @@ class FileStorage:
         if cls not in classes.values():
             return None
 
-        all_cls = BackEnd.models.storage.all(cls)
-        for value in all_cls.values():
-            if (value.id == id):
-                return value
-
-        return None
-
+        key = cls.__name__ + "." + str(id)
+        obj = self.__objects.get(key)
+        if obj is None and self.__in_snapshot(key):
+            obj = self.__load(key, json.loads(self.__snapshot.record(self.__snapshot.find(key))))
+        return obj
 
     def find(self, cls, **kwargs):
         """
@@ -91,34 +325,114 @@ class FileStorage:
         if not kwargs:
             return None
 
-        filtered_objs = []
-        all_objs = self.all(cls)
+        name = cls.__name__
+        self.__load_class(name)
+        candidates = None
+        for field, value in kwargs.items():
+            index = self.__indexes.get(name, {}).get(field)
+            if index is not None and value is not None:
+                candidates = [self.__objects[key] for key in index.get(value, ())]
+                break
+        if candidates is None:
+            candidates = self.__by_class.get(name, {}).values()
 
-        for obj in all_objs.values():
-            match = True
-            for key, value in kwargs.items():
-                if not hasattr(obj, key) or getattr(obj, key) != value:
-                    match = False
-                    break
-            if match:
-                filtered_objs.append(obj)
+        for obj in candidates:
+            if all(getattr(obj, key, None) == value for key, value in kwargs.items()):
+                return obj
+        return None
 
-        return filtered_objs[0] if filtered_objs else None
+    def count(self, cls=None):
+        """
+        count the number of objects in storage, without decoding them
+        """
+        if not cls:
+            return sum(self.count(name) for name in classes)
+        name = cls if isinstance(cls, str) else cls.__name__
+        objects = self.__by_class.get(name, {})
+        if self.__snapshot is None or name in self.__loaded:
+            return len(objects)
+        prefix = name + "."
+        in_snapshot = len(self.__snapshot.class_range(name))
+        deleted = sum(1 for key in self.__tombstones if key.startswith(prefix))
+        added = sum(1 for key in objects if self.__snapshot.find(key) is None)
+        return in_snapshot - deleted + added
 
+    def __in_snapshot(self, key):
+        """True if key is stored in the snapshot and was not deleted since"""
+        return (self.__snapshot is not None and key not in self.__tombstones
+                and self.__snapshot.find(key) is not None)
 
+    def __load_class(self, name):
+        """decodes every snapshot object of one class not decoded yet"""
+        if name in self.__loaded:
+            return
+        if self.__snapshot is not None:
+            for i in self.__snapshot.class_range(name):
+                key = self.__snapshot.key(i)
+                if key not in self.__objects and key not in self.__tombstones:
+                    self.__load(key, json.loads(self.__snapshot.record(i)))
+        self.__loaded.add(name)
 
+    def __load(self, key, value):
+        """builds an object from its dictionary and adds it"""
+        cls = classes.get(value.get("__class__"))
+        if cls is None:
+            return None
+        for field, kind in date_columns(cls).items():
+            if isinstance(value.get(field), str):
+                value[field] = kind.fromisoformat(value[field])
+        obj = cls(**value)
+        self.__add(key, obj)
+        return obj
 
-    def count(self, cls=None):
-        """
-        count the number of objects in storage
-        """
-        all_class = classes.values()
+    def __add(self, key, obj):
+        """adds obj under key and (re)indexes it"""
+        if key in self.__objects:
+            self.__unindex(key)
+        name = obj.__class__.__name__
+        self.__objects[key] = obj
+        self.__by_class.setdefault(name, {})[key] = obj
+        fields = self.__indexed_fields.get(name, ())
+        if fields:
+            values = {}
+            indexes = self.__indexes.setdefault(name, {})
+            for field in fields:
+                value = obj.__dict__.get(field)
+                if value is not None:
+                    indexes.setdefault(field, {}).setdefault(value, set()).add(key)
+                    values[field] = value
+            self.__indexed_values[key] = values
 
-        if not cls:
-            count = 0
-            for clas in all_class:
-                count += len(BackEnd.models.storage.all(clas).values())
-        else:
-            count = len(BackEnd.models.storage.all(cls).values())
+    def __discard(self, key):
+        """removes key from memory and hides it in the snapshot"""
+        if self.__in_snapshot(key):
+            self.__tombstones.add(key)
+        self.__changed.discard(key)
+        obj = self.__objects.pop(key, None)
+        if obj is not None:
+            self.__unindex(key)
+            self.__by_class.get(obj.__class__.__name__, {}).pop(key, None)
+
+    def __unindex(self, key):
+        """drops the index entries recorded for key"""
+        values = self.__indexed_values.pop(key, None)
+        if not values:
+            return
+        indexes = self.__indexes[key.split(".", 1)[0]]
+        for field, value in values.items():
+            keys = indexes[field].get(value)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del indexes[field][value]
 
-        return count
+    def __stat(self):
+        """size and modification time of the snapshot and the log"""
+        state = []
+        for path in (self.__file_path, self.__log_path):
+            try:
+                st = os.stat(path)
+                state.append((st.st_size, st.st_mtime_ns))
+            except OSError:
+                state.append(None)
+        return tuple(state)
@@ -3,73 +3,219 @@
 Contains the MongoStorage class for NoSQL storage using MongoDB
 """
 
-from pymongo import MongoClient
+from contextlib import contextmanager
+from datetime import date, datetime, time
 from os import getenv
-from BackEnd.models.user import User
-from BackEnd.models.Account import Account
+from pymongo import ASCENDING, DeleteOne, MongoClient, ReplaceOne
+from sqlalchemy import Index
+from BackEnd.models.base_model import BaseModel
+from BackEnd.models.engine.file_storage import classes, date_columns, model_columns
 
-classes = {"User": User, "Account": Account}
+# Documents fetched per round trip when streaming a collection
+BATCH_SIZE = int(getenv('MONGO_BATCH_SIZE', '1000'))
+
+
+def _document(obj):
+    """obj as a MongoDB document, keyed by _id"""
+    doc = {}
+    for key, value in obj.__dict__.items():
+        # Skip ORM state and loaded relationships
+        if key.startswith('_') or isinstance(value, (BaseModel, list)):
+            continue
+        if type(value) is date:
+            # BSON has no date type
+            value = datetime.combine(value, time.min)
+        doc[key] = value
+    doc['_id'] = doc.pop('id')
+    return doc
+
+
+def _index_specs(cls):
+    """
+    The indexes the model declares for SQL (Column index/unique flags and
+    __table_args__ Index entries) as (name, keys, unique) for MongoDB
+    """
+    specs = []
+    for name, column in model_columns(cls).items():
+        if name != 'id' and (column.index or column.unique):
+            specs.append((f"idx_{name}", [(name, ASCENDING)], bool(column.unique)))
+    for arg in getattr(cls, '__table_args__', ()):
+        if isinstance(arg, Index):
+            keys = [(getattr(e, 'name', e), ASCENDING) for e in arg.expressions]
+            keys = [('_id' if key == 'id' else key, order) for key, order in keys]
+            specs.append((arg.name, keys, bool(arg.unique)))
+    return specs
 
 
 class MongoStorage:
-    """Interacts with the MongoDB database"""
+    """
+    Interacts with the MongoDB database, one collection per model class.
 
-    def __init__(self):
-        """Initialize a new MongoStorage instance"""
+    Like a database session, new() and delete() are queued and written by
+    save() in one bulk_write per collection; Rollback() drops the queue.
+    Objects read from the database are copies, so changes must be passed to
+    new() again to be written.
+    """
+
+    def __init__(self, client=None):
+        """
+        Initialize a new MongoStorage instance
+        Args:
+            client: MongoClient to use instead of one built from MONGO_HOST,
+                MONGO_PORT and MONGO_DB
+        """
         MONGO_HOST = getenv('MONGO_HOST') or "localhost"
         MONGO_PORT = int(getenv('MONGO_PORT', 27017))  # Default port is 27017
         MONGO_DB = getenv('MONGO_DB') or "unidate"
 
-        self.client = MongoClient(MONGO_HOST, MONGO_PORT)
+        self.client = client or MongoClient(MONGO_HOST, MONGO_PORT)
         self.db = self.client[MONGO_DB]
+        # class name -> {id: obj} waiting to be written
+        self.__upserts = {}
+        # class name -> ids waiting to be deleted
+        self.__deletes = {}
+        # Nesting of transaction() blocks, and whether one rolled back
+        self.__depth = 0
+        self.__rolled_back = False
+
+    def _to_object(self, cls, doc):
+        """Rebuild a model object from its document"""
+        doc['id'] = doc.pop('_id')
+        for field, kind in date_columns(cls).items():
+            if kind is date and isinstance(doc.get(field), datetime):
+                doc[field] = doc[field].date()
+        obj = cls(**doc)
+        # BaseModel.__init__ only keeps timestamps given as strings
+        for field in ('created_at', 'updated_at'):
+            if field in doc:
+                setattr(obj, field, doc[field])
+        return obj
+
+    def stream(self, cls, batch_size=BATCH_SIZE, **filters):
+        """
+        Yields the objects of one class from a cursor, batch_size documents
+        per round trip, so a whole collection is never held at once
+        """
+        cursor = self.db[cls.__name__].find(filters, batch_size=batch_size)
+        for doc in cursor:
+            yield self._to_object(cls, doc)
+
+    def project(self, cls, fields, **filters):
+        """
+        Yields only some fields of the matching documents, as dictionaries
+        with "id" for "_id"; no objects are built
+        """
+        projection = {field: 1 for field in fields if field != 'id'}
+        if 'id' not in fields:
+            projection['_id'] = 0
+        for doc in self.db[cls.__name__].find(filters, projection, batch_size=BATCH_SIZE):
+            if '_id' in doc:
+                doc['id'] = doc.pop('_id')
+            yield doc
 
     def all(self, cls=None):
-        """Returns all objects of a certain class or all objects in the database"""
-        if cls:
-            cls_name = cls.__name__
-            return list(self.db[cls_name].find())  # Return all objects of that class
-        else:
-            # Return all objects for all classes
-            all_objects = {}
-            for cls_name in classes:
-                all_objects[cls_name] = list(self.db[cls_name].find())
-            return all_objects
+        """Returns a dictionary of <class name>.id -> object, like DBStorage"""
+        new_dict = {}
+        for clss in classes.values():
+            if cls is None or cls is clss or cls == clss.__name__:
+                for obj in self.stream(clss):
+                    new_dict[clss.__name__ + '.' + obj.id] = obj
+        return new_dict
 
     def new(self, obj):
-        """Adds a new object to the database"""
-        cls_name = obj.__class__.__name__
-        self.db[cls_name].insert_one(obj.to_dict())  # Convert object to dict before storing
+        """Queues obj to be inserted or replaced by the next save()"""
+        if obj is not None:
+            cls_name = obj.__class__.__name__
+            self.__deletes.get(cls_name, set()).discard(obj.id)
+            self.__upserts.setdefault(cls_name, {})[obj.id] = obj
 
     def save(self):
-        """No explicit save needed for MongoDB as it automatically writes"""
-        pass
+        """
+        Writes the queued changes with one bulk_write per collection; inside
+        transaction() they are left for the outermost block to write
+        """
+        if self.__depth:
+            return
+        for cls_name in set(self.__upserts) | set(self.__deletes):
+            operations = [ReplaceOne({'_id': obj.id}, _document(obj), upsert=True)
+                          for obj in self.__upserts.get(cls_name, {}).values()]
+            operations += [DeleteOne({'_id': id}) for id in self.__deletes.get(cls_name, ())]
+            if operations:
+                self.db[cls_name].bulk_write(operations, ordered=False)
+        self.Rollback()
+
+    def Rollback(self):
+        """Drops the changes queued since the last save()"""
+        if self.__depth:
+            self.__rolled_back = True
+        self.__upserts = {}
+        self.__deletes = {}
+
+    @contextmanager
+    def transaction(self):
+        """
+        Unit of work, as DBStorage.transaction(): the outermost block writes
+        everything queued inside it once, unless it raised or rolled back
+        """
+        depth = self.__depth
+        if not depth:
+            self.__rolled_back = False
+        self.__depth = depth + 1
+        try:
+            yield self
+        except BaseException:
+            self.__depth = depth
+            if not depth:
+                self.Rollback()
+            raise
+        self.__depth = depth
+        if not depth:
+            if self.__rolled_back:
+                self.Rollback()
+            else:
+                self.save()
 
     def delete(self, obj=None):
-        """Deletes an object from the database"""
+        """Queues obj to be deleted by the next save()"""
         if obj is not None:
             cls_name = obj.__class__.__name__
-            self.db[cls_name].delete_one({"_id": obj.id})
+            self.__upserts.get(cls_name, {}).pop(obj.id, None)
+            self.__deletes.setdefault(cls_name, set()).add(obj.id)
+
+    def reload(self):
+        """Ensures every collection has the indexes its model declares"""
+        for cls_name, cls in classes.items():
+            for name, keys, unique in _index_specs(cls):
+                self.db[cls_name].create_index(keys, name=name, unique=unique)
 
     def get(self, cls, id):
         """Returns an object based on the class and its ID"""
-        if cls is not None:
-            cls_name = cls.__name__
-            obj_data = self.db[cls_name].find_one({"_id": id})
-            if obj_data:
-                return classes[cls_name](**obj_data)  # Recreate the object from stored data
-        return None
+        if cls not in classes.values():
+            return None
+        doc = self.db[cls.__name__].find_one({"_id": id})
+        return self._to_object(cls, doc) if doc else None
+
+    def find(self, cls, **kwargs):
+        """
+        Finds the first object matching the given field values
+        """
+        if cls not in classes.values() or not kwargs:
+            return None
+        if 'id' in kwargs:
+            kwargs['_id'] = kwargs.pop('id')
+        doc = self.db[cls.__name__].find_one(kwargs)
+        return self._to_object(cls, doc) if doc else None
 
     def count(self, cls=None):
-        """Counts the number of objects in the database"""
+        """
+        Counts the number of objects in the database from collection
+        metadata, without scanning documents
+        """
         if cls:
-            cls_name = cls.__name__
-            return self.db[cls_name].count_documents({})
-        else:
-            total_count = 0
-            for cls_name in classes:
-                total_count += self.db[cls_name].count_documents({})
-            return total_count
+            cls_name = cls if isinstance(cls, str) else cls.__name__
+            return self.db[cls_name].estimated_document_count()
+        return sum(self.db[cls_name].estimated_document_count() for cls_name in classes)
 
     def close(self):
-        """Closes the MongoDB connection"""
-        self.client.close()
+        """Drops unsaved changes; the client's connection pool stays open"""
+        self.Rollback()
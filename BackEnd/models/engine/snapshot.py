@@ -0,0 +1,132 @@
+#!/usr/bin/python3
+"""
+Binary snapshot format used by FileStorage.
+
+A snapshot is written once and then only read, through mmap:
+
+    header   MAGIC, object count, offset of the keys, offset of the index
+    records  one compact JSON object per stored object
+    keys     "<class name>.<id>" keys, UTF-8
+    index    one INDEX_ENTRY per object, sorted by key: where its key and
+             its record are
+
+Opening a snapshot reads the header only; lookups binary-search the index
+and decode just the records asked for, and all objects of one class sit in
+one contiguous index range.
+"""
+import mmap
+import os
+import struct
+from typing import Iterable, Iterator, Optional, Tuple
+
+MAGIC = b"MFSSNAP1"
+# magic, count, keys offset, index offset
+HEADER = struct.Struct("<8sQQQ")
+# key offset, key length, record offset, record length
+INDEX_ENTRY = struct.Struct("<QIQI")
+
+
+def is_snapshot(path: str) -> bool:
+    """True if path holds a binary snapshot rather than legacy JSON"""
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def write_snapshot(path: str, entries: Iterable[Tuple[str, bytes]]):
+    """
+    Write a snapshot, streaming the records
+    Args:
+        path: Destination; callers write to a temporary file and rename it
+        entries: (key, record) pairs in key order
+    """
+    keys = []
+    record_spans = []
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, 0, 0, 0))
+        offset = HEADER.size
+        for key, record in entries:
+            f.write(record)
+            keys.append(key.encode("utf-8"))
+            record_spans.append((offset, len(record)))
+            offset += len(record)
+        keys_offset = offset
+        key_offsets = []
+        for key in keys:
+            f.write(key)
+            key_offsets.append(offset)
+            offset += len(key)
+        f.write(b"".join(
+            INDEX_ENTRY.pack(key_offset, len(key), record_offset, record_length)
+            for key, key_offset, (record_offset, record_length)
+            in zip(keys, key_offsets, record_spans)))
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, len(keys), keys_offset, offset))
+        f.flush()
+        os.fsync(f.fileno())
+
+
+class Snapshot:
+    """
+    A read-only, memory-mapped snapshot
+    """
+
+    def __init__(self, path: str):
+        """Map the file and read its header"""
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, _, self._index_offset = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a snapshot")
+
+    def close(self):
+        """Unmap the file"""
+        self._map.close()
+        self._file.close()
+
+    def _entry(self, i: int) -> Tuple[int, int, int, int]:
+        """Index entry i"""
+        return INDEX_ENTRY.unpack_from(self._map, self._index_offset + i * INDEX_ENTRY.size)
+
+    def key(self, i: int) -> str:
+        """Key of entry i"""
+        key_offset, key_length, _, _ = self._entry(i)
+        return self._map[key_offset:key_offset + key_length].decode("utf-8")
+
+    def record(self, i: int) -> bytes:
+        """Record of entry i"""
+        _, _, record_offset, record_length = self._entry(i)
+        return self._map[record_offset:record_offset + record_length]
+
+    def _bisect(self, key: bytes) -> int:
+        """First entry whose key is not less than key"""
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            key_offset, key_length, _, _ = self._entry(mid)
+            if self._map[key_offset:key_offset + key_length] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def find(self, key: str) -> Optional[int]:
+        """Entry of key, or None"""
+        i = self._bisect(key.encode("utf-8"))
+        if i < self.count and self.key(i) == key:
+            return i
+        return None
+
+    def class_range(self, name: str) -> range:
+        """Entries of one class"""
+        prefix = name.encode("utf-8") + b"."
+        # "/" sorts right after "."
+        return range(self._bisect(prefix), self._bisect(prefix[:-1] + b"/"))
+
+    def __iter__(self) -> Iterator[Tuple[str, bytes]]:
+        """Every (key, record) pair in key order"""
+        for i in range(self.count):
+            yield self.key(i), self.record(i)
@@ -0,0 +1,181 @@
+#!/usr/bin/python3
+"""
+Schema-driven serialization of model rows for list endpoints.
+
+BaseModel.to_dict copies the instance __dict__ and then strips it back
+down; a ModelSerializer instead reads each mapped column of a class once,
+up front, and afterwards builds each row straight from the instance state:
+
+    serializer = serializer_for(Transaction)
+    serializer.to_dict(transaction)     # same keys and values as to_dict()
+    serializer.to_tuple(transaction)    # values in serializer.fields order
+    serializer.dumps(transactions)      # JSON array as bytes
+
+dumps() uses orjson when it is installed and falls back to the standard
+json module otherwise.
+"""
+import json
+import decimal
+import uuid
+from datetime import date, datetime
+from operator import itemgetter
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import DateTime, inspect
+from werkzeug.http import http_date
+
+from BackEnd.models.base_model import BaseModel, time
+
+try:
+    import orjson
+except ImportError:  # optional, only makes dumps() faster
+    orjson = None
+
+# Columns never serialized unless asked for
+DEFAULT_EXCLUDE = ('password',)
+# Columns BaseModel.to_dict formats as "%Y-%m-%dT%H:%M:%S.%f" strings
+TIMESTAMP_COLUMNS = ('created_at', 'updated_at')
+
+_MISSING = object()
+_serializers: Dict[type, 'ModelSerializer'] = {}
+
+
+def format_timestamp(value):
+    """created_at/updated_at in BaseModel.to_dict's format"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        try:
+            value = datetime.strptime(value, time)
+        except ValueError:
+            value = datetime.strptime(value, "%Y-%m-%d %H:%M:%S.%f")
+    if value.tzinfo is None:
+        # Same text as strftime(time), without parsing the format string
+        return value.isoformat(timespec='microseconds')
+    return value.strftime(time)
+
+
+def _default(value):
+    """Encode the values Flask's JSON provider handles beyond plain JSON"""
+    if isinstance(value, date):
+        return http_date(value)
+    if isinstance(value, (decimal.Decimal, uuid.UUID)):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(value) -> bytes:
+    """Compact JSON bytes, encoding dates the way jsonify does"""
+    if orjson is not None:
+        return orjson.dumps(value, default=_default,
+                            option=orjson.OPT_PASSTHROUGH_DATETIME)
+    return json.dumps(value, default=_default, separators=(',', ':')).encode('utf-8')
+
+
+class ModelSerializer:
+    """
+    Precompiled column accessors for one model class
+    """
+
+    def __init__(self, cls: type, fields: Optional[Iterable[str]] = None,
+                 exclude: Iterable[str] = DEFAULT_EXCLUDE):
+        """
+        Read the mapped columns of cls once
+        Args:
+            cls: Model class
+            fields: Columns to emit, defaults to every mapped column
+            exclude: Columns to leave out
+        """
+        columns = {attr.key: attr.columns[0] for attr in inspect(cls).column_attrs}
+        if fields is None:
+            fields = columns
+        else:
+            unknown = [key for key in fields if key not in columns]
+            if unknown:
+                raise ValueError(f"{cls.__name__} has no column(s) {', '.join(unknown)}")
+        self.cls = cls
+        self.class_name = cls.__name__
+        keys = [key for key in fields if key not in exclude]
+        timestamps = [key for key in keys
+                      if key in TIMESTAMP_COLUMNS and isinstance(columns[key].type, DateTime)]
+        plain = [key for key in keys if key not in timestamps]
+        # Plain columns first so one C-level itemgetter call reads them all
+        self.fields: Tuple[str, ...] = tuple(plain + timestamps)
+        self._plain = tuple(plain)
+        self._timestamps = tuple(timestamps)
+        if len(plain) == 1:
+            self._get_plain: Callable = lambda state, key=plain[0]: (state[key],)
+        elif plain:
+            self._get_plain = itemgetter(*plain)
+        else:
+            self._get_plain = lambda state: ()
+
+    def _read(self, state: dict) -> tuple:
+        """Column values from an instance __dict__; KeyError if one is not loaded"""
+        values = self._get_plain(state)
+        for key in self._timestamps:
+            value = state[key]
+            if type(value) is datetime and value.tzinfo is None:
+                value = value.isoformat(timespec='microseconds')
+            else:
+                value = format_timestamp(value)
+            values += (value,)
+        return values
+
+    def to_dict(self, obj) -> dict:
+        """
+        The loaded row as BaseModel.to_dict would return it, including
+        __class__; columns that are not loaded are left out, and nothing is
+        queried
+        """
+        state = obj.__dict__
+        try:
+            row = dict(zip(self.fields, self._read(state)))
+        except KeyError:
+            # Deferred or expired columns
+            row = {}
+            for key in self.fields:
+                value = state.get(key, _MISSING)
+                if value is not _MISSING:
+                    row[key] = format_timestamp(value) if key in self._timestamps else value
+        row['__class__'] = self.class_name
+        return row
+
+    def to_tuple(self, obj) -> tuple:
+        """The row's values in self.fields order; unloaded columns are None"""
+        state = obj.__dict__
+        try:
+            return self._read(state)
+        except KeyError:
+            return tuple(format_timestamp(state.get(key)) if key in self._timestamps
+                         else state.get(key) for key in self.fields)
+
+    def to_dicts(self, objs: Iterable) -> List[dict]:
+        """to_dict for every row"""
+        to_dict = self.to_dict
+        return [to_dict(obj) for obj in objs]
+
+    def to_tuples(self, objs: Iterable) -> List[tuple]:
+        """to_tuple for every row"""
+        to_tuple = self.to_tuple
+        return [to_tuple(obj) for obj in objs]
+
+    def dumps(self, objs: Iterable) -> bytes:
+        """The rows as a JSON array of objects"""
+        return dumps(self.to_dicts(objs))
+
+
+def serializer_for(cls: type) -> ModelSerializer:
+    """The default ModelSerializer of a class, built on first use"""
+    serializer = _serializers.get(cls)
+    if serializer is None:
+        serializer = _serializers[cls] = ModelSerializer(cls)
+    return serializer
+
+
+def uses_default_to_dict(cls: type) -> bool:
+    """
+    True when cls serializes with BaseModel.to_dict, i.e. serializer_for(cls)
+    produces the same output as its to_dict()
+    """
+    return cls.to_dict is BaseModel.to_dict
@@ -25,8 +25,11 @@ class User(BaseModel, Base):
     password = Column(String(128), nullable=False)
     bio = Column(Text)
     admin = Column(Boolean, nullable=True, default=False)
-    session_id = Column(String(250))
+    session_id = Column(String(250), index=True)
     session_expiration = Column(DateTime)  # Add session expiration field
+    # Single-use ticket for opening the notification stream
+    stream_ticket = Column(String(60), index=True)
+    stream_ticket_expiration = Column(DateTime)
     reset_token = Column(String(250))
     gender = Column(String(10))
     age = Column(Integer)
@@ -41,6 +44,8 @@ class User(BaseModel, Base):
     preferences = Column(String(255))
     is_verified = Column(Boolean, default=False)
     verification_token = Column(String(255))
+    # Maintained by NotificationController so polling needs no COUNT(*)
+    unread_notification_count = Column(Integer, nullable=False, default=0, server_default='0')
 
     # Relationships
     Notification = relationship("Notification",
@@ -0,0 +1,3 @@
+"""
+Request profiling and monitoring for the MicroFinance-Solution backend
+"""
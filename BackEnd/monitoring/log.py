@@ -0,0 +1,136 @@
+#!/usr/bin/python3
+"""
+Structured logging for the backend.
+
+configure_logging() routes every logger through a QueueHandler: the thread
+that logs only puts the record on a queue, and a QueueListener thread
+formats it as one JSON object per line and writes it to stdout. Records
+logged while handling a request carry its request id, taken from the
+X-Request-ID header or generated, and sent back in the response.
+
+    MFS_LOG_LEVEL   root level, INFO by default
+    MFS_LOG_FORMAT  "json" (default) or "text" for local development
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import sys
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from flask import g, has_request_context, request
+
+LOG_LEVEL = os.getenv('MFS_LOG_LEVEL', 'INFO').upper()
+LOG_FORMAT = os.getenv('MFS_LOG_FORMAT', 'json')
+# Longest X-Request-ID accepted from a client
+REQUEST_ID_MAX_LENGTH = 128
+
+# Attributes every LogRecord has; anything else was passed in extra=
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'request_id'}
+
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per record: timestamp, level, logger, message,
+    request_id, the fields passed in extra= and the traceback if any
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'request_id': getattr(record, 'request_id', None),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class RequestIdFilter(logging.Filter):
+    """Tags records with the id of the request being handled, if any"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = g.get('request_id') if has_request_context() else None
+        return True
+
+
+class StructuredQueueHandler(QueueHandler):
+    """
+    Queues records for the listener thread. The message is rendered and
+    the traceback turned to text here, as the arguments and the exception
+    may change once the caller moves on, but the record keeps its fields
+    for JsonFormatter.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def configure_logging(level: str = None, stream=None):
+    """
+    Send every logger through the queue to stdout; calling it again only
+    changes the level
+    Args:
+        level: Root level, defaults to MFS_LOG_LEVEL
+        stream: Where the listener writes, defaults to stdout
+    """
+    global _listener
+    root = logging.getLogger()
+    root.setLevel(level or LOG_LEVEL)
+    if _listener is not None:
+        return
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    if LOG_FORMAT == 'text':
+        output.setFormatter(logging.Formatter(
+            '%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s'))
+    else:
+        output.setFormatter(JsonFormatter())
+
+    records = queue.SimpleQueue()
+    handler = StructuredQueueHandler(records)
+    handler.addFilter(RequestIdFilter())
+    root.addHandler(handler)
+    _listener = QueueListener(records, output, respect_handler_level=True)
+    _listener.start()
+    # Write out what is still queued at exit
+    atexit.register(_listener.stop)
+
+
+def assign_request_id():
+    """Use the client's X-Request-ID or make one up"""
+    request_id = request.headers.get('X-Request-ID', '')[:REQUEST_ID_MAX_LENGTH]
+    g.request_id = request_id or uuid.uuid4().hex
+
+
+def send_request_id(response):
+    """Return the request id so clients can quote it"""
+    request_id = g.get('request_id')
+    if request_id:
+        response.headers['X-Request-ID'] = request_id
+    return response
+
+
+def init_app(app):
+    """Configure logging and give every request an id"""
+    configure_logging()
+    app.before_request(assign_request_id)
+    app.after_request(send_request_id)
@@ -0,0 +1,397 @@
+#!/usr/bin/python3
+"""
+Application metrics in the Prometheus text format, served at /metrics.
+
+Counters and histograms are updated without a lock: each thread writes to
+its own shard of values, and /metrics adds the shards up. A thread's shard
+is folded into the registry when the thread ends, so counters never go
+back. Gauges are read from a callback when /metrics is scraped.
+
+    mfs_http_requests_total              requests per method, route, status
+    mfs_http_request_duration_seconds    latency per method and route
+    mfs_conditional_requests_total       ETag revalidations answered 304
+                                         (hit) or with a body (miss)
+    mfs_operations_total                 deposit, withdraw, transfer,
+                                         loan_approve, repayment, by outcome
+    mfs_operation_duration_seconds       time of those operations
+    mfs_money_flow_total                 amounts they moved, in ETB
+    mfs_credit_score_duration_seconds    credit score computations
+    mfs_db_pool_connections              connection pool usage by state
+    mfs_tasks_total                      background tasks run, by outcome
+    mfs_task_duration_seconds            time tasks took to run
+    mfs_task_lag_seconds                 time from a task being due to its
+                                         start
+    mfs_task_queue_depth                 outbox tasks not finished yet, by
+                                         state: due, scheduled for a retry,
+                                         or running
+"""
+import bisect
+import logging
+import os
+import threading
+import time
+import weakref
+from contextlib import ContextDecorator
+from datetime import datetime
+from functools import wraps
+
+from flask import Response, g, request
+from sqlalchemy import func, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from BackEnd.models import storage
+
+logger = logging.getLogger(__name__)
+
+# Latency buckets in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Bearer token required to read /metrics; open when unset
+METRICS_TOKEN = os.getenv('MFS_METRICS_TOKEN')
+
+
+def _merge(into: dict, values: dict):
+    """Add one shard's values to into"""
+    for key, value in values.items():
+        if isinstance(value, list):
+            total = into.get(key)
+            if total is None:
+                into[key] = list(value)
+            else:
+                for i, count in enumerate(value):
+                    total[i] += count
+        else:
+            into[key] = into.get(key, 0.0) + value
+
+
+def _escape(value) -> str:
+    """Label value escaped for the text format"""
+    return str(value).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+def _labels(names, values) -> str:
+    """{name="value",...}, or nothing without labels"""
+    if not names:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + '}'
+
+
+def _number(value) -> str:
+    """A sample value in the text format"""
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value))
+
+
+class _Shard:
+    """One thread's values"""
+    __slots__ = ('values', '__weakref__')
+
+    def __init__(self):
+        self.values = {}
+
+
+class Registry:
+    """
+    The metrics of the application and their per-thread values
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self._shards = weakref.WeakSet()
+        # values of threads that have ended
+        self._retired = {}
+        self._metrics = []
+
+    def register(self, metric):
+        """Export metric at /metrics"""
+        self._metrics.append(metric)
+
+    def values(self) -> dict:
+        """The calling thread's values, (metric, label values) -> value"""
+        try:
+            return self._local.shard.values
+        except AttributeError:
+            shard = _Shard()
+            with self._lock:
+                self._shards.add(shard)
+            # The thread-local is the only strong reference: when the thread
+            # ends its values are kept in _retired
+            weakref.finalize(shard, self._retire, shard.values)
+            self._local.shard = shard
+            return shard.values
+
+    def _retire(self, values: dict):
+        """Keep the values of a thread that ended"""
+        with self._lock:
+            _merge(self._retired, values)
+
+    def collect(self) -> dict:
+        """Every thread's values added up"""
+        with self._lock:
+            total = {}
+            _merge(total, self._retired)
+            for shard in list(self._shards):
+                # Copying a dict is atomic; its owner may be writing to it
+                _merge(total, dict(shard.values))
+        return total
+
+    def reset(self):
+        """Zero every counter and histogram"""
+        with self._lock:
+            self._retired.clear()
+            for shard in list(self._shards):
+                shard.values.clear()
+
+    def exposition(self) -> str:
+        """Every metric in the Prometheus text format"""
+        by_metric = {}
+        for (metric, labelvalues), value in self.collect().items():
+            by_metric.setdefault(metric, []).append((labelvalues, value))
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples(sorted(by_metric.get(metric, ()), key=lambda s: s[0])))
+        return '\n'.join(lines) + '\n'
+
+
+class Counter:
+    """A value that only goes up"""
+    kind = 'counter'
+
+    def __init__(self, registry: Registry, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._registry = registry
+        registry.register(self)
+
+    def inc(self, *labelvalues, amount: float = 1.0):
+        """Add amount to the counter of these label values"""
+        values = self._registry.values()
+        key = (self, labelvalues)
+        values[key] = values.get(key, 0.0) + amount
+
+    def samples(self, series):
+        """Text format lines"""
+        for labelvalues, value in series:
+            yield f"{self.name}{_labels(self.labelnames, labelvalues)} {_number(value)}"
+
+
+class Histogram:
+    """Observations counted into buckets, with their sum and count"""
+    kind = 'histogram'
+
+    def __init__(self, registry: Registry, name: str, documentation: str, labelnames=(),
+                 buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._registry = registry
+        registry.register(self)
+
+    def observe(self, value: float, *labelvalues):
+        """Count value into its bucket"""
+        values = self._registry.values()
+        key = (self, labelvalues)
+        # one count per bucket, then +Inf, sum and count
+        counts = values.get(key)
+        if counts is None:
+            counts = values[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        counts[-2] += value
+        counts[-1] += 1
+
+    def time(self, *labelvalues):
+        """Context manager and decorator observing the time spent inside"""
+        return _Timer(self, labelvalues)
+
+    def samples(self, series):
+        """Text format lines, with cumulative buckets"""
+        for labelvalues, counts in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                labels = _labels(self.labelnames + ('le',), labelvalues + (_number(bound),))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _labels(self.labelnames, labelvalues)
+            yield f"{self.name}_sum{labels} {_number(counts[-2])}"
+            yield f"{self.name}_count{labels} {counts[-1]}"
+
+
+class _Timer(ContextDecorator):
+    """Observes the seconds spent in a block or call"""
+
+    def __init__(self, histogram: Histogram, labelvalues: tuple):
+        self._histogram = histogram
+        self._labelvalues = labelvalues
+        self._local = threading.local()
+
+    def __enter__(self):
+        self._local.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._histogram.observe(time.perf_counter() - self._local.start, *self._labelvalues)
+        return False
+
+
+class Gauge:
+    """A value read when /metrics is scraped"""
+    kind = 'gauge'
+
+    def __init__(self, registry: Registry, name: str, documentation: str, labelnames=(),
+                 collect=None):
+        """
+        Args:
+            collect: Callable returning {label values: value}
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.collect = collect or dict
+        registry.register(self)
+
+    def samples(self, series):
+        """Text format lines"""
+        for labelvalues, value in sorted(self.collect().items()):
+            yield f"{self.name}{_labels(self.labelnames, labelvalues)} {_number(value)}"
+
+
+def db_pool_connections() -> dict:
+    """Connections of the storage engine's pool, by state"""
+    if not hasattr(storage, 'engine'):
+        return {}
+    pool = storage.engine().pool
+    # sqlite's pools do not keep counts
+    if not hasattr(pool, 'checkedout'):
+        return {}
+    return {('size',): pool.size(), ('checked_out',): pool.checkedout(),
+            ('checked_in',): pool.checkedin(), ('overflow',): pool.overflow()}
+
+
+def task_queue_depth() -> dict:
+    """Outbox backlog of every process, by state"""
+    if not hasattr(storage, 'engine'):
+        return {}
+    from BackEnd.models.TaskOutbox import TaskOutbox
+    table = TaskOutbox.__table__
+    session = storage.session()
+    try:
+        # Both counts are ranges of the (status, next_attempt_at) index
+        counts = dict(session.execute(select(table.c.status, func.count()).where(
+            table.c.status.in_(('pending', 'running'))
+        ).group_by(table.c.status)).all())
+        due = session.execute(select(func.count()).select_from(table).where(
+            table.c.status == 'pending',
+            table.c.next_attempt_at <= datetime.utcnow()
+        )).scalar()
+    except SQLAlchemyError:
+        # The other metrics are still worth serving without the database
+        storage.Rollback()
+        logger.exception("Could not read the task outbox backlog")
+        return {}
+    pending = counts.get('pending', 0)
+    return {('due',): due, ('scheduled',): pending - due, ('running',): counts.get('running', 0)}
+
+
+registry = Registry()
+
+HTTP_REQUESTS = Counter(registry, 'mfs_http_requests_total', 'HTTP requests',
+                        ('method', 'route', 'status'))
+HTTP_DURATION = Histogram(registry, 'mfs_http_request_duration_seconds',
+                          'HTTP request latency', ('method', 'route'))
+CONDITIONAL_REQUESTS = Counter(registry, 'mfs_conditional_requests_total',
+                               'Requests revalidating an ETag, by result', ('result',))
+OPERATIONS = Counter(registry, 'mfs_operations_total',
+                     'Money operations, by outcome', ('operation', 'outcome'))
+OPERATION_DURATION = Histogram(registry, 'mfs_operation_duration_seconds',
+                               'Money operation latency', ('operation',))
+MONEY_FLOW = Counter(registry, 'mfs_money_flow_total',
+                     'Amounts moved by successful money operations, in ETB', ('operation',))
+CREDIT_SCORE_DURATION = Histogram(registry, 'mfs_credit_score_duration_seconds',
+                                  'Credit score computation time', ('model',),
+                                  buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0))
+DB_POOL = Gauge(registry, 'mfs_db_pool_connections', 'Database connection pool usage',
+                ('state',), collect=db_pool_connections)
+TASKS = Counter(registry, 'mfs_tasks_total', 'Background tasks run, by outcome',
+                ('task', 'outcome'))
+TASK_DURATION = Histogram(registry, 'mfs_task_duration_seconds', 'Background task run time',
+                          ('task',))
+TASK_LAG = Histogram(registry, 'mfs_task_lag_seconds',
+                     'Time from a task being due to its start', ('task',),
+                     buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0))
+TASK_QUEUE = Gauge(registry, 'mfs_task_queue_depth', 'Background tasks not finished yet',
+                   ('state',), collect=task_queue_depth)
+
+# Operations running in this thread; only the outermost one is recorded
+_operations = threading.local()
+
+
+def operation(name: str, amount=None):
+    """
+    Decorator recording a controller operation in OPERATIONS,
+    OPERATION_DURATION and MONEY_FLOW. Operations called by another one
+    (transfer calling withdraw and deposit) are part of it and are not
+    recorded on their own.
+    Args:
+        name: Operation label
+        amount: Callable returning the amount moved from the operation's
+            result; the money flow is not recorded without it
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            depth = getattr(_operations, 'depth', 0)
+            if depth:
+                return func(*args, **kwargs)
+            _operations.depth = 1
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except Exception:
+                OPERATIONS.inc(name, 'error')
+                raise
+            finally:
+                _operations.depth = 0
+                OPERATION_DURATION.observe(time.perf_counter() - start, name)
+            OPERATIONS.inc(name, 'success')
+            if amount is not None:
+                MONEY_FLOW.inc(name, amount=abs(amount(result) or 0.0))
+            return result
+        return wrapper
+    return decorator
+
+
+def start_request():
+    """Note when the request started"""
+    g.metrics_start = time.perf_counter()
+
+
+def record_request(response):
+    """Count the request and observe its latency"""
+    start = g.pop('metrics_start', None)
+    if start is None:
+        return response
+    route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    HTTP_REQUESTS.inc(request.method, route, response.status_code)
+    HTTP_DURATION.observe(time.perf_counter() - start, request.method, route)
+    if request.if_none_match:
+        CONDITIONAL_REQUESTS.inc('hit' if response.status_code == 304 else 'miss')
+    return response
+
+
+def metrics():
+    """Every metric in the Prometheus text format"""
+    if METRICS_TOKEN and request.headers.get('Authorization') != f"Bearer {METRICS_TOKEN}":
+        return Response('Unauthorized\n', status=401, mimetype='text/plain')
+    return Response(registry.exposition(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+
+def init_app(app):
+    """Record every request and serve /metrics"""
+    app.before_request(start_request)
+    app.after_request(record_request)
+    app.add_url_rule('/metrics', 'metrics', metrics, methods=['GET'])
@@ -0,0 +1,203 @@
+#!/usr/bin/python3
+"""
+Per-request SQL profiling.
+
+SQLAlchemy cursor events on the storage engine count the queries of each
+Flask request and time them. Every request then:
+
+    - is added to route_stats, which keeps recent durations per route for
+      the p50/p95/p99 served by /admin/perf
+    - carries a Server-Timing header (db and app time, query count) when the
+      app runs in debug mode or MFS_SERVER_TIMING=1
+    - logs each statement slower than SLOW_QUERY_MS on the
+      "BackEnd.monitoring.slow_query" logger, with route, duration_ms and
+      statement as fields of the record
+"""
+import heapq
+import logging
+import math
+import os
+import threading
+import time
+from collections import deque
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+
+from BackEnd.models import storage
+
+# Statements slower than this many milliseconds are logged
+SLOW_QUERY_MS = float(os.getenv('MFS_SLOW_QUERY_MS', '200'))
+# Slowest statements kept per request
+SLOWEST_KEPT = 3
+# Recent requests per route the percentiles are computed from
+ROUTE_SAMPLES = int(os.getenv('MFS_PERF_SAMPLES', '1000'))
+# Longest statement text logged or reported
+STATEMENT_MAX_LENGTH = 500
+# Send Server-Timing outside debug mode too
+SERVER_TIMING = os.getenv('MFS_SERVER_TIMING', '0') == '1'
+
+slow_query_log = logging.getLogger('BackEnd.monitoring.slow_query')
+
+
+def percentile(ordered: list, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted, non-empty list"""
+    return ordered[max(0, math.ceil(len(ordered) * pct / 100) - 1)]
+
+
+class RequestProfile:
+    """
+    Queries made while handling one request
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        # (seconds, statement) min-heap of the slowest statements
+        self.slowest = []
+
+    def add(self, statement: str, elapsed: float):
+        """Record a statement that took elapsed seconds"""
+        self.queries += 1
+        self.db_time += elapsed
+        entry = (elapsed, statement[:STATEMENT_MAX_LENGTH])
+        if len(self.slowest) < SLOWEST_KEPT:
+            heapq.heappush(self.slowest, entry)
+        elif entry[0] > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, entry)
+
+    def server_timing(self, total: float) -> str:
+        """Server-Timing header value for a request that took total seconds"""
+        return (f'db;dur={self.db_time * 1000:.1f};desc="{self.queries} queries", '
+                f'app;dur={(total - self.db_time) * 1000:.1f}, total;dur={total * 1000:.1f}')
+
+
+class RouteStats:
+    """
+    Durations of the most recent requests, per route
+    """
+
+    def __init__(self, samples: int = ROUTE_SAMPLES):
+        self._lock = threading.Lock()
+        self._samples = samples
+        # route -> deque of (total ms, db ms, queries)
+        self._routes = {}
+        # route -> requests seen, including those no longer sampled
+        self._counts = {}
+        # route -> (seconds, statement) min-heap of its slowest statements
+        self._slowest = {}
+
+    def record(self, route: str, total_ms: float, db_ms: float, queries: int, slowest=()):
+        """
+        Add one request to route
+        Args:
+            slowest: The request's slowest (seconds, statement) pairs
+        """
+        with self._lock:
+            samples = self._routes.get(route)
+            if samples is None:
+                samples = self._routes[route] = deque(maxlen=self._samples)
+            samples.append((total_ms, db_ms, queries))
+            self._counts[route] = self._counts.get(route, 0) + 1
+            kept = self._slowest.setdefault(route, [])
+            for entry in slowest:
+                if len(kept) < SLOWEST_KEPT:
+                    heapq.heappush(kept, entry)
+                elif entry[0] > kept[0][0]:
+                    heapq.heapreplace(kept, entry)
+
+    def snapshot(self) -> dict:
+        """
+        Returns:
+            route -> {"requests", "duration_ms", "db_ms", "queries",
+            "slowest_queries"}; duration_ms, db_ms and queries hold p50,
+            p95, p99 and max
+        """
+        with self._lock:
+            routes = {route: list(samples) for route, samples in self._routes.items()}
+            counts = dict(self._counts)
+            slowest = {route: sorted(kept, reverse=True) for route, kept in self._slowest.items()}
+        report = {}
+        for route, samples in routes.items():
+            summary = {'requests': counts[route], 'slowest_queries': [
+                {'duration_ms': round(elapsed * 1000, 1), 'statement': statement}
+                for elapsed, statement in slowest[route]]}
+            for name, column in (('duration_ms', 0), ('db_ms', 1), ('queries', 2)):
+                ordered = sorted(sample[column] for sample in samples)
+                summary[name] = {'p50': round(percentile(ordered, 50), 2),
+                                 'p95': round(percentile(ordered, 95), 2),
+                                 'p99': round(percentile(ordered, 99), 2),
+                                 'max': round(ordered[-1], 2)}
+            report[route] = summary
+        return report
+
+    def reset(self):
+        """Forget everything recorded"""
+        with self._lock:
+            self._routes.clear()
+            self._counts.clear()
+            self._slowest.clear()
+
+
+route_stats = RouteStats()
+
+
+def _route() -> str:
+    """The request's method and URL rule, e.g. "GET /api/v1/loans/<loan_id>" """
+    rule = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    return f"{request.method} {rule}"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    """Note when the statement started"""
+    # Statements on one connection run one after the other
+    conn.info['query_start'] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    """Add the statement to the current request's profile"""
+    elapsed = time.perf_counter() - conn.info.pop('query_start')
+    if not has_request_context():
+        return
+    profile = g.get('profile')
+    if profile is None:
+        return
+    profile.add(statement, elapsed)
+    if elapsed * 1000 >= SLOW_QUERY_MS:
+        slow_query_log.warning("Slow query", extra={
+            'route': _route(), 'duration_ms': round(elapsed * 1000, 1),
+            'statement': statement[:STATEMENT_MAX_LENGTH]})
+
+
+def start_profile():
+    """Profile the request from here on"""
+    g.profile = RequestProfile()
+
+
+def finish_profile(response):
+    """Record the request in route_stats and report it in Server-Timing"""
+    profile = g.pop('profile', None)
+    if profile is None:
+        return response
+    total = time.perf_counter() - profile.started
+    route_stats.record(_route(), total * 1000, profile.db_time * 1000, profile.queries,
+                       profile.slowest)
+    if SERVER_TIMING or current_app.debug:
+        response.headers['Server-Timing'] = profile.server_timing(total)
+    return response
+
+
+def instrument_engine(engine):
+    """Time every statement executed on engine"""
+    if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+
+def init_app(app):
+    """Profile every request; queries are counted when storage is a database"""
+    if hasattr(storage, 'engine'):
+        instrument_engine(storage.engine())
+    app.before_request(start_profile)
+    app.after_request(finish_profile)
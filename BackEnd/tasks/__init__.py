@@ -0,0 +1,3 @@
+"""
+Background tasks: side effects run after the request's commit
+"""
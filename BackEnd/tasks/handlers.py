@@ -0,0 +1,34 @@
+#!/usr/bin/python3
+"""
+Side effects of money movements and sign ups, run by the task runner
+after the request that caused them has committed
+"""
+from BackEnd.Controllers.EmailVerificationController import send_verification_email
+from BackEnd.Controllers.NotificationController import NotificationController
+from BackEnd.tasks.runner import task
+
+
+@task('notify_welcome')
+def notify_welcome(user_id: str, username: str):
+    """Welcome a new customer"""
+    NotificationController().notify_welcome(user_id, username)
+
+
+@task('notify_low_balance')
+def notify_low_balance(user_id: str, current_balance: float):
+    """Warn a customer whose balance dropped below the threshold"""
+    NotificationController().notify_low_balance(user_id, current_balance)
+
+
+@task('notify_admin_loan_application')
+def notify_admin_loan_application(admin_id: str, customer_name: str, amount: float, loan_id: str):
+    """Ask the admin a loan was assigned to to review it"""
+    message = f"New loan application received from user {customer_name} for {amount} ETB (Loan ID: {loan_id}). Please review and approve/reject."
+    NotificationController().create_notification(user_id=admin_id, message=message)
+
+
+@task('send_verification_email')
+def verification_email(user_id: str):
+    """Queue the email verification link of a new user"""
+    if send_verification_email(user_id) is False:
+        raise RuntimeError("Verification email could not be queued")
@@ -0,0 +1,271 @@
+#!/usr/bin/python3
+"""
+In-process runner for side effects deferred until after commit.
+
+defer() writes the task to the task_outbox table in the caller's
+transaction, so it is kept if and only if the caller's changes are. When
+that transaction commits, an after_commit hook hands the task to a thread
+pool and the request returns without waiting for it. A poller picks up
+tasks the pool never ran (the process died, or no runner was started) and
+retries failed ones with backoff. Each poll also refreshes updated_at of
+the tasks this process is running, so only tasks whose process stopped
+polling are taken for lost.
+
+    MFS_TASK_WORKERS        worker threads, 4 by default; 0 leaves the tasks
+                            to a runner started with python -m
+    MFS_TASK_POLL_INTERVAL  seconds between outbox polls, 5 by default
+    MFS_TASK_MAX_ATTEMPTS   attempts before a task is marked failed
+    MFS_TASK_STALE_AFTER    seconds without a heartbeat after which a running
+                            task is run again, 300 by default
+"""
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import event, update
+from sqlalchemy.orm import Session
+
+from BackEnd.models import storage
+from BackEnd.models.TaskOutbox import TaskOutbox
+from BackEnd.monitoring.metrics import TASK_DURATION, TASK_LAG, TASKS
+
+logger = logging.getLogger(__name__)
+
+WORKERS = int(os.getenv('MFS_TASK_WORKERS', '4'))
+POLL_INTERVAL = float(os.getenv('MFS_TASK_POLL_INTERVAL', '5'))
+MAX_ATTEMPTS = int(os.getenv('MFS_TASK_MAX_ATTEMPTS', '5'))
+# Retry delays grow from RETRY_BASE_DELAY and are capped at RETRY_MAX_DELAY
+RETRY_BASE_DELAY = 10
+RETRY_MAX_DELAY = 600
+# Seconds without a heartbeat after which a running task is assumed lost
+# with its process
+STALE_AFTER = float(os.getenv('MFS_TASK_STALE_AFTER', '300'))
+# Tasks picked up per poll
+BATCH_SIZE = 50
+
+# session.info key holding ids of tasks deferred in the open transaction
+PENDING_TASKS = 'pending_tasks'
+
+_handlers: Dict[str, Callable] = {}
+
+
+def task(name: str):
+    """Register the decorated function as the handler of tasks called name"""
+    def decorator(func):
+        _handlers[name] = func
+        return func
+    return decorator
+
+
+def defer(name: str, **kwargs) -> TaskOutbox:
+    """
+    Run a task once the current transaction commits
+    Args:
+        name: Task name, as registered with @task
+        kwargs: JSON serializable arguments of the handler
+    Returns:
+        The outbox entry, written with the caller's next commit
+    """
+    entry = TaskOutbox(
+        name=name,
+        payload=json.dumps(kwargs, default=str),
+        status='pending',
+        attempts=0,
+        next_attempt_at=datetime.utcnow()
+    )
+    session = storage.session().registry()
+    if not session.in_transaction():
+        # Begin now so a rollback before the next query still discards the task
+        session.begin()
+    session.add(entry)
+    session.info.setdefault(PENDING_TASKS, []).append(entry.id)
+    return entry
+
+
+@event.listens_for(Session, 'after_commit')
+def _submit_committed_tasks(session):
+    """Hand the tasks deferred by the committed transaction to the workers"""
+    task_ids = session.info.pop(PENDING_TASKS, None)
+    if task_ids:
+        task_runner.submit(task_ids)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_pending_tasks(session, previous_transaction):
+    """Forget tasks whose transaction was rolled back"""
+    session.info.pop(PENDING_TASKS, None)
+
+
+def _retry_delay(attempts: int) -> timedelta:
+    """Exponential backoff for the given number of failed attempts"""
+    return timedelta(seconds=min(RETRY_BASE_DELAY * 2 ** (attempts - 1), RETRY_MAX_DELAY))
+
+
+class TaskRunner:
+    """
+    Thread pool running outbox tasks, and the poller feeding it
+    """
+
+    def __init__(self, workers: int = WORKERS):
+        """Initialize the runner without starting it"""
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._poller: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        # ids handed to the pool and not finished yet
+        self._queued = set()
+
+    def start(self):
+        """Start the workers and the poller once per process"""
+        with self._lock:
+            if self._executor is not None:
+                return
+            # Register the handlers
+            import BackEnd.tasks.handlers  # noqa: F401
+            self._executor = ThreadPoolExecutor(max(1, self.workers), thread_name_prefix='task')
+            self._stop.clear()
+            self._poller = threading.Thread(target=self._poll, name='task-outbox', daemon=True)
+            self._poller.start()
+
+    def stop(self, timeout: float = None):
+        """Stop polling and wait for the running tasks"""
+        self._stop.set()
+        if self._poller is not None:
+            self._poller.join(timeout)
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def submit(self, task_ids: List[str]):
+        """Run the tasks on the workers; no-op until the runner is started"""
+        with self._lock:
+            if self._executor is None:
+                return
+            for task_id in task_ids:
+                if task_id not in self._queued:
+                    self._queued.add(task_id)
+                    self._executor.submit(self._run_queued, task_id)
+
+    def _run_queued(self, task_id: str):
+        """Worker thread entry point"""
+        try:
+            self.run(task_id)
+        except Exception:
+            logger.exception("Error running task %s", task_id)
+        finally:
+            with self._lock:
+                self._queued.discard(task_id)
+            # Each worker thread has its own scoped session
+            storage.close()
+
+    def _claim(self, task_id: str) -> bool:
+        """Mark the task running unless another worker got it first"""
+        table = TaskOutbox.__table__
+        claimed = storage.session().execute(
+            update(table).where(table.c.id == task_id, table.c.status == 'pending').values(
+                status='running', attempts=table.c.attempts + 1, updated_at=datetime.utcnow())
+        ).rowcount
+        storage.save()
+        return claimed == 1
+
+    def run(self, task_id: str) -> bool:
+        """
+        Run one task in the calling thread
+        Returns:
+            False if the task was not pending or its handler failed
+        """
+        if not self._claim(task_id):
+            return False
+        # The session may hold the entry as defer() left it
+        entry = storage.session().get(TaskOutbox, task_id, populate_existing=True)
+        TASK_LAG.observe(max(0.0, (datetime.utcnow() - entry.next_attempt_at).total_seconds()),
+                         entry.name)
+        start = time.perf_counter()
+        try:
+            handler = _handlers.get(entry.name)
+            if handler is None:
+                raise LookupError(f"No handler for task {entry.name}")
+            handler(**json.loads(entry.payload))
+        except Exception as e:
+            storage.Rollback()
+            TASKS.inc(entry.name, 'error')
+            logger.exception("Task %s failed", entry.name, extra={'task_id': task_id})
+            entry.last_error = str(e)[:500]
+            if entry.attempts >= MAX_ATTEMPTS:
+                entry.status = 'failed'
+            else:
+                entry.status = 'pending'
+                entry.next_attempt_at = datetime.utcnow() + _retry_delay(entry.attempts)
+            storage.save()
+            return False
+        finally:
+            TASK_DURATION.observe(time.perf_counter() - start, entry.name)
+        entry.status = 'done'
+        entry.finished_at = datetime.utcnow()
+        entry.last_error = None
+        storage.save()
+        TASKS.inc(entry.name, 'success')
+        return True
+
+    def _due(self) -> List[str]:
+        """Ids of pending tasks that are due, after releasing lost ones"""
+        table = TaskOutbox.__table__
+        session = storage.session()
+        with self._lock:
+            running = list(self._queued)
+        if running:
+            # Heartbeat of the tasks still running here, however long they take
+            session.execute(update(table).where(
+                table.c.id.in_(running), table.c.status == 'running'
+            ).values(updated_at=datetime.utcnow()))
+        cutoff = datetime.utcnow() - timedelta(seconds=STALE_AFTER)
+        session.execute(update(table).where(
+            table.c.status == 'running', table.c.updated_at < cutoff).values(status='pending'))
+        task_ids = [row.id for row in session.query(TaskOutbox.id).filter(
+            TaskOutbox.status == 'pending',
+            TaskOutbox.next_attempt_at <= datetime.utcnow()
+        ).order_by(TaskOutbox.next_attempt_at).limit(BATCH_SIZE)]
+        storage.save()
+        return task_ids
+
+    def run_pending(self) -> int:
+        """
+        Run the due tasks in the calling thread, e.g. from a script or test
+        Returns:
+            Number of tasks that succeeded
+        """
+        import BackEnd.tasks.handlers  # noqa: F401
+        return sum(self.run(task_id) for task_id in self._due())
+
+    def _poll(self):
+        """Hand due tasks to the workers until stopped"""
+        while not self._stop.is_set():
+            try:
+                self.submit(self._due())
+            except Exception:
+                storage.Rollback()
+                logger.exception("Error polling the task outbox")
+            finally:
+                storage.close()
+            self._stop.wait(POLL_INTERVAL)
+
+
+task_runner = TaskRunner()
+
+
+if __name__ == "__main__":
+    # Run the tasks in their own process instead of inside the API
+    from BackEnd.monitoring.log import configure_logging
+    configure_logging()
+    task_runner.start()
+    try:
+        task_runner._poller.join()
+    except KeyboardInterrupt:
+        task_runner.stop()
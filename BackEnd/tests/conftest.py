@@ -10,6 +10,12 @@ load_dotenv()
 
 # Test database URL
 TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL", "sqlite:///./test.db")
+# The app's storage, created when BackEnd.models is first imported, runs on
+# an in-memory sqlite database unless a test run points it elsewhere
+os.environ.setdefault("MFS_DB_URL", "sqlite://")
+# Deferred tasks and email stay in their outboxes, where the tests run them
+os.environ.setdefault("MFS_EMAIL_WORKER", "0")
+os.environ.setdefault("MFS_TASK_WORKERS", "0")
 
 @pytest.fixture(scope="session")
 def engine():
@@ -0,0 +1,61 @@
+import unittest
+from flask import Flask, jsonify
+from BackEnd.api.v1.commit_metrics import commit_stats, init_app
+from BackEnd.models import storage
+from BackEnd.models.user import User
+
+
+class TestCommitMetrics(unittest.TestCase):
+    """Test the commits-per-request header and totals"""
+
+    def setUp(self):
+        """Set up an app whose endpoint commits once per user it creates"""
+        app = Flask(__name__)
+        init_app(app)
+
+        @app.route('/users/<int:count>')
+        def create_users(count):
+            for n in range(count):
+                user = User(fullname="Test", username=f"metrics{n}",
+                            email=f"metrics{self.id()}{n}@x", password="x")
+                storage.new(user)
+                storage.save()
+            return jsonify({})
+
+        @app.route('/batched/<int:count>')
+        def create_batched(count):
+            with storage.transaction():
+                return create_users(count)
+
+        commit_stats.reset()
+        self.client = app.test_client()
+
+    def tearDown(self):
+        """Remove the users and drop the session"""
+        session = storage.session()
+        session.query(User).filter(User.username.like("metrics%")).delete(synchronize_session=False)
+        session.commit()
+        storage.close()
+
+    @unittest.skipUnless(hasattr(storage, 'commit_count'), "storage does not count commits")
+    def test_header_and_totals(self):
+        """Test that each response reports its commits and totals add up"""
+        self.assertEqual(self.client.get('/users/2').headers['X-DB-Commits'], '2')
+        self.assertEqual(self.client.get('/users/0').headers['X-DB-Commits'], '0')
+        stats = commit_stats.snapshot()['create_users']
+        self.assertEqual(stats, {'requests': 2, 'commits': 2, 'mean': 1.0, 'max': 2})
+
+    @unittest.skipUnless(hasattr(storage, 'commit_count'), "storage does not count commits")
+    def test_transaction_commits_once(self):
+        """Test that saves inside storage.transaction() make one commit"""
+        self.assertEqual(self.client.get('/batched/3').headers['X-DB-Commits'], '1')
+
+    def test_stats_reset(self):
+        """Test that reset() forgets recorded requests"""
+        commit_stats.record('endpoint', 3)
+        commit_stats.reset()
+        self.assertEqual(commit_stats.snapshot(), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
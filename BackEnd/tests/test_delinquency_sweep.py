@@ -0,0 +1,67 @@
+import unittest
+from datetime import date, datetime, timedelta
+from BackEnd.models import storage
+from BackEnd.models.user import User
+from BackEnd.models.Account import Account
+from BackEnd.models.Loan import Loan
+from BackEnd.models.LoanDelinquency import LoanDelinquency
+from BackEnd.models.DelinquencySweep import DelinquencySweep
+from BackEnd.Controllers.DelinquencyController import DelinquencyController
+
+
+class TestDelinquencySweep(unittest.TestCase):
+    """Test that readers follow the latest sweep and never write"""
+
+    def setUp(self):
+        """Create a loan that is 10 days past its end date"""
+        self.user = User(fullname="Late", username="late", email="late@test.local", password="x")
+        self.account = Account(user_id=self.user.id, account_number="DLQ0000001",
+                               type="savings", balance=0.0)
+        self.loan = Loan(admin_id=self.user.id, account_id=self.account.id, amount=500.0,
+                         interest_rate=10.0, repayment_period=1, loan_status="active",
+                         end_date=datetime.now() - timedelta(days=10))
+        for obj in (self.user, self.account, self.loan):
+            storage.new(obj)
+        storage.save()
+        self.controller = DelinquencyController()
+
+    def tearDown(self):
+        """Remove the test rows"""
+        session = storage.session()
+        session.rollback()
+        for cls in (DelinquencySweep, LoanDelinquency, Loan, Account, User):
+            session.query(cls).delete()
+        session.commit()
+        storage.close()
+
+    def test_readers_do_not_sweep(self):
+        """Test that reading before any sweep returns nothing and writes nothing"""
+        self.assertIsNone(self.controller.current_snapshot_date())
+        self.assertEqual(self.controller.count_delinquent(), 0)
+        self.assertEqual(self.controller.get_loan_delinquencies([self.loan.id]), [])
+        self.assertEqual(storage.session().query(LoanDelinquency).count(), 0)
+
+    def test_readers_use_latest_sweep(self):
+        """Test that a day without delinquent loans replaces the older snapshot"""
+        yesterday = date.today() - timedelta(days=1)
+        self.assertEqual(self.controller.run_sweep(yesterday), 1)
+        self.assertEqual(self.controller.current_snapshot_date(), yesterday)
+        self.assertEqual(self.controller.get_bucket_summary()["1-30"]["count"], 1)
+
+        self.loan.loan_status = "paid"
+        storage.save()
+        self.assertEqual(self.controller.run_sweep(), 0)
+        self.assertEqual(self.controller.current_snapshot_date(), date.today())
+        self.assertEqual(self.controller.count_delinquent(), 0)
+        self.assertEqual(self.controller.get_loan_delinquencies([self.loan.id]), [])
+
+    def test_rerun_replaces_day(self):
+        """Test that sweeping the same day twice keeps one row per loan"""
+        self.controller.run_sweep()
+        self.controller.run_sweep()
+        self.assertEqual(storage.session().query(LoanDelinquency).count(), 1)
+        self.assertEqual(storage.session().query(DelinquencySweep).count(), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+import smtplib
+import unittest
+from datetime import datetime
+from BackEnd.models import storage
+from BackEnd.models.EmailOutbox import EmailOutbox
+from BackEnd.Controllers.EmailOutboxController import (
+    EmailOutboxController, SMTPConnection, MAX_ATTEMPTS, _retry_delay
+)
+
+
+class StubServer:
+    """Stands in for an smtplib.SMTP connection"""
+
+    def __init__(self, outbox):
+        """Record messages; outbox.failures are raised by the next sends"""
+        self.outbox = outbox
+
+    def noop(self):
+        return (250, b'OK')
+
+    def sendmail(self, sender, recipient, message):
+        # Nothing may be held open in the database while a message is sent
+        self.outbox.open_transactions.append(storage.session().registry().in_transaction())
+        if self.outbox.failures:
+            raise self.outbox.failures.pop(0)
+        self.outbox.sent.append(recipient)
+
+    def quit(self):
+        pass
+
+
+class StubConnection(SMTPConnection):
+    """SMTPConnection opening StubServers and counting them"""
+
+    def __init__(self):
+        super().__init__()
+        self.connects = 0
+        self.sent = []
+        self.failures = []
+        self.open_transactions = []
+
+    def _connect(self):
+        self.connects += 1
+        return StubServer(self)
+
+
+class TestEmailDelivery(unittest.TestCase):
+    """Test the outbox worker's claiming, sending and retries"""
+
+    def setUp(self):
+        """Start from an empty outbox"""
+        self.session = storage.session()
+        self.session.query(EmailOutbox).delete()
+        self.session.commit()
+        self.connection = StubConnection()
+        self.controller = EmailOutboxController(self.connection)
+
+    def tearDown(self):
+        """Empty the outbox"""
+        self.session.rollback()
+        self.session.query(EmailOutbox).delete()
+        self.session.commit()
+        storage.close()
+
+    def queue(self, *recipients):
+        """Queue one email per recipient"""
+        return [self.controller.enqueue_email(recipient, "Subject", "Body").id
+                for recipient in recipients]
+
+    def stored(self, email_id):
+        """The outbox row as committed"""
+        return self.session.get(EmailOutbox, email_id, populate_existing=True)
+
+    def test_batch_sent_over_one_connection(self):
+        """Test that a batch is sent on one reused connection, outside any transaction"""
+        ids = self.queue("a@x", "b@x", "c@x")
+        self.assertEqual(self.controller.process_batch(), 3)
+        self.assertEqual(sorted(self.connection.sent), ["a@x", "b@x", "c@x"])
+        self.assertEqual(self.connection.open_transactions, [False] * 3)
+
+        self.queue("d@x")
+        self.controller.process_batch()
+        self.assertEqual(self.connection.connects, 1)
+        for email_id in ids:
+            email = self.stored(email_id)
+            self.assertEqual((email.status, email.attempts), ('sent', 1))
+            self.assertIsNotNone(email.sent_at)
+        self.assertEqual(self.controller.process_batch(), 0)
+
+    def test_transient_failure_backs_off(self):
+        """Test that a failed send is retried later, then marked failed"""
+        email_id, = self.queue("a@x")
+        # Dropped twice: the reconnect inside send() fails too
+        self.connection.failures = [smtplib.SMTPServerDisconnected("gone")] * 2
+        before = datetime.utcnow()
+        self.controller.process_batch()
+        email = self.stored(email_id)
+        self.assertEqual((email.status, email.attempts, email.last_error), ('pending', 1, 'gone'))
+        self.assertGreaterEqual(email.next_attempt_at, before + _retry_delay(1))
+        # Not due yet
+        self.assertEqual(self.controller.process_batch(), 0)
+
+        email.attempts = MAX_ATTEMPTS - 1
+        email.next_attempt_at = datetime.utcnow()
+        storage.save()
+        self.connection.failures = [smtplib.SMTPDataError(451, "try later")]
+        self.controller.process_batch()
+        self.assertEqual(self.stored(email_id).status, 'failed')
+        self.assertEqual(self.connection.sent, [])
+
+    def test_refused_recipient_not_retried(self):
+        """Test that a recipient the server refuses fails at once"""
+        email_id, = self.queue("bad@x")
+        self.connection.failures = [smtplib.SMTPRecipientsRefused({"bad@x": (550, b"no")})]
+        self.controller.process_batch()
+        email = self.stored(email_id)
+        self.assertEqual((email.status, email.attempts), ('failed', 1))
+
+    def test_lost_claim_released(self):
+        """Test that an email left in sending by a dead worker is sent again"""
+        email_id, = self.queue("a@x")
+        email = self.stored(email_id)
+        email.status = 'sending'
+        email.updated_at = datetime(2026, 1, 1)
+        storage.save()
+        self.controller.process_batch()
+        self.assertEqual(self.stored(email_id).status, 'sent')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+from unittest import mock
+from BackEnd.models import storage
+from BackEnd.models.user import User
+from BackEnd.models.Account import Account
+from BackEnd.models.Loan import Loan
+from BackEnd.models.Notification import Notification
+from BackEnd.models.TaskOutbox import TaskOutbox
+from BackEnd.Controllers.LoanController import LoanController
+from BackEnd.tasks.runner import task_runner
+
+
+class TestApplyLoan(unittest.TestCase):
+    """Test that a loan application is written as one unit of work"""
+
+    def setUp(self):
+        """Create a customer without an account and an admin"""
+        self.customer = User(fullname="Applicant", username="applicant",
+                             email="applicant@test.local", password="x")
+        self.admin = User(fullname="Reviewer", username="reviewer",
+                          email="reviewer@test.local", password="x", admin=True)
+        storage.new(self.customer)
+        storage.new(self.admin)
+        storage.save()
+        self.customer_id, self.admin_id = self.ids = [self.customer.id, self.admin.id]
+        self.controller = LoanController()
+
+    def tearDown(self):
+        """Remove the test rows"""
+        session = storage.session()
+        session.rollback()
+        account_ids = session.query(Account.id).filter(Account.user_id == self.customer_id)
+        session.query(Loan).filter(Loan.account_id.in_(account_ids)).delete(
+            synchronize_session=False)
+        session.query(Account).filter(Account.user_id == self.customer_id).delete()
+        session.query(Notification).filter(Notification.user_id.in_(self.ids)).delete(
+            synchronize_session=False)
+        session.query(TaskOutbox).filter(TaskOutbox.payload.contains(self.admin_id)).delete(
+            synchronize_session=False)
+        session.query(User).filter(User.id.in_(self.ids)).delete(synchronize_session=False)
+        session.commit()
+        storage.close()
+
+    def apply(self):
+        """Apply for a 1200 loan over twelve months"""
+        return self.controller.apply_loan(self.customer_id, 1200.0, 10.0, 12,
+                                          "stock", self.admin_id)
+
+    def count(self, model, *criteria):
+        """Number of committed rows matching the criteria"""
+        storage.close()
+        return storage.session().query(model).filter(*criteria).count()
+
+    def test_written_in_one_commit(self):
+        """Test that account, loan, notification and admin task share one commit"""
+        storage.reset_commit_count()
+        loan = self.apply()
+        self.assertEqual(storage.commit_count(), 1)
+
+        storage.close()
+        account = storage.session().query(Account).filter(
+            Account.user_id == self.customer_id).one()
+        self.assertTrue(account.account_number.startswith("MF"))
+        self.assertEqual((account.type, account.status), ("savings", "active"))
+        self.assertEqual(storage.get(Loan, loan.id).account_id, account.id)
+        self.assertEqual(self.count(Notification, Notification.user_id == self.customer_id), 1)
+
+    def test_admin_notified_by_task(self):
+        """Test that the admin is notified by a deferred task, not inline"""
+        loan = self.apply()
+        entries = storage.session().query(TaskOutbox).filter(
+            TaskOutbox.name == 'notify_admin_loan_application',
+            TaskOutbox.payload.contains(loan.id)).all()
+        self.assertEqual(len(entries), 1)
+        self.assertEqual(self.count(Notification, Notification.user_id == self.admin_id), 0)
+
+        task_runner.run_pending()
+        self.assertEqual(self.count(Notification, Notification.user_id == self.admin_id), 1)
+
+    def test_failure_writes_nothing(self):
+        """Test that a step failing after the loan is queued leaves no rows behind"""
+        with mock.patch.object(self.controller.notification_controller,
+                               'notify_loan_application', side_effect=RuntimeError("down")):
+            with self.assertRaises(RuntimeError):
+                self.apply()
+        # A later commit on the same session must not write the discarded rows
+        storage.save()
+
+        self.assertEqual(self.count(Account, Account.user_id == self.customer_id), 0)
+        self.assertEqual(self.count(Loan, Loan.admin_id == self.admin_id), 0)
+        self.assertEqual(self.count(TaskOutbox, TaskOutbox.payload.contains(self.admin_id)), 0)
+        self.assertEqual(self.count(Notification, Notification.user_id.in_(self.ids)), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import unittest
+from datetime import datetime, timedelta
+from BackEnd.models import storage
+from BackEnd.models.user import User
+from BackEnd.models.Account import Account
+from BackEnd.models.Loan import Loan
+from BackEnd.models.LoanInstallment import LoanInstallment
+from BackEnd.models.Notification import Notification
+from BackEnd.models.Repayment import Repayment
+from BackEnd.models.TaskOutbox import TaskOutbox
+from BackEnd.models.Transaction import Transaction
+from BackEnd.Controllers.LoanController import LoanController
+
+
+class TestLoanInstallments(unittest.TestCase):
+    """Test how repayments settle a loan's stored schedule"""
+
+    def setUp(self):
+        """Create a customer with an active 1200 loan of twelve 100 installments"""
+        self.user = User(fullname="Borrower", username="borrower",
+                         email="borrower@test.local", password="x")
+        self.account = Account(user_id=self.user.id, account_number="INS0000001",
+                               type="savings", balance=5000.0)
+        self.loan = Loan(admin_id=self.user.id, account_id=self.account.id, amount=1200.0,
+                         interest_rate=0.0, repayment_period=12, loan_status="active",
+                         end_date=datetime.now() + timedelta(days=360))
+        for obj in (self.user, self.account, self.loan):
+            storage.new(obj)
+        self.controller = LoanController()
+        self.controller._create_installments(self.loan, datetime.now())
+        storage.save()
+
+    def tearDown(self):
+        """Remove the test rows"""
+        session = storage.session()
+        session.rollback()
+        session.query(LoanInstallment).filter(LoanInstallment.loan_id == self.loan.id).delete()
+        session.query(Transaction).filter(Transaction.account_id == self.account.id).delete()
+        session.query(Repayment).filter(Repayment.loan_id == self.loan.id).delete()
+        session.query(Notification).filter(Notification.user_id == self.user.id).delete()
+        session.query(TaskOutbox).filter(TaskOutbox.payload.contains(self.user.id)).delete(
+            synchronize_session=False)
+        session.query(Loan).filter(Loan.id == self.loan.id).delete()
+        session.query(Account).filter(Account.id == self.account.id).delete()
+        session.query(User).filter(User.id == self.user.id).delete()
+        session.commit()
+        storage.close()
+
+    def installments(self):
+        """The stored installments, freshly read"""
+        storage.close()
+        return storage.session().query(LoanInstallment).filter(
+            LoanInstallment.loan_id == self.loan.id
+        ).order_by(LoanInstallment.installment_number).all()
+
+    def test_partial_payment_spans_installments(self):
+        """Test that a payment settles the oldest installments and part of the next"""
+        self.controller._allocate_to_installments(self.loan, 250.0)
+        storage.save()
+        installments = self.installments()
+        self.assertEqual([i.status for i in installments[:4]], ["paid", "paid", "partial", "pending"])
+        self.assertEqual([i.amount_paid for i in installments[:4]], [100.0, 100.0, 50.0, 0.0])
+
+        # The partial installment is finished before the next one starts
+        self.controller._allocate_to_installments(self.loan, 75.0)
+        storage.save()
+        installments = self.installments()
+        self.assertEqual([i.amount_paid for i in installments[2:5]], [100.0, 25.0, 0.0])
+
+    def test_overpayment_stops_at_amount_due(self):
+        """Test that paying more than is owed settles everything and no more"""
+        self.controller._allocate_to_installments(self.loan, 5000.0)
+        storage.save()
+        installments = self.installments()
+        self.assertTrue(all(i.status == "paid" for i in installments))
+        self.assertEqual(sum(i.amount_paid for i in installments), 1200.0)
+
+    def test_schedule_stable_after_repayment(self):
+        """Test that a repayment only records payments on the stored schedule"""
+        before = self.controller.get_repayment_schedule(self.loan.id)
+        self.controller.make_repayment(self.loan.id, 150.0)
+        storage.close()
+        after = self.controller.get_repayment_schedule(self.loan.id)
+
+        fixed = ("id", "installment_number", "due_date", "principal", "interest", "amount")
+        self.assertEqual([[e[k] for k in fixed] for e in before],
+                         [[e[k] for k in fixed] for e in after])
+        self.assertEqual([e["amount_paid"] for e in after[:3]], [100.0, 50.0, 0.0])
+        self.assertEqual(after[0]["remaining_balance"], 1050.0)
+
+    def test_legacy_loan_read_does_not_write(self):
+        """Test that a loan without stored installments gets them projected from its original amount"""
+        session = storage.session()
+        session.query(LoanInstallment).filter(LoanInstallment.loan_id == self.loan.id).delete()
+        # 300 of the original 1200 was repaid before installments existed
+        self.loan.amount = 900.0
+        storage.new(Repayment(loan_id=self.loan.id, amount=300.0, status="completed"))
+        storage.save()
+
+        schedule = self.controller.get_repayment_schedule(self.loan.id)
+        self.assertEqual(self.installments(), [])
+        self.assertEqual([e["amount"] for e in schedule], [100.0] * 12)
+        self.assertEqual([e["status"] for e in schedule[:4]], ["paid", "paid", "paid", "pending"])
+        self.assertEqual(schedule[0]["remaining_balance"], 900.0)
+
+    def test_backfill_stores_projected_schedule(self):
+        """Test that backfilling stores what a legacy loan's schedule projects, once"""
+        session = storage.session()
+        session.query(LoanInstallment).filter(LoanInstallment.loan_id == self.loan.id).delete()
+        self.loan.amount = 900.0
+        storage.new(Repayment(loan_id=self.loan.id, amount=300.0, status="completed"))
+        storage.save()
+        projected = self.controller.get_repayment_schedule(self.loan.id)
+
+        self.assertGreaterEqual(self.controller.backfill_installments(), 1)
+        stored = self.installments()
+        self.assertEqual([(i.amount_paid, i.status) for i in stored],
+                         [(e["amount_paid"], e["status"]) for e in projected])
+        self.assertEqual(sum(i.amount_paid for i in stored), 300.0)
+        self.assertEqual(self.controller.backfill_installments(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+from sqlalchemy import event
+from BackEnd.models import storage
+from BackEnd.models.user import User
+from BackEnd.models.Account import Account
+from BackEnd.models.Loan import Loan
+from BackEnd.Controllers.LoanController import LoanController
+
+LOAN_COUNT = 25
+
+class TestLoanListingQueries(unittest.TestCase):
+    """Loan listings must cost the same number of queries for any number of loans"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Create an admin and customers with one pending loan each"""
+        cls.admin = User(fullname="Admin", username="listing-admin",
+                         email="listing-admin@test.local", password="x", admin=True)
+        cls.objects = [cls.admin]
+        cls.customer_ids = []
+        for i in range(LOAN_COUNT):
+            customer = User(fullname=f"Customer {i}", username=f"listing{i}",
+                            email=f"listing{i}@test.local", password="x")
+            account = Account(user_id=customer.id, account_number=f"LST{i:07d}",
+                              type="savings", balance=100.0)
+            loan = Loan(admin_id=cls.admin.id, account_id=account.id, amount=1000.0,
+                        interest_rate=10.0, repayment_period=12, loan_status="pending")
+            cls.objects += [customer, account, loan]
+            cls.customer_ids.append(customer.id)
+        for obj in cls.objects:
+            storage.new(obj)
+        storage.save()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Remove the test rows"""
+        for obj in reversed(cls.objects):
+            storage.delete(obj)
+        storage.save()
+        storage.close()
+
+    def serialize_counting_queries(self, listing):
+        """Run a listing in a fresh session and serialize it, counting statements"""
+        storage.close()
+        statements = []
+
+        def count(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        engine = storage._DBStorage__engine
+        event.listen(engine, "before_cursor_execute", count)
+        try:
+            loans = [loan.to_dict() for loan in listing()]
+        finally:
+            event.remove(engine, "before_cursor_execute", count)
+        return loans, len(statements)
+
+    def test_admin_loans(self):
+        """Test that the admin listing loads accounts and owners with the loans"""
+        loans, queries = self.serialize_counting_queries(
+            lambda: LoanController().get_admin_loans(self.admin.id))
+        self.assertEqual(len(loans), LOAN_COUNT)
+        # One lookup for the admin, one for the loans
+        self.assertLessEqual(queries, 2)
+        self.assertTrue(all(loan["account"]["user"]["fullname"].startswith("Customer")
+                            for loan in loans))
+
+    def test_unassigned_loans(self):
+        """Test that the pending listing is a single query"""
+        loans, queries = self.serialize_counting_queries(
+            lambda: LoanController().get_unassigned_loans())
+        self.assertGreaterEqual(len(loans), LOAN_COUNT)
+        self.assertEqual(queries, 1)
+        self.assertTrue(all("account" in loan for loan in loans))
+
+    def test_user_loans(self):
+        """Test that a customer's listing is a single query"""
+        loans, queries = self.serialize_counting_queries(
+            lambda: LoanController().get_user_loans(self.customer_ids[0]))
+        self.assertEqual(len(loans), 1)
+        self.assertEqual(queries, 1)
+        self.assertEqual(loans[0]["account"]["user_id"], self.customer_ids[0])
+
+    def test_to_dict_does_not_lazy_load(self):
+        """Test that serializing a bare loan does not fetch its account"""
+        loans, queries = self.serialize_counting_queries(
+            lambda: storage.session().query(Loan).filter(Loan.admin_id == self.admin.id).all())
+        self.assertEqual(queries, 1)
+        self.assertTrue(all("account" not in loan for loan in loans))
+
+if __name__ == "__main__":
+    unittest.main()
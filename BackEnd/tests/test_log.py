@@ -0,0 +1,71 @@
+import json
+import logging
+import queue
+import unittest
+from flask import Flask, jsonify
+from BackEnd.monitoring import log
+from BackEnd.monitoring.log import JsonFormatter, RequestIdFilter, StructuredQueueHandler
+
+
+class TestStructuredLogging(unittest.TestCase):
+    """Test JSON log lines, the queue handler and request ids"""
+
+    def setUp(self):
+        """Set up a logger that queues its records, and an app"""
+        self.records = queue.SimpleQueue()
+        handler = StructuredQueueHandler(self.records)
+        handler.addFilter(RequestIdFilter())
+        self.logger = logging.getLogger('BackEnd.tests.test_log')
+        self.logger.propagate = False
+        self.logger.setLevel(logging.DEBUG)
+        self.logger.addHandler(handler)
+        self.addCleanup(self.logger.removeHandler, handler)
+
+        app = Flask(__name__)
+        log.init_app(app)
+
+        @app.route('/work')
+        def work():
+            self.logger.info("working")
+            return jsonify({})
+
+        self.client = app.test_client()
+
+    def next_line(self):
+        """The next queued record, formatted"""
+        return json.loads(JsonFormatter().format(self.records.get_nowait()))
+
+    def test_json_line(self):
+        """Test that a record becomes one JSON object with its extra fields"""
+        self.logger.warning("Deposit of %s failed", 25.0, extra={'account_id': 'A1'})
+        entry = self.next_line()
+        self.assertEqual(entry['level'], 'WARNING')
+        self.assertEqual(entry['logger'], 'BackEnd.tests.test_log')
+        self.assertEqual(entry['message'], "Deposit of 25.0 failed")
+        self.assertEqual(entry['account_id'], 'A1')
+        self.assertIsNone(entry['request_id'])
+
+    def test_exception_rendered_before_queueing(self):
+        """Test that the traceback travels as text"""
+        try:
+            raise ValueError("Insufficient funds")
+        except ValueError:
+            self.logger.exception("Error in withdraw")
+        record = self.records.get_nowait()
+        self.assertIsNone(record.exc_info)
+        entry = json.loads(JsonFormatter().format(record))
+        self.assertIn("ValueError: Insufficient funds", entry['exception'])
+
+    def test_request_id(self):
+        """Test that records and responses carry the request id"""
+        response = self.client.get('/work', headers={'X-Request-ID': 'req-1'})
+        self.assertEqual(response.headers['X-Request-ID'], 'req-1')
+        self.assertEqual(self.next_line()['request_id'], 'req-1')
+
+        generated = self.client.get('/work').headers['X-Request-ID']
+        self.assertEqual(len(generated), 32)
+        self.assertEqual(self.next_line()['request_id'], generated)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+from BackEnd.api.v1.app import app
+from BackEnd.models import storage
+from BackEnd.models.user import User
+from BackEnd.models.Account import Account
+from BackEnd.models.Loan import Loan
+from BackEnd.models.LoanInstallment import LoanInstallment
+from BackEnd.models.Notification import Notification
+from BackEnd.models.Repayment import Repayment
+from BackEnd.models.Transaction import Transaction
+from BackEnd.Controllers.LoanController import LoanController
+
+
+class TestMakeRepayment(unittest.TestCase):
+    """Test repaying a loan through the controller and the API"""
+
+    def setUp(self):
+        """Create a borrower with 5000 and an active 1200 loan, and another customer"""
+        expiration = datetime.utcnow() + timedelta(hours=1)
+        self.user = User(fullname="Payer", username="payer", email="payer@test.local",
+                         password="x", session_id="payer-session",
+                         session_expiration=expiration)
+        self.other = User(fullname="Other", username="other", email="other@test.local",
+                          password="x", session_id="other-session",
+                          session_expiration=expiration)
+        self.account = Account(user_id=self.user.id, account_number="REP0000001",
+                               type="savings", balance=5000.0)
+        self.loan = Loan(admin_id=self.user.id, account_id=self.account.id, amount=1200.0,
+                         interest_rate=0.0, repayment_period=12, loan_status="active",
+                         end_date=datetime.now() + timedelta(days=360))
+        for obj in (self.user, self.other, self.account, self.loan):
+            storage.new(obj)
+        self.controller = LoanController()
+        self.controller._create_installments(self.loan, datetime.now())
+        storage.save()
+        self.user_ids = [self.user.id, self.other.id]
+        self.account_id, self.loan_id = self.account.id, self.loan.id
+        self.client = app.test_client()
+
+    def tearDown(self):
+        """Remove the test rows"""
+        session = storage.session()
+        session.rollback()
+        session.query(LoanInstallment).filter(LoanInstallment.loan_id == self.loan_id).delete()
+        session.query(Transaction).filter(Transaction.account_id == self.account_id).delete()
+        session.query(Repayment).filter(Repayment.loan_id == self.loan_id).delete()
+        session.query(Notification).filter(Notification.user_id.in_(self.user_ids)).delete(
+            synchronize_session=False)
+        session.query(Loan).filter(Loan.id == self.loan_id).delete()
+        session.query(Account).filter(Account.id == self.account_id).delete()
+        session.query(User).filter(User.id.in_(self.user_ids)).delete(synchronize_session=False)
+        session.commit()
+        storage.close()
+
+    def stored(self):
+        """Account balance, loan amount, installment payments, repayments and transactions as committed"""
+        storage.close()
+        session = storage.session()
+        installments = session.query(LoanInstallment.amount_paid).filter(
+            LoanInstallment.loan_id == self.loan_id
+        ).order_by(LoanInstallment.installment_number).limit(4)
+        return (session.get(Account, self.account_id).balance,
+                session.get(Loan, self.loan_id).amount,
+                [paid for paid, in installments],
+                session.query(Repayment.amount).filter(Repayment.loan_id == self.loan_id).all(),
+                session.query(Transaction.amount, Transaction.balance_after).filter(
+                    Transaction.account_id == self.account_id).all())
+
+    def pay(self, session_id="payer-session", **fields):
+        """POST a payment of 250 on the loan"""
+        headers = {'Authorization': f"Bearer {session_id}"} if session_id else {}
+        return self.client.post('/api/v1/repayments/make-payment', headers=headers, json={
+            'loan_id': self.loan_id, 'amount': 250, 'payment_method': 'account', **fields})
+
+    def test_repayment_settles_installments(self):
+        """Test that a repayment debits the account and spans installments in one commit"""
+        storage.reset_commit_count()
+        self.controller.make_repayment(self.loan_id, 250.0, user_id=self.user_ids[0])
+        self.assertEqual(storage.commit_count(), 1)
+        self.assertEqual(self.stored(), (4750.0, 950.0, [100.0, 100.0, 50.0, 0.0],
+                                         [(250.0,)], [(-250.0, 4750.0)]))
+
+    def test_failure_rolls_back(self):
+        """Test that a step failing after the debit leaves no repayment, transaction or balance change"""
+        before = self.stored()
+        with mock.patch.object(self.controller.notification_controller,
+                               'notify_loan_repayment', side_effect=RuntimeError("down")):
+            with self.assertRaises(RuntimeError):
+                self.controller.make_repayment(self.loan_id, 250.0)
+        # A later commit on the same session must not write the discarded changes
+        storage.save()
+        self.assertEqual(self.stored(), before)
+        self.assertEqual(before, (5000.0, 1200.0, [0.0] * 4, [], []))
+
+    def test_api_requires_owner(self):
+        """Test that only the borrower's session can repay the loan"""
+        self.assertEqual(self.pay(None).status_code, 401)
+        self.assertEqual(self.pay("no-such-session").status_code, 401)
+        self.assertEqual(self.pay("other-session").status_code, 403)
+        self.assertEqual(self.stored()[0], 5000.0)
+
+        response = self.pay()
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.get_json()["remaining_balance"], 950.0)
+
+    def test_api_rejects_invalid_payments(self):
+        """Test that refused payments are answered with 400, not 500"""
+        for fields in ({'amount': 'ten'}, {'amount': 'nan'}, {'amount': -5}):
+            self.assertEqual(self.pay(**fields).status_code, 400, fields)
+
+        storage.session().query(Account).filter(Account.id == self.account_id).update(
+            {'balance': 10.0})
+        storage.save()
+        response = self.pay()
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_json(), {"error": "Insufficient funds for repayment"})
+        self.assertEqual(self.pay(loan_id="no-such-loan").status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+import threading
+import unittest
+from unittest import mock
+from flask import Flask, jsonify
+from BackEnd.monitoring import metrics
+from BackEnd.monitoring.metrics import Counter, Gauge, Histogram, Registry, operation
+
+
+class TestRegistry(unittest.TestCase):
+    """Test per-thread aggregation and the text format"""
+
+    def setUp(self):
+        """Set up a registry with one metric of each kind"""
+        self.registry = Registry()
+        self.counter = Counter(self.registry, 'test_total', 'A counter', ('kind',))
+        self.histogram = Histogram(self.registry, 'test_seconds', 'A histogram', buckets=(0.1, 1.0))
+        Gauge(self.registry, 'test_gauge', 'A gauge', ('state',), collect=lambda: {('up',): 3})
+
+    def test_text_format(self):
+        """Test counters, cumulative buckets and gauges"""
+        self.counter.inc('a')
+        self.counter.inc('a', amount=2.5)
+        self.counter.inc('b"\n')
+        for value in (0.05, 0.1, 0.5, 3.0):
+            self.histogram.observe(value)
+        text = self.registry.exposition()
+        self.assertIn('# TYPE test_total counter\n', text)
+        self.assertIn('test_total{kind="a"} 3.5\n', text)
+        self.assertIn('test_total{kind="b\\"\\n"} 1.0\n', text)
+        self.assertIn('test_seconds_bucket{le="0.1"} 2\n', text)
+        self.assertIn('test_seconds_bucket{le="1.0"} 3\n', text)
+        self.assertIn('test_seconds_bucket{le="+Inf"} 4\n', text)
+        self.assertIn('test_seconds_sum 3.65\n', text)
+        self.assertIn('test_seconds_count 4\n', text)
+        self.assertIn('test_gauge{state="up"} 3.0\n', text)
+
+    def test_threads_added_up(self):
+        """Test that values of running and ended threads are all counted"""
+        started = threading.Event()
+        finish = threading.Event()
+
+        def running():
+            self.counter.inc('a')
+            started.set()
+            finish.wait()
+
+        ended = threading.Thread(target=lambda: self.counter.inc('a', amount=10))
+        ended.start()
+        ended.join()
+        worker = threading.Thread(target=running)
+        worker.start()
+        started.wait()
+        self.counter.inc('a', amount=100)
+        self.assertEqual(self.registry.collect()[(self.counter, ('a',))], 111)
+        finish.set()
+        worker.join()
+        self.assertEqual(self.registry.collect()[(self.counter, ('a',))], 111)
+
+    def test_timer(self):
+        """Test that Histogram.time() observes decorated calls"""
+        @self.histogram.time()
+        def compute():
+            return 42
+
+        self.assertEqual(compute(), 42)
+        self.assertEqual(self.registry.collect()[(self.histogram, ())][-1], 1)
+
+
+class TestOperations(unittest.TestCase):
+    """Test the controller operation decorator"""
+
+    def setUp(self):
+        """Start from zero"""
+        metrics.registry.reset()
+
+    def value(self, metric, *labelvalues):
+        """Current value of one series"""
+        return metrics.registry.collect().get((metric, labelvalues))
+
+    def test_nested_operations_recorded_once(self):
+        """Test that an operation's inner operations are part of it"""
+        @operation('withdraw', amount=lambda result: result)
+        def withdraw(amount):
+            return -amount
+
+        @operation('transfer', amount=lambda result: result)
+        def transfer(amount):
+            withdraw(amount)
+            return amount
+
+        self.assertEqual(transfer(40.0), 40.0)
+        self.assertEqual(self.value(metrics.OPERATIONS, 'transfer', 'success'), 1)
+        self.assertEqual(self.value(metrics.MONEY_FLOW, 'transfer'), 40.0)
+        self.assertIsNone(self.value(metrics.OPERATIONS, 'withdraw', 'success'))
+
+        withdraw(5.0)
+        self.assertEqual(self.value(metrics.MONEY_FLOW, 'withdraw'), 5.0)
+
+    def test_failed_operation(self):
+        """Test that failures are counted and move no money"""
+        @operation('deposit', amount=lambda result: result)
+        def deposit(amount):
+            raise ValueError("Deposit amount must be positive")
+
+        with self.assertRaises(ValueError):
+            deposit(-1)
+        self.assertEqual(self.value(metrics.OPERATIONS, 'deposit', 'error'), 1)
+        self.assertEqual(self.value(metrics.OPERATION_DURATION, 'deposit')[-1], 1)
+        self.assertIsNone(self.value(metrics.MONEY_FLOW, 'deposit'))
+
+
+class TestMetricsEndpoint(unittest.TestCase):
+    """Test request metrics and /metrics"""
+
+    def setUp(self):
+        """Set up an app serving /metrics"""
+        app = Flask(__name__)
+        metrics.init_app(app)
+
+        @app.route('/items/<item_id>')
+        def item(item_id):
+            return jsonify({'id': item_id})
+
+        metrics.registry.reset()
+        self.client = app.test_client()
+
+    def test_requests_by_route(self):
+        """Test that requests are labelled by URL rule and status"""
+        self.client.get('/items/1')
+        self.client.get('/items/2')
+        text = self.client.get('/metrics').get_data(as_text=True)
+        self.assertIn('mfs_http_requests_total{method="GET",route="/items/<item_id>",status="200"} 2.0',
+                      text)
+        self.assertIn('mfs_http_request_duration_seconds_count{method="GET",route="/items/<item_id>"} 2',
+                      text)
+
+    def test_token(self):
+        """Test that MFS_METRICS_TOKEN guards /metrics"""
+        with mock.patch.object(metrics, 'METRICS_TOKEN', 'secret'):
+            self.assertEqual(self.client.get('/metrics').status_code, 401)
+            response = self.client.get('/metrics', headers={'Authorization': 'Bearer secret'})
+            self.assertEqual(response.status_code, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+import inspect
+from datetime import date
+from BackEnd.models.AccountBalanceDaily import AccountBalanceDaily
+from BackEnd.models.Transaction import Transaction
+from BackEnd.models.base_model import BaseModel
+
+class TestAccountBalanceDailyDocs(unittest.TestCase):
+    """Tests to check the documentation of the AccountBalanceDaily class"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.snapshot_f = inspect.getmembers(AccountBalanceDaily, inspect.isfunction)
+
+    def test_snapshot_class_docstring(self):
+        """Test for the AccountBalanceDaily class docstring"""
+        self.assertIsNot(AccountBalanceDaily.__doc__, None, "AccountBalanceDaily class needs a docstring")
+        self.assertTrue(len(AccountBalanceDaily.__doc__) >= 1, "AccountBalanceDaily class needs a docstring")
+
+    def test_snapshot_func_docstrings(self):
+        """Test for the presence of docstrings in AccountBalanceDaily methods"""
+        for func in self.snapshot_f:
+            self.assertIsNot(func[1].__doc__, None, f"{func[0]} method needs a docstring")
+            self.assertTrue(len(func[1].__doc__) >= 1, f"{func[0]} method needs a docstring")
+
+class TestAccountBalanceDaily(unittest.TestCase):
+    """Test the AccountBalanceDaily class"""
+
+    def setUp(self):
+        """Set up a test snapshot row"""
+        self.snapshot = AccountBalanceDaily(
+            account_id="account123",
+            snapshot_date=date(2026, 3, 1),
+            balance=1250.5
+        )
+
+    def test_is_subclass(self):
+        """Test that AccountBalanceDaily is a subclass of BaseModel"""
+        self.assertIsInstance(self.snapshot, BaseModel)
+
+    def test_to_dict(self):
+        """Test the to_dict method"""
+        snapshot_dict = self.snapshot.to_dict()
+        self.assertEqual(snapshot_dict["account_id"], "account123")
+        self.assertEqual(snapshot_dict["snapshot_date"], "2026-03-01")
+        self.assertEqual(snapshot_dict["balance"], 1250.5)
+
+    def test_one_row_per_account_and_day(self):
+        """Test that snapshots are unique per account and day"""
+        index = next(i for i in AccountBalanceDaily.__table__.indexes
+                     if i.name == 'idx_account_balance_daily_account_date')
+        self.assertTrue(index.unique)
+        self.assertEqual([c.name for c in index.columns], ["account_id", "snapshot_date"])
+
+    def test_transaction_balance_after(self):
+        """Test that transactions carry the balance after posting"""
+        transaction = Transaction(account_id="account123", amount=-50.0,
+                                  transaction_type="withdrawal", balance_after=1200.5)
+        self.assertEqual(transaction.to_dict()["balance_after"], 1200.5)
+
+if __name__ == "__main__":
+    unittest.main()
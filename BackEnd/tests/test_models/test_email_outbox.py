@@ -0,0 +1,60 @@
+import unittest
+import inspect
+from datetime import datetime
+from BackEnd.models.EmailOutbox import EmailOutbox
+from BackEnd.models.base_model import BaseModel
+from BackEnd.Controllers.EmailOutboxController import _retry_delay, RETRY_MAX_DELAY
+
+class TestEmailOutboxDocs(unittest.TestCase):
+    """Tests to check the documentation of the EmailOutbox class"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.outbox_f = inspect.getmembers(EmailOutbox, inspect.isfunction)
+
+    def test_outbox_class_docstring(self):
+        """Test for the EmailOutbox class docstring"""
+        self.assertIsNot(EmailOutbox.__doc__, None, "EmailOutbox class needs a docstring")
+        self.assertTrue(len(EmailOutbox.__doc__) >= 1, "EmailOutbox class needs a docstring")
+
+    def test_outbox_func_docstrings(self):
+        """Test for the presence of docstrings in EmailOutbox methods"""
+        for func in self.outbox_f:
+            self.assertIsNot(func[1].__doc__, None, f"{func[0]} method needs a docstring")
+            self.assertTrue(len(func[1].__doc__) >= 1, f"{func[0]} method needs a docstring")
+
+class TestEmailOutbox(unittest.TestCase):
+    """Test the EmailOutbox class"""
+
+    def setUp(self):
+        """Set up a test outbox entry"""
+        self.next_attempt_at = datetime(2026, 1, 1, 12, 0, 0)
+        self.email = EmailOutbox(
+            recipient="user@example.com",
+            subject="Email Verification",
+            body="Click the link",
+            status="pending",
+            attempts=0,
+            next_attempt_at=self.next_attempt_at
+        )
+
+    def test_is_subclass(self):
+        """Test that EmailOutbox is a subclass of BaseModel"""
+        self.assertIsInstance(self.email, BaseModel)
+
+    def test_to_dict(self):
+        """Test the to_dict method"""
+        email_dict = self.email.to_dict()
+        self.assertEqual(email_dict["recipient"], "user@example.com")
+        self.assertEqual(email_dict["status"], "pending")
+        self.assertEqual(email_dict["next_attempt_at"], self.next_attempt_at.isoformat())
+        self.assertIsNone(email_dict["sent_at"])
+
+    def test_retry_delay_backs_off(self):
+        """Test that retry delays double and are capped"""
+        self.assertEqual(_retry_delay(2), 2 * _retry_delay(1))
+        self.assertEqual(_retry_delay(50).total_seconds(), RETRY_MAX_DELAY)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+#!/usr/bin/python3
+"""Tests for the DBStorage engine's unit of work, run against sqlite"""
+import os
+import unittest
+from unittest import mock
+from BackEnd.models.engine.database import DBStorage
+from BackEnd.models.user import User
+from BackEnd.models.Account import Account
+
+
+class TestDBStorageTransaction(unittest.TestCase):
+    """Test DBStorage.transaction() and the commit counter"""
+
+    def setUp(self):
+        """Set up a storage on an in-memory database"""
+        with mock.patch.dict(os.environ, {'MFS_DB_URL': 'sqlite://', 'MFS_ENV': ''}):
+            self.storage = DBStorage()
+        self.storage.reload()
+        self.storage.reset_commit_count()
+
+    def tearDown(self):
+        """Drop the session"""
+        self.storage.close()
+
+    def make_user(self, email):
+        """Add a user to the session"""
+        user = User(fullname="Test", username=email, email=email, password="x")
+        self.storage.new(user)
+        return user
+
+    def stored_emails(self):
+        """Emails of the committed users, read outside the session"""
+        engine = self.storage._DBStorage__engine
+        with engine.connect() as connection:
+            return sorted(row[0] for row in connection.exec_driver_sql("SELECT email FROM users"))
+
+    def test_save_commits(self):
+        """Test that save() outside a transaction commits at once"""
+        self.make_user("a@x")
+        self.storage.save()
+        self.make_user("b@x")
+        self.storage.save()
+        self.assertEqual(self.storage.commit_count(), 2)
+
+    def test_nested_commit_once(self):
+        """Test that nested blocks and their saves collapse into one commit"""
+        with self.storage.transaction():
+            self.make_user("a@x")
+            self.storage.save()
+            with self.storage.transaction():
+                self.make_user("b@x")
+                self.storage.save()
+            self.assertEqual(self.storage.commit_count(), 0)
+            # Queries inside the block still see the pending objects
+            self.assertEqual(self.storage.session().query(User).count(), 2)
+        self.assertEqual(self.storage.commit_count(), 1)
+        self.assertEqual(self.stored_emails(), ["a@x", "b@x"])
+
+    def test_exception_rolls_back(self):
+        """Test that an exception in any block rolls the whole unit back"""
+        with self.assertRaises(ValueError):
+            with self.storage.transaction():
+                self.make_user("a@x")
+                with self.storage.transaction():
+                    self.make_user("b@x")
+                    raise ValueError
+        self.assertEqual(self.storage.commit_count(), 0)
+        self.assertEqual(self.stored_emails(), [])
+
+    def test_handled_rollback_not_committed(self):
+        """Test that a Rollback() inside a block is not undone by the commit"""
+        with self.storage.transaction():
+            self.make_user("a@x")
+            try:
+                with self.storage.transaction():
+                    raise ValueError
+            except ValueError:
+                self.storage.Rollback()
+            self.make_user("b@x")
+        self.assertEqual(self.storage.commit_count(), 0)
+        self.assertEqual(self.stored_emails(), [])
+
+        # The next unit commits normally
+        with self.storage.transaction():
+            self.make_user("c@x")
+        self.assertEqual(self.stored_emails(), ["c@x"])
+
+    def test_table_versions(self):
+        """Test that committed ORM and bulk writes bump their table's counter"""
+        self.assertEqual(self.storage.table_versions(User, Account), ())
+        user = self.make_user("a@x")
+        self.storage.save()
+        self.assertEqual(self.storage.table_versions(User, Account), (("users", 1),))
+
+        self.storage.session().query(User).filter(User.id == user.id).update(
+            {User.fullname: "Renamed"}, synchronize_session=False)
+        self.storage.session().execute(Account.__table__.insert(), [{
+            'id': 'acc1', 'user_id': user.id, 'account_number': 'MF1', 'type': 'savings',
+            'balance': 0.0}])
+        self.storage.save()
+        self.assertEqual(self.storage.table_versions(User, Account),
+                         (("accounts", 1), ("users", 2)))
+
+        # Rolled back and read-only transactions change nothing
+        self.make_user("b@x")
+        self.storage.session().flush()
+        self.storage.Rollback()
+        self.storage.session().query(User).all()
+        self.storage.save()
+        self.assertEqual(self.storage.table_versions(User, Account),
+                         (("accounts", 1), ("users", 2)))
+
+
+if __name__ == '__main__':
+    unittest.main()
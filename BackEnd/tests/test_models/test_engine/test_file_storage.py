@@ -0,0 +1,305 @@
+#!/usr/bin/python3
+"""Tests for the append-only FileStorage engine"""
+import inspect
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import date, datetime
+from BackEnd.models.engine import file_storage
+from BackEnd.models.engine.file_storage import FileStorage
+from BackEnd.models.engine.snapshot import Snapshot, is_snapshot, write_snapshot
+from BackEnd.models.user import User
+from BackEnd.models.Account import Account
+from BackEnd.models.AccountBalanceDaily import AccountBalanceDaily
+from BackEnd.models.Transaction import Transaction
+
+
+class TestFileStorageDocs(unittest.TestCase):
+    """Tests to check the documentation of the FileStorage class"""
+
+    def test_func_docstrings(self):
+        """Test for the presence of docstrings in FileStorage methods"""
+        for name, func in inspect.getmembers(FileStorage, inspect.isfunction):
+            self.assertIsNot(func.__doc__, None, f"{name} method needs a docstring")
+
+
+class TestFileStorage(unittest.TestCase):
+    """Test the FileStorage class"""
+
+    def setUp(self):
+        """Set up an empty storage in a temporary directory"""
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "file.json")
+        self.storage = FileStorage(self.path)
+        self.storage.reload()
+
+    def tearDown(self):
+        """Remove the storage files"""
+        shutil.rmtree(self.dir)
+
+    def reopen(self):
+        """A second storage reading the same files"""
+        storage = FileStorage(self.path)
+        storage.reload()
+        return storage
+
+    def log_lines(self):
+        """Entries in the write log"""
+        with open(self.path + ".log") as f:
+            return [json.loads(line) for line in f]
+
+    def make_user(self, email):
+        """Add a user to the storage"""
+        user = User(fullname="Test", username=email, email=email, password="x")
+        self.storage.new(user)
+        return user
+
+    def test_all_model_classes(self):
+        """Test that every model class can be stored"""
+        for name in ("User", "Account", "Loan", "Transaction", "Repayment", "Notification"):
+            self.assertIn(name, file_storage.classes)
+        account = Account(user_id="user1", account_number="MF1", type="savings", balance=5.0)
+        self.storage.new(account)
+        self.storage.save()
+        self.assertEqual(self.reopen().get(Account, account.id).balance, 5.0)
+
+    def test_dates_round_trip(self):
+        """Test that date and datetime columns come back as dates"""
+        user = self.make_user("a@x")
+        user.session_expiration = datetime(2026, 3, 1, 9, 30)
+        snapshot = AccountBalanceDaily(account_id="acc1", snapshot_date=date(2026, 3, 1), balance=1.0)
+        self.storage.new(snapshot)
+        self.storage.save()
+        storage = self.reopen()
+        self.assertEqual(storage.get(User, user.id).session_expiration, datetime(2026, 3, 1, 9, 30))
+        self.assertEqual(storage.get(AccountBalanceDaily, snapshot.id).snapshot_date, date(2026, 3, 1))
+
+    def test_save_appends_only_changes(self):
+        """Test that a save writes only the objects changed since the last one"""
+        self.make_user("a@x")
+        self.make_user("b@x")
+        self.storage.save()
+        self.assertEqual(len(self.log_lines()), 2)
+
+        user = self.make_user("c@x")
+        self.storage.save()
+        self.storage.save()
+        lines = self.log_lines()
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(lines[-1]["key"], "User." + user.id)
+
+    def test_transaction(self):
+        """Test that a transaction appends to the log once, when it ends"""
+        with self.storage.transaction():
+            self.make_user("a@x")
+            self.storage.save()
+            with self.storage.transaction():
+                self.make_user("b@x")
+                self.storage.save()
+            self.assertFalse(os.path.exists(self.path + ".log"))
+        self.assertEqual(len(self.log_lines()), 2)
+        self.assertEqual(self.reopen().count(User), 2)
+
+    def test_transaction_rolls_back_on_error(self):
+        """Test that a block that raised leaves nothing for a later save"""
+        kept = self.make_user("a@x")
+        self.storage.save()
+        with self.assertRaises(ValueError):
+            with self.storage.transaction():
+                failed = self.make_user("b@x")
+                kept.fullname = "Renamed"
+                self.storage.new(kept)
+                with self.storage.transaction():
+                    self.storage.delete(self.storage.get(User, kept.id))
+                raise ValueError("boom")
+        self.assertIsNone(self.storage.get(User, failed.id))
+        self.assertEqual(self.storage.get(User, kept.id).fullname, "Test")
+
+        later = self.make_user("c@x")
+        self.storage.save()
+        self.assertEqual([line["key"] for line in self.log_lines()],
+                         ["User." + kept.id, "User." + later.id])
+        storage = self.reopen()
+        self.assertIsNone(storage.get(User, failed.id))
+        self.assertEqual(storage.get(User, kept.id).fullname, "Test")
+
+    def test_reload_replays_log(self):
+        """Test that updates and deletions survive a restart"""
+        user = self.make_user("a@x")
+        gone = self.make_user("b@x")
+        self.storage.save()
+        user.fullname = "Renamed"
+        self.storage.new(user)
+        self.storage.delete(gone)
+        self.storage.save()
+
+        storage = self.reopen()
+        self.assertEqual(storage.get(User, user.id).fullname, "Renamed")
+        self.assertIsNone(storage.get(User, gone.id))
+        self.assertEqual(storage.count(User), 1)
+
+    def test_compact(self):
+        """Test that compaction folds the log into the snapshot"""
+        user = self.make_user("a@x")
+        self.storage.save()
+        self.storage.compact()
+        self.assertEqual(os.path.getsize(self.path + ".log"), 0)
+        self.assertEqual(self.reopen().get(User, user.id).email, "a@x")
+
+    def test_compacts_when_log_outgrows_objects(self):
+        """Test that a long log is compacted automatically"""
+        original = file_storage.COMPACT_MIN_ENTRIES
+        file_storage.COMPACT_MIN_ENTRIES = 5
+        try:
+            user = self.make_user("a@x")
+            for n in range(5):
+                user.fullname = f"Name {n}"
+                self.storage.new(user)
+                self.storage.save()
+        finally:
+            file_storage.COMPACT_MIN_ENTRIES = original
+        self.assertEqual(os.path.getsize(self.path + ".log"), 0)
+        self.assertEqual(self.reopen().get(User, user.id).fullname, "Name 4")
+
+    def test_torn_log_line_ignored(self):
+        """Test that a partly written last entry is skipped"""
+        user = self.make_user("a@x")
+        self.storage.save()
+        with open(self.path + ".log", "a") as f:
+            f.write('{"key": "User.broken", "obj": {"__cla')
+        self.assertEqual(self.reopen().count(User), 1)
+        self.assertIsNotNone(self.reopen().get(User, user.id))
+
+    def test_find_by_index(self):
+        """Test lookups by indexed and non-indexed fields"""
+        user = self.make_user("a@x")
+        self.make_user("b@x")
+        self.assertIs(self.storage.find(User, email="a@x"), user)
+        self.assertIs(self.storage.find(User, fullname="Test", email="a@x"), user)
+        self.assertIsNone(self.storage.find(User, email="c@x"))
+        self.assertIsNone(self.storage.find(Account, user_id=user.id))
+
+    def test_index_follows_updates(self):
+        """Test that re-added objects are re-indexed"""
+        user = self.make_user("a@x")
+        user.session_id = "token1"
+        self.storage.new(user)
+        self.assertIs(self.storage.find(User, session_id="token1"), user)
+        user.session_id = "token2"
+        self.storage.new(user)
+        self.assertIsNone(self.storage.find(User, session_id="token1"))
+        self.assertIs(self.storage.find(User, session_id="token2"), user)
+        self.storage.delete(user)
+        self.assertIsNone(self.storage.find(User, session_id="token2"))
+
+    def test_all_and_count_by_class(self):
+        """Test per-class listings"""
+        self.make_user("a@x")
+        transaction = Transaction(account_id="acc1", amount=1.0, transaction_type="deposit")
+        self.storage.new(transaction)
+        self.assertEqual(list(self.storage.all(Transaction)), ["Transaction." + transaction.id])
+        self.assertEqual(len(self.storage.all("User")), 1)
+        self.assertEqual(self.storage.count(), 2)
+        self.assertEqual(self.storage.count(User), 1)
+
+    def test_close_reloads_external_changes(self):
+        """Test that close() picks up writes from another process"""
+        self.make_user("a@x")
+        self.storage.save()
+        other = self.reopen()
+        user = User(fullname="Other", username="o", email="o@x", password="x")
+        other.new(user)
+        other.save()
+        self.storage.close()
+        self.assertIsNotNone(self.storage.get(User, user.id))
+
+    def test_objects_decoded_on_first_access(self):
+        """Test that a reopened snapshot decodes objects only when asked for"""
+        users = [self.make_user(f"{n}@x") for n in range(3)]
+        self.storage.new(Account(user_id=users[0].id, account_number="MF1", type="savings"))
+        self.storage.save()
+        self.storage.compact()
+        self.assertTrue(is_snapshot(self.path))
+
+        storage = self.reopen()
+        decoded = storage._FileStorage__objects
+        self.assertEqual(len(decoded), 0)
+        self.assertEqual(storage.count(User), 3)
+        self.assertEqual(storage.count(), 4)
+        self.assertEqual(len(decoded), 0)
+        self.assertEqual(storage.get(User, users[1].id).email, "1@x")
+        self.assertEqual(len(decoded), 1)
+        self.assertEqual(storage.find(User, email="2@x").id, users[2].id)
+        self.assertEqual(len(decoded), 3)
+        self.assertEqual(len(storage.all(Account)), 1)
+
+    def test_snapshot_deletes_and_updates(self):
+        """Test changes to snapshotted objects across reopen and compaction"""
+        user = self.make_user("a@x")
+        gone = self.make_user("b@x")
+        self.storage.save()
+        self.storage.compact()
+
+        storage = self.reopen()
+        storage.delete(storage.get(User, gone.id))
+        renamed = storage.get(User, user.id)
+        renamed.fullname = "Renamed"
+        storage.new(renamed)
+        storage.new(User(fullname="New", username="c", email="c@x", password="x"))
+        storage.save()
+        self.assertEqual(storage.count(User), 2)
+        for reopened in (self.reopen(), self.reopen()):
+            self.assertIsNone(reopened.get(User, gone.id))
+            self.assertEqual(reopened.get(User, user.id).fullname, "Renamed")
+            self.assertEqual(reopened.count(User), 2)
+            reopened.compact()
+
+    def test_legacy_json_converted(self):
+        """Test that a JSON file.json is read and rewritten as a snapshot"""
+        user = User(fullname="Old", username="old", email="old@x", password="x")
+        with open(self.path, "w") as f:
+            json.dump({"User." + user.id: user.to_dict(save_fs=1)}, f)
+        storage = self.reopen()
+        self.assertEqual(storage.get(User, user.id).email, "old@x")
+        storage.compact()
+        self.assertTrue(is_snapshot(self.path))
+        self.assertEqual(self.reopen().get(User, user.id).email, "old@x")
+
+
+class TestSnapshot(unittest.TestCase):
+    """Test the binary snapshot format"""
+
+    def setUp(self):
+        """Write a small snapshot"""
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "file.snap")
+        write_snapshot(self.path, [("Account.1", b'{"a":1}'), ("User.1", b'{"u":1}'),
+                                   ("User.2", b'{"u":2}')])
+        self.snapshot = Snapshot(self.path)
+
+    def tearDown(self):
+        """Remove the snapshot"""
+        self.snapshot.close()
+        shutil.rmtree(self.dir)
+
+    def test_find(self):
+        """Test key lookups"""
+        self.assertEqual(self.snapshot.count, 3)
+        self.assertEqual(self.snapshot.record(self.snapshot.find("User.2")), b'{"u":2}')
+        self.assertIsNone(self.snapshot.find("User.3"))
+
+    def test_class_range(self):
+        """Test that each class is one contiguous range"""
+        self.assertEqual([self.snapshot.key(i) for i in self.snapshot.class_range("User")],
+                         ["User.1", "User.2"])
+        self.assertEqual(len(self.snapshot.class_range("Loan")), 0)
+
+    def test_iteration(self):
+        """Test iterating over every entry"""
+        self.assertEqual([key for key, _ in self.snapshot], ["Account.1", "User.1", "User.2"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,184 @@
+#!/usr/bin/python3
+"""Tests for the MongoStorage engine, run against mongomock"""
+import inspect
+import unittest
+from datetime import date, datetime
+from BackEnd.models.engine.mongostorage import MongoStorage
+from BackEnd.models.user import User
+from BackEnd.models.Account import Account
+from BackEnd.models.AccountBalanceDaily import AccountBalanceDaily
+from BackEnd.models.Loan import Loan
+
+try:
+    import mongomock
+    from mongomock.collection import BulkOperationBuilder
+except ImportError:
+    mongomock = None
+
+
+def accept_bulk_sort():
+    """
+    pymongo 4.9+ passes sort= to bulk update/replace builders, which
+    mongomock 4.3 does not accept; drop it (it is None for our writes)
+    """
+    for name in ("add_update", "add_replace"):
+        method = getattr(BulkOperationBuilder, name)
+        if "sort" in inspect.signature(method).parameters:
+            continue
+
+        def without_sort(self, *args, _method=method, sort=None, **kwargs):
+            return _method(self, *args, **kwargs)
+        setattr(BulkOperationBuilder, name, without_sort)
+
+
+@unittest.skipIf(mongomock is None, "mongomock is not installed")
+class TestMongoStorage(unittest.TestCase):
+    """Test the MongoStorage class"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Let mongomock run the bulk writes pymongo builds"""
+        accept_bulk_sort()
+
+    def setUp(self):
+        """Set up a storage on an in-memory MongoDB"""
+        self.storage = MongoStorage(client=mongomock.MongoClient())
+        self.storage.reload()
+
+    def make_user(self, email):
+        """Queue a user"""
+        user = User(fullname="Test", username=email, email=email, password="x")
+        self.storage.new(user)
+        return user
+
+    def test_indexes_created(self):
+        """Test that reload() creates the indexes the models declare"""
+        users = self.storage.db["User"].index_information()
+        self.assertTrue(users["idx_email"]["unique"])
+        self.assertIn("idx_session_id", users)
+        transactions = self.storage.db["Transaction"].index_information()
+        self.assertEqual(transactions["idx_transactions_account_created"]["key"],
+                         [("account_id", 1), ("created_at", 1), ("_id", 1)])
+
+    def test_writes_wait_for_save(self):
+        """Test that new() and delete() are written by save()"""
+        user = self.make_user("a@x")
+        self.assertIsNone(self.storage.get(User, user.id))
+        self.storage.save()
+        self.assertEqual(self.storage.get(User, user.id).email, "a@x")
+        self.storage.delete(user)
+        self.assertIsNotNone(self.storage.get(User, user.id))
+        self.storage.save()
+        self.assertIsNone(self.storage.get(User, user.id))
+
+    def test_rollback(self):
+        """Test that Rollback() drops queued changes"""
+        self.make_user("a@x")
+        self.storage.Rollback()
+        self.storage.save()
+        self.assertEqual(self.storage.count(User), 0)
+
+    def test_transaction(self):
+        """Test that a transaction writes once, at the outermost block"""
+        with self.storage.transaction():
+            user = self.make_user("a@x")
+            with self.storage.transaction():
+                self.make_user("b@x")
+                self.storage.save()
+            self.storage.save()
+            self.assertIsNone(self.storage.get(User, user.id))
+        self.assertEqual(self.storage.count(User), 2)
+
+        with self.assertRaises(ValueError):
+            with self.storage.transaction():
+                self.make_user("c@x")
+                raise ValueError
+        self.storage.save()
+        self.assertEqual(self.storage.count(User), 2)
+
+    def test_id_mapping(self):
+        """Test that objects are stored under _id and read back with id"""
+        user = self.make_user("a@x")
+        user.session_expiration = datetime(2026, 3, 1, 9, 30)
+        self.storage.save()
+        doc = self.storage.db["User"].find_one({"_id": user.id})
+        self.assertNotIn("id", doc)
+        found = self.storage.get(User, user.id)
+        self.assertIsInstance(found, User)
+        self.assertEqual(found.id, user.id)
+        self.assertEqual(found.session_expiration, datetime(2026, 3, 1, 9, 30))
+        self.assertEqual(found.created_at.replace(microsecond=0),
+                         user.created_at.replace(microsecond=0, tzinfo=None))
+
+    def test_update_replaces(self):
+        """Test that saving an object again replaces its document"""
+        user = self.make_user("a@x")
+        self.storage.save()
+        user.fullname = "Renamed"
+        self.storage.new(user)
+        self.storage.save()
+        self.assertEqual(self.storage.count(User), 1)
+        self.assertEqual(self.storage.get(User, user.id).fullname, "Renamed")
+
+    def test_all_models(self):
+        """Test that every model class is stored, dates included"""
+        account = Account(user_id="user1", account_number="MF1", type="savings", balance=5.0)
+        loan = Loan(account_id=account.id, admin_id="admin1", amount=100.0,
+                    interest_rate=10.0, repayment_period=12)
+        snapshot = AccountBalanceDaily(account_id=account.id, snapshot_date=date(2026, 3, 1),
+                                       balance=5.0)
+        for obj in (account, loan, snapshot):
+            self.storage.new(obj)
+        self.storage.save()
+        self.assertEqual(self.storage.get(Loan, loan.id).amount, 100.0)
+        self.assertEqual(self.storage.get(AccountBalanceDaily, snapshot.id).snapshot_date,
+                         date(2026, 3, 1))
+        self.assertEqual(self.storage.count(), 3)
+
+    def test_all_returns_objects(self):
+        """Test that all() returns objects keyed like DBStorage"""
+        user = self.make_user("a@x")
+        self.make_user("b@x")
+        self.storage.save()
+        objects = self.storage.all(User)
+        self.assertEqual(len(objects), 2)
+        self.assertEqual(objects["User." + user.id].email, "a@x")
+        self.assertEqual(len(self.storage.all()), 2)
+
+    def test_stream(self):
+        """Test streaming objects in batches"""
+        for n in range(5):
+            self.make_user(f"{n}@x")
+        self.storage.save()
+        emails = sorted(user.email for user in self.storage.stream(User, batch_size=2))
+        self.assertEqual(emails, [f"{n}@x" for n in range(5)])
+
+    def test_project(self):
+        """Test reads limited to some fields"""
+        user = self.make_user("a@x")
+        self.storage.save()
+        self.assertEqual(list(self.storage.project(User, ["email"])), [{"email": "a@x"}])
+        self.assertEqual(list(self.storage.project(User, ["id", "email"], email="a@x")),
+                         [{"id": user.id, "email": "a@x"}])
+
+    def test_find(self):
+        """Test lookups by field values"""
+        user = self.make_user("a@x")
+        self.storage.save()
+        self.assertEqual(self.storage.find(User, email="a@x").id, user.id)
+        self.assertEqual(self.storage.find(User, id=user.id).email, "a@x")
+        self.assertIsNone(self.storage.find(User, email="b@x"))
+
+    def test_count(self):
+        """Test counts per class and overall"""
+        self.make_user("a@x")
+        self.make_user("b@x")
+        self.storage.new(Account(user_id="user1", account_number="MF1", type="savings"))
+        self.storage.save()
+        self.assertEqual(self.storage.count(User), 2)
+        self.assertEqual(self.storage.count("Account"), 1)
+        self.assertEqual(self.storage.count(), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
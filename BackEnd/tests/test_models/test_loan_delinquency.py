@@ -0,0 +1,65 @@
+import unittest
+import inspect
+from datetime import date
+from BackEnd.models.LoanDelinquency import LoanDelinquency
+from BackEnd.models.base_model import BaseModel
+from BackEnd.Controllers.DelinquencyController import bucket_for
+
+class TestLoanDelinquencyDocs(unittest.TestCase):
+    """Tests to check the documentation of the LoanDelinquency class"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.delinquency_f = inspect.getmembers(LoanDelinquency, inspect.isfunction)
+
+    def test_delinquency_class_docstring(self):
+        """Test for the LoanDelinquency class docstring"""
+        self.assertIsNot(LoanDelinquency.__doc__, None, "LoanDelinquency class needs a docstring")
+        self.assertTrue(len(LoanDelinquency.__doc__) >= 1, "LoanDelinquency class needs a docstring")
+
+    def test_delinquency_func_docstrings(self):
+        """Test for the presence of docstrings in LoanDelinquency methods"""
+        for func in self.delinquency_f:
+            self.assertIsNot(func[1].__doc__, None, f"{func[0]} method needs a docstring")
+            self.assertTrue(len(func[1].__doc__) >= 1, f"{func[0]} method needs a docstring")
+
+class TestLoanDelinquency(unittest.TestCase):
+    """Test the LoanDelinquency class"""
+
+    def setUp(self):
+        """Set up a test snapshot row"""
+        self.snapshot_date = date(2026, 3, 1)
+        self.delinquency = LoanDelinquency(
+            loan_id="loan123",
+            account_id="account123",
+            snapshot_date=self.snapshot_date,
+            days_past_due=45,
+            bucket="31-60",
+            outstanding_amount=500.0
+        )
+
+    def test_is_subclass(self):
+        """Test that LoanDelinquency is a subclass of BaseModel"""
+        self.assertIsInstance(self.delinquency, BaseModel)
+
+    def test_to_dict(self):
+        """Test the to_dict method"""
+        delinquency_dict = self.delinquency.to_dict()
+        self.assertEqual(delinquency_dict["loan_id"], "loan123")
+        self.assertEqual(delinquency_dict["snapshot_date"], "2026-03-01")
+        self.assertEqual(delinquency_dict["days_past_due"], 45)
+        self.assertEqual(delinquency_dict["bucket"], "31-60")
+        self.assertEqual(delinquency_dict["outstanding_amount"], 500.0)
+
+    def test_bucket_for(self):
+        """Test the days-past-due bucket boundaries"""
+        self.assertIsNone(bucket_for(0))
+        self.assertEqual(bucket_for(1), "1-30")
+        self.assertEqual(bucket_for(30), "1-30")
+        self.assertEqual(bucket_for(31), "31-60")
+        self.assertEqual(bucket_for(90), "61-90")
+        self.assertEqual(bucket_for(91), "90+")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+import inspect
+from datetime import datetime
+from BackEnd.models.LoanInstallment import LoanInstallment
+from BackEnd.models.base_model import BaseModel
+
+class TestLoanInstallmentDocs(unittest.TestCase):
+    """Tests to check the documentation of the LoanInstallment class"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.installment_f = inspect.getmembers(LoanInstallment, inspect.isfunction)
+
+    def test_installment_class_docstring(self):
+        """Test for the LoanInstallment class docstring"""
+        self.assertIsNot(LoanInstallment.__doc__, None, "LoanInstallment class needs a docstring")
+        self.assertTrue(len(LoanInstallment.__doc__) >= 1, "LoanInstallment class needs a docstring")
+
+    def test_installment_func_docstrings(self):
+        """Test for the presence of docstrings in LoanInstallment methods"""
+        for func in self.installment_f:
+            self.assertIsNot(func[1].__doc__, None, f"{func[0]} method needs a docstring")
+            self.assertTrue(len(func[1].__doc__) >= 1, f"{func[0]} method needs a docstring")
+
+class TestLoanInstallment(unittest.TestCase):
+    """Test the LoanInstallment class"""
+
+    def setUp(self):
+        """Set up a test installment instance"""
+        self.due_date = datetime(2026, 1, 31)
+        self.installment = LoanInstallment(
+            loan_id="loan123",
+            installment_number=1,
+            due_date=self.due_date,
+            principal=80.0,
+            interest=8.0,
+            amount_paid=0.0,
+            status="pending"
+        )
+
+    def test_is_subclass(self):
+        """Test that LoanInstallment is a subclass of BaseModel"""
+        self.assertIsInstance(self.installment, BaseModel)
+
+    def test_amount_due(self):
+        """Test that amount_due is principal plus interest"""
+        self.assertEqual(self.installment.amount_due, 88.0)
+
+    def test_to_dict(self):
+        """Test the to_dict method"""
+        installment_dict = self.installment.to_dict()
+        self.assertEqual(installment_dict["loan_id"], "loan123")
+        self.assertEqual(installment_dict["installment_number"], 1)
+        self.assertEqual(installment_dict["due_date"], self.due_date.isoformat())
+        self.assertEqual(installment_dict["amount_paid"], 0.0)
+        self.assertEqual(installment_dict["status"], "pending")
+
+if __name__ == "__main__":
+    unittest.main()
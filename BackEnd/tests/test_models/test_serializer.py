@@ -0,0 +1,84 @@
+#!/usr/bin/python3
+"""Tests for the precompiled model serializer"""
+import json
+import unittest
+from datetime import datetime
+
+from BackEnd.models import serializer
+from BackEnd.models.serializer import ModelSerializer, serializer_for, uses_default_to_dict
+from BackEnd.models.Account import Account
+from BackEnd.models.Transaction import Transaction
+from BackEnd.models.user import User
+
+
+class TestModelSerializer(unittest.TestCase):
+    """Test that ModelSerializer matches BaseModel.to_dict"""
+
+    def setUp(self):
+        """Set up a transaction with naive timestamps, as loaded from the database"""
+        self.transaction = Transaction(repayment_id=None, account_id="account123", amount=25.0,
+                                       transaction_type="deposit", description="Cash",
+                                       balance_after=125.0)
+        self.transaction.created_at = datetime(2026, 3, 1, 9, 30)
+        self.transaction.updated_at = datetime(2026, 3, 1, 9, 30, 0, 250)
+
+    def test_to_dict_matches_base_model(self):
+        """Test that the serializer returns what to_dict returns"""
+        self.assertEqual(serializer_for(Transaction).to_dict(self.transaction),
+                         self.transaction.to_dict())
+
+    def test_aware_timestamps(self):
+        """Test timestamps of newly created, timezone-aware instances"""
+        transaction = Transaction(account_id="account123", amount=5.0, transaction_type="deposit")
+        self.assertEqual(serializer_for(Transaction).to_dict(transaction), transaction.to_dict())
+
+    def test_password_excluded(self):
+        """Test that passwords are left out like in to_dict"""
+        user = User(fullname="Test", username="test", email="test@example.com", password="secret")
+        user_dict = serializer_for(User).to_dict(user)
+        self.assertNotIn("password", user_dict)
+        self.assertEqual(user_dict, user.to_dict())
+
+    def test_to_tuple_in_field_order(self):
+        """Test that tuples follow serializer.fields"""
+        fast = serializer_for(Transaction)
+        row = dict(zip(fast.fields, fast.to_tuple(self.transaction)))
+        expected = self.transaction.to_dict()
+        del expected["__class__"]
+        self.assertEqual(row, expected)
+
+    def test_unloaded_columns_left_out(self):
+        """Test that columns missing from the instance state are skipped"""
+        del self.transaction.__dict__["description"]
+        transaction_dict = serializer_for(Transaction).to_dict(self.transaction)
+        self.assertNotIn("description", transaction_dict)
+        self.assertEqual(transaction_dict["amount"], 25.0)
+
+    def test_selected_fields(self):
+        """Test serializers limited to some columns"""
+        fast = ModelSerializer(Transaction, fields=["id", "amount", "created_at"])
+        self.assertEqual(fast.fields, ("id", "amount", "created_at"))
+        self.assertEqual(fast.to_tuple(self.transaction),
+                         (self.transaction.id, 25.0, "2026-03-01T09:30:00.000000"))
+        with self.assertRaises(ValueError):
+            ModelSerializer(Transaction, fields=["nope"])
+
+    def test_dumps(self):
+        """Test JSON encoding of rows"""
+        body = serializer_for(Transaction).dumps([self.transaction])
+        self.assertIsInstance(body, bytes)
+        self.assertEqual(json.loads(body), [self.transaction.to_dict()])
+
+    def test_dumps_dates_like_jsonify(self):
+        """Test that other datetimes are encoded as HTTP dates"""
+        self.assertEqual(serializer.dumps({"at": datetime(2026, 3, 1, 9, 30)}),
+                         b'{"at":"Sun, 01 Mar 2026 09:30:00 GMT"}')
+
+    def test_uses_default_to_dict(self):
+        """Test detection of models with their own to_dict"""
+        self.assertTrue(uses_default_to_dict(Transaction))
+        self.assertFalse(uses_default_to_dict(Account))
+
+
+if __name__ == '__main__':
+    unittest.main()
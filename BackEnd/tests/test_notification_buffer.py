@@ -0,0 +1,94 @@
+import unittest
+from sqlalchemy import event
+from BackEnd.models import storage
+from BackEnd.models.user import User
+from BackEnd.models.Notification import Notification
+from BackEnd.Controllers.NotificationController import NotificationController
+
+
+class TestNotificationBuffer(unittest.TestCase):
+    """Test that buffered notifications are written once, at commit"""
+
+    def setUp(self):
+        """Create two customers and an admin, and count the notification INSERTs"""
+        self.users = [User(fullname=name, username=name, email=f"{name}@test.local",
+                           password="x", admin=admin)
+                      for name, admin in (("buf1", False), ("buf2", False), ("bufadmin", True))]
+        for user in self.users:
+            storage.new(user)
+        storage.save()
+        self.ids = [user.id for user in self.users]
+        self.controller = NotificationController()
+
+        self.inserts = []
+        event.listen(storage.engine(), 'before_cursor_execute', self.record_insert)
+
+    def tearDown(self):
+        """Stop counting and remove the rows"""
+        event.remove(storage.engine(), 'before_cursor_execute', self.record_insert)
+        session = storage.session()
+        session.rollback()
+        session.query(Notification).filter(Notification.user_id.in_(self.ids)).delete(
+            synchronize_session=False)
+        session.query(User).filter(User.id.in_(self.ids)).delete(synchronize_session=False)
+        session.commit()
+        storage.close()
+
+    def record_insert(self, conn, cursor, statement, parameters, context, executemany):
+        """Note each INSERT into notifications and how many rows it carried"""
+        if statement.startswith("INSERT INTO notifications"):
+            self.inserts.append(len(parameters) if executemany else 1)
+
+    def stored(self):
+        """(user_id, message) of the committed notifications"""
+        storage.close()
+        return sorted(storage.session().query(Notification.user_id, Notification.message).filter(
+            Notification.user_id.in_(self.ids)).all())
+
+    def unread(self):
+        """Stored unread counters of the two customers and the admin"""
+        storage.close()
+        return [self.controller.get_unread_count(user_id) for user_id in self.ids]
+
+    def test_buffer_written_by_one_insert(self):
+        """Test that notifications queued in one unit of work become one executemany INSERT"""
+        first, second, admin = self.ids
+        with storage.transaction():
+            self.controller.create_notification(first, "one", commit=False)
+            self.controller.create_notification(second, "two", commit=False)
+            self.controller.create_notifications_bulk([first, admin], "three", commit=False)
+            self.assertEqual(self.inserts, [])
+        self.assertEqual(self.inserts, [4])
+        self.assertEqual(self.stored(), sorted([(first, "one"), (second, "two"),
+                                                (first, "three"), (admin, "three")]))
+        self.assertEqual(self.unread(), [2, 1, 1])
+
+    def test_rollback_discards_buffer(self):
+        """Test that a rolled back unit of work writes no notifications and no counts"""
+        self.controller.create_notification(self.ids[0], "lost", commit=False)
+        self.controller.create_notifications_bulk(self.ids, "lost", commit=False)
+        storage.Rollback()
+        storage.save()
+        self.assertEqual(self.inserts, [])
+        self.assertEqual(self.stored(), [])
+        self.assertEqual(self.unread(), [0, 0, 0])
+
+    def test_broadcast_skips_admins(self):
+        """Test that a broadcast reaches each customer once, in one INSERT"""
+        self.controller.broadcast_to_customers("hello")
+        self.assertEqual(len(self.inserts), 1)
+        self.assertEqual(self.stored(), sorted([(self.ids[0], "hello"), (self.ids[1], "hello")]))
+        self.assertEqual(self.unread(), [1, 1, 0])
+
+    def test_returned_notification_matches_row(self):
+        """Test that the returned object carries the stored id and timestamps"""
+        notification = self.controller.create_notification(self.ids[0], "mine")
+        storage.close()
+        row = storage.session().get(Notification, notification.id)
+        self.assertEqual((row.message, row.is_read), ("mine", False))
+        self.assertEqual(row.created_at, notification.created_at)
+        self.assertEqual(row.updated_at, notification.updated_at)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+import unittest
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from BackEnd.api.v1.app import app
+from BackEnd.models import storage
+from BackEnd.models.user import User
+from BackEnd.models.Notification import Notification
+from BackEnd.Controllers.NotificationController import NotificationController
+
+
+class TestUnreadCounter(unittest.TestCase):
+    """Test that the unread counter follows reads and deletes exactly once"""
+
+    def setUp(self):
+        """Create a user with three unread notifications"""
+        self.user = User(fullname="Reader", username="reader",
+                         email="reader@test.local", password="x")
+        storage.new(self.user)
+        storage.save()
+        self.controller = NotificationController()
+        self.notifications = [self.controller.create_notification(self.user.id, f"n{i}")
+                              for i in range(3)]
+
+    def tearDown(self):
+        """Remove the user and the notifications"""
+        session = storage.session()
+        session.rollback()
+        session.query(Notification).filter(Notification.user_id == self.user.id).delete()
+        session.query(User).filter(User.id == self.user.id).delete()
+        session.commit()
+        storage.close()
+
+    def unread(self):
+        """The stored counter"""
+        storage.close()
+        return self.controller.get_unread_count(self.user.id)
+
+    def test_mark_read_counts_once(self):
+        """Test that reading the same notification twice decrements once"""
+        self.assertEqual(self.unread(), 3)
+        first = self.notifications[0].id
+        self.assertTrue(self.controller.mark_as_read(first))
+        self.assertTrue(self.controller.mark_as_read(first))
+        self.assertEqual(self.unread(), 2)
+
+    def test_delete_read_notification_keeps_count(self):
+        """Test that deleting a read notification leaves the counter alone"""
+        first, second = self.notifications[0].id, self.notifications[1].id
+        self.controller.mark_as_read(first)
+        self.assertTrue(self.controller.delete_notification(first))
+        self.assertTrue(self.controller.delete_notification(second))
+        self.assertFalse(self.controller.delete_notification(second))
+        self.assertEqual(self.unread(), 1)
+
+    def test_mark_all_read_subtracts_what_it_read(self):
+        """Test that marking all read subtracts only the rows it changed"""
+        self.controller.mark_as_read(self.notifications[0].id)
+        self.assertTrue(self.controller.mark_all_as_read(self.user.id))
+        self.assertEqual(self.unread(), 0)
+        self.assertTrue(self.controller.mark_all_as_read(self.user.id))
+        self.assertEqual(self.unread(), 0)
+
+
+
+class TestUnreadCountPoll(unittest.TestCase):
+    """Test the unread count endpoint polled by clients"""
+
+    def setUp(self):
+        """Create a signed in user with two unread notifications, and count the queries"""
+        self.user = User(fullname="Poller", username="poller", email="poller@test.local",
+                         password="x", session_id="poll-session",
+                         session_expiration=datetime.utcnow() + timedelta(hours=1))
+        storage.new(self.user)
+        storage.save()
+        self.user_id = self.user.id
+        for i in range(2):
+            NotificationController().create_notification(self.user_id, f"n{i}")
+        storage.close()
+        self.client = app.test_client()
+
+        self.statements = []
+        event.listen(storage.engine(), 'before_cursor_execute', self.record)
+
+    def tearDown(self):
+        """Stop counting and remove the user and the notifications"""
+        event.remove(storage.engine(), 'before_cursor_execute', self.record)
+        session = storage.session()
+        session.rollback()
+        session.query(Notification).filter(Notification.user_id == self.user_id).delete()
+        session.query(User).filter(User.id == self.user_id).delete()
+        session.commit()
+        storage.close()
+
+    def record(self, conn, cursor, statement, parameters, context, executemany):
+        """Note each statement sent to the database"""
+        self.statements.append(statement)
+
+    def poll(self, session_id):
+        """GET the unread count with the session as bearer token"""
+        return self.client.get('/api/v1/notifications/unread-count',
+                               headers={'Authorization': f"Bearer {session_id}"})
+
+    def test_one_single_column_query(self):
+        """Test that a poll is answered from one query reading only the counter"""
+        response = self.poll("poll-session")
+        self.assertEqual(response.get_json(), {"unread_count": 2})
+        self.assertEqual(len(self.statements), 1)
+        selected = self.statements[0].split("FROM")[0]
+        self.assertEqual(selected.split()[:2], ["SELECT", "users.unread_notification_count"])
+        self.assertNotIn(",", selected)
+
+    def test_unknown_or_expired_session(self):
+        """Test that unknown and expired sessions are refused"""
+        self.assertEqual(self.poll("no-such-session").status_code, 401)
+        storage.session().query(User).filter(User.id == self.user_id).update(
+            {'session_expiration': datetime.utcnow() - timedelta(minutes=1)})
+        storage.save()
+        self.assertEqual(self.poll("poll-session").status_code, 401)
+
+
+if __name__ == '__main__':
+    unittest.main()
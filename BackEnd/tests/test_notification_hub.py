@@ -0,0 +1,71 @@
+import threading
+import unittest
+from BackEnd.Controllers.NotificationHub import (
+    NotificationHub, Subscription, MAX_SUBSCRIPTIONS_PER_USER
+)
+
+class TestNotificationHub(unittest.TestCase):
+    """Test the in-process notification hub"""
+
+    def setUp(self):
+        """Set up an empty hub"""
+        self.hub = NotificationHub()
+
+    def test_publish_reaches_only_that_user(self):
+        """Test that events are delivered to the subscribed user only"""
+        mine = self.hub.subscribe("user1")
+        other = self.hub.subscribe("user2")
+        self.hub.publish("user1", {"type": "unread", "unread_delta": 1})
+        self.assertEqual(mine.get(timeout=0.1), {"type": "unread", "unread_delta": 1})
+        self.assertIsNone(other.get(timeout=0.01))
+
+    def test_unsubscribe(self):
+        """Test that unsubscribed streams stop receiving events"""
+        subscription = self.hub.subscribe("user1")
+        self.hub.unsubscribe(subscription)
+        self.assertEqual(self.hub.subscriber_count(), 0)
+        self.hub.publish("user1", {"type": "resync"})
+        self.assertIsNone(subscription.get(timeout=0.01))
+
+    def test_full_buffer_becomes_resync(self):
+        """Test that an overflowing buffer is replaced by a resync event"""
+        subscription = Subscription("user1", maxsize=2)
+        for n in range(3):
+            subscription.put({"type": "unread", "unread_delta": n})
+        self.assertEqual(subscription.get(timeout=0.1), {"type": "resync"})
+        self.assertIsNone(subscription.get(timeout=0.01))
+
+    def test_concurrent_overflow_never_raises(self):
+        """Test that publishers racing on a full buffer never see queue.Full"""
+        subscription = Subscription("user1", maxsize=2)
+        errors = []
+
+        def publish():
+            try:
+                for n in range(2000):
+                    subscription.put({"type": "unread", "unread_delta": n})
+            except Exception as e:
+                errors.append(e)
+
+        publishers = [threading.Thread(target=publish) for _ in range(8)]
+        for publisher in publishers:
+            publisher.start()
+        subscription.close()
+        for publisher in publishers:
+            publisher.join()
+        self.assertEqual(errors, [])
+        # Nothing published after close() displaces the close event
+        self.assertEqual(subscription.get(timeout=0.1), {"type": "close"})
+        self.assertIsNone(subscription.get(timeout=0.01))
+
+    def test_oldest_stream_is_closed_past_limit(self):
+        """Test that a user cannot hold more than the allowed open streams"""
+        first = self.hub.subscribe("user1")
+        for _ in range(MAX_SUBSCRIPTIONS_PER_USER):
+            self.hub.subscribe("user1")
+        self.assertTrue(first.closed)
+        self.assertEqual(first.get(timeout=0.1), {"type": "close"})
+        self.assertEqual(self.hub.subscriber_count(), MAX_SUBSCRIPTIONS_PER_USER)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+from flask import Flask, jsonify
+from sqlalchemy import create_engine, text
+from BackEnd.monitoring import profiler
+from BackEnd.monitoring.profiler import RouteStats, percentile, route_stats
+
+
+class TestProfiler(unittest.TestCase):
+    """Test per-request query profiling"""
+
+    def setUp(self):
+        """Set up an app whose endpoint runs a number of queries"""
+        engine = create_engine('sqlite://')
+        profiler.instrument_engine(engine)
+        app = Flask(__name__)
+        profiler.init_app(app)
+
+        @app.route('/queries/<int:count>')
+        def queries(count):
+            with engine.connect() as connection:
+                for _ in range(count):
+                    connection.execute(text("SELECT 1"))
+            return jsonify({})
+
+        route_stats.reset()
+        self.app = app
+        self.client = app.test_client()
+
+    def test_percentile(self):
+        """Test nearest-rank percentiles"""
+        ordered = list(range(1, 101))
+        self.assertEqual(percentile(ordered, 50), 50)
+        self.assertEqual(percentile(ordered, 99), 99)
+        self.assertEqual(percentile([7], 95), 7)
+
+    def test_route_stats(self):
+        """Test that each request's queries are recorded under its route"""
+        for count in (1, 2, 3):
+            self.client.get(f'/queries/{count}')
+        stats = route_stats.snapshot()['GET /queries/<int:count>']
+        self.assertEqual(stats['requests'], 3)
+        self.assertEqual(stats['queries'], {'p50': 2, 'p95': 3, 'p99': 3, 'max': 3})
+        self.assertEqual(len(stats['slowest_queries']), profiler.SLOWEST_KEPT)
+        self.assertEqual(stats['slowest_queries'][0]['statement'], "SELECT 1")
+
+    def test_samples_bounded(self):
+        """Test that only the most recent requests are sampled"""
+        stats = RouteStats(samples=2)
+        for total in (100.0, 1.0, 2.0):
+            stats.record('GET /', total, 0.0, 0)
+        report = stats.snapshot()['GET /']
+        self.assertEqual(report['requests'], 3)
+        self.assertEqual(report['duration_ms']['max'], 2.0)
+
+    def test_server_timing_in_debug(self):
+        """Test that Server-Timing is sent in debug mode only"""
+        self.assertNotIn('Server-Timing', self.client.get('/queries/1').headers)
+        self.app.debug = True
+        timing = self.client.get('/queries/2').headers['Server-Timing']
+        self.assertIn('desc="2 queries"', timing)
+
+    def test_slow_query_log(self):
+        """Test that statements over the threshold are logged with their fields"""
+        threshold = profiler.SLOW_QUERY_MS
+        profiler.SLOW_QUERY_MS = 0.0
+        try:
+            with self.assertLogs('BackEnd.monitoring.slow_query', 'WARNING') as logs:
+                self.client.get('/queries/1')
+        finally:
+            profiler.SLOW_QUERY_MS = threshold
+        record = logs.records[0]
+        self.assertEqual(record.getMessage(), "Slow query")
+        self.assertEqual(record.route, 'GET /queries/<int:count>')
+        self.assertEqual(record.statement, 'SELECT 1')
+        self.assertGreaterEqual(record.duration_ms, 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
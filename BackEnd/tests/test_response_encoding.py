@@ -0,0 +1,88 @@
+import gzip
+import json
+import unittest
+from flask import Flask, jsonify
+from BackEnd.api.v1.response_encoding import COMPRESS_MIN_SIZE, conditional, init_app
+
+
+class TestResponseEncoding(unittest.TestCase):
+    """Test compact JSON, conditional GETs and compression"""
+
+    def setUp(self):
+        """Set up an app with a small, a large and a fingerprinted endpoint"""
+        app = Flask(__name__)
+        init_app(app)
+        self.calls = 0
+        self.version = 1
+
+        @app.route('/small')
+        def small():
+            return jsonify({"a": 1, "b": [1, 2]})
+
+        @app.route('/large')
+        def large():
+            return jsonify([{"id": n, "name": "customer"} for n in range(COMPRESS_MIN_SIZE)])
+
+        @app.route('/dashboard')
+        @conditional(lambda: self.version)
+        def dashboard():
+            self.calls += 1
+            return jsonify({"total": self.version})
+
+        self.client = app.test_client()
+
+    def test_compact_json(self):
+        """Test that JSON is sent without indentation"""
+        self.assertEqual(self.client.get('/small').get_data(), b'{"a":1,"b":[1,2]}\n')
+
+    def test_small_body_not_compressed(self):
+        """Test that bodies under the threshold are sent as they are"""
+        response = self.client.get('/small', headers={'Accept-Encoding': 'gzip'})
+        self.assertNotIn('Content-Encoding', response.headers)
+
+    def test_gzip(self):
+        """Test gzip negotiation of large bodies"""
+        plain = self.client.get('/large').get_data()
+        response = self.client.get('/large', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response.headers['Vary'])
+        self.assertLess(len(response.get_data()), len(plain))
+        self.assertEqual(gzip.decompress(response.get_data()), plain)
+
+    def test_not_compressed_without_accept_encoding(self):
+        """Test that clients that do not ask for compression get plain JSON"""
+        response = self.client.get('/large', headers={'Accept-Encoding': 'identity'})
+        self.assertNotIn('Content-Encoding', response.headers)
+        self.assertEqual(len(json.loads(response.get_data())), COMPRESS_MIN_SIZE)
+
+    def test_etag_not_modified(self):
+        """Test that a matching If-None-Match gets an empty 304"""
+        etag = self.client.get('/small').headers['ETag']
+        self.assertTrue(etag.startswith('W/'))
+        response = self.client.get('/small', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.get_data(), b'')
+
+    def test_etag_shared_by_encodings(self):
+        """Test that compressed and plain responses carry the same ETag"""
+        plain = self.client.get('/large').headers['ETag']
+        compressed = self.client.get('/large', headers={'Accept-Encoding': 'gzip'}).headers['ETag']
+        self.assertEqual(plain, compressed)
+
+    def test_conditional_skips_view(self):
+        """Test that an unchanged fingerprint answers 304 without running the view"""
+        etag = self.client.get('/dashboard').headers['ETag']
+        response = self.client.get('/dashboard', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(self.calls, 1)
+
+        self.version = 2
+        response = self.client.get('/dashboard', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), {"total": 2})
+        self.assertNotEqual(response.headers['ETag'], etag)
+        self.assertEqual(self.calls, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+from datetime import datetime
+from BackEnd.models import storage
+from BackEnd.models.Account import Account
+from BackEnd.models.Transaction import Transaction
+from BackEnd.Controllers.TransactionController import TransactionController
+
+
+class TestBalanceBefore(unittest.TestCase):
+    """Test the opening balance carried into a statement"""
+
+    def setUp(self):
+        """Create an account opened with 1000 that has no opening transaction"""
+        self.account = Account(user_id="statement-user", account_number="STM0000001",
+                               type="savings", balance=1000.0)
+        storage.new(self.account)
+        storage.save()
+        self.controller = TransactionController()
+
+    def tearDown(self):
+        """Remove the account and its transactions"""
+        session = storage.session()
+        session.rollback()
+        session.query(Transaction).filter(Transaction.account_id == self.account.id).delete()
+        session.query(Account).filter(Account.id == self.account.id).delete()
+        session.commit()
+        storage.close()
+
+    def post(self, day, amount, balance_after):
+        """Record a transaction on the given day of March 2026"""
+        transaction = Transaction(account_id=self.account.id, amount=amount,
+                                  transaction_type="deposit", balance_after=balance_after)
+        transaction.created_at = datetime(2026, 3, day)
+        storage.new(transaction)
+        storage.save()
+
+    def test_uses_last_balance_after(self):
+        """Test that the opening balance is the last recorded balance, not a sum"""
+        self.post(1, 200.0, 1200.0)
+        self.post(2, 50.0, 1250.0)
+        self.post(5, 10.0, 1260.0)
+        self.assertEqual(self.controller.get_balance_before(self.account.id, datetime(2026, 3, 3)), 1250.0)
+        self.assertEqual(self.controller.get_balance_before(self.account.id, datetime(2026, 3, 1)), 0.0)
+        self.assertEqual(self.controller.get_balance_before(self.account.id), 0.0)
+
+    def test_sums_legacy_transactions(self):
+        """Test that transactions without balance_after fall back to the sum"""
+        self.post(1, 200.0, None)
+        self.post(2, 50.0, None)
+        self.assertEqual(self.controller.get_balance_before(self.account.id, datetime(2026, 3, 3)), 250.0)
+
+    def test_memo_record_carries_balance(self):
+        """Test that a record without balance_after after a posting moves nothing"""
+        self.post(1, 200.0, 1200.0)
+        self.post(2, 75.0, None)
+        self.post(4, 50.0, 1250.0)
+        self.assertEqual(self.controller.get_balance_before(self.account.id, datetime(2026, 3, 3)), 1200.0)
+
+        rows = list(self.controller.iter_statement(self.account.id, datetime(2026, 3, 2),
+                                                   opening_balance=1200.0))
+        self.assertEqual([row[5] for row in rows], [1200.0, 1250.0])
+        rows = list(self.controller.iter_statement(self.account.id))
+        self.assertEqual([row[5] for row in rows], [1200.0, 1200.0, 1250.0])
+
+    def test_statement_sums_legacy_rows(self):
+        """Test that the running balance adds legacy rows until the first recorded balance"""
+        self.post(1, 200.0, None)
+        self.post(2, 50.0, None)
+        self.post(3, 10.0, 1260.0)
+        rows = list(self.controller.iter_statement(self.account.id, batch_size=1))
+        self.assertEqual([row[5] for row in rows], [200.0, 250.0, 1260.0])
+
+    def test_memo_record_does_not_post(self):
+        """Test that create_transaction leaves both the balance and balance_after alone"""
+        memo = self.controller.create_transaction(self.account.id, 75.0, "adjustment", "memo")
+        storage.close()
+        self.assertIsNone(storage.get(Transaction, memo.id).balance_after)
+        self.assertEqual(storage.get(Account, self.account.id).balance, 1000.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
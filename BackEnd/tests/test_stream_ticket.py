@@ -0,0 +1,68 @@
+import unittest
+from datetime import datetime, timedelta
+from BackEnd.api.v1.app import app
+from BackEnd.models import storage
+from BackEnd.models.user import User
+from BackEnd.Controllers.AuthController import AuthController
+
+
+class TestStreamTicket(unittest.TestCase):
+    """Test the single-use tickets that open the notification stream"""
+
+    def setUp(self):
+        """Create a signed-in user"""
+        self.user = User(fullname="Streamer", username="streamer",
+                         email="streamer@test.local", password="x",
+                         session_id="stream-session",
+                         session_expiration=datetime.utcnow() + timedelta(hours=1))
+        storage.new(self.user)
+        storage.save()
+        self.auth = AuthController()
+        self.client = app.test_client()
+
+    def tearDown(self):
+        """Remove the user"""
+        session = storage.session()
+        session.rollback()
+        session.query(User).filter(User.id == self.user.id).delete()
+        session.commit()
+        storage.close()
+
+    def test_ticket_is_single_use(self):
+        """Test that a ticket is redeemed for its user exactly once"""
+        ticket = self.auth.create_stream_ticket(self.user.id)
+        self.assertEqual(self.auth.redeem_stream_ticket(ticket).id, self.user.id)
+        self.assertIsNone(self.auth.redeem_stream_ticket(ticket))
+
+    def test_expired_ticket_rejected(self):
+        """Test that a ticket past its expiry opens nothing"""
+        ticket = self.auth.create_stream_ticket(self.user.id)
+        self.auth._userC.update_user(self.user.id, stream_ticket_expiration=datetime.utcnow()
+                                     - timedelta(seconds=1))
+        self.assertIsNone(self.auth.redeem_stream_ticket(ticket))
+
+    def test_logout_clears_ticket(self):
+        """Test that ending the session also voids its ticket"""
+        ticket = self.auth.create_stream_ticket(self.user.id)
+        self.auth.destroy_session(self.user.id)
+        self.assertIsNone(self.auth.redeem_stream_ticket(ticket))
+
+    def test_stream_needs_ticket_not_session_id(self):
+        """Test that the stream refuses the session id in the query string"""
+        response = self.client.get('/api/v1/notifications/stream?token=stream-session')
+        self.assertEqual(response.status_code, 401)
+
+        response = self.client.post('/api/v1/notifications/stream-ticket',
+                                    headers={'Authorization': 'Bearer stream-session'})
+        self.assertEqual(response.status_code, 201)
+        ticket = response.get_json()['ticket']
+        stream = self.client.get(f'/api/v1/notifications/stream?ticket={ticket}')
+        self.assertEqual(stream.status_code, 200)
+        self.assertEqual(stream.mimetype, 'text/event-stream')
+        stream.close()
+        self.assertEqual(self.client.get(
+            f'/api/v1/notifications/stream?ticket={ticket}').status_code, 401)
+
+
+if __name__ == '__main__':
+    unittest.main()
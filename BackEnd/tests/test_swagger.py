@@ -0,0 +1,68 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from flask import Flask, jsonify
+from BackEnd.api.v1.swagger import init_app, swag_from
+
+
+class TestLazySwagger(unittest.TestCase):
+    """Test swag_from and the documentation built on first use"""
+
+    def setUp(self):
+        """Set up an app with one documented view"""
+        spec = tempfile.NamedTemporaryFile('w', suffix='.yml', delete=False)
+        spec.write("summary: List the widgets\nresponses:\n  200:\n    description: widgets\n")
+        spec.close()
+        self.addCleanup(os.remove, spec.name)
+
+        app = Flask(__name__)
+        init_app(app)
+
+        @app.route('/widgets', methods=['GET', 'POST'])
+        @swag_from(spec.name, methods=['GET'])
+        def widgets():
+            return jsonify([])
+
+        self.app = app
+        self.view = widgets
+        self.spec = spec.name
+        self.client = app.test_client()
+
+    def test_swag_from_records_path(self):
+        """Test that swag_from keeps the view and records its spec file"""
+        self.assertEqual(self.view.swag_paths, {'get': self.spec})
+        self.assertEqual(self.view.swag_type, 'yml')
+
+        @swag_from('documentation/x.yml')
+        def view():
+            pass
+        self.assertEqual(view.swag_path, os.path.join(os.path.dirname(__file__),
+                                                       'documentation', 'x.yml'))
+
+    def test_docs_built_on_first_hit(self):
+        """Test that the API works without docs and /apispec_1.json has the view"""
+        self.assertEqual(self.client.get('/widgets').status_code, 200)
+        self.assertIsNone(self.app.wsgi_app._docs)
+
+        spec = self.client.get('/apispec_1.json').get_json()
+        self.assertEqual(spec['paths']['/widgets']['get']['summary'], 'List the widgets')
+        self.assertEqual(self.client.get('/apidocs/').status_code, 200)
+        self.assertEqual(self.client.get('/widgets').status_code, 200)
+
+    def test_app_import_skips_heavy_modules(self):
+        """Test that importing the API does not load numpy, stripe or flasgger"""
+        root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+        env = dict(os.environ, MFS_DB_URL='sqlite://', MFS_EMAIL_WORKER='0',
+                   MFS_TASK_WORKERS='0', PYTHONPATH=root)
+        code = ("import sys, BackEnd.api.v1.app; print(' '.join(sorted(m for m in "
+                "('numpy', 'pandas', 'stripe', 'requests', 'flasgger') if m in sys.modules)))")
+        result = subprocess.run([sys.executable, '-c', code], cwd=root, env=env,
+                                capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.strip(), '')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+import json
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+from BackEnd.models import storage
+from BackEnd.models.TaskOutbox import TaskOutbox
+from BackEnd.monitoring.metrics import TASKS, registry, task_queue_depth
+from BackEnd.tasks.runner import MAX_ATTEMPTS, STALE_AFTER, defer, task, task_runner
+
+
+calls = []
+
+
+@task('test_record')
+def record(value):
+    calls.append(value)
+
+
+@task('test_fail')
+def fail():
+    raise RuntimeError("boom")
+
+
+class TestTaskRunner(unittest.TestCase):
+    """Test deferring tasks to after commit and running them from the outbox"""
+
+    def setUp(self):
+        """Start from an empty outbox"""
+        del calls[:]
+        self.session = storage.session()
+        self.session.query(TaskOutbox).delete()
+        self.session.commit()
+
+    def tearDown(self):
+        """Empty the outbox and drop the session"""
+        self.session.rollback()
+        self.session.query(TaskOutbox).delete()
+        self.session.commit()
+        storage.close()
+
+    def test_runs_after_commit(self):
+        """Test that a committed task is handed to the workers and run once"""
+        with mock.patch.object(task_runner, 'submit') as submit:
+            entry = defer('test_record', value=3)
+            submit.assert_not_called()
+            storage.save()
+        submit.assert_called_once_with([entry.id])
+        self.assertEqual(json.loads(entry.payload), {'value': 3})
+
+        self.assertTrue(task_runner.run(entry.id))
+        self.assertFalse(task_runner.run(entry.id))
+        self.assertEqual(calls, [3])
+        entry = self.session.get(TaskOutbox, entry.id, populate_existing=True)
+        self.assertEqual((entry.status, entry.attempts), ('done', 1))
+        self.assertIsNotNone(entry.finished_at)
+
+    def test_rollback_discards(self):
+        """Test that a task deferred by a rolled back transaction never runs"""
+        with mock.patch.object(task_runner, 'submit') as submit:
+            defer('test_record', value=1)
+            storage.Rollback()
+            storage.save()
+        submit.assert_not_called()
+        self.assertEqual(self.session.query(TaskOutbox).count(), 0)
+
+    def test_failure_retries_then_fails(self):
+        """Test that a failing task is retried later and marked failed at the end"""
+        entry = defer('test_fail')
+        storage.save()
+        before = registry.collect().get((TASKS, ('test_fail', 'error')), 0)
+
+        self.assertEqual(task_runner.run_pending(), 0)
+        entry = self.session.get(TaskOutbox, entry.id, populate_existing=True)
+        self.assertEqual((entry.status, entry.attempts, entry.last_error), ('pending', 1, 'boom'))
+        self.assertGreater(entry.next_attempt_at, datetime.utcnow())
+        # Not due yet
+        self.assertEqual(task_runner.run_pending(), 0)
+        self.assertEqual(registry.collect()[(TASKS, ('test_fail', 'error'))], before + 1)
+
+        entry.attempts = MAX_ATTEMPTS - 1
+        entry.next_attempt_at = datetime.utcnow()
+        storage.save()
+        task_runner.run_pending()
+        entry = self.session.get(TaskOutbox, entry.id, populate_existing=True)
+        self.assertEqual(entry.status, 'failed')
+
+    def test_run_pending_picks_up_left_tasks(self):
+        """Test that tasks no worker ran are run from the outbox"""
+        defer('test_record', value='a')
+        defer('test_record', value='b')
+        storage.save()
+        self.assertEqual(task_runner.run_pending(), 2)
+        self.assertEqual(sorted(calls), ['a', 'b'])
+
+    def test_queue_depth_counts_outbox(self):
+        """Test that the queue gauge reports the outbox backlog, not this process's pool"""
+        defer('test_record', value='due')
+        later = defer('test_record', value='retry')
+        running = defer('test_record', value='running')
+        done = defer('test_record', value='done')
+        later.next_attempt_at = datetime.utcnow() + timedelta(minutes=5)
+        running.status = 'running'
+        done.status = 'done'
+        storage.save()
+        self.assertEqual(task_queue_depth(), {('due',): 1, ('scheduled',): 1, ('running',): 1})
+
+    def test_heartbeat_keeps_running_task(self):
+        """Test that a slow task running here is not released, and a lost one is"""
+        slow = defer('test_record', value='slow')
+        lost = defer('test_record', value='lost')
+        storage.save()
+        started = datetime.utcnow() - timedelta(seconds=STALE_AFTER + 60)
+        for entry in (slow, lost):
+            entry.status = 'running'
+            entry.updated_at = started
+        storage.save()
+
+        task_runner._queued.add(slow.id)
+        try:
+            self.assertEqual(task_runner._due(), [lost.id])
+        finally:
+            task_runner._queued.discard(slow.id)
+        slow = self.session.get(TaskOutbox, slow.id, populate_existing=True)
+        self.assertEqual(slow.status, 'running')
+        self.assertGreater(slow.updated_at, started)
+
+
+if __name__ == '__main__':
+    unittest.main()
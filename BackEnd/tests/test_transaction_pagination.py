@@ -0,0 +1,122 @@
+import base64
+import unittest
+from datetime import datetime, timezone
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
+from BackEnd.api.v1.app import app
+from BackEnd.models import storage
+from BackEnd.models.Account import Account
+from BackEnd.models.Transaction import Transaction
+from BackEnd.Controllers import TransactionController as transaction_module
+from BackEnd.Controllers.TransactionController import (
+    TransactionController, decode_cursor, encode_cursor
+)
+
+TIE = datetime(2026, 3, 10, 12, 0)
+
+
+class TestTransactionPagination(unittest.TestCase):
+    """Test keyset pagination of transaction listings"""
+
+    def setUp(self):
+        """Create an account with five transactions at the same instant and two a day later"""
+        self.account = Account(user_id="page-user", account_number="PAG0000001",
+                               type="savings", balance=0.0)
+        storage.new(self.account)
+        for n, letter in enumerate("abcde"):
+            self.add(f"page-{letter}", TIE, 10.0 + n, "deposit")
+        self.add("page-late", datetime(2026, 3, 11, 23, 59, 59), -5.0, "withdrawal")
+        self.add("page-next-day", datetime(2026, 3, 12, 0, 0), 7.0, "deposit")
+        storage.save()
+        self.controller = TransactionController()
+        self.client = app.test_client()
+
+    def tearDown(self):
+        """Remove the account and its transactions"""
+        session = storage.session()
+        session.rollback()
+        session.query(Transaction).filter(Transaction.account_id == self.account.id).delete()
+        session.query(Account).filter(Account.id == self.account.id).delete()
+        session.commit()
+        storage.close()
+
+    def add(self, transaction_id, created_at, amount, transaction_type):
+        """Add a transaction with a fixed id and time"""
+        transaction = Transaction(id=transaction_id, account_id=self.account.id, amount=amount,
+                                  transaction_type=transaction_type)
+        transaction.created_at = created_at
+        storage.new(transaction)
+
+    def listing(self, **args):
+        """GET the account's transactions in March 2026 with extra query arguments"""
+        return self.client.get('/api/v1/transactions/date-range', query_string={
+            'start_date': '2026-03-01', 'end_date': '2026-03-31',
+            'account_id': self.account.id, **args})
+
+    def test_cursor_round_trip(self):
+        """Test that a cursor decodes to the row's naive timestamp and id"""
+        row = Transaction(id="page-x", account_id="a", amount=1.0, transaction_type="deposit")
+        row.created_at = datetime(2026, 3, 10, 12, 0, 0, 123456, tzinfo=timezone.utc)
+        self.assertEqual(decode_cursor(encode_cursor(row)),
+                         (datetime(2026, 3, 10, 12, 0, 0, 123456), "page-x"))
+
+    def test_ties_ordered_by_id(self):
+        """Test that rows sharing created_at are split across pages by id without gaps"""
+        seen, cursor = [], None
+        while True:
+            page, cursor = self.controller.get_transactions_page(
+                account_id=self.account.id, cursor=cursor, limit=2)
+            seen.extend(transaction.id for transaction in page)
+            if cursor is None:
+                break
+        self.assertEqual(seen, ["page-next-day", "page-late",
+                                "page-e", "page-d", "page-c", "page-b", "page-a"])
+
+    def test_invalid_cursor_rejected(self):
+        """Test that malformed or tampered cursors are answered with 400"""
+        tampered = base64.urlsafe_b64encode(b"not-a-date|page-a").decode()
+        for cursor in ("%%%", "bm90IGJhc2U2NA", tampered):
+            response = self.listing(cursor=cursor)
+            self.assertEqual(response.status_code, 400, cursor)
+            self.assertEqual(response.get_json(), {"error": "Invalid cursor"})
+
+    def test_limit_capped(self):
+        """Test that the page size is clamped to 1..MAX_PAGE_SIZE"""
+        with mock.patch.object(transaction_module, 'MAX_PAGE_SIZE', 3):
+            self.assertEqual(len(self.listing(limit=100).get_json()), 3)
+        self.assertEqual(len(self.listing(limit=0).get_json()), 1)
+
+    def test_filters(self):
+        """Test the type filter and the inclusive end date"""
+        ids = [row['id'] for row in self.listing(type='withdrawal').get_json()]
+        self.assertEqual(ids, ["page-late"])
+
+        response = self.listing(start_date='2026-03-11', end_date='2026-03-11')
+        self.assertEqual([row['id'] for row in response.get_json()], ["page-late"])
+        response = self.listing(start_date='2026-03-12', end_date='2026-03-11')
+        self.assertEqual(response.status_code, 400)
+
+    def test_next_page_headers(self):
+        """Test that X-Next-Cursor and the Link URL lead to the next page"""
+        response = self.listing(limit=4, type='deposit')
+        self.assertEqual([row['id'] for row in response.get_json()],
+                         ["page-next-day", "page-e", "page-d", "page-c"])
+        cursor = response.headers['X-Next-Cursor']
+        self.assertEqual(decode_cursor(cursor), (TIE, "page-c"))
+
+        link = response.headers['Link']
+        self.assertTrue(link.endswith('>; rel="next"'))
+        url = urlsplit(link[1:link.index('>')])
+        args = parse_qs(url.query)
+        self.assertEqual(args['cursor'], [cursor])
+        self.assertEqual(args['type'], ['deposit'])
+        self.assertEqual(args['limit'], ['4'])
+
+        last = self.client.get(f"{url.path}?{url.query}")
+        self.assertEqual([row['id'] for row in last.get_json()], ["page-b", "page-a"])
+        self.assertNotIn('X-Next-Cursor', last.headers)
+        self.assertNotIn('Link', last.headers)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -31,41 +31,21 @@ const RepaymentTransactions = ({ loanId }) => {
     setError(null);
 
     try {
-      // Fetch repayment transactions for the user
-      console.log('Fetching repayments with user_id:', user.id);
-      const response = await api.post('/api/v1/repayment_transactions', {
-        user_id: user.id
-      });
-      
-      const allRepayments = response.data || [];
-      console.log('All repayments length:', allRepayments.length);
-      
-      // Fetch repayment details for each transaction
-      const repaymentDetailsPromises = allRepayments.map(async (transaction) => {
-        try {
-          const repaymentResponse = await api.get(`/api/v1/repayments/${transaction.repayment_id}`);
-          return {
-            ...transaction,
-            repayment: repaymentResponse.data
-          };
-        } catch (err) {
-          console.error(`Error fetching repayment details for ${transaction.repayment_id}:`, err);
-          return transaction;
-        }
-      });
-
-      const repaymentsWithDetails = await Promise.all(repaymentDetailsPromises);
-      console.log('Repayments with details:', repaymentsWithDetails);
-
-      // Filter transactions for the current loan
-      const loanRepayments = loanId 
-        ? repaymentsWithDetails.filter(transaction => {
-            console.log('Checking transaction with repayment:', transaction);
-            const isMatch = transaction.repayment && transaction.repayment.loan_id === loanId;
-            console.log('Is match?', isMatch);
-            return isMatch;
-          })
-        : repaymentsWithDetails;
+      // Fetch repayment transactions for the user, page by page; each one
+      // already carries its repayment and loan
+      const loanRepayments = [];
+      let cursor = null;
+      do {
+        const response = await api.post('/api/v1/repayment_transactions', {
+          user_id: user.id,
+          ...(loanId ? { loan_id: loanId } : {})
+        }, {
+          params: cursor ? { cursor } : {}
+        });
+        loanRepayments.push(...(response.data || []));
+        cursor = response.headers['x-next-cursor'];
+      } while (cursor);
+      console.log('Repayments length:', loanRepayments.length);
 
       // Sort repayments by date (newest first)
       const sortedRepayments = loanRepayments.sort((a, b) => 
@@ -2,7 +2,7 @@ import { useState, useEffect } from 'react';
 import { Outlet, NavLink, useNavigate, Link } from 'react-router-dom';
 import { useAuth } from '../contexts/AuthContext';
 import UserProfileDisplay from '../components/common/UserProfileDisplay';
-import { getUnreadCount } from '../services/notificationService';
+import { getUnreadCount, subscribeToNotifications } from '../services/notificationService';
 import { 
   HomeIcon, 
   UsersIcon, 
@@ -38,9 +38,18 @@ const AdminLayout = () => {
 
     fetchUnreadCount();
     
-    // Poll for updates every 30 seconds
-    const interval = setInterval(fetchUnreadCount, 30000);
-    return () => clearInterval(interval);
+    if (!user) return undefined;
+
+    // Keep the badge current from the server-sent notification stream
+    return subscribeToNotifications((event) => {
+      if (event.type === 'resync') {
+        fetchUnreadCount();
+      } else if (event.unread_count !== undefined) {
+        setUnreadCount(event.unread_count);
+      } else if (event.unread_delta !== undefined) {
+        setUnreadCount((count) => Math.max(0, count + event.unread_delta));
+      }
+    });
   }, [user]);
 
   const handleLogout = () => {
@@ -58,27 +58,7 @@ const ApproveLoans = () => {
       setLoading(true);
       setError('');
       
-      // First get all accounts
-      const accountsResponse = await api.get('/api/v1/accounts', {
-        headers: {
-          'Authorization': `Bearer ${localStorage.getItem('session_id')}`,
-          'Content-Type': 'application/json'
-        }
-      });
-      const accounts = accountsResponse.data;
-      
-      // Get all users
-      const usersResponse = await api.get('/api/v1/users', {
-        headers: {
-          'Authorization': `Bearer ${localStorage.getItem('session_id')}`,
-          'Content-Type': 'application/json'
-        }
-      });
-      const users = usersResponse.data;
-      const userMap = new Map(users.map(user => [user.id, user]));
-      const accountMap = new Map(accounts.map(account => [account.id, account]));
-      
-      // Then get all loans
+      // Loans come back with their account and its owner embedded
       const loansResponse = await api.get('/api/v1/loans', {
         params: { admin: "True" },
         headers: {
@@ -90,8 +70,8 @@ const ApproveLoans = () => {
       if (loansResponse.data && Array.isArray(loansResponse.data)) {
         // Format the loan data to match our component's expected structure
         const formattedLoans = loansResponse.data.map(loan => {
-          const account = accountMap.get(loan.account_id);
-          const user = userMap.get(account?.user_id);
+          const account = loan.account;
+          const user = account?.user;
           return {
             id: loan.id,
             customerId: account?.user_id,
@@ -71,14 +71,22 @@ const Reports = () => {
       });
       const loans = Array.isArray(loansResponse.data) ? loansResponse.data : [];
 
-      // Fetch repayments
-      const repaymentsResponse = await api.get('/api/v1/repayments', {
-        headers: {
-          'Authorization': `Bearer ${localStorage.getItem('session_id')}`,
-          'Content-Type': 'application/json'
+      // Fetch repayments, following the pagination cursor
+      const repayments = [];
+      let cursor = null;
+      do {
+        const repaymentsResponse = await api.get('/api/v1/repayments', {
+          params: { limit: 500, ...(cursor ? { cursor } : {}) },
+          headers: {
+            'Authorization': `Bearer ${localStorage.getItem('session_id')}`,
+            'Content-Type': 'application/json'
+          }
+        });
+        if (Array.isArray(repaymentsResponse.data)) {
+          repayments.push(...repaymentsResponse.data);
         }
-      });
-      const repayments = Array.isArray(repaymentsResponse.data) ? repaymentsResponse.data : [];
+        cursor = repaymentsResponse.headers['x-next-cursor'];
+      } while (cursor);
 
       // Fetch users
       const usersResponse = await api.get('/api/v1/users', { 
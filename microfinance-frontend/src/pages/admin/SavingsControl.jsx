@@ -51,13 +51,21 @@ const SavingsControl = () => {
       const allTransactions = [];
       for (const account of accounts) {
         try {
-          const transactionsResponse = await api.get(`/api/v1/accounts/${account.id}/transactions`, {
-            headers: {
-              'Authorization': `Bearer ${localStorage.getItem('session_id')}`,
-              'Content-Type': 'application/json'
-            }
-          });
-          const accountTransactions = transactionsResponse.data.map(transaction => {
+          // Follow the pagination cursor to get the account's whole history
+          const transactions = [];
+          let cursor = null;
+          do {
+            const transactionsResponse = await api.get(`/api/v1/accounts/${account.id}/transactions`, {
+              params: { limit: 500, ...(cursor ? { cursor } : {}) },
+              headers: {
+                'Authorization': `Bearer ${localStorage.getItem('session_id')}`,
+                'Content-Type': 'application/json'
+              }
+            });
+            transactions.push(...(transactionsResponse.data || []));
+            cursor = transactionsResponse.headers['x-next-cursor'];
+          } while (cursor);
+          const accountTransactions = transactions.map(transaction => {
             const user = userMap.get(account.user_id);
             return {
               ...transaction,
@@ -157,9 +157,17 @@ const Dashboard = () => {
       const loansResponse = await api.get('/api/v1/loans', { headers });
       const loans = loansResponse.data || [];
       
-      // Get recent transactions
-      const transactionsResponse = await api.get(`/api/v1/transactions/account/${savingsAccount?.id}`, { headers });
-      const recentTransactions = transactionsResponse.data || [];
+      // Get the account's transactions, following the pagination cursor
+      const recentTransactions = [];
+      let cursor = null;
+      do {
+        const transactionsResponse = await api.get(`/api/v1/transactions/account/${savingsAccount?.id}`, {
+          params: { limit: 500, ...(cursor ? { cursor } : {}) },
+          headers
+        });
+        recentTransactions.push(...(transactionsResponse.data || []));
+        cursor = transactionsResponse.headers['x-next-cursor'];
+      } while (cursor);
       
       // Calculate loan progress
       const activeLoans = loans.filter(loan => loan.status === 'approved');
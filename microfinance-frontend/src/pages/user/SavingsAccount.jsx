@@ -140,9 +140,17 @@ const SavingsAccount = () => {
     if (!accountId) return;
     
     try {
-      const transactionsResponse = await api.get(`/api/v1/transactions/account/${accountId}`);
-      const transactions = transactionsResponse.data;
-      
+      // Fetch the whole history, following the pagination cursor
+      const transactions = [];
+      let cursor = null;
+      do {
+        const transactionsResponse = await api.get(`/api/v1/transactions/account/${accountId}`, {
+          params: { limit: 500, ...(cursor ? { cursor } : {}) }
+        });
+        transactions.push(...(transactionsResponse.data || []));
+        cursor = transactionsResponse.headers['x-next-cursor'];
+      } while (cursor);
+
       if (!transactions || transactions.length === 0) {
         console.log('No transactions found for account', accountId);
         setTransactions([]);
@@ -18,6 +18,60 @@ export const getUnreadCount = () => {
   });
 };
 
+// Open a Server-Sent Events stream of notification changes.
+// onEvent receives { type, ... } for 'unread', 'notification' and 'resync'
+// events. Returns a function that closes the stream.
+// EventSource cannot send the Authorization header, so each connection,
+// reconnects included, is opened with a fresh single-use ticket.
+export const subscribeToNotifications = (onEvent) => {
+  if (!localStorage.getItem('session_id') || typeof EventSource === 'undefined') {
+    return () => {};
+  }
+
+  let source = null;
+  let retryTimer = null;
+  let closed = false;
+  const handle = (message) => onEvent(JSON.parse(message.data));
+
+  const reconnect = () => {
+    if (!closed) {
+      retryTimer = setTimeout(connect, 5000);
+    }
+  };
+
+  const connect = async () => {
+    try {
+      const response = await apiClient.post('/api/v1/notifications/stream-ticket', {}, {
+        headers: getAuthHeaders()
+      });
+      if (closed) return;
+      const url = `${import.meta.env.VITE_API_URL}/api/v1/notifications/stream?ticket=${encodeURIComponent(response.data.ticket)}`;
+      source = new EventSource(url);
+    } catch (err) {
+      reconnect();
+      return;
+    }
+
+    source.addEventListener('unread', handle);
+    source.addEventListener('notification', handle);
+    source.addEventListener('resync', handle);
+    // The ticket is spent, so reconnect with a new one instead of
+    // letting EventSource retry the same URL
+    source.onerror = () => {
+      source.close();
+      reconnect();
+    };
+  };
+
+  connect();
+
+  return () => {
+    closed = true;
+    clearTimeout(retryTimer);
+    if (source) source.close();
+  };
+};
+
 export const markNotificationAsRead = (notificationId) => {
   return apiClient.post(`/api/v1/notifications/${notificationId}/mark-read`, {}, {
     headers: getAuthHeaders()